@@ -0,0 +1,411 @@
+"""Compares the autonomous routines by simulating them.
+
+We pick which autonomous routine to run by feel. This runs each routine in
+`autonomous/` for both alliances with `match_sim`, each in a new worker
+process, and prints a table comparing them:
+- How long the routine takes, and how much of the 20 seconds of autonomous it
+  leaves to spare. Routines that don't finish in time have no slack.
+- How long it spends stopped in `shooting_fuel`.
+- How closely the robot follows the Choreo trajectory, as the RMS and largest
+  difference between the robot's pose and the trajectory's samples.
+- How long it spends in our alliance zone while shooting on the move, for the
+  routines that do.
+- The most CPU time one loop of the robot's thread took, including simulating
+  the physics.
+
+Compare every routine:
+```
+python -m auto_report
+```
+Or just a few, on one alliance:
+```
+python -m auto_report --modes "Center Shoot Preload" --alliances red
+```
+
+The simulated devices run their control loops on the wall clock, so the
+drivetrain tracks a little worse than it would in real time. Use --real-time to
+simulate in real time, which takes 20 seconds per routine.
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import inspect
+import logging
+import math
+import multiprocessing
+import os
+import pkgutil
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple, Type
+
+import hal
+import wpilib
+import wpimath
+
+import autonomous
+import match_sim
+import physics
+from autonomous import auto_base, compiled_trajectory
+
+# How long autonomous lasts, in seconds.
+AUTO_SECONDS = 20.0
+
+# The robot is disabled for a second before autonomous, which is when it
+# seeds its pose from the selected routine's trajectory.
+AUTO_PHASES = (
+    match_sim.MatchPhase("pre-match", 1.0, autonomous=True, enabled=False),
+    match_sim.MatchPhase(
+        "autonomous", AUTO_SECONDS, True, True, match_time_seconds=20.0
+    ),
+)
+
+ALLIANCE_STATIONS = {
+    "blue": hal.AllianceStationID.kBlue1,
+    "red": hal.AllianceStationID.kRed1,
+}
+
+
+@dataclass
+class TrackingError:
+    """How far the robot was from its trajectory along one axis."""
+
+    sum_of_squares: float = 0.0
+    max: float = 0.0
+    samples: int = 0
+
+    def add(self, error: float) -> None:
+        self.sum_of_squares += error * error
+        self.max = max(self.max, abs(error))
+        self.samples += 1
+
+    @property
+    def rms(self) -> float:
+        if self.samples == 0:
+            return 0.0
+        return math.sqrt(self.sum_of_squares / self.samples)
+
+
+@dataclass
+class AutoResult:
+    """How one autonomous routine went, on one alliance."""
+
+    mode: str
+    alliance: str
+    match: Optional[match_sim.MatchResult] = None
+    # Time from the start of autonomous until the routine finished, in
+    # seconds, or None if it didn't finish in time.
+    total_seconds: Optional[float] = None
+    shooting_fuel_seconds: float = 0.0
+    # Time spent executing the trajectory in our alliance zone while shooting
+    # on the move, in seconds. None if the routine doesn't shoot on the move.
+    zone_shooting_seconds: Optional[float] = None
+    # Errors in meters.
+    x_error: TrackingError = field(default_factory=TrackingError)
+    y_error: TrackingError = field(default_factory=TrackingError)
+    # Errors in degrees.
+    heading_error: TrackingError = field(default_factory=TrackingError)
+    # Most CPU time the robot's thread used in one loop of autonomous, in
+    # seconds.
+    peak_loop_cpu_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.match is not None and self.match.ok
+
+    @property
+    def slack_seconds(self) -> Optional[float]:
+        """Time left in autonomous after the routine finished."""
+        if self.total_seconds is None:
+            return None
+        return AUTO_SECONDS - self.total_seconds
+
+
+class AutoSimulator(match_sim.MatchSimulator):
+    """Simulates one autonomous routine, and measures how it went."""
+
+    def __init__(
+        self, robot_class: Type[wpilib.RobotBase], mode: str, alliance: str
+    ) -> None:
+        """
+        Args:
+            robot_class: The robot to simulate, eg: robot.MyRobot.
+            mode: The MODE_NAME of the autonomous routine to run.
+            alliance: "blue" or "red".
+        """
+        super().__init__(
+            robot_class,
+            phases=AUTO_PHASES,
+            alliance_station=ALLIANCE_STATIONS[alliance],
+        )
+        self._result = AutoResult(mode, alliance)
+        self._auto: Optional[auto_base.AutoBase] = None
+        self._sampler: Optional[compiled_trajectory.TrajectorySampler] = None
+        self._auto_start_seconds: Optional[float] = None
+        self._trajectory_start_seconds: Optional[float] = None
+        self._auto_has_executed = False
+
+    def run(self) -> AutoResult:
+        """Simulate the routine, and return how it went.
+
+        Raises:
+            KeyError: If there is no routine with this name.
+            RuntimeError: If robotInit() doesn't finish.
+        """
+        self._result.match = super().run()
+        return self._result
+
+    def _on_start(self, robot: wpilib.RobotBase) -> None:
+        self._auto = robot._automodes.modes[self._result.mode]
+        if self._auto.SHOOT_ON_THE_MOVE:
+            self._result.zone_shooting_seconds = 0.0
+        # Make the routine the chooser's default, so the robot seeds its pose
+        # from it while disabled, and runs it. Selecting it through
+        # NetworkTables like the dashboard does only reaches the chooser some
+        # wall-clock time later, by which time the simulated match may be over.
+        robot._automodes.chooser.setDefaultOption(self._result.mode, self._auto)
+        # Wait for the trajectory to load, so it's loaded before autonomous,
+        # however long that takes.
+        trajectory = robot.trajectory_cache.get(self._auto.TRAJECTORY_NAME)
+        if trajectory is not None:
+            self._sampler = trajectory.sampler()
+
+    def _on_loop(
+        self,
+        robot: wpilib.RobotBase,
+        phase: match_sim.MatchPhase,
+        match_seconds: float,
+        loop_cpu_seconds: float,
+    ) -> None:
+        if not phase.enabled:
+            return
+        result = self._result
+        period = robot.control_loop_wait_time
+        if self._auto_start_seconds is None:
+            # This is the first loop of autonomous.
+            self._auto_start_seconds = match_seconds - period
+        result.peak_loop_cpu_seconds = max(
+            result.peak_loop_cpu_seconds, loop_cpu_seconds
+        )
+        if result.total_seconds is not None:
+            return
+        if not self._auto.is_executing:
+            # The robot thread may not have run the routine yet on the first
+            # loop, when it's slow to start.
+            if self._auto_has_executed:
+                result.total_seconds = match_seconds - self._auto_start_seconds
+            return
+        self._auto_has_executed = True
+
+        state = self._auto.current_state
+        if state == "shooting_fuel":
+            result.shooting_fuel_seconds += period
+        elif state == "executing_trajectory":
+            if self._trajectory_start_seconds is None:
+                self._trajectory_start_seconds = match_seconds
+            self._measure_tracking(
+                robot, match_seconds - self._trajectory_start_seconds, period
+            )
+
+    def _measure_tracking(
+        self, robot: wpilib.RobotBase, state_tm: float, period: float
+    ) -> None:
+        """Compare the robot's pose to where the trajectory wants it to be.
+
+        Args:
+            robot: The robot.
+            state_tm: Time since the robot started executing the trajectory.
+            period: The length of the loop.
+        """
+        pose = robot.drivetrain.fresh_state().pose
+        result = self._result
+        if (
+            result.zone_shooting_seconds is not None
+            and state_tm >= self._auto.SHOOT_ON_THE_MOVE_DELAY_SECONDS
+            and self._auto.in_alliance_zone(pose)
+        ):
+            result.zone_shooting_seconds += period
+
+        if self._sampler is None:
+            return
+        sample = self._sampler.sample_at(
+            state_tm, robot.alliance_fetcher.is_red_alliance()
+        )
+        if sample is None:
+            return
+        result.x_error.add(pose.X() - sample.x)
+        result.y_error.add(pose.Y() - sample.y)
+        result.heading_error.add(
+            math.degrees(
+                wpimath.angleModulus(pose.rotation().radians() - sample.heading)
+            )
+        )
+
+
+def find_modes() -> List[str]:
+    """Returns the MODE_NAME of every autonomous routine, in name order."""
+    modes = []
+    for module_info in pkgutil.iter_modules(autonomous.__path__):
+        module = importlib.import_module(
+            f"{autonomous.__name__}.{module_info.name}"
+        )
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if (
+                issubclass(cls, auto_base.AutoBase)
+                and cls is not auto_base.AutoBase
+                and cls.__module__ == module.__name__
+            ):
+                modes.append(cls.MODE_NAME)
+    return sorted(modes)
+
+
+def _run_auto(mode_and_alliance: Tuple[str, str]) -> AutoResult:
+    """Simulates one autonomous routine, in a worker process."""
+    logging.basicConfig(level=logging.WARNING)
+    mode, alliance = mode_and_alliance
+    return AutoSimulator(
+        match_sim.load_robot_class(match_sim.ROBOT_CLASSES["robot"]),
+        mode,
+        alliance,
+    ).run()
+
+
+def run_autos(
+    modes: Sequence[str], alliances: Sequence[str], jobs: int
+) -> List[AutoResult]:
+    """Simulates each autonomous routine on each alliance, in worker processes.
+
+    Args:
+        modes: The MODE_NAMEs of the routines to simulate.
+        alliances: "blue" and/or "red".
+        jobs: Most routines simulated at once.
+
+    Returns:
+        The result of each routine on each alliance, in the same order.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        # Simulation state is global, so each routine needs a fresh process.
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        return list(
+            executor.map(
+                _run_auto,
+                [(mode, alliance) for mode in modes for alliance in alliances],
+            )
+        )
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds:.2f}"
+
+
+def _format_error(error: TrackingError) -> str:
+    if error.samples == 0:
+        return "-"
+    return f"{error.rms:.2f}/{error.max:.2f}"
+
+
+def format_table(results: Sequence[AutoResult]) -> str:
+    """Formats results as a table, with one row per routine and alliance."""
+    header = (
+        "Routine",
+        "Alliance",
+        "Time (s)",
+        "Slack (s)",
+        "Shooting (s)",
+        "X RMS/max (m)",
+        "Y RMS/max (m)",
+        "Heading RMS/max (deg)",
+        "Zone shooting (s)",
+        "Peak loop CPU (ms)",
+    )
+    rows = [header]
+    for result in results:
+        if not result.ok:
+            rows.append(
+                (result.mode, result.alliance, "CRASHED")
+                + ("",) * (len(header) - 3)
+            )
+            continue
+        rows.append(
+            (
+                result.mode,
+                result.alliance,
+                _format_seconds(result.total_seconds),
+                _format_seconds(result.slack_seconds),
+                _format_seconds(result.shooting_fuel_seconds),
+                _format_error(result.x_error),
+                _format_error(result.y_error),
+                _format_error(result.heading_error),
+                _format_seconds(result.zone_shooting_seconds),
+                f"{result.peak_loop_cpu_seconds * 1e3:.1f}",
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = []
+    for row in rows:
+        # Left align the names, and right align the numbers.
+        cells = [row[0].ljust(widths[0]), row[1].ljust(widths[1])]
+        cells += [cell.rjust(width) for cell, width in zip(row[2:], widths[2:])]
+        lines.append("  ".join(cells).rstrip())
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the autonomous routines in simulation."
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        metavar="MODE_NAME",
+        help="Routines to simulate. Defaults to all of them.",
+    )
+    parser.add_argument(
+        "--alliances",
+        nargs="+",
+        choices=sorted(ALLIANCE_STATIONS),
+        default=sorted(ALLIANCE_STATIONS),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Most routines to simulate at once.",
+    )
+    parser.add_argument(
+        "--real-time",
+        action="store_true",
+        help="Simulate in real time, so the drivetrain tracks like it would "
+        "on the field.",
+    )
+    args = parser.parse_args(argv)
+
+    all_modes = find_modes()
+    modes = args.modes or all_modes
+    unknown = sorted(set(modes) - set(all_modes))
+    if unknown:
+        parser.error(f"Unknown routines: {unknown}, choose from: {all_modes}")
+    if args.real_time:
+        # The worker processes inherit this.
+        os.environ[physics.REAL_TIME_ENVIRONMENT_VARIABLE] = "1"
+
+    results = run_autos(
+        modes,
+        args.alliances,
+        min(args.jobs, len(modes) * len(args.alliances)),
+    )
+    print(format_table(results))
+    for result in results:
+        if not result.ok:
+            print(f"\n{result.mode} ({result.alliance}) crashed:")
+            print(result.match.error if result.match else "")
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
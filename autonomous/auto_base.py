@@ -1,8 +1,11 @@
+from typing import Optional
+
 import choreo
 import magicbot
 import wpilib
 from wpimath import geometry
 
+from autonomous import compiled_trajectory, trajectories
 from common import alliance
 from subsystem import drivetrain, intake, shooter
 
@@ -21,6 +24,8 @@ class AutoBase(magicbot.AutonomousStateMachine):
     # If set to True, shoot while executing the trajectory, when we are in our
     # alliance zone.
     SHOOT_ON_THE_MOVE = False
+    # Don't shoot on the move until this long into the trajectory.
+    SHOOT_ON_THE_MOVE_DELAY_SECONDS: float = 1.0
     # If set to a positive value, shoot for this amount of time after the
     # trajectory is executed.
     SHOOT_DURATION_SECONDS: float = 0.0
@@ -33,36 +38,46 @@ class AutoBase(magicbot.AutonomousStateMachine):
     intake: intake.Intake
     intake_deployer: intake.IntakeDeployer
     shooter_state_machine: shooter.Shooter
+    trajectory_cache: trajectories.TrajectoryCache
 
     def setup(self):
         if not self.TRAJECTORY_NAME:
             wpilib.reportError(
                 f"{self.__class__.__name__} does not set TRAJECTORY_NAME"
             )
-            self._trajectory = None
+        # The trajectory isn't loaded until this routine is selected, so the
+        # robot doesn't spend time at boot parsing every routine's trajectory.
+        self._trajectory: Optional[compiled_trajectory.CompiledTrajectory] = (
+            None
+        )
+        self._sampler: Optional[compiled_trajectory.TrajectorySampler] = None
 
-        try:
-            self._trajectory = choreo.load_swerve_trajectory(
-                self.TRAJECTORY_NAME
-            )
-        except ValueError:
-            self._trajectory = None
-            wpilib.reportError(
-                f"Failed to load trajectory '{self.TRAJECTORY_NAME}' - check "
-                "deploy/choreo/"
-            )
+    def get_initial_pose(self) -> Optional[geometry.Pose2d]:
+        """Returns the starting pose of the robot for this trajectory.
 
-    def get_initial_pose(self) -> geometry.Pose2d:
-        """Returns the starting pose of the robot for this trajectory."""
+        The first call starts loading the trajectory in the background. This
+        returns None until it has loaded.
+        """
+        if not self.TRAJECTORY_NAME:
+            return geometry.Pose2d()
+        if not self.trajectory_cache.is_loaded(self.TRAJECTORY_NAME):
+            return None
+        trajectory = self.trajectory_cache.get(self.TRAJECTORY_NAME)
         return (
-            self._trajectory.get_initial_pose(
-                self.alliance_fetcher.is_red_alliance()
-            )
-            if self._trajectory
+            trajectory.get_initial_pose(self.alliance_fetcher.is_red_alliance())
+            if trajectory
             else geometry.Pose2d()
         )
 
     def on_enable(self) -> None:
+        # This waits for the trajectory if it's still loading, which only
+        # happens if this routine was selected just before the match started.
+        self._trajectory = (
+            self.trajectory_cache.get(self.TRAJECTORY_NAME)
+            if self.TRAJECTORY_NAME
+            else None
+        )
+        self._sampler = self._trajectory.sampler() if self._trajectory else None
         # The intake can remain active for the entire duration of auto.
         self.intake.set_active(True)
         super().on_enable()
@@ -77,7 +92,7 @@ class AutoBase(magicbot.AutonomousStateMachine):
             self.next_state("shooting_fuel")
             return
 
-        sample: choreo.SwerveSample = self._trajectory.sample_at(
+        sample: choreo.SwerveSample = self._sampler.sample_at(
             state_tm, self.alliance_fetcher.is_red_alliance()
         )
 
@@ -90,29 +105,24 @@ class AutoBase(magicbot.AutonomousStateMachine):
 
         self.drivetrain.follow_trajectory_sample(sample)
 
-        if state_tm < 1.0 or not self.SHOOT_ON_THE_MOVE:
+        if (
+            state_tm < self.SHOOT_ON_THE_MOVE_DELAY_SECONDS
+            or not self.SHOOT_ON_THE_MOVE
+        ):
             return
 
-        # Shoot on the move, when in the alliance zone.
-        pose = self.drivetrain.get_robot_pose()
+        # Shoot on the move at the hub when we're in our alliance zone, but not
+        # from the neutral zone.
+        self.shooter_state_machine.set_auto(True)
+        self.shooter_state_machine.set_driver_wants_feed(
+            self.in_alliance_zone(self.drivetrain.get_robot_pose())
+        )
+
+    def in_alliance_zone(self, pose: geometry.Pose2d) -> bool:
+        """Returns whether a robot pose is in our alliance zone."""
         if self.alliance_fetcher.is_red_alliance():
-            if pose.X() > self.RED_ZONE_END_X_METERS:
-                # We're in the red alliance zone, shoot at the hub.
-                self.shooter_state_machine.set_auto(True)
-                self.shooter_state_machine.set_driver_wants_feed(True)
-            else:
-                # We're in the neutral zone, don't shoot.
-                self.shooter_state_machine.set_auto(True)
-                self.shooter_state_machine.set_driver_wants_feed(False)
-        else:
-            if pose.X() < self.BLUE_ZONE_END_X_METERS:
-                # We're in the blue alliance zone, shoot at the hub.
-                self.shooter_state_machine.set_auto(True)
-                self.shooter_state_machine.set_driver_wants_feed(True)
-            else:
-                # We're in the neutral zone, don't shoot.
-                self.shooter_state_machine.set_auto(True)
-                self.shooter_state_machine.set_driver_wants_feed(False)
+            return pose.X() > self.RED_ZONE_END_X_METERS
+        return pose.X() < self.BLUE_ZONE_END_X_METERS
 
     @magicbot.state
     def shooting_fuel(self, state_tm) -> None:
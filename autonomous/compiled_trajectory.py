@@ -0,0 +1,359 @@
+"""Choreo trajectories in a compact binary format, and a fast sampler for them.
+
+Choreo's .traj files are JSON, which is slow to parse, and choreo's sampler
+allocates a new sample each loop after a binary search. Instead, we convert
+each .traj file in deploy/choreo/ to a .bin file next to it, memory-map it at
+runtime, and sample it with a cursor that usually only moves forward by a
+sample or two each loop.
+
+Convert the trajectories after changing them in Choreo with:
+
+    python -m autonomous.compiled_trajectory
+"""
+
+import array
+import bisect
+import glob
+import mmap
+import os
+import struct
+import sys
+from typing import Optional, Sequence, Union
+
+import choreo
+import choreo.util
+from wpimath import geometry
+
+EXTENSION = ".bin"
+
+_MAGIC = b"CHORBIN1"
+# Magic, number of samples and number of swerve modules.
+_HEADER = struct.Struct("<8s2I")
+# Columns stored for every trajectory, followed by one fx column and one fy
+# column for each swerve module.
+_COLUMNS = (
+    "timestamp",
+    "x",
+    "y",
+    "heading",
+    "vx",
+    "vy",
+    "omega",
+    "ax",
+    "ay",
+    "alpha",
+)
+# Samples closer together than this are treated as the same sample, like
+# choreo does.
+_MIN_SAMPLE_SPACING_SECONDS = 1e-6
+
+
+def compile_trajectory(trajectory: choreo.SwerveTrajectory) -> bytes:
+    """Converts a trajectory to the binary format.
+
+    The format is a header followed by each column of the samples, as
+    little-endian 64-bit floats.
+    """
+    samples = trajectory.samples
+    module_count = len(samples[0].fx) if samples else 0
+    values = array.array("d")
+    for column in _COLUMNS:
+        values.extend(getattr(sample, column) for sample in samples)
+    for forces in ("fx", "fy"):
+        for module in range(module_count):
+            values.extend(getattr(sample, forces)[module] for sample in samples)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return _HEADER.pack(_MAGIC, len(samples), module_count) + values.tobytes()
+
+
+class CompiledTrajectory:
+    """A trajectory read from the binary format.
+
+    The samples are read straight from the buffer, which is usually a memory
+    mapped file, so loading a trajectory doesn't parse or copy anything.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]) -> None:
+        """
+        Raises:
+            ValueError: If the buffer doesn't hold a valid trajectory.
+        """
+        if sys.byteorder != "little":
+            raise ValueError("Compiled trajectories need a little-endian CPU")
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Too short to be a compiled trajectory")
+        magic, sample_count, module_count = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError("Not a compiled trajectory")
+        column_count = len(_COLUMNS) + 2 * module_count
+        column_size = sample_count * 8
+        if len(buffer) != _HEADER.size + column_count * column_size:
+            raise ValueError(
+                f"Compiled trajectory of {sample_count} samples has the wrong"
+                " size"
+            )
+
+        self._buffer = buffer
+        view = memoryview(buffer)
+        columns = [
+            view[start : start + column_size].cast("d")
+            for start in (
+                _HEADER.size + i * column_size for i in range(column_count)
+            )
+        ]
+        (
+            self.timestamp,
+            self.x,
+            self.y,
+            self.heading,
+            self.vx,
+            self.vy,
+            self.omega,
+            self.ax,
+            self.ay,
+            self.alpha,
+        ) = columns[: len(_COLUMNS)]
+        self.fx: Sequence[Sequence[float]] = columns[
+            len(_COLUMNS) : len(_COLUMNS) + module_count
+        ]
+        self.fy: Sequence[Sequence[float]] = columns[
+            len(_COLUMNS) + module_count :
+        ]
+        self.sample_count = sample_count
+        self.module_count = module_count
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledTrajectory":
+        """Memory-maps a compiled trajectory file.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the file isn't a valid compiled trajectory.
+        """
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_trajectory(
+        cls, trajectory: choreo.SwerveTrajectory
+    ) -> "CompiledTrajectory":
+        """Converts a trajectory loaded by choreo."""
+        return cls(compile_trajectory(trajectory))
+
+    def get_total_time(self) -> float:
+        """Returns the timestamp of the last sample."""
+        return self.timestamp[-1] if self.sample_count else 0.0
+
+    def get_initial_pose(
+        self, flip_for_red_alliance: bool = False
+    ) -> Optional[geometry.Pose2d]:
+        """Returns the initial pose, or None if there are no samples."""
+        if not self.sample_count:
+            return None
+        return self.sampler().sample_at(0.0, flip_for_red_alliance).get_pose()
+
+    def sampler(self) -> "TrajectorySampler":
+        """Returns a new sampler for this trajectory."""
+        return TrajectorySampler(self)
+
+
+class TrajectorySampler:
+    """Samples a compiled trajectory, like choreo's SwerveTrajectory.sample_at.
+
+    The sampler remembers where the last sample was, so sampling at increasing
+    timestamps takes constant time. It writes every sample into the same
+    SwerveSample object, so a sample is only valid until the next call.
+    """
+
+    def __init__(self, trajectory: CompiledTrajectory) -> None:
+        self._trajectory = trajectory
+        # Index of the first sample at or after the last sampled timestamp.
+        self._index = 0
+        self._sample = choreo.SwerveSample(
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            [0.0] * trajectory.module_count,
+            [0.0] * trajectory.module_count,
+        )
+
+        # Flipping for the red alliance is an affine transform of the
+        # positions and heading, and a sign change and module reordering of
+        # the velocities, accelerations and forces. The flipper's functions are
+        # affine, so we find their offsets and scales once, instead of calling
+        # them for every sample.
+        flipper = choreo.util.get_flipper_for_year()
+        self._flip_transforms = tuple(
+            (flip(0.0), flip(1.0) - flip(0.0))
+            for flip in (flipper.flip_x, flipper.flip_y, flipper.flip_heading)
+        )
+        self._flip_y_sign = 1.0 if flipper.IS_MIRRORED else -1.0
+        self._flip_omega_sign = -1.0 if flipper.IS_MIRRORED else 1.0
+        # When mirrored, front left and front right swap, as do back left and
+        # back right.
+        self._flip_modules: Optional[Sequence[int]] = (
+            (1, 0, 3, 2)
+            if flipper.IS_MIRRORED and trajectory.module_count == 4
+            else None
+        )
+
+    def sample_at(
+        self, timestamp: float, flip_for_red_alliance: bool = False
+    ) -> Optional[choreo.SwerveSample]:
+        """Returns the interpolated sample at a timestamp.
+
+        Args:
+            timestamp: Time since the start of the trajectory, in seconds.
+            flip_for_red_alliance: Whether to flip the sample for the red
+                alliance.
+
+        Returns:
+            The sample, or None if the trajectory has no samples. The sample is
+            overwritten by the next call.
+        """
+        t = self._trajectory
+        times = t.timestamp
+        count = t.sample_count
+        if count == 0:
+            return None
+        if count == 1 or timestamp < times[0]:
+            self._write_sample(0)
+        elif timestamp > times[count - 1]:
+            self._write_sample(count - 1)
+        else:
+            # Move the cursor to the first sample at or after the timestamp.
+            # This is usually the same sample as last time, or the next one,
+            # so we only search when it isn't.
+            index = self._index
+            if (
+                0 < index < count
+                and times[index - 1] < timestamp <= times[index]
+            ):
+                pass
+            elif (
+                index + 1 < count
+                and times[index] < timestamp <= times[index + 1]
+            ):
+                index += 1
+            else:
+                index = bisect.bisect_left(times, timestamp)
+            self._index = index
+
+            if index == 0:
+                self._write_sample(0)
+            elif times[index] - times[index - 1] < _MIN_SAMPLE_SPACING_SECONDS:
+                self._write_sample(index)
+            else:
+                self._write_interpolated(index - 1, index, timestamp)
+
+        if flip_for_red_alliance:
+            self._flip()
+        return self._sample
+
+    def _write_sample(self, index: int) -> None:
+        t = self._trajectory
+        s = self._sample
+        s.timestamp = t.timestamp[index]
+        s.x = t.x[index]
+        s.y = t.y[index]
+        s.heading = t.heading[index]
+        s.vx = t.vx[index]
+        s.vy = t.vy[index]
+        s.omega = t.omega[index]
+        s.ax = t.ax[index]
+        s.ay = t.ay[index]
+        s.alpha = t.alpha[index]
+        for module in range(t.module_count):
+            s.fx[module] = t.fx[module][index]
+            s.fy[module] = t.fy[module][index]
+
+    def _write_interpolated(
+        self, behind: int, ahead: int, timestamp: float
+    ) -> None:
+        # Integrate the accelerations, like choreo does, since they change
+        # between samples.
+        t = self._trajectory
+        s = self._sample
+        start = t.timestamp[behind]
+        scale = (timestamp - start) / (t.timestamp[ahead] - start)
+        tau = timestamp - start
+        tau2 = 0.5 * tau * tau
+        vx = t.vx[behind]
+        vy = t.vy[behind]
+        omega = t.omega[behind]
+        ax = t.ax[behind]
+        ay = t.ay[behind]
+        alpha = t.alpha[behind]
+        s.timestamp = timestamp
+        s.x = t.x[behind] + vx * tau + ax * tau2
+        s.y = t.y[behind] + vy * tau + ay * tau2
+        s.heading = t.heading[behind] + omega * tau + alpha * tau2
+        s.vx = vx + ax * tau
+        s.vy = vy + ay * tau
+        s.omega = omega + alpha * tau
+        s.ax = ax
+        s.ay = ay
+        s.alpha = alpha
+        for module in range(t.module_count):
+            fx = t.fx[module]
+            fy = t.fy[module]
+            s.fx[module] = fx[behind] + (fx[ahead] - fx[behind]) * scale
+            s.fy[module] = fy[behind] + (fy[ahead] - fy[behind]) * scale
+
+    def _flip(self) -> None:
+        s = self._sample
+        y_sign = self._flip_y_sign
+        omega_sign = self._flip_omega_sign
+        (x0, x1), (y0, y1), (heading0, heading1) = self._flip_transforms
+        s.x = x0 + x1 * s.x
+        s.y = y0 + y1 * s.y
+        s.heading = heading0 + heading1 * s.heading
+        s.vx = -s.vx
+        s.vy = y_sign * s.vy
+        s.omega = omega_sign * s.omega
+        s.ax = -s.ax
+        s.ay = y_sign * s.ay
+        s.alpha = omega_sign * s.alpha
+        if self._flip_modules is None:
+            for module in range(len(s.fx)):
+                s.fx[module] = -s.fx[module]
+                s.fy[module] = y_sign * s.fy[module]
+        else:
+            fx = s.fx[:]
+            fy = s.fy[:]
+            for module, source in enumerate(self._flip_modules):
+                s.fx[module] = -fx[source]
+                s.fy[module] = y_sign * fy[source]
+
+
+def compile_directory(directory: str) -> None:
+    """Converts every .traj file in a directory to a .bin file next to it."""
+    for path in sorted(glob.glob(os.path.join(directory, "*.traj"))):
+        with open(path, "r", encoding="utf-8") as trajectory_file:
+            trajectory = choreo.load_swerve_trajectory_string(
+                trajectory_file.read()
+            )
+        compiled_path = os.path.splitext(path)[0] + EXTENSION
+        with open(compiled_path, "wb") as compiled_file:
+            compiled_file.write(compile_trajectory(trajectory))
+        print(f"Wrote {os.path.normpath(compiled_path)}")
+
+
+if __name__ == "__main__":
+    # Convert the trajectories in the source tree, next to robot.py.
+    compile_directory(
+        os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            os.pardir,
+            "deploy",
+            "choreo",
+        )
+    )
@@ -0,0 +1,140 @@
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import choreo
+import wpilib
+
+from autonomous import compiled_trajectory
+
+logger = logging.getLogger("trajectories")
+
+
+class TrajectoryCache:
+    """Loads Choreo trajectories when they are first needed, and keeps them.
+
+    Parsing a trajectory file takes a while, and only one autonomous routine
+    runs per match, so we don't parse any at boot. Instead, the selected
+    routine's trajectory is loaded on a background thread while the robot is
+    disabled, and is kept in memory until its file changes.
+
+    Trajectories are keyed by name and by the modification time of their file,
+    so a redeployed trajectory is loaded again the next time it's needed.
+
+    Trajectories are loaded from their compiled .bin files, which is much
+    faster than parsing the .traj files. If a trajectory hasn't been compiled,
+    its .traj file is parsed and compiled in memory instead.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """
+        Args:
+            directory: Directory containing the .traj files. Defaults to the
+                choreo directory in the deploy directory, which is where
+                choreo.load_swerve_trajectory loads them from.
+        """
+        self._directory = directory or os.path.join(
+            wpilib.getDeployDirectory(), "choreo"
+        )
+        # Trajectories are parsed one at a time, on a single background thread.
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="TrajectoryCache"
+        )
+        self._lock = threading.Lock()
+        # Trajectory name to the path and modification time of its file, and
+        # the future that loads it.
+        self._entries: Dict[
+            str,
+            Tuple[
+                Tuple[str, int],
+                concurrent.futures.Future[
+                    Optional[compiled_trajectory.CompiledTrajectory]
+                ],
+            ],
+        ] = {}
+
+    def load_async(self, name: str) -> None:
+        """Starts loading a trajectory in the background, if it isn't loaded."""
+        self._entry(name)
+
+    def is_loaded(self, name: str) -> bool:
+        """Returns whether a trajectory has finished loading, or failed to."""
+        return self._entry(name).done()
+
+    def get(
+        self, name: str
+    ) -> Optional[compiled_trajectory.CompiledTrajectory]:
+        """Returns a trajectory, waiting for it to load if necessary.
+
+        Args:
+            name: The path name in Choreo, which matches the file name in the
+                deploy directory, without ".traj".
+
+        Returns:
+            The trajectory, or None if it failed to load.
+        """
+        return self._entry(name).result()
+
+    def _entry(
+        self, name: str
+    ) -> concurrent.futures.Future[
+        Optional[compiled_trajectory.CompiledTrajectory]
+    ]:
+        """Returns the future loading a trajectory, starting it if needed."""
+        # Prefer the compiled trajectory, if there is one.
+        path = os.path.join(self._directory, name + ".traj")
+        mtime = -1
+        for candidate in (
+            os.path.join(self._directory, name + compiled_trajectory.EXTENSION),
+            path,
+        ):
+            try:
+                mtime = os.stat(candidate).st_mtime_ns
+            except OSError:
+                continue
+            path = candidate
+            break
+        # If neither file exists, loading the missing .traj file reports the
+        # error.
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == (path, mtime):
+                return entry[1]
+            future = self._executor.submit(self._load, name, path)
+            self._entries[name] = ((path, mtime), future)
+            return future
+
+    def _load(
+        self, name: str, path: str
+    ) -> Optional[compiled_trajectory.CompiledTrajectory]:
+        start = time.perf_counter()
+        try:
+            if path.endswith(compiled_trajectory.EXTENSION):
+                trajectory = compiled_trajectory.CompiledTrajectory.load(path)
+            else:
+                logger.warning(
+                    "Trajectory %s isn't compiled, run `python -m"
+                    " autonomous.compiled_trajectory`",
+                    name,
+                )
+                with open(path, "r", encoding="utf-8") as trajectory_file:
+                    data = trajectory_file.read()
+                trajectory = (
+                    compiled_trajectory.CompiledTrajectory.from_trajectory(
+                        choreo.load_swerve_trajectory_string(data)
+                    )
+                )
+        except (OSError, ValueError, KeyError) as e:
+            wpilib.reportError(
+                f"Failed to load trajectory '{name}' - check deploy/choreo/: {e}"
+            )
+            return None
+        logger.info(
+            "Loaded trajectory %s in %.1fms",
+            name,
+            (time.perf_counter() - start) * 1e3,
+        )
+        return trajectory
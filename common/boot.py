@@ -0,0 +1,172 @@
+"""Records a timeline of robot startup.
+
+When the robot reboots during a match, every second spent starting up is a
+second we can't drive. This module records how long each phase of startup
+takes, from when the process started, so we know where that time goes.
+
+This only uses the standard library, so it can be imported before the slow
+imports it times.
+"""
+
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger("boot")
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _seconds_since_process_start() -> Optional[float]:
+    """Returns how long ago this process started, or None if unknown.
+
+    This reads the process start time from /proc, so it's only known on Linux,
+    which includes the roboRIO.
+    """
+    try:
+        with open("/proc/self/stat", "r") as f:
+            stat = f.read()
+        # The command name may contain spaces, so skip past it. The start time
+        # is the 22nd field, in clock ticks since the system booted.
+        start_ticks = int(stat[stat.rindex(")") + 2 :].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / (
+            os.sysconf("SC_CLK_TCK")
+        )
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _topic_name(phase_name: str) -> str:
+    """Turn a phase name (eg: "turret.setup()") into a topic name."""
+    return phase_name.replace("()", "").replace(".", "_").replace(" ", "_")
+
+
+@dataclass(frozen=True)
+class BootPhase:
+    """A phase of startup."""
+
+    name: str
+    # When the phase started, in seconds since the process started.
+    start_seconds: float
+    duration_seconds: float
+    # How many phases this one is nested in.
+    depth: int
+
+
+class BootTimeline:
+    """A timeline of the phases of robot startup.
+
+    Wrap each phase in `phase()`, or a function with `timed()`. Phases can be
+    nested. Once the robot is running, `report()` writes the timeline to the
+    console and the DataLog.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        seconds_since_process_start: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            clock: Returns the current time in seconds.
+            seconds_since_process_start: How long ago the process started.
+                Defaults to reading it from the OS. If it isn't known, the
+                timeline starts now.
+        """
+        self._clock = clock
+        if seconds_since_process_start is None:
+            seconds_since_process_start = _seconds_since_process_start()
+        now = clock()
+        self._process_start = now - (seconds_since_process_start or 0.0)
+        self._lock = threading.Lock()
+        self._phases: List[BootPhase] = []
+        self._depth = 0
+        if seconds_since_process_start:
+            # Starting Python, and whatever it imported before this module.
+            self._phases.append(
+                BootPhase("python startup", 0.0, now - self._process_start, 0)
+            )
+
+    def elapsed_seconds(self) -> float:
+        """Returns the time since the process started."""
+        return self._clock() - self._process_start
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Records how long the body of a `with` statement takes."""
+        start = self._clock()
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth = depth
+            with self._lock:
+                self._phases.append(
+                    BootPhase(
+                        name,
+                        start - self._process_start,
+                        self._clock() - start,
+                        depth,
+                    )
+                )
+
+    def timed(self, name: str, func: _F) -> _F:
+        """Wraps a function so each call is recorded as a phase."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    def phases(self) -> List[BootPhase]:
+        """Returns the phases recorded so far, in the order they started."""
+        with self._lock:
+            # Nested phases are recorded before the phases containing them.
+            return sorted(
+                self._phases, key=lambda p: (p.start_seconds, p.depth)
+            )
+
+    def report(self, data_logger: Any) -> List[BootPhase]:
+        """Writes the timeline to the console and the DataLog, then clears it.
+
+        Args:
+            data_logger: The `datalog.DataLogger` to write to.
+
+        Returns:
+            The phases that were reported.
+        """
+        phases = self.phases()
+        with self._lock:
+            self._phases.clear()
+        elapsed = self.elapsed_seconds()
+
+        lines = [f"Robot started in {elapsed * 1e3:.0f}ms:"]
+        for phase in phases:
+            lines.append(
+                f"  {phase.start_seconds * 1e3:8.1f}ms"
+                f" {phase.duration_seconds * 1e3:8.1f}ms"
+                f" {'  ' * phase.depth}{phase.name}"
+            )
+        timeline = "\n".join(lines)
+        logger.info(timeline)
+
+        data_logger.log_string("/boot/timeline", timeline)
+        data_logger.log_double("/boot/total_ms", elapsed * 1e3)
+        for phase in phases:
+            data_logger.log_double(
+                f"/boot/phases/{_topic_name(phase.name)}_ms",
+                phase.duration_seconds * 1e3,
+            )
+        return phases
+
+
+# The timeline of this process.
+TIMELINE = BootTimeline()
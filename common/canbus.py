@@ -0,0 +1,235 @@
+from typing import Dict, List, Sequence, Tuple
+
+import phoenix6
+import wpilib
+
+from common import datalog
+
+# Update frequencies for the different ways we consume status signals, in Hz.
+#
+# Signals that the control loop waits on, or that a motor controller uses as a
+# remote sensor. Twice the loop rate, so there is always fresh data at the
+# start of a loop.
+CONTROL_FREQUENCY_HZ: float = 100.0
+# Signals read or logged once per loop.
+LOOP_FREQUENCY_HZ: float = 50.0
+# Slow telemetry like temperatures and faults, which we log once per second.
+# This is the lowest frequency phoenix6 supports.
+TELEMETRY_FREQUENCY_HZ: float = 4.0
+
+# Rough time on the wire of one status frame, in seconds. A classic CAN frame
+# with an extended ID and 8 data bytes is about 130 bits before bit stuffing, at
+# 1Mbit/s. A CAN FD frame on a CANivore spends its arbitration phase at 1Mbit/s,
+# but sends its data much faster.
+CLASSIC_FRAME_SECONDS: float = 150e-6
+FD_FRAME_SECONDS: float = 50e-6
+
+
+class CanBusPlanner:
+    """Component that sets the update frequency of every status signal we use.
+
+    By default, every TalonFX and CANcoder broadcasts every status signal at a
+    fixed rate, whether or not anyone reads it. Components instead tell this
+    planner which signals they consume, and how often, in their `setup()`.
+    Once all components are set up, `apply()` sets each signal to the fastest
+    frequency anyone asked for, and slows every other signal of those devices
+    down with `optimize_bus_utilization`.
+
+    The planner also logs a predicted utilization of each CAN bus from the
+    plan, and the utilization each bus actually reports, so we can compare the
+    two.
+    """
+
+    data_logger: datalog.DataLogger
+    telemetry_scheduler: datalog.TelemetryScheduler
+
+    def setup(self) -> None:
+        """Set up initial state for the planner.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        # Requested signals of each device, keyed by device. Each device maps
+        # to a dict of the fastest frequency requested for each signal, keyed
+        # by id() since signals aren't hashable.
+        self._devices: Dict[
+            int,
+            Tuple[
+                phoenix6.hardware.ParentDevice,
+                Dict[int, Tuple[phoenix6.BaseStatusSignal, float]],
+            ],
+        ] = {}
+        # Names of all CAN buses in the plan, in the order we saw them.
+        self._bus_names: List[str] = []
+        # Handles for the predicted and measured utilization of each bus in
+        # _bus_names.
+        self._predicted_utilization: List[datalog.LogHandle[float]] = []
+        self._measured_utilization: List[datalog.LogHandle[float]] = []
+        # Index into _bus_names of the bus whose utilization we log next.
+        self._next_bus_index = 0
+
+        # Reading the status of a bus can block for up to a millisecond, so we
+        # log one bus each second, and weigh it like a large group of signals.
+        self.telemetry_scheduler.register(
+            self._log_measured_utilization, datalog.SLOW_RATE_HZ, cost=10.0
+        )
+
+    def execute(self) -> None:
+        """Nothing to do each loop.
+
+        The telemetry scheduler logs the measured utilization of the buses.
+        """
+
+    def _log_measured_utilization(self) -> None:
+        """Log the measured utilization of the next CAN bus."""
+        # There are no buses to measure in simulation, and reading their status
+        # there can block the robot thread for good.
+        if not self._bus_names or not wpilib.RobotBase.isReal():
+            return
+        index = self._next_bus_index
+        self._next_bus_index = (index + 1) % len(self._bus_names)
+        status = phoenix6.CANBus(self._bus_names[index]).get_status()
+        if status.status.is_ok():
+            self._measured_utilization[index].append(
+                status.bus_utilization * 100.0
+            )
+
+    def request(
+        self,
+        device: phoenix6.hardware.ParentDevice,
+        signals: Sequence[phoenix6.BaseStatusSignal],
+        frequency_hz: float,
+    ) -> None:
+        """Request that signals of a device be updated at least this often.
+
+        Args:
+            device:
+                The device the signals belong to.
+            signals:
+                The signals we read.
+            frequency_hz:
+                How often we need new data, in Hz.
+        """
+        entry = self._devices.get(id(device))
+        if entry is None:
+            entry = (device, {})
+            self._devices[id(device)] = entry
+            bus_name = device.network.name
+            if bus_name not in self._bus_names:
+                self._bus_names.append(bus_name)
+                self._predicted_utilization.append(
+                    self.data_logger.register_double(
+                        f"/can/{bus_name}/predicted_utilization_percent"
+                    )
+                )
+                self._measured_utilization.append(
+                    self.data_logger.register_double(
+                        f"/can/{bus_name}/measured_utilization_percent"
+                    )
+                )
+        planned = entry[1]
+        for signal in signals:
+            previous = planned.get(id(signal))
+            if previous is None or previous[1] < frequency_hz:
+                planned[id(signal)] = (signal, frequency_hz)
+
+    def request_motor_logging(self, telemetry: datalog.MotorTelemetry) -> None:
+        """Request the signals logged for a motor.
+
+        Args:
+            telemetry:
+                The handles we log the motor's data with.
+        """
+        self.request(
+            telemetry.motor, telemetry.primary_signals, LOOP_FREQUENCY_HZ
+        )
+        self.request(
+            telemetry.motor,
+            telemetry.secondary_signals,
+            TELEMETRY_FREQUENCY_HZ,
+        )
+
+    def request_remote_sensor(
+        self, encoder: phoenix6.hardware.CANcoder
+    ) -> None:
+        """Request the signals a motor controller needs to use a remote sensor.
+
+        Motor controllers configured with a remote or fused CANcoder read the
+        CANcoder's position and velocity straight off the bus.
+
+        Args:
+            encoder:
+                The CANcoder used as a remote sensor.
+        """
+        self.request(
+            encoder,
+            [
+                encoder.get_position(refresh=False),
+                encoder.get_velocity(refresh=False),
+            ],
+            CONTROL_FREQUENCY_HZ,
+        )
+
+    def predicted_utilization(self) -> Dict[str, float]:
+        """Returns the predicted utilization of each CAN bus, from 0 to 1.
+
+        This assumes each signal is sent in its own frame. Signals often share
+        frames, so the real utilization should be lower than this.
+        """
+        utilization: Dict[str, float] = {name: 0.0 for name in self._bus_names}
+        for device, planned in self._devices.values():
+            bus = device.network
+            frame_seconds = (
+                FD_FRAME_SECONDS
+                if bus.is_network_fd()
+                else CLASSIC_FRAME_SECONDS
+            )
+            for _, frequency_hz in planned.values():
+                utilization[bus.name] += frequency_hz * frame_seconds
+        return utilization
+
+    def apply(self, optimize: bool = True) -> None:
+        """Apply the plan to all devices.
+
+        Call this once, after all components have been set up.
+
+        Args:
+            optimize:
+                Whether to also slow down the signals nobody requested. Turn
+                this off when tuning, since the tuners read signals that the
+                regular components don't.
+        """
+        by_frequency: Dict[float, List[phoenix6.BaseStatusSignal]] = {}
+        for _, planned in self._devices.values():
+            for signal, frequency_hz in planned.values():
+                by_frequency.setdefault(frequency_hz, []).append(signal)
+        for frequency_hz, signals in sorted(by_frequency.items()):
+            result = phoenix6.BaseStatusSignal.set_update_frequency_for_all(
+                frequency_hz, signals
+            )
+            if not result.is_ok():
+                self.logger.error(
+                    f"Failed to set update frequency to {frequency_hz}Hz: "
+                    f"{result.name}"
+                )
+
+        if optimize:
+            for device, _ in self._devices.values():
+                result = device.optimize_bus_utilization()
+                if not result.is_ok():
+                    self.logger.error(
+                        f"Failed to optimize bus utilization of device "
+                        f"{device.device_id} on CAN bus "
+                        f"'{device.network.name}': {result.name}"
+                    )
+
+        predicted = self.predicted_utilization()
+        for bus_name, handle in zip(
+            self._bus_names, self._predicted_utilization
+        ):
+            utilization = predicted[bus_name]
+            self.logger.info(
+                f"Predicted utilization of CAN bus '{bus_name}': "
+                f"{utilization * 100.0:.1f}%"
+            )
+            handle.update(utilization * 100.0)
@@ -1,14 +1,195 @@
-from typing import Any, Dict, Optional, Type, TypeVar
+import math
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
+import phoenix6
 import wpilib
 from wpiutil import log
 
 T = TypeVar("T")
 
+# Rates for TelemetryScheduler tasks, in Hz. Telemetry is logged every loop,
+# every fifth loop, or once per second.
+FAST_RATE_HZ: float = 50.0
+MEDIUM_RATE_HZ: float = 10.0
+SLOW_RATE_HZ: float = 1.0
+
+# Topics logged for each motor by MotorTelemetry and the log_*_motor_data
+# helpers, as (topic name, TalonFX signal getter) pairs.
+_CURRENT_TOPICS: Tuple[Tuple[str, str], ...] = (
+    ("supply_current", "get_supply_current"),
+    ("stator_current", "get_stator_current"),
+)
+_POSITION_TOPICS: Tuple[Tuple[str, str], ...] = (
+    ("position_rotations", "get_position"),
+    ("rotor_position_rotations", "get_rotor_position"),
+)
+_VELOCITY_TOPICS: Tuple[Tuple[str, str], ...] = (
+    ("velocity_rotations_per_second", "get_velocity"),
+    ("rotor_velocity_rotations_per_second", "get_rotor_velocity"),
+)
+_TEMPERATURE_TOPICS: Tuple[Tuple[str, str], ...] = (
+    ("device_temp", "get_device_temp"),
+    ("processor_temp", "get_processor_temp"),
+)
+_FAULT_TOPICS: Tuple[Tuple[str, str], ...] = (
+    ("device_temp_fault", "get_fault_device_temp"),
+    ("processor_temp_fault", "get_fault_proc_temp"),
+    ("supply_current_limit_fault", "get_fault_supply_curr_limit"),
+    ("stator_current_limit_fault", "get_fault_stator_curr_limit"),
+)
+
+
+def _primary_topics(
+    position: bool, velocity: bool
+) -> Tuple[Tuple[str, str], ...]:
+    """The primary topics logged for a motor."""
+    topics = _CURRENT_TOPICS
+    if position:
+        topics += _POSITION_TOPICS
+    if velocity:
+        topics += _VELOCITY_TOPICS
+    return topics
+
+
+class LogHandle(Generic[T]):
+    """Handle for logging values to a single topic.
+
+    Components get handles from the `DataLogger.register_*` methods in their
+    `setup()`, and call `append` or `update` on them in the control loop. This
+    skips the topic lookup that the `DataLogger.log_*` methods do on every
+    call, and the topic name string doesn't need to be built each loop.
+
+    The log entry behind the handle is created the first time a value is
+    logged, so registering a topic doesn't start the log manager. From then on,
+    `append` and `update` are the log entry's own methods.
+    """
+
+    def __init__(
+        self,
+        data_logger: "DataLogger",
+        topic_name: str,
+        entry_type: Type[Any],
+        *entry_args: Any,
+    ):
+        self.topic_name = topic_name
+        self._data_logger = data_logger
+        self._entry_type = entry_type
+        self._entry_args = entry_args
+
+    def append(self, value: T) -> None:
+        """Log a value.
+
+        Args:
+            value: The value to log.
+        """
+        self._bind_entry().append(value)
+
+    def update(self, value: T) -> None:
+        """Log a value, if it changed since the last value logged.
+
+        Args:
+            value: The value to log.
+        """
+        self._bind_entry().update(value)
+
+    def _bind_entry(self) -> Any:
+        """Get the log entry, and route later calls straight to it."""
+        entry = self._data_logger._get_entry(
+            self.topic_name, self._entry_type, *self._entry_args
+        )
+        # These instance attributes shadow the methods above.
+        self.append = entry.append
+        self.update = entry.update
+        return entry
+
+
+class MotorTelemetry:
+    """Handles for logging the data of a single motor.
+
+    This logs the same topics as `log_primary_motor_data` and
+    `log_secondary_motor_data`, but the topics are registered up front, and
+    each method refreshes its signals with a single CAN call. Get one from
+    `DataLogger.register_motor` in a component's `setup()`.
+    """
+
+    def __init__(
+        self,
+        data_logger: "DataLogger",
+        topic_prefix: str,
+        motor: phoenix6.hardware.TalonFX,
+        position: bool = False,
+        velocity: bool = False,
+    ):
+        self._primary: List[Tuple[LogHandle[float], Any]] = [
+            (
+                data_logger.register_double(f"{topic_prefix}/{name}"),
+                getattr(motor, getter)(refresh=False),
+            )
+            for name, getter in _primary_topics(position, velocity)
+        ]
+        self._temperatures: List[Tuple[LogHandle[float], Any]] = [
+            (
+                data_logger.register_double(f"{topic_prefix}/{name}"),
+                getattr(motor, getter)(refresh=False),
+            )
+            for name, getter in _TEMPERATURE_TOPICS
+        ]
+        self._faults: List[Tuple[LogHandle[bool], Any]] = [
+            (
+                data_logger.register_boolean(f"{topic_prefix}/{name}"),
+                getattr(motor, getter)(refresh=False),
+            )
+            for name, getter in _FAULT_TOPICS
+        ]
+
+        # The signals logged by each method. The CAN bus planner uses these to
+        # work out which signals we need, and how often.
+        self.primary_signals: List[phoenix6.BaseStatusSignal] = [
+            signal for _, signal in self._primary
+        ]
+        self.secondary_signals: List[phoenix6.BaseStatusSignal] = [
+            signal for _, signal in self._temperatures + self._faults
+        ]
+        self.motor = motor
+
+    def log_primary(self) -> None:
+        """Log primary motor data.
+
+        This includes things like currents, position, and velocity, which are
+        typically intended to be logged at a high rate.
+        """
+        phoenix6.BaseStatusSignal.refresh_all(self.primary_signals)
+        for handle, signal in self._primary:
+            handle.update(signal.value)
+
+    def log_secondary(self) -> None:
+        """Log secondary motor data.
+
+        This includes things like temperatures and faults, which are typically
+        logged at a lower rate.
+        """
+        phoenix6.BaseStatusSignal.refresh_all(self.secondary_signals)
+        for handle, signal in self._temperatures:
+            handle.update(signal.value)
+        for handle, signal in self._faults:
+            handle.update(signal.value)
+
 
 class DataLogger:
-    def __init__(self):
-        self._log: Optional[log.DataLog] = None
+    def __init__(self, data_log: Optional[log.DataLog] = None):
+        # The log to write to. If not given, we use the DataLogManager's log,
+        # which is started the first time we log something.
+        self._log: Optional[log.DataLog] = data_log
         # Map of topic name to LogEntry object.
         self._entries: Dict[str, Any] = {}
 
@@ -18,9 +199,94 @@ class DataLogger:
             self._log = wpilib.DataLogManager.getLog()
         return self._log
 
+    def _get_entry(
+        self, topic_name: str, entry_type: Type[Any], *entry_args: Any
+    ) -> Any:
+        """Get the LogEntry for a topic, creating it if needed.
+
+        Log handles and the `log_*` methods share entries, since the last value
+        used by `update` is kept per LogEntry object.
+        """
+        entry = self._entries.get(topic_name)
+        if entry is None:
+            entry = entry_type(self._get_log(), topic_name, *entry_args)
+            self._entries[topic_name] = entry
+        return entry
+
     def flush(self) -> None:
         self._get_log().flush()
 
+    def register_struct(
+        self, topic_name: str, struct_type: Type[T]
+    ) -> LogHandle[T]:
+        """Register a topic for single struct values (eg: Pose2d).
+
+        Args:
+            topic_name: The name of the topic to log to.
+            struct_type: The type of the values.
+        """
+        return LogHandle(self, topic_name, log.StructLogEntry, struct_type)
+
+    def register_struct_array(
+        self, topic_name: str, struct_type: Type[T]
+    ) -> LogHandle[list[T]]:
+        """Register a topic for arrays of structs (eg: Pose2d[]).
+
+        Args:
+            topic_name: The name of the topic to log to.
+            struct_type: The type of the array elements.
+        """
+        return LogHandle(self, topic_name, log.StructArrayLogEntry, struct_type)
+
+    def register_string(self, topic_name: str) -> LogHandle[str]:
+        """Register a topic for string values.
+
+        Args:
+            topic_name: The name of the topic to log to.
+        """
+        return LogHandle(self, topic_name, log.StringLogEntry)
+
+    def register_string_array(self, topic_name: str) -> LogHandle[list[str]]:
+        """Register a topic for arrays of strings.
+
+        Args:
+            topic_name: The name of the topic to log to.
+        """
+        return LogHandle(self, topic_name, log.StringArrayLogEntry)
+
+    def register_double(self, topic_name: str) -> LogHandle[float]:
+        """Register a topic for double values.
+
+        Args:
+            topic_name: The name of the topic to log to.
+        """
+        return LogHandle(self, topic_name, log.DoubleLogEntry)
+
+    def register_boolean(self, topic_name: str) -> LogHandle[bool]:
+        """Register a topic for boolean values.
+
+        Args:
+            topic_name: The name of the topic to log to.
+        """
+        return LogHandle(self, topic_name, log.BooleanLogEntry)
+
+    def register_motor(
+        self,
+        topic_prefix: str,
+        motor: phoenix6.hardware.TalonFX,
+        position: bool = False,
+        velocity: bool = False,
+    ) -> MotorTelemetry:
+        """Register the topics for logging the data of a motor.
+
+        Args:
+            topic_prefix: The prefix for the topic names.
+            motor: The motor to log data for.
+            position: If True, log position data. Defaults to False.
+            velocity: If True, log velocity data. Defaults to False.
+        """
+        return MotorTelemetry(self, topic_prefix, motor, position, velocity)
+
     def log_struct(
         self,
         topic_name: str,
@@ -37,14 +303,11 @@ class DataLogger:
             on_change: If True, only logs the value if it changed since the last
                 value provided for this topic. Defaults to False.
         """
-        if topic_name not in self._entries:
-            self._entries[topic_name] = log.StructLogEntry(
-                self._get_log(), topic_name, struct_type
-            )
+        entry = self._get_entry(topic_name, log.StructLogEntry, struct_type)
         if on_change:
-            self._entries[topic_name].update(value)
+            entry.update(value)
         else:
-            self._entries[topic_name].append(value)
+            entry.append(value)
 
     def log_struct_array(
         self,
@@ -62,14 +325,13 @@ class DataLogger:
             on_change: If True, only logs the value if it changed since the last
                 value provided for this topic. Defaults to False.
         """
-        if topic_name not in self._entries:
-            self._entries[topic_name] = log.StructArrayLogEntry(
-                self._get_log(), topic_name, struct_type
-            )
+        entry = self._get_entry(
+            topic_name, log.StructArrayLogEntry, struct_type
+        )
         if on_change:
-            self._entries[topic_name].update(values)
+            entry.update(values)
         else:
-            self._entries[topic_name].append(values)
+            entry.append(values)
 
     def log_string(
         self, topic_name: str, value: str, on_change: bool = False
@@ -82,14 +344,11 @@ class DataLogger:
             on_change: If True, only logs the value if it changed since the last
                 value provided for this topic. Defaults to False.
         """
-        if topic_name not in self._entries:
-            self._entries[topic_name] = log.StringLogEntry(
-                self._get_log(), topic_name
-            )
+        entry = self._get_entry(topic_name, log.StringLogEntry)
         if on_change:
-            self._entries[topic_name].update(value)
+            entry.update(value)
         else:
-            self._entries[topic_name].append(value)
+            entry.append(value)
 
     def log_string_array(
         self, topic_name: str, values: list[str], on_change: bool = False
@@ -102,14 +361,11 @@ class DataLogger:
             on_change: If True, only logs the value if it changed since the last
                 value provided for this topic. Defaults to False.
         """
-        if topic_name not in self._entries:
-            self._entries[topic_name] = log.StringArrayLogEntry(
-                self._get_log(), topic_name
-            )
+        entry = self._get_entry(topic_name, log.StringArrayLogEntry)
         if on_change:
-            self._entries[topic_name].update(values)
+            entry.update(values)
         else:
-            self._entries[topic_name].append(values)
+            entry.append(values)
 
     def log_double(
         self, topic_name: str, value: float, on_change: bool = True
@@ -122,14 +378,11 @@ class DataLogger:
             on_change: If True, only logs the value if it changed since the last
                 value provided for this topic. Defaults to False.
         """
-        if topic_name not in self._entries:
-            self._entries[topic_name] = log.DoubleLogEntry(
-                self._get_log(), topic_name
-            )
+        entry = self._get_entry(topic_name, log.DoubleLogEntry)
         if on_change:
-            self._entries[topic_name].update(value)
+            entry.update(value)
         else:
-            self._entries[topic_name].append(value)
+            entry.append(value)
 
     def log_boolean(
         self, topic_name: str, value: bool, on_change: bool = True
@@ -142,14 +395,130 @@ class DataLogger:
             on_change: If True, only logs the value if it changed since the last
                 value provided for this topic. Defaults to False.
         """
-        if topic_name not in self._entries:
-            self._entries[topic_name] = log.BooleanLogEntry(
-                self._get_log(), topic_name
-            )
+        entry = self._get_entry(topic_name, log.BooleanLogEntry)
         if on_change:
-            self._entries[topic_name].update(value)
+            entry.update(value)
         else:
-            self._entries[topic_name].append(value)
+            entry.append(value)
+
+
+class TelemetryScheduler:
+    """Component that runs telemetry tasks at their declared rates.
+
+    Components register the telemetry they log, and how often, in their
+    `setup()`. Rather than running every 1Hz task in the same loop, the
+    scheduler gives each task a phase, picking the loops with the least work
+    already scheduled, so the cost of logging is about the same in every loop.
+
+    In match mode, every task runs `MATCH_MODE_SLOWDOWN` times less often, but
+    never less than `SLOW_RATE_HZ` unless it was registered slower than that.
+    This leaves more of the loop for control when it matters.
+
+    This component must be declared after every component that registers tasks,
+    so tasks log values from the current loop.
+    """
+
+    # Rate the robot loop runs at, in Hz.
+    LOOP_RATE_HZ: float = 50.0
+    MATCH_MODE_SLOWDOWN: float = 5.0
+
+    def __init__(self) -> None:
+        # Registered tasks, as (callback, rate in Hz, cost) tuples.
+        self._tasks: List[Tuple[Callable[[], None], float, float]] = []
+        self._match_mode = False
+        # The callbacks to run in each loop of the schedule, which repeats
+        # every len(_schedule) loops. Built on the first run after the tasks or
+        # mode change.
+        self._schedule: List[List[Callable[[], None]]] = []
+        self._schedule_stale = True
+        self._loop_count = 0
+
+    def register(
+        self,
+        callback: Callable[[], None],
+        rate_hz: float,
+        cost: float = 1.0,
+    ) -> None:
+        """Run a telemetry task at a given rate.
+
+        Args:
+            callback: The function that logs the telemetry.
+            rate_hz: How often to run the callback, in Hz. This is rounded to a
+                whole number of loops, and is at most the loop rate.
+            cost: Relative cost of the callback, like the number of signals it
+                logs. Used to spread the work evenly.
+        """
+        self._tasks.append((callback, rate_hz, cost))
+        self._schedule_stale = True
+
+    def register_motor(self, telemetry: MotorTelemetry) -> None:
+        """Log a motor's primary data every loop and secondary data each second.
+
+        Args:
+            telemetry: The motor's telemetry, from `DataLogger.register_motor`.
+        """
+        self.register(
+            telemetry.log_primary,
+            FAST_RATE_HZ,
+            cost=len(telemetry.primary_signals),
+        )
+        self.register(
+            telemetry.log_secondary,
+            SLOW_RATE_HZ,
+            cost=len(telemetry.secondary_signals),
+        )
+
+    def set_match_mode(self, match_mode: bool) -> None:
+        """Set whether to lower the rate of every task."""
+        if match_mode != self._match_mode:
+            self._match_mode = match_mode
+            self._schedule_stale = True
+
+    def is_match_mode(self) -> bool:
+        return self._match_mode
+
+    def execute(self) -> None:
+        """Run the tasks scheduled for this loop."""
+        self.run()
+
+    def run(self) -> None:
+        """Run the tasks scheduled for this loop, and advance to the next."""
+        if self._schedule_stale:
+            self._build_schedule()
+        if not self._schedule:
+            return
+        for callback in self._schedule[self._loop_count % len(self._schedule)]:
+            callback()
+        self._loop_count += 1
+
+    def period_loops(self, rate_hz: float) -> int:
+        """Number of loops between runs of a task, in the current mode."""
+        if self._match_mode:
+            rate_hz = min(
+                rate_hz, max(rate_hz / self.MATCH_MODE_SLOWDOWN, SLOW_RATE_HZ)
+            )
+        return max(1, round(self.LOOP_RATE_HZ / rate_hz))
+
+    def _build_schedule(self) -> None:
+        """Assign each task a phase, spreading the cost evenly over loops."""
+        self._schedule_stale = False
+        periods = [self.period_loops(rate_hz) for _, rate_hz, _ in self._tasks]
+        length = math.lcm(*periods) if periods else 0
+        # Total cost of the tasks scheduled in each loop of the schedule.
+        costs = [0.0] * length
+        self._schedule = [[] for _ in range(length)]
+        # Place the slowest tasks last, since they have the most phases to
+        # choose from. Ties keep registration order.
+        order = sorted(range(len(self._tasks)), key=lambda i: periods[i])
+        for i in order:
+            callback, _, cost = self._tasks[i]
+            period = periods[i]
+            phase = min(
+                range(period), key=lambda phase: max(costs[phase::period])
+            )
+            for loop in range(phase, length, period):
+                costs[loop] += cost
+                self._schedule[loop].append(callback)
 
 
 def log_primary_motor_data(
@@ -164,6 +533,8 @@ def log_primary_motor_data(
     This includes things like currents, position, and velocity, which are
     typically intended to be logged at a high rate.
 
+    Prefer `MotorTelemetry.log_primary` in code that runs every loop.
+
     Args:
         data_logger:
             The data logger to use. Assumes the log is open for writing.
@@ -176,28 +547,9 @@ def log_primary_motor_data(
         velocity:
             If True, log velocity data. Defaults to False.
     """
-    data_logger.log_double(
-        f"{topic_prefix}/supply_current", motor.get_supply_current().value
-    )
-    data_logger.log_double(
-        f"{topic_prefix}/stator_current", motor.get_stator_current().value
-    )
-    if position:
-        data_logger.log_double(
-            f"{topic_prefix}/position_rotations", motor.get_position().value
-        )
-        data_logger.log_double(
-            f"{topic_prefix}/rotor_position_rotations",
-            motor.get_rotor_position().value,
-        )
-    if velocity:
-        data_logger.log_double(
-            f"{topic_prefix}/velocity_rotations_per_second",
-            motor.get_velocity().value,
-        )
+    for name, getter in _primary_topics(position, velocity):
         data_logger.log_double(
-            f"{topic_prefix}/rotor_velocity_rotations_per_second",
-            motor.get_rotor_velocity().value,
+            f"{topic_prefix}/{name}", getattr(motor, getter)().value
         )
 
 
@@ -211,30 +563,18 @@ def log_secondary_motor_data(
     This includes things like temperatures and faults, which are typically
     logged at a lower rate.
 
+    Prefer `MotorTelemetry.log_secondary` in code that runs every loop.
+
     Args:
         data_logger: The data logger to use.
         topic_prefix: The prefix for the channel names.
         motor: The motor to log data for.
     """
-    data_logger.log_double(
-        f"{topic_prefix}/device_temp", motor.get_device_temp().value
-    )
-    data_logger.log_double(
-        f"{topic_prefix}/processor_temp", motor.get_processor_temp().value
-    )
-    data_logger.log_boolean(
-        f"{topic_prefix}/device_temp_fault",
-        motor.get_fault_device_temp().value,
-    )
-    data_logger.log_boolean(
-        f"{topic_prefix}/processor_temp_fault",
-        motor.get_fault_proc_temp().value,
-    )
-    data_logger.log_boolean(
-        f"{topic_prefix}/supply_current_limit_fault",
-        motor.get_fault_supply_curr_limit().value,
-    )
-    data_logger.log_boolean(
-        f"{topic_prefix}/stator_current_limit_fault",
-        motor.get_fault_stator_curr_limit().value,
-    )
+    for name, getter in _TEMPERATURE_TOPICS:
+        data_logger.log_double(
+            f"{topic_prefix}/{name}", getattr(motor, getter)().value
+        )
+    for name, getter in _FAULT_TOPICS:
+        data_logger.log_boolean(
+            f"{topic_prefix}/{name}", getattr(motor, getter)().value
+        )
@@ -0,0 +1,352 @@
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import phoenix6
+import wpilib
+
+from common import datalog
+
+
+@dataclass(frozen=True)
+class ConfigResult:
+    """The outcome of applying one configuration to a device."""
+
+    # What was configured, eg: "hood motor".
+    name: str
+    # The device type, ID and CAN bus, eg: "TalonFX 41 on 'Shooter'".
+    device: str
+    status: phoenix6.StatusCode
+    attempts: int
+    duration_seconds: float
+    # Whether the device already had this configuration, so it wasn't applied.
+    skipped: bool = False
+    # Fingerprint of the configuration, if we were keeping track of them.
+    fingerprint: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status.is_ok()
+
+    @property
+    def key(self) -> str:
+        """Identifies this configuration of this device in a ConfigStore."""
+        return _key(self.name, self.device)
+
+
+def _key(name: str, device: str) -> str:
+    return f"{name} ({device})"
+
+
+def _describe(device: phoenix6.hardware.ParentDevice) -> str:
+    return (
+        f"{type(device).__name__} {device.device_id} on "
+        f"'{device.network.name}'"
+    )
+
+
+def fingerprint(config: Any) -> str:
+    """Returns a hash of every value in a phoenix6 configuration."""
+    return hashlib.sha256(config.serialize().encode()).hexdigest()
+
+
+class ConfigStore:
+    """The fingerprints of the configurations last applied to each device.
+
+    Devices keep their configuration across reboots, so if a configuration is
+    the same as the one we applied last time, there's no need to apply it
+    again. Applying it takes time, and writes to the device's flash.
+
+    The fingerprints are kept in a JSON file, which is rewritten by `save()`.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Loads the fingerprints from a file, if it exists.
+
+        Args:
+            path: The JSON file the fingerprints are kept in.
+        """
+        self._path = path
+        self._fingerprints: Dict[str, str] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                fingerprints = json.load(f)
+            if isinstance(fingerprints, dict):
+                self._fingerprints = fingerprints
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            # We'll apply every configuration, and write a new file.
+            logging.getLogger("device_configurator").warning(
+                f"Ignoring device config fingerprints in {path}: {e}"
+            )
+
+    @classmethod
+    def default_path(cls) -> str:
+        """Returns the path of the store on the robot.
+
+        This is in the robot program's home directory, which is kept when new
+        code is deployed, unlike the deploy directory.
+        """
+        return os.path.join(
+            wpilib.getOperatingDirectory(), "device_config_fingerprints.json"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the fingerprint last stored for a key, if any."""
+        return self._fingerprints.get(key)
+
+    def set(self, key: str, value: Optional[str]) -> None:
+        """Stores a fingerprint for a key, or forgets the key if it's None."""
+        if value is None:
+            self._fingerprints.pop(key, None)
+        else:
+            self._fingerprints[key] = value
+
+    def save(self) -> None:
+        """Writes the fingerprints to the file.
+
+        Raises:
+            OSError: If the file can't be written.
+        """
+        # Write a new file and move it into place, so losing power while saving
+        # can't leave a partial file behind.
+        temporary_path = self._path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(self._fingerprints, f, indent=2, sort_keys=True)
+        os.replace(temporary_path, self._path)
+
+
+class DeviceConfigurator:
+    """Component that applies the configuration of every device at boot.
+
+    Applying a configuration blocks until the device acknowledges it, which
+    takes tens of milliseconds per device on a real robot. Instead of applying
+    their configurations one at a time, components hand them to this
+    configurator with `submit()` in their `setup()`. Once all components are set
+    up, `apply()` applies them all on a pool of worker threads, so devices are
+    configured concurrently, and retries each configuration that fails a few
+    times before reporting it.
+
+    Work that needs a configured device, like seeding a motor's position from
+    its absolute encoder, is registered with `after_applied()`, and runs once
+    every configuration has been applied.
+
+    On the robot, the configurator also remembers a fingerprint of each
+    configuration it applied in a ConfigStore, and skips configurations that
+    haven't changed since the last boot, as long as the device reports having
+    them.
+
+    Configurations applied while the robot is running, like new gains while
+    tuning, are still applied directly.
+    """
+
+    # Times to try applying each configuration before giving up.
+    MAX_ATTEMPTS: int = 3
+    # How long each attempt waits for the device to acknowledge, in seconds.
+    # This is phoenix6's default.
+    TIMEOUT_SECONDS: float = 0.1
+    # Most devices configured at once. Configurations mostly wait on the CAN
+    # bus, so this can be more than the number of CPUs.
+    MAX_WORKERS: int = 8
+
+    data_logger: datalog.DataLogger
+
+    def setup(self) -> None:
+        """Set up initial state for the configurator.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        # Submitted configurations of each device, in the order they were
+        # submitted, keyed by id() of the device. A device's configurations
+        # are applied in order, on the same worker.
+        self._submitted: Dict[
+            int,
+            Tuple[phoenix6.hardware.ParentDevice, List[Tuple[str, Any]]],
+        ] = {}
+        self._after_applied: List[Callable[[], None]] = []
+
+    def execute(self) -> None:
+        """Nothing to do each loop."""
+
+    def submit(
+        self,
+        name: str,
+        device: phoenix6.hardware.ParentDevice,
+        config: Any,
+    ) -> None:
+        """Submit a configuration to apply to a device in `apply()`.
+
+        Args:
+            name:
+                What is being configured, for the report, eg: "hood motor".
+            device:
+                The device to configure.
+            config:
+                The configuration to apply, eg: a TalonFXConfiguration.
+        """
+        entry = self._submitted.setdefault(id(device), (device, []))
+        entry[1].append((name, config))
+
+    def after_applied(self, callback: Callable[[], None]) -> None:
+        """Run a function once all configurations have been applied.
+
+        Callbacks run in the order they were registered, on the thread that
+        calls `apply()`, whether or not the configurations succeeded.
+        """
+        self._after_applied.append(callback)
+
+    def apply(self, store: Optional[ConfigStore] = None) -> List[ConfigResult]:
+        """Apply all submitted configurations, and wait for them.
+
+        Call this once, after all components have been set up.
+
+        Args:
+            store:
+                Fingerprints of the configurations applied last time. If given,
+                configurations that match their fingerprint and what the device
+                reports are skipped, and the store is saved with the new
+                fingerprints.
+
+        Returns:
+            The result of each configuration, in the order they were submitted
+            for each device.
+        """
+        start = time.perf_counter()
+        devices = list(self._submitted.values())
+        self._submitted.clear()
+        results: List[ConfigResult] = []
+        if devices:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(self.MAX_WORKERS, len(devices)),
+                thread_name_prefix="DeviceConfigurator",
+            ) as executor:
+                for device_results in executor.map(
+                    lambda entry: self._apply_device(*entry, store), devices
+                ):
+                    results.extend(device_results)
+        elapsed = time.perf_counter() - start
+
+        if store is not None:
+            for result in results:
+                # Forget failed configurations, so they're applied next time
+                # even if the device reads back the old configuration.
+                store.set(result.key, result.fingerprint if result.ok else None)
+            try:
+                store.save()
+            except OSError as e:
+                self.logger.warning(f"Failed to save config fingerprints: {e}")
+        self._report(results, elapsed)
+
+        callbacks = self._after_applied
+        self._after_applied = []
+        for callback in callbacks:
+            callback()
+        return results
+
+    def _apply_device(
+        self,
+        device: phoenix6.hardware.ParentDevice,
+        configs: List[Tuple[str, Any]],
+        store: Optional[ConfigStore],
+    ) -> List[ConfigResult]:
+        """Apply the configurations of one device, retrying failures."""
+        description = _describe(device)
+        results = []
+        for name, config in configs:
+            start = time.perf_counter()
+            config_fingerprint = None
+            if store is not None:
+                config_fingerprint = fingerprint(config)
+                unchanged = (
+                    store.get(_key(name, description)) == config_fingerprint
+                )
+                if unchanged and self._device_has(
+                    device, config, config_fingerprint
+                ):
+                    results.append(
+                        ConfigResult(
+                            name,
+                            description,
+                            phoenix6.StatusCode.OK,
+                            0,
+                            time.perf_counter() - start,
+                            skipped=True,
+                            fingerprint=config_fingerprint,
+                        )
+                    )
+                    continue
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                status = device.configurator.apply(config, self.TIMEOUT_SECONDS)
+                if status.is_ok():
+                    break
+            results.append(
+                ConfigResult(
+                    name,
+                    description,
+                    status,
+                    attempt,
+                    time.perf_counter() - start,
+                    fingerprint=config_fingerprint,
+                )
+            )
+        return results
+
+    def _device_has(
+        self,
+        device: phoenix6.hardware.ParentDevice,
+        config: Any,
+        config_fingerprint: str,
+    ) -> bool:
+        """Returns whether a device reports having a configuration.
+
+        This catches configurations changed since we last applied them, like
+        with Phoenix Tuner, or a device that was replaced. Reading the
+        configuration back doesn't write to the device's flash, unlike applying
+        it.
+        """
+        current = type(config)()
+        status = device.configurator.refresh(current, self.TIMEOUT_SECONDS)
+        return status.is_ok() and fingerprint(current) == config_fingerprint
+
+    def _report(self, results: List[ConfigResult], elapsed: float) -> None:
+        """Log the results to the console and the DataLog."""
+        failures = [result for result in results if not result.ok]
+        skipped = sum(result.skipped for result in results)
+        retries = sum(
+            result.attempts - 1 for result in results if not result.skipped
+        )
+        for result in failures:
+            self.logger.error(
+                f"Failed to apply configs to {result.name} "
+                f"({result.device}) after {result.attempts} attempts: "
+                f"{result.status.name}: {result.status.description}"
+            )
+        for result in results:
+            if result.ok and result.attempts > 1:
+                self.logger.warning(
+                    f"Applied configs to {result.name} ({result.device}) "
+                    f"after {result.attempts} attempts"
+                )
+        self.logger.info(
+            f"Applied {len(results) - skipped} device configs in "
+            f"{elapsed * 1e3:.0f}ms, with {retries} retries and "
+            f"{len(failures)} failures. Skipped {skipped} unchanged configs."
+        )
+
+        self.data_logger.log_double("/devices/config/apply_ms", elapsed * 1e3)
+        self.data_logger.log_double("/devices/config/retries", retries)
+        self.data_logger.log_double("/devices/config/skipped", skipped)
+        self.data_logger.log_string_array(
+            "/devices/config/failures",
+            [
+                f"{result.name} ({result.device}): {result.status.name}"
+                for result in failures
+            ],
+        )
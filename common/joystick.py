@@ -162,6 +162,19 @@ class DriverControllerRumble:
 
     PHASE_CHANGES = [130.0, 105.0, 80.0, 55.0, 30.0, 0.0]
 
+    def setup(self) -> None:
+        """Set up initial state for the rumble component.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        self._match_time_log = self.data_logger.register_double(
+            "/components/common/match_time"
+        )
+        self._rumble_log = self.data_logger.register_double(
+            "/components/driver_controller/rumble"
+        )
+
     def execute(self) -> None:
         match_time = wpilib.DriverStation.getMatchTime()
         rumble_value = 0.0
@@ -175,9 +188,5 @@ class DriverControllerRumble:
 
         self.driver_controller.set_rumble(rumble_value)
 
-        self.data_logger.log_double(
-            "/components/common/match_time", match_time, on_change=True
-        )
-        self.data_logger.log_double(
-            "/components/driver_controller/rumble", rumble_value, on_change=True
-        )
+        self._match_time_log.update(match_time)
+        self._rumble_log.update(rumble_value)
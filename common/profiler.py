@@ -0,0 +1,340 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import ntcore
+from robotpy_ext.misc.simple_watchdog import SimpleWatchdog
+
+from common import datalog
+
+logger = logging.getLogger("profiler")
+
+# Name used for the stats of the whole control loop.
+LOOP_EPOCH_NAME = "loop"
+
+
+def _topic_name(epoch_name: str) -> str:
+    """Turn a magicbot epoch name (eg: "robotPeriodic()") into a topic name."""
+    return (
+        epoch_name.replace("()", "")
+        .replace("@", "")
+        .replace(".", "_")
+        .replace(" ", "_")
+    )
+
+
+class _EpochStats:
+    """Rolling window of durations for a single epoch of the control loop.
+
+    Durations are stored in microseconds in a preallocated ring buffer, so
+    recording a sample never allocates.
+    """
+
+    __slots__ = (
+        "name",
+        "samples",
+        "index",
+        "count",
+        "overruns",
+        "last_p95_ms",
+        "last_max_ms",
+        "p50_log",
+        "p95_log",
+        "p99_log",
+        "max_log",
+        "overruns_log",
+    )
+
+    def __init__(
+        self, name: str, window: int, data_logger: datalog.DataLogger
+    ) -> None:
+        self.name: str = name
+        self.samples: List[int] = [0] * window
+        self.index: int = 0
+        self.count: int = 0
+        # Number of loop overruns this epoch was blamed for.
+        self.overruns: int = 0
+        # Most recently computed statistics, used for the NetworkTables
+        # summary.
+        self.last_p95_ms: float = 0.0
+        self.last_max_ms: float = 0.0
+
+        # Topics are registered once here, not every time we log.
+        prefix = f"/profiler/{_topic_name(name)}"
+        self.p50_log = data_logger.register_double(f"{prefix}/p50_ms")
+        self.p95_log = data_logger.register_double(f"{prefix}/p95_ms")
+        self.p99_log = data_logger.register_double(f"{prefix}/p99_ms")
+        self.max_log = data_logger.register_double(f"{prefix}/max_ms")
+        self.overruns_log = data_logger.register_double(f"{prefix}/overruns")
+
+    def record(self, duration_us: int) -> None:
+        self.samples[self.index] = duration_us
+        self.index += 1
+        if self.index == len(self.samples):
+            self.index = 0
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def percentiles_ms(self) -> Tuple[float, float, float, float]:
+        """Returns (p50, p95, p99, max) over the window, in milliseconds."""
+        if self.count == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        ordered = sorted(self.samples[: self.count])
+        last = self.count - 1
+        return (
+            ordered[min(last, int(0.50 * self.count))] / 1000.0,
+            ordered[min(last, int(0.95 * self.count))] / 1000.0,
+            ordered[min(last, int(0.99 * self.count))] / 1000.0,
+            ordered[last] / 1000.0,
+        )
+
+
+class LoopProfiler(SimpleWatchdog):
+    """Watchdog that keeps per-component timing statistics for the main loop.
+
+    MagicRobot adds a watchdog epoch after every component's `execute()` and
+    after each mode callback (`teleopPeriodic()`, `robotPeriodic()`, ...), and
+    calls `printIfExpired()` once at the end of every loop. This class folds
+    those epochs into rolling p50/p95/p99/max statistics per epoch, and blames
+    the slowest epoch of a loop whenever the loop overruns its budget.
+
+    The statistics of one epoch are computed and logged every few loops, in
+    round robin order, so the cost of the profiler is spread evenly across
+    loops. A compact summary of all epochs is published to NetworkTables each
+    time the round robin wraps around.
+    """
+
+    # Number of loops each epoch's statistics are computed over (5 seconds at
+    # 50Hz).
+    WINDOW_SIZE: int = 250
+    # Statistics for one epoch are computed and logged every this many loops.
+    PUBLISH_PERIOD_LOOPS: int = 5
+
+    def __init__(
+        self,
+        timeout: float,
+        data_logger: datalog.DataLogger,
+        window_size: int = WINDOW_SIZE,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            timeout:
+                The loop period in seconds. Loops that take longer than this
+                are counted as overruns.
+            data_logger:
+                The data logger to write statistics to.
+            window_size:
+                Number of loops to compute statistics over.
+        """
+        super().__init__(timeout)
+        self._data_logger = data_logger
+        self._window_size = window_size
+
+        self._stats: Dict[str, _EpochStats] = {}
+        # Same objects as in _stats, in the order we publish them.
+        self._publish_order: List[_EpochStats] = []
+        self._publish_index: int = 0
+        self._loops_until_publish: int = self.PUBLISH_PERIOD_LOOPS
+        self._loop_stats = _EpochStats(
+            LOOP_EPOCH_NAME, window_size, data_logger
+        )
+        self._loop_ms_log = data_logger.register_double("/profiler/loop_ms")
+        self._overrun_culprit_log = data_logger.register_string(
+            "/profiler/overrun_culprit"
+        )
+        self._overrun_culprit_ms_log = data_logger.register_double(
+            "/profiler/overrun_culprit_ms"
+        )
+
+        # Name of the epoch whose time to the end of the loop we keep
+        # statistics of, if any. See track_time_after().
+        self._time_after_name: Optional[str] = None
+        self._time_after_stats: Optional[_EpochStats] = None
+
+        self._overruns: int = 0
+        self._last_culprit: Optional[str] = None
+        self._last_overrun_print_time: int = 0
+
+        nt = ntcore.NetworkTableInstance.getDefault()
+        self._names_publisher = nt.getStringArrayTopic(
+            "/profiler/names"
+        ).publish()
+        self._p95_publisher = nt.getDoubleArrayTopic(
+            "/profiler/p95_ms"
+        ).publish()
+        self._max_publisher = nt.getDoubleArrayTopic(
+            "/profiler/max_ms"
+        ).publish()
+        self._overruns_publisher = nt.getDoubleArrayTopic(
+            "/profiler/overruns"
+        ).publish()
+        self._last_culprit_publisher = nt.getStringTopic(
+            "/profiler/last_overrun_culprit"
+        ).publish()
+
+    def printIfExpired(self) -> None:
+        """Record this loop's epochs, then defer to the regular watchdog."""
+        self._record_loop()
+        super().printIfExpired()
+
+    def overrun_count(self) -> int:
+        """Returns the number of loop overruns seen so far."""
+        return self._overruns
+
+    def last_overrun_culprit(self) -> Optional[str]:
+        """Returns the epoch blamed for the most recent loop overrun."""
+        return self._last_culprit
+
+    def track_time_after(self, epoch_name: str) -> None:
+        """Keep statistics of the time from the end of an epoch to the end of
+        each loop.
+
+        This is how long the rest of the loop takes once that epoch is done, so
+        the epoch can tell how much of the loop's budget it may use.
+
+        Args:
+            epoch_name:
+                A component name or watchdog epoch name.
+        """
+        self._time_after_name = epoch_name
+        self._time_after_stats = _EpochStats(
+            f"after {epoch_name}", self._window_size, self._data_logger
+        )
+        self._publish_order.append(self._time_after_stats)
+
+    def remaining_seconds(self) -> float:
+        """Returns how much longer the current loop can spend before the epoch
+        passed to `track_time_after()` ends, in seconds.
+
+        This is the loop period, minus the time since the loop started, minus
+        the longest the rest of the loop has taken over the window. It is
+        negative when the loop is already behind.
+        """
+        time_after_us = 0
+        if self._time_after_stats is not None:
+            time_after_us = max(self._time_after_stats.samples)
+        return (
+            self._timeout - (self._get_time() - self._startTime) - time_after_us
+        ) / 1e6
+
+    def percentiles_ms(
+        self, epoch_name: str
+    ) -> Tuple[float, float, float, float]:
+        """Returns (p50, p95, p99, max) in milliseconds for an epoch.
+
+        Args:
+            epoch_name:
+                A component name, a watchdog epoch name such as
+                "teleopPeriodic()", or `LOOP_EPOCH_NAME` for the whole loop.
+        """
+        if epoch_name == LOOP_EPOCH_NAME:
+            return self._loop_stats.percentiles_ms()
+        stats = self._stats.get(epoch_name)
+        if stats is None:
+            return 0.0, 0.0, 0.0, 0.0
+        return stats.percentiles_ms()
+
+    def _record_loop(self) -> None:
+        now = self._get_time()
+        prev = self._startTime
+        culprit: Optional[_EpochStats] = None
+        culprit_duration = -1
+        time_after_name = self._time_after_name
+        time_after_start: Optional[int] = None
+
+        all_stats = self._stats
+        for name, timestamp in self._epochs:
+            if name == time_after_name:
+                time_after_start = timestamp
+            duration = timestamp - prev
+            prev = timestamp
+            stats = all_stats.get(name)
+            if stats is None:
+                stats = _EpochStats(name, self._window_size, self._data_logger)
+                all_stats[name] = stats
+                self._publish_order.append(stats)
+            # This is _EpochStats.record, inlined since it runs for every epoch
+            # of every loop.
+            index = stats.index
+            stats.samples[index] = duration
+            index += 1
+            stats.index = 0 if index == self._window_size else index
+            if stats.count < self._window_size:
+                stats.count += 1
+            if duration > culprit_duration:
+                culprit = stats
+                culprit_duration = duration
+
+        if time_after_start is not None:
+            self._time_after_stats.record(now - time_after_start)
+
+        loop_duration = now - self._startTime
+        self._loop_stats.record(loop_duration)
+        self._loop_ms_log.append(loop_duration / 1000.0)
+
+        if loop_duration > self._timeout and culprit is not None:
+            self._on_overrun(culprit, culprit_duration, loop_duration, now)
+
+        self._loops_until_publish -= 1
+        if self._loops_until_publish <= 0:
+            self._loops_until_publish = self.PUBLISH_PERIOD_LOOPS
+            self._publish_next()
+
+    def _on_overrun(
+        self,
+        culprit: _EpochStats,
+        culprit_duration: int,
+        loop_duration: int,
+        now: int,
+    ) -> None:
+        self._overruns += 1
+        culprit.overruns += 1
+        self._last_culprit = culprit.name
+
+        self._overrun_culprit_log.append(culprit.name)
+        self._overrun_culprit_ms_log.append(culprit_duration / 1000.0)
+        self._last_culprit_publisher.set(culprit.name)
+
+        if now - self._last_overrun_print_time > self.kMinPrintPeriod:
+            self._last_overrun_print_time = now
+            logger.warning(
+                "Loop overrun (%.2fms): %s took %.2fms",
+                loop_duration / 1000.0,
+                culprit.name,
+                culprit_duration / 1000.0,
+            )
+
+    def _publish_next(self) -> None:
+        """Log the statistics of the next epoch in the round robin."""
+        if self._publish_index >= len(self._publish_order):
+            self._publish_index = 0
+            self._publish_summary()
+            stats = self._loop_stats
+        else:
+            stats = self._publish_order[self._publish_index]
+            self._publish_index += 1
+
+        p50, p95, p99, maximum = stats.percentiles_ms()
+        stats.last_p95_ms = p95
+        stats.last_max_ms = maximum
+        stats.p50_log.update(p50)
+        stats.p95_log.update(p95)
+        stats.p99_log.update(p99)
+        stats.max_log.update(maximum)
+        stats.overruns_log.update(stats.overruns)
+
+    def _publish_summary(self) -> None:
+        """Publish the latest p95 and max of every epoch to NetworkTables."""
+        names: List[str] = []
+        p95s: List[float] = []
+        maxes: List[float] = []
+        overruns: List[float] = []
+        for stats in self._publish_order:
+            names.append(stats.name)
+            p95s.append(stats.last_p95_ms)
+            maxes.append(stats.last_max_ms)
+            overruns.append(stats.overruns)
+        self._names_publisher.set(names)
+        self._p95_publisher.set(p95s)
+        self._max_publisher.set(maxes)
+        self._overruns_publisher.set(overruns)
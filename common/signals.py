@@ -0,0 +1,242 @@
+from typing import Dict, List, Optional, TypeVar
+
+import phoenix6
+import wpilib
+
+from common import canbus, datalog, profiler
+
+T = TypeVar("T", bound=phoenix6.BaseStatusSignal)
+
+
+class SignalHub:
+    """Component that refreshes the StatusSignals of all components at once.
+
+    Components register the signals they read with `register()` in their
+    `setup()`, keep a reference to the returned signal, and read `.value` (or
+    `.timestamp`) from it whenever they need it. Once per control loop, this
+    component refreshes every registered signal with a single
+    `BaseStatusSignal.refresh_all` call per CAN bus. That is much cheaper than
+    refreshing each signal separately, and it means every component works off
+    the same snapshot of sensor data within a loop.
+
+    In synchronous mode, the hub instead starts each loop by blocking in
+    `BaseStatusSignal.wait_for_all` until the signals registered with
+    `synchronous=True` all have new data. Everything that runs after the hub in
+    the loop then acts on sensor data that is only as old as the time it takes
+    to get there, rather than anywhere up to a full loop old.
+
+    Only the signals of one CAN bus are waited on: `wait_for_all` rejects
+    signals from different buses, so the hub waits on the bus with the most
+    synchronous signals. Synchronous signals on any other bus, like the Pigeon
+    2's yaw rate on the swerve bus, are refreshed without waiting, and are not
+    synchronized with the loop at all.
+
+    The wait never eats into the time the rest of the loop needs: given the
+    robot's loop profiler, the hub waits at most until the time left in the
+    loop is what the rest of the loop has recently taken, plus a margin.
+
+    This component must be declared before any component that reads hub
+    signals in the robot class, so that its `execute()` runs first.
+    """
+
+    # Longest we'll block waiting for synchronous signals, in seconds. This is
+    # a bit more than the period of a 100Hz signal, so it only times out if a
+    # device stops sending data. The time left in the loop can cut it shorter.
+    SYNCHRONOUS_TIMEOUT_SECONDS: float = 0.012
+    # Time we leave the rest of the loop on top of the longest it took recently,
+    # in seconds.
+    SYNCHRONOUS_MARGIN_SECONDS: float = 0.002
+
+    data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+
+    def setup(self) -> None:
+        """Set up initial state for the signal hub.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        # Registered signals, keyed by the name of their CAN bus. Signals must
+        # be grouped by bus, since refresh_all rejects signals from different
+        # buses.
+        self._signals_by_bus: Dict[str, List[phoenix6.BaseStatusSignal]] = {}
+        # Signals registered with synchronous=True, keyed by CAN bus name.
+        self._synchronous_signals_by_bus: Dict[
+            str, List[phoenix6.BaseStatusSignal]
+        ] = {}
+        # What refresh() refreshes each loop: one list of signals per CAN bus,
+        # minus the signals we wait on in synchronous mode.
+        self._signal_groups: List[List[phoenix6.BaseStatusSignal]] = []
+        # Signals we wait on at the start of each loop, in synchronous mode.
+        self._wait_signals: List[phoenix6.BaseStatusSignal] = []
+        self._synchronous = False
+        # Measures how much of the loop we can spend waiting, if given.
+        self._loop_profiler: Optional[profiler.LoopProfiler] = None
+        self._wait_timeouts = 0
+        # Time of the most recent refresh, in seconds.
+        self._refresh_timestamp: float = 0.0
+
+        self._wait_ms_log = self.data_logger.register_double(
+            "/signal_hub/wait_ms"
+        )
+        self._wait_timeouts_log = self.data_logger.register_double(
+            "/signal_hub/wait_timeouts"
+        )
+
+    def execute(self) -> None:
+        """Refresh all registered signals.
+
+        This method is called at the end of the control loop, before the
+        `execute` method of any component declared after this one.
+        """
+        self.refresh()
+
+    def register(
+        self,
+        device: phoenix6.hardware.ParentDevice,
+        signal: T,
+        synchronous: bool = False,
+    ) -> T:
+        """Register a signal to be refreshed every loop.
+
+        Registering the same signal more than once is harmless. The signal is
+        refreshed once right away, so it has a valid value before the first
+        loop runs.
+
+        Args:
+            device:
+                The device the signal belongs to. Used to group signals by CAN
+                bus.
+            signal:
+                The signal to refresh.
+            synchronous:
+                Whether the loop should wait for new data on this signal when
+                the hub is in synchronous mode.
+
+        Returns:
+            The signal, for convenience.
+        """
+        bus_name = device.network.name
+        signals = self._signals_by_bus.setdefault(bus_name, [])
+        if not any(s is signal for s in signals):
+            signals.append(signal)
+            self.logger.info(
+                f"Registered {signal.name} on CAN bus '{bus_name}' "
+                f"({len(signals)} signals)"
+            )
+        if synchronous:
+            synchronous_signals = self._synchronous_signals_by_bus.setdefault(
+                bus_name, []
+            )
+            if not any(s is signal for s in synchronous_signals):
+                synchronous_signals.append(signal)
+        self._update_signal_groups()
+        self.can_bus_planner.request(
+            device,
+            [signal],
+            (
+                canbus.CONTROL_FREQUENCY_HZ
+                if synchronous
+                else canbus.LOOP_FREQUENCY_HZ
+            ),
+        )
+        signal.refresh()
+        return signal
+
+    def set_synchronous(
+        self,
+        enabled: bool,
+        loop_profiler: Optional[profiler.LoopProfiler] = None,
+    ) -> None:
+        """Enable or disable synchronous mode.
+
+        wait_for_all only accepts signals from a single CAN bus, so we wait on
+        the bus with the most synchronous signals. Synchronous signals on other
+        buses are refreshed without waiting, like any other signal.
+
+        Args:
+            enabled:
+                True to wait for new sensor data at the start of each loop,
+                False to refresh whatever data is already there.
+            loop_profiler:
+                The robot's loop profiler, tracking the time after this
+                component with `track_time_after()`. Waits are cut short so the
+                rest of the loop still fits in the loop's period. Without one,
+                we wait up to `SYNCHRONOUS_TIMEOUT_SECONDS`.
+        """
+        self._synchronous = enabled
+        self._loop_profiler = loop_profiler
+        self._update_signal_groups()
+        if enabled and self._wait_signals:
+            self.logger.info(
+                "Synchronous mode: waiting on "
+                + ", ".join(signal.name for signal in self._wait_signals)
+            )
+        elif enabled:
+            self.logger.warning(
+                "Synchronous mode enabled, but no synchronous signals are "
+                "registered"
+            )
+
+    def refresh(self) -> None:
+        """Refresh all registered signals, with one call per CAN bus.
+
+        In synchronous mode, this first blocks until the synchronous signals
+        have new data, or until `SYNCHRONOUS_TIMEOUT_SECONDS` has passed, or
+        until waiting any longer would leave too little time for the rest of
+        the loop. If there's no time to wait at all, they are just refreshed.
+        """
+        if self._wait_signals:
+            timeout = self.SYNCHRONOUS_TIMEOUT_SECONDS
+            if self._loop_profiler is not None:
+                timeout = min(
+                    timeout,
+                    self._loop_profiler.remaining_seconds()
+                    - self.SYNCHRONOUS_MARGIN_SECONDS,
+                )
+            start = wpilib.Timer.getFPGATimestamp()
+            if timeout > 0.0:
+                status = phoenix6.BaseStatusSignal.wait_for_all(
+                    timeout, self._wait_signals, report_error=False
+                )
+            else:
+                status = phoenix6.BaseStatusSignal.refresh_all(
+                    self._wait_signals
+                )
+            self._wait_ms_log.append(
+                (wpilib.Timer.getFPGATimestamp() - start) * 1000.0
+            )
+            if not status.is_ok():
+                self._wait_timeouts += 1
+                self._wait_timeouts_log.update(self._wait_timeouts)
+        for signals in self._signal_groups:
+            phoenix6.BaseStatusSignal.refresh_all(signals)
+        self._refresh_timestamp = wpilib.Timer.getFPGATimestamp()
+
+    def refresh_timestamp(self) -> float:
+        """Time of the most recent refresh, in seconds on the FPGA clock."""
+        return self._refresh_timestamp
+
+    def _update_signal_groups(self) -> None:
+        """Work out which signals refresh() waits on and which it refreshes."""
+        wait_bus: Optional[str] = None
+        if self._synchronous and self._synchronous_signals_by_bus:
+            wait_bus = max(
+                self._synchronous_signals_by_bus,
+                key=lambda bus: len(self._synchronous_signals_by_bus[bus]),
+            )
+        self._wait_signals = (
+            list(self._synchronous_signals_by_bus[wait_bus])
+            if wait_bus is not None
+            else []
+        )
+
+        self._signal_groups = []
+        for signals in self._signals_by_bus.values():
+            group = [
+                signal
+                for signal in signals
+                if not any(signal is s for s in self._wait_signals)
+            ]
+            if group:
+                self._signal_groups.append(group)
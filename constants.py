@@ -1,4 +1,8 @@
+import json
+import logging
+import os
 import subprocess
+import time
 from dataclasses import dataclass
 
 import wpilib
@@ -7,6 +11,13 @@ import typing
 # Juno
 DEFAULT_ROBOT_SERIAL = "0323CA4B"
 
+# The MAC address of the roboRIO's ethernet port, which we use to check that a
+# cached serial number belongs to this roboRIO. A roboRIO 2 boots from an SD
+# card, which can be moved to another roboRIO along with the cache.
+_MAC_ADDRESS_PATH = "/sys/class/net/eth0/address"
+
+logger = logging.getLogger("constants")
+
 
 @dataclass(frozen=True)
 class RobotConstants:
@@ -18,7 +29,98 @@ class RobotConstants:
     shooter: "subsystem.shooter.constants.ShooterConstants | None" = None
 
 
-def get_robot_constants() -> RobotConstants:
+def default_serial_cache_path() -> str:
+    """Returns where the robot caches its serial number.
+
+    This is in the robot program's home directory, which is kept when new code
+    is deployed.
+    """
+    return os.path.join(wpilib.getOperatingDirectory(), "robot_serial.json")
+
+
+def _read_mac_address() -> typing.Optional[str]:
+    try:
+        with open(_MAC_ADDRESS_PATH, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_cached_serial(path: str, mac_address: str) -> typing.Optional[str]:
+    """Returns the cached serial number, if it was cached on this roboRIO."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["mac_address"] == mac_address and cached["serial"]:
+            return cached["serial"]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring cached serial number in {path}: {e}")
+    return None
+
+
+def _write_cached_serial(path: str, serial: str, mac_address: str) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"serial": serial, "mac_address": mac_address}, f)
+    except OSError as e:
+        logger.warning(f"Failed to cache serial number in {path}: {e}")
+
+
+def get_robot_serial(cache_path: typing.Optional[str] = None) -> str:
+    """Reads the serial number of the roboRIO.
+
+    Reading the serial number runs fw_printenv, which takes a while, so if a
+    cache path is given, the serial number is read from there instead, as long
+    as it was cached on this roboRIO.
+
+    Args:
+        cache_path: Where to cache the serial number, or None to always read
+            it with fw_printenv.
+
+    Returns:
+        The serial number, or the default serial number if it can't be read.
+    """
+    # Without the MAC address, we can't tell whether a cached serial number
+    # belongs to this roboRIO, so we don't use the cache.
+    mac_address = _read_mac_address() if cache_path is not None else None
+    if cache_path is not None and mac_address is not None:
+        robot_serial = _read_cached_serial(cache_path, mac_address)
+        if robot_serial is not None:
+            logger.info(f"Using cached serial number {robot_serial}")
+            return robot_serial
+
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            ["/sbin/fw_printenv", "-n", "serial#"],
+            capture_output=True,
+            text=True,
+            timeout=1,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        wpilib.reportError(f"Failed to get robot serial numbers: {e}", False)
+        wpilib.reportWarning(
+            f"Using constants for default serial number: {DEFAULT_ROBOT_SERIAL}",
+            False,
+        )
+        return DEFAULT_ROBOT_SERIAL
+    robot_serial = result.stdout.rstrip()
+    logger.info(
+        f"Read serial number {robot_serial} with fw_printenv in "
+        f"{(time.perf_counter() - start) * 1e3:.0f}ms"
+    )
+
+    if cache_path is not None and mac_address is not None and robot_serial:
+        _write_cached_serial(cache_path, robot_serial, mac_address)
+    return robot_serial
+
+
+def get_robot_constants(
+    serial_cache_path: typing.Optional[str] = None,
+) -> RobotConstants:
     """Fetches robot constants based on serial number.
 
     Attempts to read the serial number, and fetches the matching constants from
@@ -27,6 +129,10 @@ def get_robot_constants() -> RobotConstants:
     In simulation mode, instead of attempting to read the serial, it uses the
     default.
 
+    Args:
+        serial_cache_path: Where to cache the serial number. See
+            `get_robot_serial`.
+
     Returns:
         A RobotConstants object containing all the constants found for the
         determined serial number.
@@ -37,31 +143,12 @@ def get_robot_constants() -> RobotConstants:
             "Running in simulation - using default robot constants", False
         )
     else:
-        try:
-            result = subprocess.run(
-                ["/sbin/fw_printenv", "-n", "serial#"],
-                capture_output=True,
-                text=True,
-                timeout=1,
-                check=True,
-            )
-            robot_serial = result.stdout.rstrip()
-        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-            wpilib.reportError(
-                f"Failed to get robot serial numbers: {e}", False
-            )
-            wpilib.reportWarning(
-                f"Using constants for default serial number: {DEFAULT_ROBOT_SERIAL}",
-                False,
-            )
-            robot_serial = DEFAULT_ROBOT_SERIAL
-
-    # If these imports are moved to global scope, subsytem/shooter/__init__.py
-    # gets executed, which imports Tuner classes, which triggers @tunable +
-    # get_type_hints() while constants.py is still being loaded, and fails
-    # because it can't find the RobotConstants type.
-    #
-    # Hence we import them lazily inside this function.
+        robot_serial = get_robot_serial(serial_cache_path)
+
+    # The subsystem modules import this module, and their components are
+    # annotated with RobotConstants, which is evaluated when each component
+    # class is defined. Importing them at the top of this module would define
+    # those classes before RobotConstants exists, so we import them here.
     from subsystem import drivetrain, intake, shooter
 
     drivetrain_constants: typing.Optional[drivetrain.DrivetrainConstants] = (
@@ -0,0 +1,445 @@
+"""Simulates whole matches headless, as fast as the CPU allows.
+
+The simulation GUI runs the robot in real time, so a match takes as long to
+simulate as it does to play. This steps simulated time forward in lockstep with
+the robot's control loop instead, so each loop runs as soon as the previous one
+finishes. It scripts the DriverStation through each phase of a match, and
+replays scripted driver controller inputs.
+
+It reports how long the robot's loops take, and any exceptions. The simulated
+devices run their control loops on the wall clock, so when simulated time runs
+this far ahead of it, the mechanisms don't move like they would on the field.
+Use `auto_report` to measure how they do.
+
+Simulate matches with the competition robot, in parallel worker processes:
+```
+python -m match_sim --matches 20
+```
+Or with the TunerBot:
+```
+python -m match_sim --robot tunerbot
+```
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import logging
+import multiprocessing
+import os
+import pathlib
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Sequence, Type
+
+import hal
+import hal.simulation
+import ntcore
+import wpilib
+from pyfrc.physics.core import PhysicsInterface
+from wpilib.simulation import (
+    DriverStationSim,
+    XboxControllerSim,
+    pauseTiming,
+    restartTiming,
+    stepTiming,
+)
+
+logger = logging.getLogger("match_sim")
+
+# Robot classes that can be simulated from the command line.
+ROBOT_CLASSES = {
+    "robot": "robot:MyRobot",
+    "tunerbot": "tunerbot:TunerBot",
+}
+
+# How long to wait for robotInit() to finish, in wall-clock seconds.
+INIT_TIMEOUT_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class MatchPhase:
+    """A stretch of the match with the same DriverStation state."""
+
+    name: str
+    duration_seconds: float
+    autonomous: bool
+    enabled: bool
+    # Match time reported at the start of the phase, counting down through it,
+    # or None if the DriverStation doesn't report one.
+    match_time_seconds: Optional[float] = None
+
+
+# The phases of a match: 20 seconds of autonomous, a few disabled seconds while
+# the field is scored, then 2:20 of teleop, the last 30 seconds of which are the
+# endgame. The robot is disabled for a second before the match starts.
+MATCH_PHASES = (
+    MatchPhase("pre-match", 1.0, autonomous=True, enabled=False),
+    MatchPhase("autonomous", 20.0, True, True, match_time_seconds=20.0),
+    MatchPhase("auto to teleop", 3.0, autonomous=False, enabled=False),
+    MatchPhase("teleop", 110.0, False, True, match_time_seconds=140.0),
+    MatchPhase("endgame", 30.0, False, True, match_time_seconds=30.0),
+)
+
+_BUTTONS = frozenset(
+    (
+        "A",
+        "B",
+        "X",
+        "Y",
+        "LeftBumper",
+        "RightBumper",
+        "LeftStick",
+        "RightStick",
+        "Back",
+        "Start",
+    )
+)
+
+
+@dataclass(frozen=True)
+class ControllerInput:
+    """The state of the driver controller from a point in the match on.
+
+    The controller holds this state until the next input in the script.
+    """
+
+    # When this state starts, in seconds since the start of the match.
+    time_seconds: float
+    left_x: float = 0.0
+    left_y: float = 0.0
+    right_x: float = 0.0
+    right_y: float = 0.0
+    left_trigger: float = 0.0
+    right_trigger: float = 0.0
+    # Names of the buttons held down, eg: "A", "RightBumper", "Start".
+    buttons: FrozenSet[str] = frozenset()
+
+    def __post_init__(self) -> None:
+        unknown = self.buttons - _BUTTONS
+        if unknown:
+            raise ValueError(f"Unknown buttons: {sorted(unknown)}")
+
+    def apply(self, controller: XboxControllerSim) -> None:
+        """Set the simulated controller to this state."""
+        controller.setLeftX(self.left_x)
+        controller.setLeftY(self.left_y)
+        controller.setRightX(self.right_x)
+        controller.setRightY(self.right_y)
+        controller.setLeftTriggerAxis(self.left_trigger)
+        controller.setRightTriggerAxis(self.right_trigger)
+        for button in _BUTTONS:
+            getattr(controller, f"set{button}Button")(button in self.buttons)
+
+
+# A driver that intakes and shoots a few times in teleop, which starts 23
+# seconds into the match.
+DRIVER_SCRIPT = (
+    # Turn on the intake, and drive upfield collecting fuel.
+    ControllerInput(24.0, buttons=frozenset({"RightBumper"})),
+    ControllerInput(24.5, left_y=-0.8),
+    ControllerInput(27.0, left_x=0.5, right_x=0.3),
+    # Drive back and shoot from behind the tower.
+    ControllerInput(30.0, left_y=0.8),
+    ControllerInput(33.0, buttons=frozenset({"A", "Y"})),
+    ControllerInput(38.0),
+    # Shoot on the move, aiming automatically.
+    ControllerInput(40.0, left_x=-0.4, right_trigger=1.0),
+    ControllerInput(45.0),
+    # Shoot from the trenches.
+    ControllerInput(60.0, buttons=frozenset({"X"})),
+    ControllerInput(64.0, buttons=frozenset({"B"})),
+    ControllerInput(68.0),
+    # Reset the field-centric heading.
+    ControllerInput(90.0, buttons=frozenset({"Start"})),
+    ControllerInput(90.2),
+    # Drive around through the endgame.
+    ControllerInput(140.0, left_y=-0.5, right_x=-0.5),
+    ControllerInput(150.0, left_y=0.5, buttons=frozenset({"LeftBumper"})),
+    ControllerInput(160.0),
+)
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """The outcome of simulating one match."""
+
+    robot: str
+    simulated_seconds: float
+    # Wall-clock time spent simulating the match, after robotInit().
+    wall_seconds: float
+    # Wall-clock time robotInit() took.
+    init_wall_seconds: float
+    loops: int
+    # Most CPU time the robot's thread used in one loop, in seconds. This
+    # includes simulating the physics.
+    peak_loop_cpu_seconds: float = 0.0
+    # The exception that stopped the robot, if it crashed.
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than real time the match was simulated."""
+        if self.wall_seconds <= 0.0:
+            return float("inf")
+        return self.simulated_seconds / self.wall_seconds
+
+
+class MatchSimulator:
+    """Runs a robot through a match, stepping simulated time in lockstep.
+
+    Each simulator runs one match, and the simulation keeps global state, so
+    run each match in a new process. `run_matches()` does that.
+    """
+
+    def __init__(
+        self,
+        robot_class: Type[wpilib.RobotBase],
+        phases: Sequence[MatchPhase] = MATCH_PHASES,
+        driver_script: Sequence[ControllerInput] = (),
+        alliance_station: hal.AllianceStationID = (
+            hal.AllianceStationID.kBlue1
+        ),
+    ) -> None:
+        """
+        Args:
+            robot_class:
+                The robot to simulate, eg: robot.MyRobot. If there is a
+                physics.py next to its module, its PhysicsEngine is attached,
+                like in the simulation GUI.
+            phases:
+                The phases of the match, in order.
+            driver_script:
+                The driver controller's inputs, on port 0.
+            alliance_station:
+                Where the robot is on the field.
+        """
+        self._robot_name = robot_class.__name__
+        robot_path = pathlib.Path(
+            sys.modules[robot_class.__module__].__file__
+        ).parent
+        _, self._robot_class = PhysicsInterface._create_and_attach(
+            robot_class, robot_path
+        )
+        self._phases = list(phases)
+        self._driver_script = sorted(
+            driver_script, key=lambda state: state.time_seconds
+        )
+        self._alliance_station = alliance_station
+        self._error: Optional[str] = None
+
+    def run(self) -> MatchResult:
+        """Simulate the match, and return how it went.
+
+        Raises:
+            RuntimeError: If robotInit() doesn't finish.
+        """
+        ntcore.NetworkTableInstance.getDefault().startLocal()
+        pauseTiming()
+        restartTiming()
+        wpilib.DriverStation.silenceJoystickConnectionWarning(True)
+        DriverStationSim.setDsAttached(True)
+        DriverStationSim.setAllianceStationId(self._alliance_station)
+        DriverStationSim.setAutonomous(False)
+        DriverStationSim.setEnabled(False)
+        DriverStationSim.notifyNewData()
+        controller = XboxControllerSim(0)
+
+        init_start = time.perf_counter()
+        robot = self._robot_class()
+        initialized = threading.Event()
+        robot_init = robot.robotInit
+
+        def initialize() -> None:
+            try:
+                robot_init()
+            finally:
+                initialized.set()
+
+        robot.robotInit = initialize
+        thread = threading.Thread(
+            target=self._run_robot, args=(robot,), name="Robot", daemon=True
+        )
+        thread.start()
+        if not initialized.wait(INIT_TIMEOUT_SECONDS):
+            raise RuntimeError(
+                f"{self._robot_name}.robotInit() didn't finish in "
+                f"{INIT_TIMEOUT_SECONDS}s"
+            )
+        init_wall_seconds = time.perf_counter() - init_start
+        robot_cpu_clock = time.pthread_getcpuclockid(thread.ident)
+
+        # Every simulated phoenix6 device copies its state into the simulation
+        # GUI each loop, which takes most of the time of each loop. There's no
+        # GUI here, and physics sets the simulated devices' state directly, so
+        # stop them.
+        hal.simulation.cancelAllSimPeriodicCallbacks()
+        self._on_start(robot)
+
+        period = robot.control_loop_wait_time
+        loops = 0
+        next_input = 0
+        peak_loop_cpu_seconds = 0.0
+        start = time.perf_counter()
+        for phase in self._phases:
+            DriverStationSim.setAutonomous(phase.autonomous)
+            DriverStationSim.setEnabled(phase.enabled)
+            for step in range(round(phase.duration_seconds / period)):
+                if not thread.is_alive():
+                    break
+                match_seconds = loops * period
+                while (
+                    next_input < len(self._driver_script)
+                    and self._driver_script[next_input].time_seconds
+                    <= match_seconds
+                ):
+                    self._driver_script[next_input].apply(controller)
+                    next_input += 1
+                DriverStationSim.setMatchTime(
+                    -1.0
+                    if phase.match_time_seconds is None
+                    else phase.match_time_seconds - step * period
+                )
+                DriverStationSim.notifyNewData()
+                # The robot runs a loop before this returns.
+                loop_start_cpu_seconds = time.clock_gettime(robot_cpu_clock)
+                stepTiming(period)
+                loop_cpu_seconds = (
+                    time.clock_gettime(robot_cpu_clock) - loop_start_cpu_seconds
+                )
+                peak_loop_cpu_seconds = max(
+                    peak_loop_cpu_seconds, loop_cpu_seconds
+                )
+                loops += 1
+                self._on_loop(robot, phase, loops * period, loop_cpu_seconds)
+        wall_seconds = time.perf_counter() - start
+
+        robot.endCompetition()
+        # Let the robot's loop wake up and see it should stop.
+        stepTiming(1.0)
+        thread.join(timeout=5.0)
+
+        return MatchResult(
+            robot=self._robot_name,
+            simulated_seconds=loops * period,
+            wall_seconds=wall_seconds,
+            init_wall_seconds=init_wall_seconds,
+            loops=loops,
+            peak_loop_cpu_seconds=peak_loop_cpu_seconds,
+            error=self._error,
+        )
+
+    def _on_start(self, robot: wpilib.RobotBase) -> None:
+        """Called once robotInit() has finished, before the match starts.
+
+        Subclasses can override this to set up the robot for the match.
+        """
+
+    def _on_loop(
+        self,
+        robot: wpilib.RobotBase,
+        phase: MatchPhase,
+        match_seconds: float,
+        loop_cpu_seconds: float,
+    ) -> None:
+        """Called after each loop of the robot, while simulated time is paused.
+
+        Subclasses can override this to record how the robot is doing.
+
+        Args:
+            robot: The robot.
+            phase: The phase of the match the loop ran in.
+            match_seconds: Time since the start of the match, in seconds.
+            loop_cpu_seconds: CPU time the robot's thread used in the loop.
+        """
+
+    def _run_robot(self, robot: wpilib.RobotBase) -> None:
+        """Runs the robot's main loop until the match ends or it crashes."""
+        try:
+            robot.startCompetition()
+        except BaseException:
+            self._error = traceback.format_exc()
+            logger.error(f"{self._robot_name} crashed:\n{self._error}")
+
+
+def load_robot_class(name: str) -> Type[wpilib.RobotBase]:
+    """Imports a robot class from a "module:Class" name."""
+    module_name, class_name = name.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _run_match(robot: str) -> MatchResult:
+    """Simulates a match with the scripted driver, in a worker process."""
+    logging.basicConfig(level=logging.WARNING)
+    return MatchSimulator(
+        load_robot_class(robot), driver_script=DRIVER_SCRIPT
+    ).run()
+
+
+def run_matches(robot: str, matches: int, jobs: int) -> List[MatchResult]:
+    """Simulates matches, each in a new worker process.
+
+    Args:
+        robot: The robot class, as "module:Class", eg: "robot:MyRobot".
+        matches: How many matches to simulate.
+        jobs: Most matches simulated at once.
+
+    Returns:
+        The result of each match.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        # Simulation state is global, so each match needs a fresh process.
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        return list(executor.map(_run_match, [robot] * matches))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Simulate matches headless, faster than real time."
+    )
+    parser.add_argument(
+        "--robot", choices=sorted(ROBOT_CLASSES), default="robot"
+    )
+    parser.add_argument("--matches", type=int, default=1)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Most matches to simulate at once.",
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_matches(
+        ROBOT_CLASSES[args.robot], args.matches, min(args.jobs, args.matches)
+    )
+    elapsed = time.perf_counter() - start
+
+    for i, result in enumerate(results, 1):
+        status = "ok" if result.ok else "CRASHED"
+        print(
+            f"Match {i}: {status}, simulated {result.simulated_seconds:.0f}s "
+            f"in {result.wall_seconds:.1f}s ({result.speedup:.1f}x real "
+            f"time), robotInit() took {result.init_wall_seconds:.1f}s, peak "
+            f"loop CPU {result.peak_loop_cpu_seconds * 1e3:.1f}ms"
+        )
+    simulated = sum(result.simulated_seconds for result in results)
+    print(
+        f"Simulated {len(results)} matches ({simulated:.0f}s) in "
+        f"{elapsed:.1f}s: {simulated / elapsed:.1f}x real time"
+    )
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
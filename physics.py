@@ -0,0 +1,472 @@
+"""Simulated physics of the robot's mechanisms and drivetrain.
+
+pyfrc loads this module next to robot.py in simulation, in the simulation GUI,
+`robotpy test` and `match_sim`, and calls `PhysicsEngine.update_sim()` each loop.
+Each mechanism reads the voltage its simulated TalonFX applies, steps a model
+of the mechanism forward, and writes the new rotor and CANcoder positions and
+velocities back into the simulated devices. Without this, the simulated devices
+never move, so nothing that waits for a mechanism to get somewhere can be
+tested. The drivetrain is stepped by phoenix6's own swerve simulation, which
+moves the modules and the Pigeon 2 the same way.
+
+The models only know the gear ratios and limits from the robot constants. The
+masses and moments of inertia are rough estimates, so use them to compare
+changes to the code, not to tune gains.
+
+The simulated devices run their control loops and motion profiles on the wall
+clock, not on simulated time. When simulated time runs faster than real time,
+like in `robotpy test` and `match_sim`, they fall behind the mechanisms, and
+stiff position loops like the turret's oscillate. Set the PHYSICS_REAL_TIME
+environment variable to keep simulated time from running ahead of the wall
+clock when measuring how the mechanisms move, like how long the shooter takes
+to get ready. `auto_report` always does. `match_sim` doesn't, so it only
+reports how long the robot's loops take, not how the mechanisms behave.
+"""
+
+import math
+import os
+import time
+import typing
+
+import phoenix6
+import wpilib
+import wpilib.simulation
+from pyfrc.physics.core import PhysicsInterface
+from wpimath.system.plant import DCMotor, LinearSystemId
+
+# How often the mechanisms are stepped in real time, in seconds.
+SIM_PERIOD_SECONDS = 0.005
+# Set this environment variable (to anything) to simulate in real time.
+REAL_TIME_ENVIRONMENT_VARIABLE = "PHYSICS_REAL_TIME"
+# Estimated moments of inertia of the mechanisms, in kg*m^2, about their axes.
+TURRET_MOI = 0.05
+FLYWHEEL_MOI = 0.005
+# The flywheel's feedforward gain says it's geared down a little from the motor.
+FLYWHEEL_GEARING = 1.2
+INTAKE_DEPLOYER_MOI = 0.02
+ROLLER_MOI = 0.0005
+# Estimated size of the hood, which swings up from horizontal.
+HOOD_LENGTH_METERS = 0.2
+HOOD_MASS_KG = 1.5
+# The intake deploys from its stowed (zero) position until it rests on the
+# bumper, about one rotation of its encoder later.
+INTAKE_DEPLOYER_TRAVEL_ENCODER_ROTATIONS = 1.0
+
+
+def _orientation(
+    direction: typing.Union[
+        phoenix6.signals.InvertedValue, phoenix6.signals.SensorDirectionValue
+    ],
+) -> phoenix6.sim.ChassisReference:
+    """Returns the simulated orientation of a device configured this way.
+
+    Simulating each device in the orientation it's configured in means
+    positive voltage and positive positions all move the mechanism the same
+    way, so the models don't need to know about inversions.
+    """
+    if direction in (
+        phoenix6.signals.InvertedValue.CLOCKWISE_POSITIVE,
+        phoenix6.signals.SensorDirectionValue.CLOCKWISE_POSITIVE,
+    ):
+        return phoenix6.sim.ChassisReference.CLOCKWISE_POSITIVE
+    return phoenix6.sim.ChassisReference.COUNTER_CLOCKWISE_POSITIVE
+
+
+class Mechanism:
+    """A mechanism driven by one TalonFX, optionally with a CANcoder on it.
+
+    Subclasses step the model of the mechanism forward in `_step()`.
+    """
+
+    def __init__(
+        self,
+        motor: phoenix6.hardware.TalonFX,
+        motor_inverted: phoenix6.signals.InvertedValue,
+        rotor_to_mechanism_ratio: float,
+        encoder: typing.Optional[phoenix6.hardware.CANcoder] = None,
+        encoder_direction: phoenix6.signals.SensorDirectionValue = (
+            phoenix6.signals.SensorDirectionValue.COUNTER_CLOCKWISE_POSITIVE
+        ),
+        sensor_to_mechanism_ratio: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            motor:
+                The motor driving the mechanism.
+            motor_inverted:
+                The direction the motor is configured to turn.
+            rotor_to_mechanism_ratio:
+                Rotations of the motor's rotor per rotation of the mechanism.
+            encoder:
+                The CANcoder measuring the mechanism, if any.
+            encoder_direction:
+                The direction the CANcoder is configured to count.
+            sensor_to_mechanism_ratio:
+                Rotations of the CANcoder per rotation of the mechanism.
+        """
+        self._motor_sim = motor.sim_state
+        self._motor_sim.orientation = _orientation(motor_inverted)
+        self._motor_sim.set_motor_type(
+            phoenix6.sim.TalonFXSimState.MotorType.KRAKEN_X60
+        )
+        self._rotor_to_mechanism_ratio = rotor_to_mechanism_ratio
+        self._encoder_sim = None
+        if encoder is not None:
+            self._encoder_sim = encoder.sim_state
+            self._encoder_sim.orientation = _orientation(encoder_direction)
+        self._sensor_to_mechanism_ratio = sensor_to_mechanism_ratio
+        self._last_position = 0.0
+
+    def update(self, tm_diff: float, supply_voltage: float) -> None:
+        """Step the mechanism forward in time.
+
+        Args:
+            tm_diff: Time since the last update, in seconds.
+            supply_voltage: The battery voltage.
+        """
+        self._motor_sim.set_supply_voltage(supply_voltage)
+        position, velocity = self._step(self._motor_sim.motor_voltage, tm_diff)
+        # Move the devices by how far the mechanism moved, instead of setting
+        # their positions. The simulated devices outlive the robot in tests, so
+        # they may not start where the model does.
+        change = position - self._last_position
+        self._last_position = position
+        self._motor_sim.add_rotor_position(
+            change * self._rotor_to_mechanism_ratio
+        )
+        self._motor_sim.set_rotor_velocity(
+            velocity * self._rotor_to_mechanism_ratio
+        )
+        if self._encoder_sim is not None:
+            self._encoder_sim.set_supply_voltage(supply_voltage)
+            self._encoder_sim.add_position(
+                change * self._sensor_to_mechanism_ratio
+            )
+            self._encoder_sim.set_velocity(
+                velocity * self._sensor_to_mechanism_ratio
+            )
+
+    def _step(
+        self, voltage: float, tm_diff: float
+    ) -> typing.Tuple[float, float]:
+        """Apply a motor voltage for some time.
+
+        Returns:
+            The new position of the mechanism in rotations, and its velocity in
+            rotations per second.
+        """
+        raise NotImplementedError
+
+
+class Rotating(Mechanism):
+    """A mechanism that spins freely, like a roller or a turret."""
+
+    def __init__(
+        self,
+        moi: float,
+        motor: phoenix6.hardware.TalonFX,
+        motor_inverted: phoenix6.signals.InvertedValue,
+        rotor_to_mechanism_ratio: float,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            moi: The moment of inertia of the mechanism, in kg*m^2.
+
+        See `Mechanism` for the other arguments.
+        """
+        super().__init__(
+            motor, motor_inverted, rotor_to_mechanism_ratio, **kwargs
+        )
+        gearbox = DCMotor.krakenX60(1)
+        self._sim = wpilib.simulation.DCMotorSim(
+            LinearSystemId.DCMotorSystem(
+                gearbox, moi, rotor_to_mechanism_ratio
+            ),
+            gearbox,
+        )
+
+    def _step(
+        self, voltage: float, tm_diff: float
+    ) -> typing.Tuple[float, float]:
+        self._sim.setInputVoltage(voltage)
+        self._sim.update(tm_diff)
+        return (
+            self._sim.getAngularPosition() / math.tau,
+            self._sim.getAngularVelocity() / math.tau,
+        )
+
+
+class Flywheel(Mechanism):
+    """A flywheel, which only has a velocity."""
+
+    def __init__(
+        self,
+        moi: float,
+        motor: phoenix6.hardware.TalonFX,
+        motor_inverted: phoenix6.signals.InvertedValue,
+        rotor_to_mechanism_ratio: float,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            moi: The moment of inertia of the flywheel, in kg*m^2.
+
+        See `Mechanism` for the other arguments.
+        """
+        super().__init__(
+            motor, motor_inverted, rotor_to_mechanism_ratio, **kwargs
+        )
+        gearbox = DCMotor.krakenX60(1)
+        self._sim = wpilib.simulation.FlywheelSim(
+            LinearSystemId.flywheelSystem(
+                gearbox, moi, rotor_to_mechanism_ratio
+            ),
+            gearbox,
+        )
+        self._position = 0.0
+
+    def _step(
+        self, voltage: float, tm_diff: float
+    ) -> typing.Tuple[float, float]:
+        self._sim.setInputVoltage(voltage)
+        self._sim.update(tm_diff)
+        velocity = self._sim.getAngularVelocity() / math.tau
+        self._position += velocity * tm_diff
+        return self._position, velocity
+
+
+class Arm(Mechanism):
+    """A mechanism that swings between hard stops, pulled down by gravity.
+
+    Positions are measured from horizontal.
+    """
+
+    def __init__(
+        self,
+        length_meters: float,
+        mass_kg: float,
+        min_angle_degrees: float,
+        max_angle_degrees: float,
+        motor: phoenix6.hardware.TalonFX,
+        motor_inverted: phoenix6.signals.InvertedValue,
+        rotor_to_mechanism_ratio: float,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            length_meters: The length of the arm.
+            mass_kg: The mass of the arm.
+            min_angle_degrees: The lower hard stop, where the arm starts.
+            max_angle_degrees: The upper hard stop.
+
+        See `Mechanism` for the other arguments.
+        """
+        super().__init__(
+            motor, motor_inverted, rotor_to_mechanism_ratio, **kwargs
+        )
+        self._sim = wpilib.simulation.SingleJointedArmSim(
+            DCMotor.krakenX60(1),
+            rotor_to_mechanism_ratio,
+            wpilib.simulation.SingleJointedArmSim.estimateMOI(
+                length_meters, mass_kg
+            ),
+            length_meters,
+            math.radians(min_angle_degrees),
+            math.radians(max_angle_degrees),
+            True,
+            math.radians(min_angle_degrees),
+        )
+
+    def _step(
+        self, voltage: float, tm_diff: float
+    ) -> typing.Tuple[float, float]:
+        self._sim.setInputVoltage(voltage)
+        self._sim.update(tm_diff)
+        return (
+            self._sim.getAngle() / math.tau,
+            self._sim.getVelocity() / math.tau,
+        )
+
+
+class IntakeDeployer(Rotating):
+    """The intake, which swings out until it rests on the bumper."""
+
+    def __init__(self, travel_rotations: float, *args, **kwargs) -> None:
+        """
+        Args:
+            travel_rotations: How far the intake swings out, in rotations.
+
+        See `Rotating` for the other arguments.
+        """
+        super().__init__(*args, **kwargs)
+        self._travel_rotations = travel_rotations
+
+    def _step(
+        self, voltage: float, tm_diff: float
+    ) -> typing.Tuple[float, float]:
+        position, velocity = super()._step(voltage, tm_diff)
+        stop = min(max(position, 0.0), self._travel_rotations)
+        if stop != position:
+            self._sim.setState(stop * math.tau, 0.0)
+            return stop, 0.0
+        return position, velocity
+
+
+class PhysicsEngine:
+    """Simulates the shooter and intake mechanisms, and the drivetrain."""
+
+    def __init__(
+        self, physics_controller: PhysicsInterface, robot: wpilib.RobotBase
+    ) -> None:
+        """
+        Args:
+            physics_controller: pyfrc's interface to the simulation.
+            robot: The robot, after robotInit() has created its devices.
+        """
+        shooter_constants = robot.robot_constants.shooter
+        intake_constants = robot.robot_constants.intake
+
+        turret = shooter_constants.turret
+        hood = shooter_constants.hood
+        flywheel = shooter_constants.flywheel
+        hopper = shooter_constants.hopper
+        indexer = shooter_constants.indexer
+
+        self._mechanisms: typing.List[Mechanism] = [
+            Rotating(
+                TURRET_MOI,
+                robot.turret_motor,
+                turret.motor_inverted,
+                turret.rotor_to_sensor_ratio * turret.sensor_to_mechanism_ratio,
+                encoder=robot.turret_encoder,
+                encoder_direction=turret.encoder_direction,
+                sensor_to_mechanism_ratio=turret.sensor_to_mechanism_ratio,
+            ),
+            Arm(
+                HOOD_LENGTH_METERS,
+                HOOD_MASS_KG,
+                hood.min_angle_degrees,
+                hood.max_angle_degrees,
+                robot.hood_motor,
+                hood.motor_inverted,
+                hood.rotor_to_sensor_ratio * hood.sensor_to_mechanism_ratio,
+                encoder=robot.hood_encoder,
+                encoder_direction=hood.encoder_direction,
+                sensor_to_mechanism_ratio=hood.sensor_to_mechanism_ratio,
+            ),
+            # The flywheel's CANcoder is on the flywheel's shaft.
+            Flywheel(
+                FLYWHEEL_MOI,
+                robot.flywheel_motor,
+                flywheel.motor_inverted,
+                FLYWHEEL_GEARING,
+                encoder=robot.flywheel_encoder,
+                encoder_direction=flywheel.encoder_direction,
+            ),
+            Rotating(
+                ROLLER_MOI,
+                robot.hopper_left_motor,
+                hopper.left_motor_inverted,
+                hopper.gear_reduction,
+            ),
+            Rotating(
+                ROLLER_MOI,
+                robot.hopper_right_motor,
+                hopper.right_motor_inverted,
+                hopper.gear_reduction,
+            ),
+            Rotating(
+                ROLLER_MOI,
+                robot.indexer_back_motor,
+                indexer.back_motor_inverted,
+                1.0,
+            ),
+            Rotating(
+                ROLLER_MOI,
+                robot.indexer_front_motor,
+                indexer.front_motor_inverted,
+                1.0,
+            ),
+            Rotating(
+                ROLLER_MOI,
+                robot.intake_roller_top_motor,
+                intake_constants.roller_top_motor_inverted,
+                intake_constants.rotor_to_sensor_ratio
+                * intake_constants.sensor_to_mechanism_ratio,
+            ),
+            Rotating(
+                ROLLER_MOI,
+                robot.intake_roller_bottom_motor,
+                intake_constants.roller_bottom_motor_inverted,
+                intake_constants.rotor_to_sensor_ratio
+                * intake_constants.sensor_to_mechanism_ratio,
+            ),
+            IntakeDeployer(
+                INTAKE_DEPLOYER_TRAVEL_ENCODER_ROTATIONS
+                / intake_constants.deploy_sensor_to_mechanism_ratio,
+                INTAKE_DEPLOYER_MOI,
+                robot.intake_deploy_motor,
+                intake_constants.deploy_motor_inverted,
+                intake_constants.deploy_rotor_to_sensor_ratio
+                * intake_constants.deploy_sensor_to_mechanism_ratio,
+                encoder=robot.intake_deploy_encoder,
+                encoder_direction=intake_constants.deploy_encoder_direction,
+                sensor_to_mechanism_ratio=(
+                    intake_constants.deploy_sensor_to_mechanism_ratio
+                ),
+            ),
+        ]
+
+        self._swerve_drive = robot.drivetrain.swerve_drive
+
+        self._real_time = bool(os.environ.get(REAL_TIME_ENVIRONMENT_VARIABLE))
+        # Simulated and wall clock times that real time pacing is measured
+        # from, set on the first update. Simulated time doesn't run between
+        # here and the first loop, but the wall clock does.
+        self._start_seconds: typing.Optional[float] = None
+        self._start_wall_seconds = 0.0
+
+    def update_sim(self, now: float, tm_diff: float) -> None:
+        """Step every mechanism forward by one robot loop.
+
+        Args:
+            now: The current time, in seconds.
+            tm_diff: Time since the last update, in seconds.
+        """
+        supply_voltage = wpilib.RobotController.getBatteryVoltage()
+        if not self._real_time:
+            self._step(tm_diff, supply_voltage)
+            return
+
+        # The devices run their control loops much faster than the robot loop,
+        # and stiff position loops go unstable if their mechanisms only move
+        # every 20ms, so move them in smaller steps, giving the devices time to
+        # respond to each one.
+        steps = max(1, round(tm_diff / SIM_PERIOD_SECONDS))
+        step_seconds = tm_diff / steps
+        start = now - tm_diff
+        if self._start_seconds is None:
+            self._start_seconds = start
+            self._start_wall_seconds = time.monotonic()
+        for step in range(1, steps + 1):
+            self._step(step_seconds, supply_voltage)
+            # Wait for the wall clock to catch up. This blocks the robot loop,
+            # so simulated time can't be stepped any further until it does.
+            # Never wait longer than a step, in case simulated time jumps.
+            ahead_seconds = (
+                start + step_seconds * step - self._start_seconds
+            ) - (time.monotonic() - self._start_wall_seconds)
+            if ahead_seconds > 0.0:
+                time.sleep(min(ahead_seconds, step_seconds))
+
+    def _step(self, tm_diff: float, supply_voltage: float) -> None:
+        """Step every mechanism and the drivetrain forward.
+
+        Args:
+            tm_diff: Time to step forward, in seconds.
+            supply_voltage: The battery voltage.
+        """
+        for mechanism in self._mechanisms:
+            mechanism.update(tm_diff, supply_voltage)
+        self._swerve_drive.update_sim_state(tm_diff, supply_voltage)
@@ -1,15 +1,30 @@
 import math
-
-import magicbot
-import phoenix6
-import wpilib
-import wpimath
-from phoenix6 import swerve, hardware
-
-import constants
-from common import alliance, datalog, joystick
-from subsystem import drivetrain, shooter, intake
-from subsystem.drivetrain import limelight
+import typing
+
+# This comes first, so it can time the other imports.
+from common import boot
+
+with boot.TIMELINE.phase("import libraries"):
+    import magicbot
+    import phoenix6
+    import wpilib
+    import wpimath
+    from phoenix6 import swerve, hardware
+
+with boot.TIMELINE.phase("import robot code"):
+    import constants
+    from autonomous import trajectories
+    from common import (
+        alliance,
+        canbus,
+        datalog,
+        devices,
+        joystick,
+        profiler,
+        signals,
+    )
+    from subsystem import drivetrain, shooter, intake
+    from subsystem.drivetrain import limelight
 
 DEADBAND = 0.15**2
 
@@ -22,6 +37,17 @@ class MyRobot(magicbot.MagicRobot):
     https://robotpy.readthedocs.io/en/latest/frameworks/magicbot.html
     """
 
+    # Set this to True to have each loop wait for new turret, hood and flywheel
+    # sensor data before the components run, instead of acting on data that is
+    # up to a loop old. Only the shooter's CAN bus is waited on; the Pigeon 2's
+    # yaw rate on the swerve bus isn't synchronized. See SignalHub for details.
+    SENSOR_SYNCHRONOUS_LOOP = False
+
+    # Components execute in the order they are declared. The signal hub must
+    # come first, so every other component reads sensor values refreshed in the
+    # current loop.
+    signal_hub: signals.SignalHub
+
     intake_deployer: intake.IntakeDeployer
     shooter_state_machine: shooter.Shooter
 
@@ -35,12 +61,20 @@ class MyRobot(magicbot.MagicRobot):
     turret: shooter.Turret
     vision: drivetrain.Vision
     rumble: joystick.DriverControllerRumble
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    # The telemetry scheduler must come last, so it logs values from the
+    # current loop.
+    telemetry_scheduler: datalog.TelemetryScheduler
 
     def createObjects(self) -> None:
         """Create and initialize robot objects."""
-        self.robot_constants: constants.RobotConstants = (
-            constants.get_robot_constants()
-        )
+        with boot.TIMELINE.phase("constants.get_robot_constants()"):
+            self.robot_constants: constants.RobotConstants = (
+                constants.get_robot_constants(
+                    constants.default_serial_cache_path()
+                )
+            )
         self.logger.info(f"Robot serial number: {self.robot_constants.serial}")
 
         self.driver_controller = joystick.DriverController(
@@ -117,12 +151,89 @@ class MyRobot(magicbot.MagicRobot):
         )
 
         self.alliance_fetcher = alliance.AllianceFetcher()
+        # Autonomous routines load their trajectories from here when they are
+        # selected, instead of at boot.
+        self.trajectory_cache = trajectories.TrajectoryCache()
         self.data_logger = datalog.DataLogger()
 
         self._tuning_mode = False
         self._auto_done = False
+        # Whether we've logged the boot timeline, and the time of the first
+        # enabled loop.
+        self._boot_reported = False
+        self._enabled_since_boot = False
+
+    def _create_component(
+        self, name: str, ctyp: type, injectables: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        """Creates a component, and times its setup() in the boot timeline.
+
+        Component setup is where devices are configured and mechanisms are
+        zeroed, which is most of the time it takes to start the robot.
+        """
+        component = super()._create_component(name, ctyp, injectables)
+        setup = getattr(component, "setup", None)
+        if setup is not None:
+            component.setup = boot.TIMELINE.timed(f"{name}.setup()", setup)
+        return component
+
+    def robotInit(self) -> None:
+        """Initialize the robot.
+
+        MagicRobot creates its loop watchdog at the end of robotInit, after
+        createObjects has been called, so this is the only place we can swap in
+        our profiling watchdog. It times every component's `execute()` and mode
+        callback in each loop, and blames the slowest one on loop overruns.
+
+        Components have submitted their device configs and registered their
+        signals by this point, so this is also where we configure the devices,
+        set the signal hub's loop mode and apply the CAN bus plan.
+        """
+        with boot.TIMELINE.phase("MagicRobot.robotInit()"):
+            super().robotInit()
+        self.watchdog = profiler.LoopProfiler(
+            self.control_loop_wait_time, self.data_logger
+        )
+        # Devices keep their configs when the robot reboots, so only apply the
+        # ones that changed. Simulated devices start over each time.
+        with boot.TIMELINE.phase("device_configurator.apply()"):
+            self.device_configurator.apply(
+                devices.ConfigStore(devices.ConfigStore.default_path())
+                if wpilib.RobotBase.isReal()
+                else None
+            )
+        # Simulated devices don't keep pace with simulated time, so waiting on
+        # them only slows down the simulation. The signal hub only waits as long
+        # as the rest of the loop, as measured after it, leaves time for.
+        self.watchdog.track_time_after("signal_hub")
+        self.signal_hub.set_synchronous(
+            self.SENSOR_SYNCHRONOUS_LOOP and wpilib.RobotBase.isReal(),
+            self.watchdog,
+        )
+        # Tuners read signals the regular components don't, so leave the
+        # signals nobody asked for at their default rates when tuning.
+        # Optimizing takes tens of milliseconds per simulated device and buys
+        # nothing in simulation, so skip it there too.
+        with boot.TIMELINE.phase("can_bus_planner.apply()"):
+            self.can_bus_planner.apply(
+                optimize=not self._tuning_mode and wpilib.RobotBase.isReal()
+            )
 
     def robotPeriodic(self) -> None:
+        if not self._boot_reported:
+            # This is the first loop, so startup has finished.
+            boot.TIMELINE.report(self.data_logger)
+            self._boot_reported = True
+        if not self._enabled_since_boot and wpilib.DriverStation.isEnabled():
+            self._enabled_since_boot = True
+            self.data_logger.log_double(
+                "/boot/first_enabled_loop_ms",
+                boot.TIMELINE.elapsed_seconds() * 1e3,
+            )
+        # Log less often during matches, to leave more of the loop for control.
+        self.telemetry_scheduler.set_match_mode(
+            wpilib.DriverStation.isFMSAttached()
+        )
         if wpilib.DriverStation.isEnabled():
             # Deploy the intake.
             self.intake_deployer.deploy()
@@ -151,6 +262,9 @@ class MyRobot(magicbot.MagicRobot):
             self.target_tracker.set_enabled(False)
 
         super().robotPeriodic()
+        # This is the last thing that runs in every loop, so the next loop
+        # takes a new drivetrain state snapshot.
+        self.drivetrain.clear_state()
 
     def autonomousInit(self) -> None:
         """Initialize autonomous mode.
@@ -182,12 +296,21 @@ class MyRobot(magicbot.MagicRobot):
         disabled mode. This code executes before the `execute` method of all
         components are called.
         """
+        # We call this here because the SignalHub component's execute method
+        # does not get called when disabled. Components read these signals
+        # in on_enable, so they need to be fresh when the robot is enabled.
+        self.signal_hub.refresh()
+
         # Seed our pose estimator with the initial pose of the selected auto
-        # mode, if we haven't run our auto yet.
+        # mode, if we haven't run our auto yet. The first time a mode is
+        # selected, this starts loading its trajectory in the background, and
+        # there is no initial pose until it has loaded.
         if not self._auto_done and self._automodes is not None:
             auto_mode = self._automodes.chooser.getSelected()
             if auto_mode is not None:
-                self.drivetrain.set_pose(auto_mode.get_initial_pose())
+                initial_pose = auto_mode.get_initial_pose()
+                if initial_pose is not None:
+                    self.drivetrain.set_pose(initial_pose)
 
     def teleopInit(self) -> None:
         """Initialize teleoperated mode.
@@ -1,5 +1,5 @@
 from .constants import DrivetrainConstants, DRIVETRAIN_CONSTANTS
-from .drivetrain import Drivetrain, DrivetrainTuner
+from .drivetrain import Drivetrain
 from .vision import Vision
 from . import constants
 
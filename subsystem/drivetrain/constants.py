@@ -136,8 +136,18 @@ class VisionConstants:
     # Average tag distance limit. Vision estimates whose average tag distance
     # exceeds this will be discarded.
     average_tag_distance_threshold: float = 3.0
+    # Standard deviations of an estimate from a single tag at
+    # std_dev_reference_tag_distance. Estimates from more tags, closer tags,
+    # tags spread further apart or less ambiguous tags are trusted more.
     xy_std_dev: float = 0.5
     theta_std_dev: float = math.inf
+    std_dev_reference_tag_distance: float = 2.0
+    # How much the standard deviations grow for each unit of ambiguity of the
+    # most ambiguous tag in an estimate.
+    std_dev_ambiguity_scale: float = 2.0
+    # Estimates from different Limelights taken within this many seconds of
+    # each other are merged into one measurement.
+    merge_window_seconds: float = 0.005
     # Vision estimates that differ by more than this from the current robot pose
     # estimate will be discarded.
     max_diff_from_robot_pose: float = 0.5
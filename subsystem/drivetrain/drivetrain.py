@@ -5,14 +5,12 @@ import typing
 import commands2
 import choreo
 import magicbot
-import wpilib
 import wpimath
-from commands2 import sysid as commands2_sysid
-from phoenix6 import hardware, swerve, units, configs, SignalLogger
+from phoenix6 import hardware, swerve, units, configs
 from wpimath import controller, geometry, kinematics
 
 import constants
-from common import alliance, datalog, joystick
+from common import alliance, canbus, datalog, joystick
 from subsystem import drivetrain
 
 
@@ -20,6 +18,8 @@ class Drivetrain(commands2.Subsystem):
     robot_constants: constants.RobotConstants
     alliance_fetcher: alliance.AllianceFetcher
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    telemetry_scheduler: datalog.TelemetryScheduler
 
     def setup(self) -> None:
         constants = self.robot_constants.drivetrain
@@ -117,6 +117,11 @@ class Drivetrain(commands2.Subsystem):
                 ),
             ],
         )
+        # Snapshot of the drivetrain state for the current loop, taken the
+        # first time it is read. See state().
+        self._state: typing.Optional[
+            swerve.SwerveDrivetrain.SwerveDriveState
+        ] = None
 
         self._x_controller = controller.PIDController(
             constants.trajectory_following.x_kp, 0.0, 0.0
@@ -160,8 +165,70 @@ class Drivetrain(commands2.Subsystem):
 
         self.set_operator_perspective_forward()
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
+        self._yaw_log = self.data_logger.register_double(
+            "/components/drivetrain/yaw_degrees"
+        )
+        self._pigeon_yaw_log = self.data_logger.register_double(
+            "/components/drivetrain/pigeon/yaw_degrees"
+        )
+        self._pigeon_pitch_log = self.data_logger.register_double(
+            "/components/drivetrain/pigeon/pitch_degrees"
+        )
+        self._pigeon_roll_log = self.data_logger.register_double(
+            "/components/drivetrain/pigeon/roll_degrees"
+        )
+        self._motor_telemetry: list[datalog.MotorTelemetry] = []
+        for module_name, module in zip(
+            ("front_left", "front_right", "back_left", "back_right"),
+            self.swerve_drive.modules,
+        ):
+            self._motor_telemetry.append(
+                self.data_logger.register_motor(
+                    f"/components/drivetrain/{module_name}_drive_motor",
+                    module.drive_motor,
+                )
+            )
+            self._motor_telemetry.append(
+                self.data_logger.register_motor(
+                    f"/components/drivetrain/{module_name}_steer_motor",
+                    module.steer_motor,
+                )
+            )
+
+        # Tell the CAN bus planner which signals we use. The odometry thread
+        # reads module positions and velocities and the Pigeon's yaw at the
+        # odometry frequency, and the steer motors read their CANcoders.
+        odometry_frequency_hz = self.swerve_drive.get_odometry_frequency()
+        for module in self.swerve_drive.modules:
+            for motor in (module.drive_motor, module.steer_motor):
+                self.can_bus_planner.request(
+                    motor,
+                    [
+                        motor.get_position(refresh=False),
+                        motor.get_velocity(refresh=False),
+                    ],
+                    odometry_frequency_hz,
+                )
+            self.can_bus_planner.request_remote_sensor(module.encoder)
+        for telemetry in self._motor_telemetry:
+            self.can_bus_planner.request_motor_logging(telemetry)
+        pigeon2 = self.swerve_drive.pigeon2
+        self.can_bus_planner.request(
+            pigeon2,
+            [
+                pigeon2.get_yaw(refresh=False),
+                pigeon2.get_angular_velocity_z_world(refresh=False),
+            ],
+            odometry_frequency_hz,
+        )
+        self.can_bus_planner.request(
+            pigeon2,
+            [pigeon2.get_pitch(refresh=False), pigeon2.get_roll(refresh=False)],
+            canbus.LOOP_FREQUENCY_HZ,
+        )
+
+        for telemetry in self._motor_telemetry:
+            self.telemetry_scheduler.register_motor(telemetry)
 
     def execute(self) -> None:
         """Command the drivetrain to the current speeds.
@@ -199,7 +266,7 @@ class Drivetrain(commands2.Subsystem):
             sample:
                 The Choreo trajectory sample to follow.
         """
-        pose = self.swerve_drive.get_state().pose
+        pose = self.state().pose
         self._auto_request.with_speeds(
             kinematics.ChassisSpeeds(
                 sample.vx + self._x_controller.calculate(pose.X(), sample.x),
@@ -221,6 +288,8 @@ class Drivetrain(commands2.Subsystem):
     def set_pose(self, pose: geometry.Pose2d) -> None:
         """Hard reset the robot's pose estimate."""
         self.swerve_drive.reset_pose(pose)
+        # The snapshot has the old pose.
+        self.clear_state()
 
     def set_brake_enabled(self, value: bool) -> None:
         self._brake_enabled = value
@@ -235,12 +304,40 @@ class Drivetrain(commands2.Subsystem):
             else drivetrain.constants.BLUE_ALLIANCE_PERSPECTIVE_ROTATION
         )
 
+    def state(self) -> swerve.SwerveDrivetrain.SwerveDriveState:
+        """Get the drivetrain state for the current loop.
+
+        The first call in a loop copies the state out of the odometry thread,
+        and later calls in the same loop return the same snapshot. This keeps
+        the pose and speeds every component sees consistent within a loop. Don't
+        modify the returned state.
+
+        Use `fresh_state()` if you need the latest state instead.
+        """
+        if self._state is None:
+            self._state = self.swerve_drive.get_state_copy()
+        return self._state
+
+    def fresh_state(self) -> swerve.SwerveDrivetrain.SwerveDriveState:
+        """Get a copy of the latest drivetrain state from the odometry thread.
+
+        This doesn't change the snapshot returned by `state()`.
+        """
+        return self.swerve_drive.get_state_copy()
+
+    def clear_state(self) -> None:
+        """Drop the state snapshot, so the next `state()` call takes a new one.
+
+        The robot calls this at the end of every loop.
+        """
+        self._state = None
+
     @magicbot.feedback
     def get_robot_pose(self) -> geometry.Pose2d:
-        return self.swerve_drive.get_state().pose
+        return self.state().pose
 
     def robot_speeds(self) -> kinematics.ChassisSpeeds:
-        return self.swerve_drive.get_state().speeds
+        return self.state().speeds
 
     def raw_yaw_degrees(self) -> units.degree:
         return wpimath.inputModulus(
@@ -258,291 +355,10 @@ class Drivetrain(commands2.Subsystem):
         )
 
     def estimated_yaw_degrees(self) -> units.degree:
-        return self.swerve_drive.get_state().pose.rotation().degrees()
+        return self.state().pose.rotation().degrees()
 
     def _log_data(self) -> None:
-        self.data_logger.log_double(
-            "/components/drivetrain/yaw_degrees",
-            self.estimated_yaw_degrees(),
-        )
-        self.data_logger.log_double(
-            "/components/drivetrain/pigeon/yaw_degrees", self.raw_yaw_degrees()
-        )
-        self.data_logger.log_double(
-            "/components/drivetrain/pigeon/pitch_degrees",
-            self.raw_pitch_degrees(),
-        )
-        self.data_logger.log_double(
-            "/components/drivetrain/pigeon/roll_degrees",
-            self.raw_roll_degrees(),
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/front_left_drive_motor",
-            self.swerve_drive.get_module(0).drive_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/front_left_steer_motor",
-            self.swerve_drive.get_module(0).steer_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/front_right_drive_motor",
-            self.swerve_drive.get_module(1).drive_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/front_right_steer_motor",
-            self.swerve_drive.get_module(1).steer_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/back_left_drive_motor",
-            self.swerve_drive.get_module(2).drive_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/back_left_steer_motor",
-            self.swerve_drive.get_module(2).steer_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/back_right_drive_motor",
-            self.swerve_drive.get_module(3).drive_motor,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/drivetrain/back_right_steer_motor",
-            self.swerve_drive.get_module(3).steer_motor,
-        )
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/front_left_drive_motor",
-                self.swerve_drive.get_module(0).drive_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/front_left_steer_motor",
-                self.swerve_drive.get_module(0).steer_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/front_right_drive_motor",
-                self.swerve_drive.get_module(1).drive_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/front_right_steer_motor",
-                self.swerve_drive.get_module(1).steer_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/back_left_drive_motor",
-                self.swerve_drive.get_module(2).drive_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/back_left_steer_motor",
-                self.swerve_drive.get_module(2).steer_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/back_right_drive_motor",
-                self.swerve_drive.get_module(3).drive_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/drivetrain/back_right_steer_motor",
-                self.swerve_drive.get_module(3).steer_motor,
-            )
-
-
-class DrivetrainTuner:
-    """Component for tuning the drivetrain."""
-
-    drivetrain: Drivetrain
-
-    translation_quasistatic = magicbot.tunable(False)
-    translation_dynamic = magicbot.tunable(False)
-    rotation_quasistatic = magicbot.tunable(False)
-    rotation_dynamic = magicbot.tunable(False)
-    steer_quasistatic = magicbot.tunable(False)
-    steer_dynamic = magicbot.tunable(False)
-
-    reverse = magicbot.tunable(False)
-
-    # PID gains for trajectory following.
-    trajectory_x_kp = magicbot.tunable(0.0)
-    trajectory_x_ki = magicbot.tunable(0.0)
-    trajectory_x_kd = magicbot.tunable(0.0)
-    trajectory_y_kp = magicbot.tunable(0.0)
-    trajectory_y_ki = magicbot.tunable(0.0)
-    trajectory_y_kd = magicbot.tunable(0.0)
-    trajectory_heading_kp = magicbot.tunable(0.0)
-    trajectory_heading_ki = magicbot.tunable(0.0)
-    trajectory_heading_kd = magicbot.tunable(0.0)
-
-    def setup(self) -> None:
-        self._last_tq = self.translation_quasistatic
-        self._last_td = self.translation_dynamic
-        self._last_rq = self.rotation_quasistatic
-        self._last_rd = self.rotation_dynamic
-        self._last_sq = self.steer_quasistatic
-        self._last_sd = self.steer_dynamic
-
-        self._translation_request = swerve.requests.SysIdSwerveTranslation()
-        self._rotation_request = swerve.requests.SysIdSwerveRotation()
-        self._steer_request = swerve.requests.SysIdSwerveSteerGains()
-
-        self._sysid_config = commands2_sysid.SysIdRoutine.Config(
-            stepVoltage=2.0,
-            timeout=2.0,
-            recordState=lambda state: SignalLogger.write_string(
-                "state", wpilib.sysid.SysIdRoutineLog.stateEnumToString(state)
-            ),
-        )
-
-        self._sysid_translation = commands2_sysid.SysIdRoutine(
-            self._sysid_config,
-            commands2_sysid.SysIdRoutine.Mechanism(
-                lambda volts: self.drivetrain.swerve_drive.set_control(
-                    self._translation_request.with_volts(volts)
-                ),
-                lambda log: None,
-                self.drivetrain,
-                "Drivetrain",
-            ),
-        )
-
-        self._sysid_rotation = commands2_sysid.SysIdRoutine(
-            self._sysid_config,
-            commands2_sysid.SysIdRoutine.Mechanism(
-                lambda rotational_rate: self.drivetrain.swerve_drive.set_control(
-                    self._rotation_request.with_rotational_rate(rotational_rate)
-                ),
-                lambda log: None,
-                self.drivetrain,
-                "Drivetrain",
-            ),
-        )
-
-        self._sysid_steer = commands2_sysid.SysIdRoutine(
-            self._sysid_config,
-            commands2_sysid.SysIdRoutine.Mechanism(
-                lambda volts: self.drivetrain.swerve_drive.set_control(
-                    self._steer_request.with_volts(volts)
-                ),
-                lambda log: None,
-                self.drivetrain,
-                "Drivetrain",
-            ),
-        )
-
-        self._scheduler = commands2.CommandScheduler.getInstance()
-
-    def on_enable(self) -> None:
-        self._scheduler.enable()
-
-    def on_disable(self) -> None:
-        self._scheduler.disable()
-        SignalLogger.stop()
-
-    def execute(self) -> None:
-        self.drivetrain._x_controller.setPID(
-            self.trajectory_x_kp, self.trajectory_x_ki, self.trajectory_x_kd
-        )
-        self.drivetrain._y_controller.setPID(
-            self.trajectory_y_kp, self.trajectory_y_ki, self.trajectory_y_kd
-        )
-        self.drivetrain._heading_controller.setPID(
-            self.trajectory_heading_kp,
-            self.trajectory_heading_ki,
-            self.trajectory_heading_kd,
-        )
-
-        if (
-            sum(
-                [
-                    self.translation_quasistatic,
-                    self.translation_dynamic,
-                    self.rotation_quasistatic,
-                    self.rotation_dynamic,
-                    self.steer_quasistatic,
-                    self.steer_dynamic,
-                ]
-            )
-            > 1
-        ):
-            self.logger.warning(
-                "Cannot apply multiple sysid routines simultaneously"
-            )
-            self._update_state()
-            return
-
-        direction = (
-            commands2_sysid.SysIdRoutine.Direction.kReverse
-            if self.reverse
-            else commands2_sysid.SysIdRoutine.Direction.kForward
-        )
-        # Only schedule a sysid command on a rising edge.
-        if self.translation_quasistatic and not self._last_tq:
-            self._sys_id_translation_quasistatic(direction)
-        if self.translation_dynamic and not self._last_td:
-            self._sys_id_translation_dynamic(direction)
-        if self.rotation_quasistatic and not self._last_rq:
-            self._sys_id_rotation_quasistatic(direction)
-        if self.rotation_dynamic and not self._last_rd:
-            self._sys_id_rotation_dynamic(direction)
-        if self.steer_quasistatic and not self._last_sq:
-            self._sys_id_steer_quasistatic(direction)
-        if self.steer_dynamic and not self._last_sd:
-            self._sys_id_steer_dynamic(direction)
-
-        self._update_state()
-        self._scheduler.run()
-
-    def _update_state(self) -> None:
-        self._last_tq = self.translation_quasistatic
-        self._last_td = self.translation_dynamic
-        self._last_rq = self.rotation_quasistatic
-        self._last_rd = self.rotation_dynamic
-        self._last_sq = self.steer_quasistatic
-        self._last_sd = self.steer_dynamic
-
-    def _sys_id_translation_quasistatic(
-        self, direction: commands2_sysid.SysIdRoutine.Direction
-    ) -> None:
-        self._scheduler.cancelAll()
-        self._scheduler.schedule(self._sysid_translation.quasistatic(direction))
-
-    def _sys_id_translation_dynamic(
-        self, direction: commands2_sysid.SysIdRoutine.Direction
-    ) -> None:
-        self._scheduler.cancelAll()
-        self._scheduler.schedule(self._sysid_translation.dynamic(direction))
-
-    def _sys_id_rotation_quasistatic(
-        self, direction: commands2_sysid.SysIdRoutine.Direction
-    ) -> None:
-        self._scheduler.cancelAll()
-        self._scheduler.schedule(self._sysid_rotation.quasistatic(direction))
-
-    def _sys_id_rotation_dynamic(
-        self, direction: commands2_sysid.SysIdRoutine.Direction
-    ) -> None:
-        self._scheduler.cancelAll()
-        self._scheduler.schedule(self._sysid_rotation.dynamic(direction))
-
-    def _sys_id_steer_quasistatic(
-        self, direction: commands2_sysid.SysIdRoutine.Direction
-    ) -> None:
-        self._scheduler.cancelAll()
-        self._scheduler.schedule(self._sysid_steer.quasistatic(direction))
-
-    def _sys_id_steer_dynamic(
-        self, direction: commands2_sysid.SysIdRoutine.Direction
-    ) -> None:
-        self._scheduler.cancelAll()
-        self._scheduler.schedule(self._sysid_steer.dynamic(direction))
+        self._yaw_log.update(self.estimated_yaw_degrees())
+        self._pigeon_yaw_log.update(self.raw_yaw_degrees())
+        self._pigeon_pitch_log.update(self.raw_pitch_degrees())
+        self._pigeon_roll_log.update(self.raw_roll_degrees())
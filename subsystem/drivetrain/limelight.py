@@ -8,7 +8,7 @@ from dataclasses import dataclass
 import threading
 from urllib.parse import urlparse, ParseResult
 
-from ntcore import NetworkTable, NetworkTableEntry, NetworkTableInstance, DoubleArrayEntry
+from ntcore import NetworkTable, NetworkTableEntry, NetworkTableInstance, DoubleArrayEntry, DoubleArraySubscriber, PubSubOptions
 from wpilib import DataLogManager
 from wpimath.geometry import (
 	Pose2d,
@@ -130,6 +130,11 @@ class LimelightHelpers:
 	This library supports all Limelight features including AprilTag tracking, Neural Networks, and standard color/retroreflective tracking.
 	"""
 	_double_array_entries = ConcurrentDefaultDict(DoubleArrayEntry)
+	_double_array_subscribers = ConcurrentDefaultDict(DoubleArraySubscriber)
+
+	# Number of values a queued subscriber holds between reads. Older values are
+	# discarded by NetworkTables once the queue is full.
+	QUEUE_SIZE = 16
 
 	@staticmethod
 	def _sanitize_name(name: str | None) -> str:
@@ -219,9 +224,10 @@ class LimelightHelpers:
 		pose_entry = LimelightHelpers.get_limelight_double_array_entry(limelight_name, entry_name)
 
 		ts_value = pose_entry.getAtomic()
-		pose_array = ts_value.value
-		timestamp = ts_value.time
+		return LimelightHelpers._parse_botpose_estimate(ts_value.value, ts_value.time, is_megatag_2)
 
+	@staticmethod
+	def _parse_botpose_estimate(pose_array: list[float], timestamp: int, is_megatag_2: bool) -> PoseEstimate:
 		if len(pose_array) == 0:
 			# Handle the case where no data is available
 			return PoseEstimate()
@@ -388,6 +394,22 @@ class LimelightHelpers:
 			lambda: LimelightHelpers.get_limelight_NTTable(table_name).getDoubleArrayTopic(entry_name).getEntry([])
 		)
 
+	@staticmethod
+	def get_limelight_double_array_subscriber(table_name: str, entry_name: str) -> DoubleArraySubscriber:
+		"""
+		Gets a subscriber that queues every value published to a double array entry, for use with readQueue().
+		Values are only queued once the subscriber exists, so create it early.
+		@param table_name Name/identifier of the Limelight
+		@param entry_name Name of the entry
+		@return DoubleArraySubscriber that keeps up to QUEUE_SIZE values between reads
+		"""
+		return LimelightHelpers._double_array_subscribers.compute_if_absent(
+			f"{table_name}/{entry_name}",
+			lambda: LimelightHelpers.get_limelight_NTTable(table_name).getDoubleArrayTopic(entry_name).subscribe(
+				[], PubSubOptions(pollStorage=LimelightHelpers.QUEUE_SIZE, sendAll=True)
+			)
+		)
+
 	@staticmethod
 	def get_limelight_NTDouble(table_name: str, entry_name: str) -> float:
 		return LimelightHelpers.get_limelight_NTTableEntry(table_name, entry_name).getDouble(0.0)
@@ -753,6 +775,33 @@ class LimelightHelpers:
 		result = LimelightHelpers.get_botpose_wpired(limelight_name)
 		return LimelightHelpers.to_Pose2D(result)
 
+	@staticmethod
+	def get_botpose_subscriber_wpiblue_megatag2(limelight_name: str) -> DoubleArraySubscriber:
+		"""
+		Gets a subscriber that queues every MegaTag2 pose estimate in the WPILib Blue alliance coordinate system.
+		Pass it to read_botpose_estimates() to get every frame, instead of just the latest one.
+		@param limelight_name Name/identifier of the Limelight
+		@return DoubleArraySubscriber for the botpose_orb_wpiblue entry
+		"""
+		return LimelightHelpers.get_limelight_double_array_subscriber(limelight_name, "botpose_orb_wpiblue")
+
+	@staticmethod
+	def read_botpose_estimates(subscriber: DoubleArraySubscriber, is_megatag_2: bool, max_frames: int) -> tuple[list[PoseEstimate], int]:
+		"""
+		Reads every pose estimate published since the last read, oldest first, each with its own timestamp.
+		At most max_frames of the newest estimates are parsed, so the work per call is bounded.
+		@param subscriber Subscriber from one of the get_botpose_subscriber methods
+		@param is_megatag_2 Whether the subscriber is for a MegaTag2 entry
+		@param max_frames Maximum number of estimates to return
+		@return The estimates, and the number of older estimates that were dropped to stay within max_frames
+		"""
+		values = subscriber.readQueue()
+		dropped = max(0, len(values) - max_frames)
+		return [
+			LimelightHelpers._parse_botpose_estimate(value.value, value.time, is_megatag_2)
+			for value in values[dropped:]
+		], dropped
+
 	@staticmethod
 	def get_botpose_estimate_wpired(limelight_name: str) -> PoseEstimate:
 		"""
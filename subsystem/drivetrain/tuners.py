@@ -0,0 +1,244 @@
+"""Components for tuning the drivetrain and vision.
+
+Only tunerbot.py uses these, so the drivetrain package doesn't import them, or
+the SysId routines they run.
+"""
+
+import commands2
+import magicbot
+import ntcore
+import wpilib
+from commands2 import sysid as commands2_sysid
+from phoenix6 import swerve, SignalLogger
+
+import constants
+from subsystem import drivetrain
+from subsystem.drivetrain import limelight
+
+
+class DrivetrainTuner:
+    """Component for tuning the drivetrain."""
+
+    drivetrain: drivetrain.Drivetrain
+
+    translation_quasistatic = magicbot.tunable(False)
+    translation_dynamic = magicbot.tunable(False)
+    rotation_quasistatic = magicbot.tunable(False)
+    rotation_dynamic = magicbot.tunable(False)
+    steer_quasistatic = magicbot.tunable(False)
+    steer_dynamic = magicbot.tunable(False)
+
+    reverse = magicbot.tunable(False)
+
+    # PID gains for trajectory following.
+    trajectory_x_kp = magicbot.tunable(0.0)
+    trajectory_x_ki = magicbot.tunable(0.0)
+    trajectory_x_kd = magicbot.tunable(0.0)
+    trajectory_y_kp = magicbot.tunable(0.0)
+    trajectory_y_ki = magicbot.tunable(0.0)
+    trajectory_y_kd = magicbot.tunable(0.0)
+    trajectory_heading_kp = magicbot.tunable(0.0)
+    trajectory_heading_ki = magicbot.tunable(0.0)
+    trajectory_heading_kd = magicbot.tunable(0.0)
+
+    def setup(self) -> None:
+        self._last_tq = self.translation_quasistatic
+        self._last_td = self.translation_dynamic
+        self._last_rq = self.rotation_quasistatic
+        self._last_rd = self.rotation_dynamic
+        self._last_sq = self.steer_quasistatic
+        self._last_sd = self.steer_dynamic
+
+        self._translation_request = swerve.requests.SysIdSwerveTranslation()
+        self._rotation_request = swerve.requests.SysIdSwerveRotation()
+        self._steer_request = swerve.requests.SysIdSwerveSteerGains()
+
+        self._sysid_config = commands2_sysid.SysIdRoutine.Config(
+            stepVoltage=2.0,
+            timeout=2.0,
+            recordState=lambda state: SignalLogger.write_string(
+                "state", wpilib.sysid.SysIdRoutineLog.stateEnumToString(state)
+            ),
+        )
+
+        self._sysid_translation = commands2_sysid.SysIdRoutine(
+            self._sysid_config,
+            commands2_sysid.SysIdRoutine.Mechanism(
+                lambda volts: self.drivetrain.swerve_drive.set_control(
+                    self._translation_request.with_volts(volts)
+                ),
+                lambda log: None,
+                self.drivetrain,
+                "Drivetrain",
+            ),
+        )
+
+        self._sysid_rotation = commands2_sysid.SysIdRoutine(
+            self._sysid_config,
+            commands2_sysid.SysIdRoutine.Mechanism(
+                lambda rotational_rate: self.drivetrain.swerve_drive.set_control(
+                    self._rotation_request.with_rotational_rate(rotational_rate)
+                ),
+                lambda log: None,
+                self.drivetrain,
+                "Drivetrain",
+            ),
+        )
+
+        self._sysid_steer = commands2_sysid.SysIdRoutine(
+            self._sysid_config,
+            commands2_sysid.SysIdRoutine.Mechanism(
+                lambda volts: self.drivetrain.swerve_drive.set_control(
+                    self._steer_request.with_volts(volts)
+                ),
+                lambda log: None,
+                self.drivetrain,
+                "Drivetrain",
+            ),
+        )
+
+        self._scheduler = commands2.CommandScheduler.getInstance()
+
+    def on_enable(self) -> None:
+        self._scheduler.enable()
+
+    def on_disable(self) -> None:
+        self._scheduler.disable()
+        SignalLogger.stop()
+
+    def execute(self) -> None:
+        self.drivetrain._x_controller.setPID(
+            self.trajectory_x_kp, self.trajectory_x_ki, self.trajectory_x_kd
+        )
+        self.drivetrain._y_controller.setPID(
+            self.trajectory_y_kp, self.trajectory_y_ki, self.trajectory_y_kd
+        )
+        self.drivetrain._heading_controller.setPID(
+            self.trajectory_heading_kp,
+            self.trajectory_heading_ki,
+            self.trajectory_heading_kd,
+        )
+
+        if (
+            sum(
+                [
+                    self.translation_quasistatic,
+                    self.translation_dynamic,
+                    self.rotation_quasistatic,
+                    self.rotation_dynamic,
+                    self.steer_quasistatic,
+                    self.steer_dynamic,
+                ]
+            )
+            > 1
+        ):
+            self.logger.warning(
+                "Cannot apply multiple sysid routines simultaneously"
+            )
+            self._update_state()
+            return
+
+        direction = (
+            commands2_sysid.SysIdRoutine.Direction.kReverse
+            if self.reverse
+            else commands2_sysid.SysIdRoutine.Direction.kForward
+        )
+        # Only schedule a sysid command on a rising edge.
+        if self.translation_quasistatic and not self._last_tq:
+            self._sys_id_translation_quasistatic(direction)
+        if self.translation_dynamic and not self._last_td:
+            self._sys_id_translation_dynamic(direction)
+        if self.rotation_quasistatic and not self._last_rq:
+            self._sys_id_rotation_quasistatic(direction)
+        if self.rotation_dynamic and not self._last_rd:
+            self._sys_id_rotation_dynamic(direction)
+        if self.steer_quasistatic and not self._last_sq:
+            self._sys_id_steer_quasistatic(direction)
+        if self.steer_dynamic and not self._last_sd:
+            self._sys_id_steer_dynamic(direction)
+
+        self._update_state()
+        self._scheduler.run()
+
+    def _update_state(self) -> None:
+        self._last_tq = self.translation_quasistatic
+        self._last_td = self.translation_dynamic
+        self._last_rq = self.rotation_quasistatic
+        self._last_rd = self.rotation_dynamic
+        self._last_sq = self.steer_quasistatic
+        self._last_sd = self.steer_dynamic
+
+    def _sys_id_translation_quasistatic(
+        self, direction: commands2_sysid.SysIdRoutine.Direction
+    ) -> None:
+        self._scheduler.cancelAll()
+        self._scheduler.schedule(self._sysid_translation.quasistatic(direction))
+
+    def _sys_id_translation_dynamic(
+        self, direction: commands2_sysid.SysIdRoutine.Direction
+    ) -> None:
+        self._scheduler.cancelAll()
+        self._scheduler.schedule(self._sysid_translation.dynamic(direction))
+
+    def _sys_id_rotation_quasistatic(
+        self, direction: commands2_sysid.SysIdRoutine.Direction
+    ) -> None:
+        self._scheduler.cancelAll()
+        self._scheduler.schedule(self._sysid_rotation.quasistatic(direction))
+
+    def _sys_id_rotation_dynamic(
+        self, direction: commands2_sysid.SysIdRoutine.Direction
+    ) -> None:
+        self._scheduler.cancelAll()
+        self._scheduler.schedule(self._sysid_rotation.dynamic(direction))
+
+    def _sys_id_steer_quasistatic(
+        self, direction: commands2_sysid.SysIdRoutine.Direction
+    ) -> None:
+        self._scheduler.cancelAll()
+        self._scheduler.schedule(self._sysid_steer.quasistatic(direction))
+
+    def _sys_id_steer_dynamic(
+        self, direction: commands2_sysid.SysIdRoutine.Direction
+    ) -> None:
+        self._scheduler.cancelAll()
+        self._scheduler.schedule(self._sysid_steer.dynamic(direction))
+
+
+class VisionTuner:
+    robot_constants: constants.RobotConstants
+    drivetrain: drivetrain.Drivetrain
+    vision: drivetrain.Vision
+
+    xy_std_dev = magicbot.tunable(0.0)
+    theta_std_dev = magicbot.tunable(0.0)
+
+    def setup(self) -> None:
+        self.xy_std_dev = self.robot_constants.drivetrain.vision.xy_std_dev
+        self.theta_std_dev = (
+            self.robot_constants.drivetrain.vision.theta_std_dev
+        )
+
+        self._limelights: list[str] = (
+            self.robot_constants.drivetrain.vision.limelights
+        )
+        self._nt = ntcore.NetworkTableInstance.getDefault()
+
+    def execute(self) -> None:
+        self.vision.set_std_devs(self.xy_std_dev, self.theta_std_dev)
+
+        if wpilib.DriverStation.isDisabled():
+            self.throttle_limelights(True)
+        else:
+            self.throttle_limelights(False)
+
+    def throttle_limelights(self, value: bool) -> None:
+        """Throttle the limelights so they don't overheat."""
+        if value:
+            for ll in self._limelights:
+                limelight.LimelightHelpers.set_LED_to_force_off(ll)
+                self._nt.getTable(ll).getEntry("throttle_set").setInteger(150)
+        else:
+            for ll in self._limelights:
+                limelight.LimelightHelpers.set_LED_to_pipeline_control(ll)
+                self._nt.getTable(ll).getEntry("throttle_set").setInteger(0)
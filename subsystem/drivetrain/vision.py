@@ -1,6 +1,7 @@
+import dataclasses
 import math
+import typing
 
-import magicbot
 import ntcore
 import wpilib
 import wpimath
@@ -14,10 +15,116 @@ from subsystem.drivetrain import limelight
 RADIANS_TO_DEGREES = 180.0 / math.pi
 
 
+@dataclasses.dataclass(frozen=True)
+class VisionMeasurement:
+    """A vision pose estimate, and how much to trust it."""
+
+    pose: wpimath.geometry.Pose2d
+    # When the frame was captured, in FPGA time.
+    timestamp_seconds: float
+    xy_std_dev: float
+    theta_std_dev: float
+
+
+def measurement_std_devs(
+    pose_estimate: limelight.PoseEstimate,
+    vision_constants: drivetrain.constants.VisionConstants,
+    xy_std_dev: float,
+    theta_std_dev: float,
+) -> tuple[float, float]:
+    """Scale the standard deviations of a single tag estimate to an estimate.
+
+    Standard deviations grow with the square of the average tag distance, and
+    with the ambiguity of the most ambiguous tag. They shrink with the square
+    root of the number of tags, and as the tags are spread further apart.
+
+    Args:
+        pose_estimate: The estimate to scale the standard deviations for.
+        vision_constants: Constants with the scaling parameters.
+        xy_std_dev: Translation standard deviation of a single tag estimate at
+            the reference distance, in meters.
+        theta_std_dev: Rotation standard deviation of a single tag estimate at
+            the reference distance, in radians.
+
+    Returns:
+        The translation and rotation standard deviations of the estimate.
+    """
+    reference_distance = vision_constants.std_dev_reference_tag_distance
+    distance_scale = (
+        1.0 + (pose_estimate.avg_tag_dist / reference_distance) ** 2
+    ) / 2.0
+    ambiguity = max(
+        (fiducial.ambiguity for fiducial in pose_estimate.raw_fiducials),
+        default=0.0,
+    )
+    ambiguity_scale = 1.0 + vision_constants.std_dev_ambiguity_scale * ambiguity
+    tag_scale = math.sqrt(max(pose_estimate.tag_count, 1))
+    span_scale = 1.0 + pose_estimate.tag_span / reference_distance
+    scale = distance_scale * ambiguity_scale / (tag_scale * span_scale)
+    return xy_std_dev * scale, theta_std_dev * scale
+
+
+def merge_measurements(
+    measurements: typing.Sequence[VisionMeasurement],
+) -> VisionMeasurement:
+    """Merge measurements taken at about the same time into one.
+
+    Each measurement is weighted by its inverse variance, so the merged
+    standard deviations are smaller than any one measurement's.
+    """
+    if len(measurements) == 1:
+        return measurements[0]
+
+    xy_weights = [1.0 / m.xy_std_dev**2 for m in measurements]
+    xy_weight = sum(xy_weights)
+    x = sum(w * m.pose.X() for w, m in zip(xy_weights, measurements))
+    y = sum(w * m.pose.Y() for w, m in zip(xy_weights, measurements))
+    timestamp = sum(
+        w * m.timestamp_seconds for w, m in zip(xy_weights, measurements)
+    )
+
+    # Rotation standard deviations can be infinite, like when we don't trust
+    # vision for heading at all. Average on the unit circle, so headings
+    # either side of +/-180 degrees average correctly.
+    theta_weights = [1.0 / m.theta_std_dev**2 for m in measurements]
+    theta_weight = sum(theta_weights)
+    if theta_weight > 0.0:
+        rotation = wpimath.geometry.Rotation2d(
+            sum(
+                w * m.pose.rotation().cos()
+                for w, m in zip(theta_weights, measurements)
+            ),
+            sum(
+                w * m.pose.rotation().sin()
+                for w, m in zip(theta_weights, measurements)
+            ),
+        )
+        theta_std_dev = 1.0 / math.sqrt(theta_weight)
+    else:
+        rotation = min(measurements, key=lambda m: m.xy_std_dev).pose.rotation()
+        theta_std_dev = math.inf
+
+    return VisionMeasurement(
+        wpimath.geometry.Pose2d(x / xy_weight, y / xy_weight, rotation),
+        timestamp / xy_weight,
+        1.0 / math.sqrt(xy_weight),
+        theta_std_dev,
+    )
+
+
 class Vision:
+    # Set this to False to add each accepted estimate as its own measurement,
+    # instead of merging estimates taken at about the same time.
+    MERGE_TIME_ALIGNED_ESTIMATES = True
+
+    # Most frames we fuse from each Limelight per loop. Limelights publish at
+    # most a few frames per loop, so this only bounds the work after a stall.
+    MAX_FRAMES_PER_LOOP = 4
+
     robot_constants: constants.RobotConstants
     drivetrain: drivetrain.Drivetrain
     data_logger: datalog.DataLogger
+    telemetry_scheduler: datalog.TelemetryScheduler
 
     def setup(self) -> None:
         """
@@ -54,6 +161,47 @@ class Vision:
             "/components/vision/rejected_pose_estimates",
             wpimath.geometry.Pose2d,
         ).publish()
+        self._accepted_limelights_log = self.data_logger.register_string_array(
+            "/components/vision/accepted_limelights"
+        )
+        self._rejected_limelights_log = self.data_logger.register_string_array(
+            "/components/vision/rejected_limelights"
+        )
+        self._rejected_reasons_log = self.data_logger.register_string_array(
+            "/components/vision/rejected_reasons"
+        )
+
+        # Subscribers that queue every MegaTag2 pose estimate each Limelight
+        # publishes, so we fuse every frame exactly once, even when several
+        # arrive between loops.
+        self._pose_subscribers: list[ntcore.DoubleArraySubscriber] = [
+            limelight.LimelightHelpers.get_botpose_subscriber_wpiblue_megatag2(
+                ll
+            )
+            for ll in self._limelights
+        ]
+        # Number of frames from each Limelight that we fused, and that we
+        # dropped to stay within MAX_FRAMES_PER_LOOP, since we last logged
+        # them.
+        self._new_frames: list[int] = [0] * len(self._limelights)
+        self._dropped_frames: list[int] = [0] * len(self._limelights)
+        self._frame_rate_logs = [
+            self.data_logger.register_double(
+                f"/components/vision/{ll}/frames_per_second"
+            )
+            for ll in self._limelights
+        ]
+        self._dropped_frame_rate_logs = [
+            self.data_logger.register_double(
+                f"/components/vision/{ll}/dropped_frames_per_second"
+            )
+            for ll in self._limelights
+        ]
+        self._frame_rate_timer = wpilib.Timer()
+        self._frame_rate_timer.start()
+        self.telemetry_scheduler.register(
+            self._log_frame_rates, datalog.SLOW_RATE_HZ
+        )
 
     def execute(self) -> None:
         self.set_robot_orientation()
@@ -96,111 +244,136 @@ class Vision:
 
         drivetrain_pose = self.drivetrain.get_robot_pose()
         vision_constants = self.robot_constants.drivetrain.vision
-
-        for ll in self._limelights:
-            pose_estimate: limelight.PoseEstimate = (
-                limelight.LimelightHelpers.get_botpose_estimate_wpiblue_megatag2(
-                    ll
+        measurements: list[VisionMeasurement] = []
+
+        for index, ll in enumerate(self._limelights):
+            pose_estimates, dropped_frames = (
+                limelight.LimelightHelpers.read_botpose_estimates(
+                    self._pose_subscribers[index],
+                    True,
+                    self.MAX_FRAMES_PER_LOOP,
                 )
             )
-            pose: wpimath.geometry.Pose2d = pose_estimate.pose
-
-            # Filter out bad readings
-
-            if not (pose_estimate.tag_count > 0):
-                rejected_poses.append(pose)
-                rejected_limelights.append(ll)
-                rejected_reasons.append("No tags seen")
-                continue
-
-            if (
-                pose_estimate.avg_tag_dist
-                > vision_constants.average_tag_distance_threshold
-            ):
-                rejected_poses.append(pose)
-                rejected_limelights.append(ll)
-                rejected_reasons.append(
-                    f"Too far away: {pose_estimate.avg_tag_dist:.2f}m"
+            self._new_frames[index] += len(pose_estimates)
+            self._dropped_frames[index] += dropped_frames
+
+            for pose_estimate in pose_estimates:
+                pose: wpimath.geometry.Pose2d = pose_estimate.pose
+
+                # Filter out bad readings
+                rejected_reason = self._rejected_reason(pose_estimate)
+                if rejected_reason is not None:
+                    rejected_poses.append(pose)
+                    rejected_limelights.append(ll)
+                    rejected_reasons.append(rejected_reason)
+                    continue
+
+                accepted_poses.append(pose)
+                accepted_limelights.append(ll)
+
+                xy_std_dev, theta_std_dev = measurement_std_devs(
+                    pose_estimate,
+                    vision_constants,
+                    self._xy_std_dev,
+                    self._theta_std_dev,
                 )
-                continue
-
-            if (
-                pose.X() < vision_constants.pose_x_min
-                or pose.X() > vision_constants.pose_x_max
-            ) or (
-                pose.Y() < vision_constants.pose_y_min
-                or pose.Y() > vision_constants.pose_y_max
-            ):
-                rejected_poses.append(pose)
-                rejected_limelights.append(ll)
-                rejected_reasons.append(
-                    f"Out of bounds: ({pose.X():.2f}, {pose.Y():.2f})"
+                measurements.append(
+                    VisionMeasurement(
+                        pose,
+                        pose_estimate.timestamp_seconds,
+                        xy_std_dev,
+                        theta_std_dev,
+                    )
                 )
-                continue
 
-            accepted_poses.append(pose)
-            accepted_limelights.append(ll)
-
-            synced_timestamp = utils.fpga_to_current_time(
-                pose_estimate.timestamp_seconds
-            )
+        if self.MERGE_TIME_ALIGNED_ESTIMATES:
+            measurements = [
+                merge_measurements(group)
+                for group in self._time_aligned_groups(measurements)
+            ]
+        for measurement in measurements:
             self.drivetrain.swerve_drive.add_vision_measurement(
-                pose_estimate.pose,
-                synced_timestamp,
-                (self._xy_std_dev, self._xy_std_dev, self._theta_std_dev),
+                measurement.pose,
+                utils.fpga_to_current_time(measurement.timestamp_seconds),
+                (
+                    measurement.xy_std_dev,
+                    measurement.xy_std_dev,
+                    measurement.theta_std_dev,
+                ),
             )
 
         self._accepted_pose_publisher.set(accepted_poses)
-        self.data_logger.log_string_array(
-            "/components/vision/accepted_limelights", accepted_limelights
-        )
+        self._accepted_limelights_log.append(accepted_limelights)
         self._rejected_pose_publisher.set(rejected_poses)
-        self.data_logger.log_string_array(
-            "/components/vision/rejected_limelights", rejected_limelights
-        )
-        self.data_logger.log_string_array(
-            "/components/vision/rejected_reasons", rejected_reasons
-        )
+        self._rejected_limelights_log.append(rejected_limelights)
+        self._rejected_reasons_log.append(rejected_reasons)
+
+    def _time_aligned_groups(
+        self, measurements: list[VisionMeasurement]
+    ) -> list[list[VisionMeasurement]]:
+        """Group measurements taken within the merge window of each other.
+
+        Groups are in order of time, so the pose estimator gets them in order.
+        """
+        window = self.robot_constants.drivetrain.vision.merge_window_seconds
+        groups: list[list[VisionMeasurement]] = []
+        for measurement in sorted(
+            measurements, key=lambda m: m.timestamp_seconds
+        ):
+            if (
+                groups
+                and measurement.timestamp_seconds
+                - groups[-1][0].timestamp_seconds
+                <= window
+            ):
+                groups[-1].append(measurement)
+            else:
+                groups.append([measurement])
+        return groups
+
+    def _rejected_reason(
+        self, pose_estimate: limelight.PoseEstimate
+    ) -> typing.Optional[str]:
+        """Returns why a pose estimate should not be used, or None if it's good."""
+        vision_constants = self.robot_constants.drivetrain.vision
+        pose = pose_estimate.pose
+
+        if not (pose_estimate.tag_count > 0):
+            return "No tags seen"
+
+        if (
+            pose_estimate.avg_tag_dist
+            > vision_constants.average_tag_distance_threshold
+        ):
+            return f"Too far away: {pose_estimate.avg_tag_dist:.2f}m"
+
+        if (
+            pose.X() < vision_constants.pose_x_min
+            or pose.X() > vision_constants.pose_x_max
+        ) or (
+            pose.Y() < vision_constants.pose_y_min
+            or pose.Y() > vision_constants.pose_y_max
+        ):
+            return f"Out of bounds: ({pose.X():.2f}, {pose.Y():.2f})"
+
+        return None
+
+    def _log_frame_rates(self) -> None:
+        """Log how many frames from each Limelight we fused and dropped."""
+        elapsed_seconds = self._frame_rate_timer.get()
+        self._frame_rate_timer.reset()
+        if elapsed_seconds <= 0.0:
+            return
+        for index in range(len(self._limelights)):
+            self._frame_rate_logs[index].update(
+                self._new_frames[index] / elapsed_seconds
+            )
+            self._dropped_frame_rate_logs[index].update(
+                self._dropped_frames[index] / elapsed_seconds
+            )
+            self._new_frames[index] = 0
+            self._dropped_frames[index] = 0
 
     def set_std_devs(self, xy_std_dev, theta_std_dev) -> None:
         self._xy_std_dev = xy_std_dev
         self._theta_std_dev = theta_std_dev
-
-
-class VisionTuner:
-    robot_constants: constants.RobotConstants
-    drivetrain: drivetrain.Drivetrain
-    vision: Vision
-
-    xy_std_dev = magicbot.tunable(0.0)
-    theta_std_dev = magicbot.tunable(0.0)
-
-    def setup(self) -> None:
-        self.xy_std_dev = self.robot_constants.drivetrain.vision.xy_std_dev
-        self.theta_std_dev = (
-            self.robot_constants.drivetrain.vision.theta_std_dev
-        )
-
-        self._limelights: list[str] = (
-            self.robot_constants.drivetrain.vision.limelights
-        )
-        self._nt = ntcore.NetworkTableInstance.getDefault()
-
-    def execute(self) -> None:
-        self.vision.set_std_devs(self.xy_std_dev, self.theta_std_dev)
-
-        if wpilib.DriverStation.isDisabled():
-            self.throttle_limelights(True)
-        else:
-            self.throttle_limelights(False)
-
-    def throttle_limelights(self, value: bool) -> None:
-        """Throttle the limelights so they don't overheat."""
-        if value:
-            for ll in self._limelights:
-                limelight.LimelightHelpers.set_LED_to_force_off(ll)
-                self._nt.getTable(ll).getEntry("throttle_set").setInteger(150)
-        else:
-            for ll in self._limelights:
-                limelight.LimelightHelpers.set_LED_to_pipeline_control(ll)
-                self._nt.getTable(ll).getEntry("throttle_set").setInteger(0)
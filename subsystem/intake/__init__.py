@@ -1,5 +1,5 @@
 from .constants import IntakeConstants, INTAKE_CONSTANTS
-from .intake import Intake, IntakeTuner
+from .intake import Intake
 from .intake_deployer import IntakeDeployer
 
 __all__ = ["Intake", "IntakeDeployer", "IntakeConstants", "INTAKE_CONSTANTS"]
@@ -1,9 +1,7 @@
-import magicbot
-import wpilib
 from phoenix6 import configs, controls, hardware, units
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices
 
 
 class Intake:
@@ -16,6 +14,9 @@ class Intake:
     intake_roller_top_motor: hardware.TalonFX
     intake_roller_bottom_motor: hardware.TalonFX
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
 
     def setup(self) -> None:
         """Set up initial state for the intake.
@@ -28,7 +29,9 @@ class Intake:
             self.robot_constants.intake.active_roller_speed_rps
         )
 
-        self.intake_roller_top_motor.configurator.apply(
+        self.device_configurator.submit(
+            "top intake motor",
+            self.intake_roller_top_motor,
             configs.TalonFXConfiguration()
             .with_motor_output(
                 configs.MotorOutputConfigs().with_inverted(
@@ -59,9 +62,11 @@ class Intake:
                 .with_rotor_to_sensor_ratio(
                     self.robot_constants.intake.rotor_to_sensor_ratio
                 )
-            )
+            ),
         )
-        self.intake_roller_bottom_motor.configurator.apply(
+        self.device_configurator.submit(
+            "bottom intake motor",
+            self.intake_roller_bottom_motor,
             configs.TalonFXConfiguration()
             .with_motor_output(
                 configs.MotorOutputConfigs().with_inverted(
@@ -92,13 +97,42 @@ class Intake:
                 .with_rotor_to_sensor_ratio(
                     self.robot_constants.intake.rotor_to_sensor_ratio
                 )
-            )
+            ),
         )
 
         self._request = controls.VelocityVoltage(0.0).with_slot(0)
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
+        self._active_log = self.data_logger.register_boolean(
+            "/components/intake/active"
+        )
+        self._target_speed_log = self.data_logger.register_double(
+            "/components/intake/target_speed_rps"
+        )
+        self._roller_top_motor_telemetry = self.data_logger.register_motor(
+            "/components/intake/roller_top_motor",
+            self.intake_roller_top_motor,
+            velocity=True,
+        )
+        self._roller_bottom_motor_telemetry = self.data_logger.register_motor(
+            "/components/intake/roller_bottom_motor",
+            self.intake_roller_bottom_motor,
+            velocity=True,
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(
+            self._roller_top_motor_telemetry
+        )
+        self.can_bus_planner.request_motor_logging(
+            self._roller_bottom_motor_telemetry
+        )
+
+        self.telemetry_scheduler.register_motor(
+            self._roller_top_motor_telemetry
+        )
+        self.telemetry_scheduler.register_motor(
+            self._roller_bottom_motor_telemetry
+        )
 
     def execute(self) -> None:
         """Command the motors to the requested speed.
@@ -144,154 +178,5 @@ class Intake:
 
     def _log_data(self) -> None:
         """Writes useful data to the log."""
-        self.data_logger.log_boolean(
-            "/components/intake/active", self._active, on_change=True
-        )
-        self.data_logger.log_double(
-            "/components/intake/target_speed_rps",
-            self._active_roller_speed_rps,
-            on_change=True,
-        )
-
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/intake/roller_top_motor",
-            self.intake_roller_top_motor,
-            velocity=True,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/intake/roller_bottom_motor",
-            self.intake_roller_bottom_motor,
-            velocity=True,
-        )
-        # Log the rest of the data at a slower frequency.
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/intake/roller_top_motor",
-                self.intake_roller_top_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/intake/roller_bottom_motor",
-                self.intake_roller_bottom_motor,
-            )
-
-
-class IntakeTuner:
-    """Component for tuning the intake gains.
-
-    It sets up tunable gains over network tables so they can be easily modified
-    on AdvantageScope.
-    """
-
-    robot_constants: constants.RobotConstants
-    intake_roller_top_motor: hardware.TalonFX
-    intake_roller_bottom_motor: hardware.TalonFX
-    intake: Intake
-
-    # Gains for velocity control of the intake.
-    k_s = magicbot.tunable(0.0)
-    k_v = magicbot.tunable(0.0)
-    k_a = magicbot.tunable(0.0)
-    k_p = magicbot.tunable(0.0)
-    k_i = magicbot.tunable(0.0)
-    k_d = magicbot.tunable(0.0)
-
-    target_speed_rps = magicbot.tunable(0.0)
-    active = magicbot.tunable(False)
-
-    def setup(self) -> None:
-        """Set up initial state for the intake tuner.
-
-        This method is called after createObjects has been called in the main
-        robot class, and after all components have been created.
-        """
-        intake_constants = self.robot_constants.intake
-
-        self.k_s = intake_constants.k_s
-        self.k_v = intake_constants.k_v
-        self.k_a = intake_constants.k_a
-        self.k_p = intake_constants.k_p
-        self.k_i = intake_constants.k_i
-        self.k_d = intake_constants.k_d
-
-        self.last_k_s = self.k_s
-        self.last_k_v = self.k_v
-        self.last_k_a = self.k_a
-        self.last_k_p = self.k_p
-        self.last_k_i = self.k_i
-        self.last_k_d = self.k_d
-
-    def execute(self) -> None:
-        """Update the intake speed and gains (if they changed).
-
-        This method is called at the end of the control loop.
-        """
-        self.intake.set_active(self.active)
-        self.intake.set_speed(self.target_speed_rps)
-
-        # We only want to reapply the gains if they changed. The TalonFX motor
-        # doesn't like being reconfigured constantly.
-        if not self._gains_changed():
-            return
-
-        self._apply_gains()
-
-        self.last_k_s = self.k_s
-        self.last_k_v = self.k_v
-        self.last_k_a = self.k_a
-        self.last_k_p = self.k_p
-        self.last_k_i = self.k_i
-        self.last_k_d = self.k_d
-
-    def _gains_changed(self) -> bool:
-        """Detect if any of the gains changed.
-
-        Returns:
-            True if any of the gains changed, False otherwise.
-        """
-        return (
-            self.k_s != self.last_k_s
-            or self.k_v != self.last_k_v
-            or self.k_a != self.last_k_a
-            or self.k_p != self.last_k_p
-            or self.k_i != self.last_k_i
-            or self.k_d != self.last_k_d
-        )
-
-    def _apply_gains(self) -> None:
-        """Apply the current gains to the motor."""
-        result = self.intake_roller_top_motor.configurator.apply(
-            configs.config_groups.Slot0Configs()
-            .with_k_s(self.k_s)
-            .with_k_v(self.k_v)
-            .with_k_a(self.k_a)
-            .with_k_p(self.k_p)
-            .with_k_i(self.k_i)
-            .with_k_d(self.k_d)
-        )
-        if not result.is_ok():
-            self.logger.error("Failed to apply new gains to top intake motor")
-        result = self.intake_roller_bottom_motor.configurator.apply(
-            configs.config_groups.Slot0Configs()
-            .with_k_s(self.k_s)
-            .with_k_v(self.k_v)
-            .with_k_a(self.k_a)
-            .with_k_p(self.k_p)
-            .with_k_i(self.k_i)
-            .with_k_d(self.k_d)
-        )
-        if not result.is_ok():
-            self.logger.error(
-                "Failed to apply new gains to bottom intake motor"
-            )
-
-    @magicbot.feedback
-    def get_top_measured_speed_rps(self) -> float:
-        return self.intake_roller_top_motor.get_velocity().value
-
-    @magicbot.feedback
-    def get_bottom_measured_speed_rps(self) -> float:
-        return self.intake_roller_bottom_motor.get_velocity().value
+        self._active_log.update(self._active)
+        self._target_speed_log.update(self._active_roller_speed_rps)
@@ -1,9 +1,8 @@
 import magicbot
 import phoenix6
-import wpilib
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices, signals
 from subsystem import intake
 
 
@@ -18,20 +17,28 @@ class IntakeDeployer(magicbot.StateMachine):
     intake_deploy_encoder: phoenix6.hardware.CANcoder
     intake: intake.Intake
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
+    signal_hub: signals.SignalHub
 
     def __init__(self):
         self._deployed = False
 
     def setup(self) -> None:
         intake_constants = self.robot_constants.intake
-        self.intake_deploy_encoder.configurator.apply(
+        self.device_configurator.submit(
+            "intake deploy encoder",
+            self.intake_deploy_encoder,
             phoenix6.configs.CANcoderConfiguration().with_magnet_sensor(
                 phoenix6.configs.MagnetSensorConfigs().with_sensor_direction(
                     intake_constants.deploy_encoder_direction
                 )
-            )
+            ),
         )
-        self.intake_deploy_motor.configurator.apply(
+        self.device_configurator.submit(
+            "intake deploy motor",
+            self.intake_deploy_motor,
             phoenix6.configs.TalonFXConfiguration()
             .with_feedback(
                 phoenix6.configs.FeedbackConfigs()
@@ -59,15 +66,37 @@ class IntakeDeployer(magicbot.StateMachine):
                     self.robot_constants.intake.deploy_motor_supply_current_limit
                 )
                 .with_supply_current_limit_enable(True)
-            )
+            ),
         )
 
         # Assume the intake has been reset to its vertical position, and set the
-        # mechanism position to zero.
-        self.intake_deploy_encoder.set_position(0.0)
+        # mechanism position to zero once the encoder is configured.
+        self.device_configurator.after_applied(
+            lambda: self.intake_deploy_encoder.set_position(0.0)
+        )
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
+        # Refreshed each loop by the signal hub.
+        self._encoder_position_signal: phoenix6.status_signal.StatusSignal[
+            phoenix6.units.rotation
+        ] = self.signal_hub.register(
+            self.intake_deploy_encoder,
+            self.intake_deploy_encoder.get_position(),
+        )
+
+        self._encoder_position_log = self.data_logger.register_double(
+            "/components/intake/deploy_encoder/position_rotations"
+        )
+        self._motor_telemetry = self.data_logger.register_motor(
+            "/components/intake/deploy_motor",
+            self.intake_deploy_motor,
+            position=True,
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(self._motor_telemetry)
+        self.can_bus_planner.request_remote_sensor(self.intake_deploy_encoder)
+
+        self.telemetry_scheduler.register_motor(self._motor_telemetry)
 
     def deploy(self) -> None:
         """Deploy the intake.
@@ -88,7 +117,7 @@ class IntakeDeployer(magicbot.StateMachine):
         # roughly one full rotation on the encoder. Apply a motor input most of
         # the way there, but stop a bit early so that we don't push against the
         # bumper.
-        if self.intake_deploy_encoder.get_position().value >= 0.85:
+        if self._encoder_position_signal.value >= 0.85:
             self.next_state("deployed")
         elif state_tm >= 10.0:
             self.next_state("timed_out")
@@ -110,23 +139,7 @@ class IntakeDeployer(magicbot.StateMachine):
         self.done()
 
     def encoder_position_rotations(self) -> phoenix6.units.rotation:
-        return self.intake_deploy_encoder.get_position().value
+        return self._encoder_position_signal.value
 
     def _log_data(self) -> None:
-        self.data_logger.log_double(
-            "/components/intake/deploy_encoder/position_rotations",
-            self.encoder_position_rotations(),
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/intake/deploy_motor",
-            self.intake_deploy_motor,
-            position=True,
-        )
-        # Log the rest of the data at a slower frequency.
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/intake/deploy_motor",
-                self.intake_deploy_motor,
-            )
+        self._encoder_position_log.update(self.encoder_position_rotations())
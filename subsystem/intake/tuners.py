@@ -0,0 +1,128 @@
+"""Components for tuning the intake.
+
+Only tunerbot.py uses these, so the intake package doesn't import them.
+"""
+
+import magicbot
+from phoenix6 import configs, hardware
+
+import constants
+from subsystem import intake
+
+
+class IntakeTuner:
+    """Component for tuning the intake gains.
+
+    It sets up tunable gains over network tables so they can be easily modified
+    on AdvantageScope.
+    """
+
+    robot_constants: constants.RobotConstants
+    intake_roller_top_motor: hardware.TalonFX
+    intake_roller_bottom_motor: hardware.TalonFX
+    intake: intake.Intake
+
+    # Gains for velocity control of the intake.
+    k_s = magicbot.tunable(0.0)
+    k_v = magicbot.tunable(0.0)
+    k_a = magicbot.tunable(0.0)
+    k_p = magicbot.tunable(0.0)
+    k_i = magicbot.tunable(0.0)
+    k_d = magicbot.tunable(0.0)
+
+    target_speed_rps = magicbot.tunable(0.0)
+    active = magicbot.tunable(False)
+
+    def setup(self) -> None:
+        """Set up initial state for the intake tuner.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        intake_constants = self.robot_constants.intake
+
+        self.k_s = intake_constants.k_s
+        self.k_v = intake_constants.k_v
+        self.k_a = intake_constants.k_a
+        self.k_p = intake_constants.k_p
+        self.k_i = intake_constants.k_i
+        self.k_d = intake_constants.k_d
+
+        self.last_k_s = self.k_s
+        self.last_k_v = self.k_v
+        self.last_k_a = self.k_a
+        self.last_k_p = self.k_p
+        self.last_k_i = self.k_i
+        self.last_k_d = self.k_d
+
+    def execute(self) -> None:
+        """Update the intake speed and gains (if they changed).
+
+        This method is called at the end of the control loop.
+        """
+        self.intake.set_active(self.active)
+        self.intake.set_speed(self.target_speed_rps)
+
+        # We only want to reapply the gains if they changed. The TalonFX motor
+        # doesn't like being reconfigured constantly.
+        if not self._gains_changed():
+            return
+
+        self._apply_gains()
+
+        self.last_k_s = self.k_s
+        self.last_k_v = self.k_v
+        self.last_k_a = self.k_a
+        self.last_k_p = self.k_p
+        self.last_k_i = self.k_i
+        self.last_k_d = self.k_d
+
+    def _gains_changed(self) -> bool:
+        """Detect if any of the gains changed.
+
+        Returns:
+            True if any of the gains changed, False otherwise.
+        """
+        return (
+            self.k_s != self.last_k_s
+            or self.k_v != self.last_k_v
+            or self.k_a != self.last_k_a
+            or self.k_p != self.last_k_p
+            or self.k_i != self.last_k_i
+            or self.k_d != self.last_k_d
+        )
+
+    def _apply_gains(self) -> None:
+        """Apply the current gains to the motor."""
+        result = self.intake_roller_top_motor.configurator.apply(
+            configs.config_groups.Slot0Configs()
+            .with_k_s(self.k_s)
+            .with_k_v(self.k_v)
+            .with_k_a(self.k_a)
+            .with_k_p(self.k_p)
+            .with_k_i(self.k_i)
+            .with_k_d(self.k_d)
+        )
+        if not result.is_ok():
+            self.logger.error("Failed to apply new gains to top intake motor")
+        result = self.intake_roller_bottom_motor.configurator.apply(
+            configs.config_groups.Slot0Configs()
+            .with_k_s(self.k_s)
+            .with_k_v(self.k_v)
+            .with_k_a(self.k_a)
+            .with_k_p(self.k_p)
+            .with_k_i(self.k_i)
+            .with_k_d(self.k_d)
+        )
+        if not result.is_ok():
+            self.logger.error(
+                "Failed to apply new gains to bottom intake motor"
+            )
+
+    @magicbot.feedback
+    def get_top_measured_speed_rps(self) -> float:
+        return self.intake_roller_top_motor.get_velocity().value
+
+    @magicbot.feedback
+    def get_bottom_measured_speed_rps(self) -> float:
+        return self.intake_roller_bottom_motor.get_velocity().value
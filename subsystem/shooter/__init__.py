@@ -7,12 +7,12 @@ from .constants import (
     TurretConstants,
     SHOOTER_CONSTANTS,
 )
-from .hood import Hood, HoodTuner
+from .hood import Hood
 from .target_tracker import TargetTracker
-from .turret import Turret, TurretTuner
-from .flywheel import Flywheel, FlywheelTuner
-from .hopper import Hopper, HopperTuner
-from .indexer import Indexer, IndexerTuner
+from .turret import Turret
+from .flywheel import Flywheel
+from .hopper import Hopper
+from .indexer import Indexer
 from .shooter import Shooter
 
 __all__ = [
@@ -129,8 +129,6 @@ class TurretConstants:
     min_angle: units.degree = -180.0
     max_angle: units.degree = 180.0
     supply_current_limit: units.ampere = 40.0
-    # TODO: Find a more accurate average
-    time_of_flight: units.second = 1.25
 
 
 @dataclass(frozen=True)
@@ -1,9 +1,7 @@
-import magicbot
 import phoenix6
-import wpilib
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices, signals
 from subsystem import shooter
 
 
@@ -17,6 +15,10 @@ class Flywheel:
     flywheel_motor: phoenix6.hardware.TalonFX
     flywheel_encoder: phoenix6.hardware.CANcoder
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
+    signal_hub: signals.SignalHub
 
     def setup(self) -> None:
         """Set up initial state for the flywheel.
@@ -27,7 +29,9 @@ class Flywheel:
         flywheel_constants: shooter.FlywheelConstants = (
             self.robot_constants.shooter.flywheel
         )
-        self.flywheel_motor.configurator.apply(
+        self.device_configurator.submit(
+            "flywheel motor",
+            self.flywheel_motor,
             phoenix6.configs.TalonFXConfiguration()
             .with_feedback(
                 phoenix6.configs.FeedbackConfigs()
@@ -58,19 +62,26 @@ class Flywheel:
                     flywheel_constants.supply_current_limit
                 )
                 .with_supply_current_limit_enable(True)
-            )
+            ),
         )
-        self.flywheel_encoder.configurator.apply(
+        self.device_configurator.submit(
+            "flywheel encoder",
+            self.flywheel_encoder,
             phoenix6.configs.CANcoderConfiguration().with_magnet_sensor(
                 phoenix6.configs.MagnetSensorConfigs().with_sensor_direction(
                     flywheel_constants.encoder_direction
                 )
-            )
+            ),
         )
 
+        # Refreshed each loop by the signal hub.
         self._velocity_signal: phoenix6.status_signal.StatusSignal[
             phoenix6.units.rotations_per_second
-        ] = self.flywheel_encoder.get_velocity()
+        ] = self.signal_hub.register(
+            self.flywheel_encoder,
+            self.flywheel_encoder.get_velocity(),
+            synchronous=True,
+        )
         self._target_rps: float = 0.0
 
         # Create a velocity closed-loop request with voltage output and slot 0
@@ -79,19 +90,39 @@ class Flywheel:
             self._target_rps
         ).with_slot(0)
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
+        self._target_velocity_log = self.data_logger.register_double(
+            "/components/flywheel/target_velocity_rotations_per_second"
+        )
+        self._measured_velocity_log = self.data_logger.register_double(
+            "/components/flywheel/encoder/velocity_rotations_per_second"
+        )
+        self._sensor_latency_log = self.data_logger.register_double(
+            "/components/flywheel/sensor_latency_ms"
+        )
+        self._motor_telemetry = self.data_logger.register_motor(
+            "/components/flywheel/motor", self.flywheel_motor, velocity=True
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(self._motor_telemetry)
+        self.can_bus_planner.request_remote_sensor(self.flywheel_encoder)
+
+        self.telemetry_scheduler.register_motor(self._motor_telemetry)
 
     def execute(self) -> None:
         """Command the motors to the current speed.
 
         This method is called at the end of the control loop.
         """
-        self._velocity_signal.refresh()
         self.flywheel_motor.set_control(
             self._request.with_velocity(self._target_rps)
         )
 
+        # Time from the encoder sample to commanding the motor. This shows the
+        # effect of running the signal hub in synchronous mode.
+        self._sensor_latency_log.append(
+            self._velocity_signal.timestamp.get_latency() * 1000.0
+        )
         self._log_data()
 
     def on_enable(self) -> None:
@@ -119,124 +150,5 @@ class Flywheel:
         return self._velocity_signal.value
 
     def _log_data(self) -> None:
-        self.data_logger.log_double(
-            "/components/flywheel/target_velocity_rotations_per_second",
-            self._target_rps,
-            on_change=True,
-        )
-        self.data_logger.log_double(
-            "/components/flywheel/encoder/velocity_rotations_per_second",
-            self.measured_speed_rps(),
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/flywheel/motor",
-            self.flywheel_motor,
-            velocity=True,
-        )
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/flywheel/motor",
-                self.flywheel_motor,
-            )
-
-
-class FlywheelTuner:
-    """Component for tuning the flywheel gains.
-
-    It sets up tunable gains over network tables so they can be easily modified
-    on AdvantageScope. It also provides a settable flywheel target velocity.
-    """
-
-    robot_constants: constants.RobotConstants
-    flywheel_motor: phoenix6.hardware.TalonFX
-    flywheel_encoder: phoenix6.hardware.CANcoder
-    flywheel: Flywheel
-
-    # Gains for velocity control of the flywheel.
-    k_s = magicbot.tunable(0.0)
-    k_v = magicbot.tunable(0.0)
-    k_a = magicbot.tunable(0.0)
-    k_p = magicbot.tunable(0.0)
-    k_i = magicbot.tunable(0.0)
-    k_d = magicbot.tunable(0.0)
-
-    # The target rotational velocity of the flywheel.
-    target_rps = magicbot.tunable(0.0)
-
-    def setup(self) -> None:
-        """Set up initial state for the flywheel tuner.
-
-        This method is called after createObjects has been called in the main
-        robot class, and after all components have been created.
-        """
-        flywheel_constants: shooter.FlywheelConstants = (
-            self.robot_constants.shooter.flywheel
-        )
-
-        self.k_s = flywheel_constants.k_s
-        self.k_v = flywheel_constants.k_v
-        self.k_a = flywheel_constants.k_a
-        self.k_p = flywheel_constants.k_p
-        self.k_i = flywheel_constants.k_i
-        self.k_d = flywheel_constants.k_d
-
-        self.last_k_s = self.k_s
-        self.last_k_v = self.k_v
-        self.last_k_a = self.k_a
-        self.last_k_p = self.k_p
-        self.last_k_i = self.k_i
-        self.last_k_d = self.k_d
-
-        self.target_rps = flywheel_constants.default_speed_rps
-
-    def execute(self) -> None:
-        """Update the flywheel speed and gains (if they changed).
-
-        This method is called at the end of the control loop.
-        """
-        self.flywheel.set_target_rps(self.target_rps)
-
-        # We only want to reapply the gains if they changed. The TalonFX motor
-        # doesn't like being reconfigured constantly.
-        if not self.gains_changed():
-            return
-
-        self.apply_gains()
-
-        self.last_k_s = self.k_s
-        self.last_k_v = self.k_v
-        self.last_k_a = self.k_a
-        self.last_k_p = self.k_p
-        self.last_k_i = self.k_i
-        self.last_k_d = self.k_d
-
-    def gains_changed(self) -> bool:
-        """Detect if any of the gains changed.
-
-        Returns:
-            True if any of the gains changed, False otherwise.
-        """
-        return (
-            self.k_s != self.last_k_s
-            or self.k_v != self.last_k_v
-            or self.k_a != self.last_k_a
-            or self.k_p != self.last_k_p
-            or self.k_i != self.last_k_i
-            or self.k_d != self.last_k_d
-        )
-
-    def apply_gains(self) -> None:
-        """Apply the current gains to the motor."""
-        result = self.flywheel_motor.configurator.apply(
-            phoenix6.configs.config_groups.Slot0Configs()
-            .with_k_s(self.k_s)
-            .with_k_v(self.k_v)
-            .with_k_a(self.k_a)
-            .with_k_p(self.k_p)
-            .with_k_i(self.k_i)
-            .with_k_d(self.k_d)
-        )
-        if not result.is_ok():
-            self.logger.error("Failed to apply new gains to flywheel motor")
+        self._target_velocity_log.update(self._target_rps)
+        self._measured_velocity_log.update(self.measured_speed_rps())
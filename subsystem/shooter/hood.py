@@ -1,9 +1,7 @@
-import magicbot
 import phoenix6
-import wpilib
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices, signals
 from subsystem import shooter
 
 
@@ -20,6 +18,10 @@ class Hood:
     hood_motor: phoenix6.hardware.TalonFX
     hood_encoder: phoenix6.hardware.CANcoder
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
+    signal_hub: signals.SignalHub
 
     def setup(self) -> None:
         """Set up initial state for the hood.
@@ -27,6 +29,16 @@ class Hood:
         This method is called after createObjects has been called in the main
         robot class, and after all components have been created.
         """
+        # Raw position from the external encoder. This is refreshed each loop
+        # by the signal hub.
+        self._encoder_position_signal: phoenix6.status_signal.StatusSignal[
+            phoenix6.units.rotation
+        ] = self.signal_hub.register(
+            self.hood_encoder,
+            self.hood_encoder.get_position(),
+            synchronous=True,
+        )
+
         self._hood_speed = 0.0
         self._target_position_degrees = self.measured_angle_degrees()
 
@@ -83,11 +95,14 @@ class Hood:
             )
         )
 
-        result = self.hood_motor.configurator.apply(self.hood_motor_configs)
-        if not result.is_ok():
-            self.logger.error("Failed to apply configs to hood motor")
-
-        result = self.hood_encoder.configurator.apply(
+        # Applied with the configs of the other devices, once every component
+        # is set up.
+        self.device_configurator.submit(
+            "hood motor", self.hood_motor, self.hood_motor_configs
+        )
+        self.device_configurator.submit(
+            "hood encoder",
+            self.hood_encoder,
             phoenix6.configs.CANcoderConfiguration().with_magnet_sensor(
                 phoenix6.configs.MagnetSensorConfigs()
                 .with_sensor_direction(hood_constants.encoder_direction)
@@ -95,11 +110,39 @@ class Hood:
                     hood_constants.absolute_sensor_discontinuity_point
                 )
                 .with_magnet_offset(hood_constants.magnet_offset)
-            )
+            ),
         )
-        if not result.is_ok():
-            self.logger.error("Failed to apply configs to hood encoder")
+        # The absolute position depends on the encoder's magnet offset.
+        self.device_configurator.after_applied(self._seed_position)
+
+        self._request = phoenix6.controls.MotionMagicVoltage(
+            self._target_position_degrees * self.DEGREES_TO_ROTATIONS
+        ).with_slot(0)
+
+        self._target_position_log = self.data_logger.register_double(
+            "/components/hood/target_position_degrees"
+        )
+        self._measured_position_log = self.data_logger.register_double(
+            "/components/hood/measured_position_degrees"
+        )
+        self._sensor_latency_log = self.data_logger.register_double(
+            "/components/hood/sensor_latency_ms"
+        )
+        self._motor_telemetry = self.data_logger.register_motor(
+            "/components/hood/motor", self.hood_motor, position=True
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(self._motor_telemetry)
+        self.can_bus_planner.request_remote_sensor(self.hood_encoder)
+
+        self.telemetry_scheduler.register_motor(self._motor_telemetry)
+
+    def _seed_position(self) -> None:
+        """Set the hood position from the absolute encoder.
 
+        This is called once the hood's devices have been configured.
+        """
         absolute_position = self.hood_encoder.get_absolute_position().value
         self.logger.info(
             f"Setting hood position to {absolute_position} rotations"
@@ -111,13 +154,6 @@ class Hood:
         if not result.is_ok():
             self.logger.error("Failed to set position on hood motor")
 
-        self._request = phoenix6.controls.MotionMagicVoltage(
-            self._target_position_degrees * self.DEGREES_TO_ROTATIONS
-        ).with_slot(0)
-
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
-
     def execute(self) -> None:
         """Command the motors to the current speed.
 
@@ -140,6 +176,11 @@ class Hood:
                 )
             )
 
+        # Time from the encoder sample to commanding the motor. This shows the
+        # effect of running the signal hub in synchronous mode.
+        self._sensor_latency_log.append(
+            self._encoder_position_signal.timestamp.get_latency() * 1000.0
+        )
         self._log_data()
 
     def on_enable(self) -> None:
@@ -190,162 +231,11 @@ class Hood:
     def measured_angle_degrees(self) -> phoenix6.units.degree:
         """The angle of the hood measured by the external encoder, in degrees."""
         return (
-            self.hood_encoder.get_position().value
+            self._encoder_position_signal.value
             * self.ROTATIONS_TO_DEGREES
             / self.robot_constants.shooter.hood.sensor_to_mechanism_ratio
         )
 
     def _log_data(self) -> None:
-        self.data_logger.log_double(
-            "/components/hood/target_position_degrees",
-            self._target_position_degrees,
-            on_change=True,
-        )
-        self.data_logger.log_double(
-            "/components/hood/measured_position_degrees",
-            self.measured_angle_degrees(),
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/hood/motor",
-            self.hood_motor,
-            position=True,
-        )
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/hood/motor",
-                self.hood_motor,
-            )
-
-
-class HoodTuner:
-    """Component for tuning the hood gains.
-
-    It sets up tunable gains over network tables so they can be easily modified
-    on AdvantageScope. It also provides a settable hood target angle position.
-    """
-
-    robot_constants: constants.RobotConstants
-    hood_motor: phoenix6.hardware.TalonFX
-    hood_encoder: phoenix6.hardware.CANcoder
-    hood: Hood
-
-    # Gains for position control of the hood.
-    k_s = magicbot.tunable(0.0)
-    k_v = magicbot.tunable(0.0)
-    k_a = magicbot.tunable(0.0)
-    k_g = magicbot.tunable(0.0)
-    k_p = magicbot.tunable(0.0)
-    k_i = magicbot.tunable(0.0)
-    k_d = magicbot.tunable(0.0)
-    # Motion Magic parameters for smooth trajectories.
-    mm_cruise_velocity = magicbot.tunable(0.0)
-    mm_acceleration = magicbot.tunable(0.0)
-    mm_jerk = magicbot.tunable(0.0)
-
-    # The target angle of the hood, in degrees.
-    target_angle_deg = magicbot.tunable(20.0)
-
-    def setup(self) -> None:
-        """Set up initial state for the hood tuner.
-        This method is called after createObjects has been called in the main
-        robot class, and after all components have been created.
-        """
-        hood_constants: shooter.HoodConstants = (
-            self.robot_constants.shooter.hood
-        )
-
-        self.k_s = hood_constants.k_s
-        self.k_v = hood_constants.k_v
-        self.k_a = hood_constants.k_a
-        self.k_g = hood_constants.k_g
-        self.k_p = hood_constants.k_p
-        self.k_i = hood_constants.k_i
-        self.k_d = hood_constants.k_d
-        self.mm_cruise_velocity = hood_constants.motion_magic_cruise_velocity
-        self.mm_acceleration = hood_constants.motion_magic_acceleration
-        self.mm_jerk = hood_constants.motion_magic_jerk
-
-        self.last_k_s = self.k_s
-        self.last_k_v = self.k_v
-        self.last_k_a = self.k_a
-        self.last_k_g = self.k_g
-        self.last_k_p = self.k_p
-        self.last_k_i = self.k_i
-        self.last_k_d = self.k_d
-        self.last_mm_cruise_velocity = self.mm_cruise_velocity
-        self.last_mm_acceleration = self.mm_acceleration
-        self.last_mm_jerk = self.mm_jerk
-
-        self.target_angle_deg = self.hood.measured_angle_degrees()
-
-    def execute(self) -> None:
-        """Update the hood speed and gains (if they changed).
-
-        This method is called at the end of the control loop.
-        """
-        self.hood.set_position(self.target_angle_deg)
-
-        # We only want to reapply the gains if they changed. The TalonFX motor
-        # doesn't like being reconfigured constantly.
-        if not self._gains_changed():
-            return
-
-        self._apply_gains()
-
-        self.last_k_s = self.k_s
-        self.last_k_v = self.k_v
-        self.last_k_a = self.k_a
-        self.last_k_p = self.k_p
-        self.last_k_i = self.k_i
-        self.last_k_d = self.k_d
-        self.last_k_g = self.k_g
-        self.last_mm_cruise_velocity = self.mm_cruise_velocity
-        self.last_mm_acceleration = self.mm_acceleration
-        self.last_mm_jerk = self.mm_jerk
-
-    def _gains_changed(self) -> bool:
-        """Detect if any of the gains changed.
-
-        Returns:
-            True if any of the gains changed, False otherwise.
-        """
-        return (
-            self.k_s != self.last_k_s
-            or self.k_v != self.last_k_v
-            or self.k_a != self.last_k_a
-            or self.k_p != self.last_k_p
-            or self.k_i != self.last_k_i
-            or self.k_d != self.last_k_d
-            or self.k_g != self.last_k_g
-            or self.mm_cruise_velocity != self.last_mm_cruise_velocity
-            or self.mm_acceleration != self.last_mm_acceleration
-            or self.mm_jerk != self.last_mm_jerk
-        )
-
-    def _apply_gains(self) -> None:
-        """Apply the current gains to the motor."""
-        result = self.hood_motor.configurator.apply(
-            self.hood.hood_motor_configs.with_slot0(
-                phoenix6.configs.Slot0Configs()
-                .with_k_s(self.k_s)
-                .with_k_v(self.k_v)
-                .with_k_a(self.k_a)
-                .with_k_p(self.k_p)
-                .with_k_i(self.k_i)
-                .with_k_d(self.k_d)
-                .with_k_g(self.k_g)
-            ).with_motion_magic(
-                phoenix6.configs.MotionMagicConfigs()
-                .with_motion_magic_cruise_velocity(self.mm_cruise_velocity)
-                .with_motion_magic_acceleration(self.mm_acceleration)
-                .with_motion_magic_jerk(self.mm_jerk)
-            )
-        )
-        if not result.is_ok():
-            self.logger.error("Failed to apply new gains to hood motor")
-
-    @magicbot.feedback
-    def get_absolute_position(self) -> float:
-        return self.hood_encoder.get_absolute_position().value
+        self._target_position_log.update(self._target_position_degrees)
+        self._measured_position_log.update(self.measured_angle_degrees())
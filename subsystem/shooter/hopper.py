@@ -1,9 +1,7 @@
-import magicbot
 import phoenix6
-import wpilib
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices
 from subsystem import shooter
 
 
@@ -18,6 +16,9 @@ class Hopper:
     hopper_left_motor: phoenix6.hardware.TalonFX
     hopper_right_motor: phoenix6.hardware.TalonFX
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
 
     def __init__(self):
         # The target speeds (in rotations per second) to request the hopper
@@ -37,7 +38,9 @@ class Hopper:
         hopper_constants: shooter.HopperConstants = (
             self.robot_constants.shooter.hopper
         )
-        self.hopper_left_motor.configurator.apply(
+        self.device_configurator.submit(
+            "hopper left motor",
+            self.hopper_left_motor,
             phoenix6.configs.TalonFXConfiguration()
             .with_motor_output(
                 phoenix6.configs.MotorOutputConfigs().with_inverted(
@@ -64,9 +67,11 @@ class Hopper:
                 phoenix6.configs.FeedbackConfigs().with_sensor_to_mechanism_ratio(
                     hopper_constants.gear_reduction
                 )
-            )
+            ),
         )
-        self.hopper_right_motor.configurator.apply(
+        self.device_configurator.submit(
+            "hopper right motor",
+            self.hopper_right_motor,
             phoenix6.configs.TalonFXConfiguration()
             .with_motor_output(
                 phoenix6.configs.MotorOutputConfigs().with_inverted(
@@ -93,7 +98,7 @@ class Hopper:
                 phoenix6.configs.FeedbackConfigs().with_sensor_to_mechanism_ratio(
                     hopper_constants.gear_reduction
                 )
-            )
+            ),
         )
 
         self._left_target_rps = (
@@ -105,8 +110,32 @@ class Hopper:
 
         self._request = phoenix6.controls.VelocityVoltage(0.0).with_slot(0)
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
+        self._enabled_log = self.data_logger.register_boolean(
+            "/components/hopper/enabled"
+        )
+        self._left_target_velocity_log = self.data_logger.register_double(
+            "/components/hopper/left_target_velocity_rotations_per_second"
+        )
+        self._right_target_velocity_log = self.data_logger.register_double(
+            "/components/hopper/right_target_velocity_rotations_per_second"
+        )
+        self._left_motor_telemetry = self.data_logger.register_motor(
+            "/components/hopper/left_motor",
+            self.hopper_left_motor,
+            velocity=True,
+        )
+        self._right_motor_telemetry = self.data_logger.register_motor(
+            "/components/hopper/right_motor",
+            self.hopper_right_motor,
+            velocity=True,
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(self._left_motor_telemetry)
+        self.can_bus_planner.request_motor_logging(self._right_motor_telemetry)
+
+        self.telemetry_scheduler.register_motor(self._left_motor_telemetry)
+        self.telemetry_scheduler.register_motor(self._right_motor_telemetry)
 
     def execute(self) -> None:
         """Command the motors to the current speed.
@@ -168,190 +197,6 @@ class Hopper:
         self._enabled = value
 
     def _log_data(self):
-        self.data_logger.log_boolean(
-            "/components/hopper/enabled", self._enabled, on_change=True
-        )
-        self.data_logger.log_double(
-            "/components/hopper/left_target_velocity_rotations_per_second",
-            self._left_target_rps,
-            on_change=True,
-        )
-        self.data_logger.log_double(
-            "/components/hopper/right_target_velocity_rotations_per_second",
-            self._right_target_rps,
-            on_change=True,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/hopper/left_motor",
-            self.hopper_left_motor,
-            velocity=True,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/hopper/right_motor",
-            self.hopper_right_motor,
-            velocity=True,
-        )
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/hopper/left_motor",
-                self.hopper_left_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/hopper/right_motor",
-                self.hopper_right_motor,
-            )
-
-
-class HopperTuner:
-    """Component for tuning hopper gains.
-
-    It sets up tunable gains over network tables so they can be easily modified
-    on AdvantageScope. It also provides a settable hopper target speed.
-    """
-
-    robot_constants: constants.RobotConstants
-    hopper_left_motor: phoenix6.hardware.TalonFX
-    hopper_right_motor: phoenix6.hardware.TalonFX
-    hopper: Hopper
-
-    # Gains for velocity control of the left hopper motor.
-    left_k_s = magicbot.tunable(0.0)
-    left_k_v = magicbot.tunable(0.0)
-    left_k_a = magicbot.tunable(0.0)
-    left_k_p = magicbot.tunable(0.0)
-    left_k_i = magicbot.tunable(0.0)
-    left_k_d = magicbot.tunable(0.0)
-
-    # Gains for velocity control of the right hopper motor.
-    right_k_s = magicbot.tunable(0.0)
-    right_k_v = magicbot.tunable(0.0)
-    right_k_a = magicbot.tunable(0.0)
-    right_k_p = magicbot.tunable(0.0)
-    right_k_i = magicbot.tunable(0.0)
-    right_k_d = magicbot.tunable(0.0)
-
-    # The target rotational speeds for the hopper motors.
-    left_target_rps = magicbot.tunable(0.0)
-    right_target_rps = magicbot.tunable(0.0)
-    # Whether or not the hopper motors should run.
-    enabled = magicbot.tunable(False)
-
-    def setup(self) -> None:
-        hopper_constants: shooter.HopperConstants = (
-            self.robot_constants.shooter.hopper
-        )
-
-        self.left_k_s = hopper_constants.left_k_s
-        self.left_k_v = hopper_constants.left_k_v
-        self.left_k_a = hopper_constants.left_k_a
-        self.left_k_p = hopper_constants.left_k_p
-        self.left_k_i = hopper_constants.left_k_i
-        self.left_k_d = hopper_constants.left_k_d
-
-        self.right_k_s = hopper_constants.right_k_s
-        self.right_k_v = hopper_constants.right_k_v
-        self.right_k_a = hopper_constants.right_k_a
-        self.right_k_p = hopper_constants.right_k_p
-        self.right_k_i = hopper_constants.right_k_i
-        self.right_k_d = hopper_constants.right_k_d
-
-        self._current_left_gains = (
-            phoenix6.configs.config_groups.Slot0Configs()
-            .with_k_s(self.left_k_s)
-            .with_k_v(self.left_k_v)
-            .with_k_a(self.left_k_a)
-            .with_k_p(self.left_k_p)
-            .with_k_i(self.left_k_i)
-            .with_k_d(self.left_k_d)
-        )
-        self._current_right_gains = (
-            phoenix6.configs.config_groups.Slot0Configs()
-            .with_k_s(self.right_k_s)
-            .with_k_v(self.right_k_v)
-            .with_k_a(self.right_k_a)
-            .with_k_p(self.right_k_p)
-            .with_k_i(self.right_k_i)
-            .with_k_d(self.right_k_d)
-        )
-
-    def execute(self) -> None:
-        self.hopper.set_left_target_rps(self.left_target_rps)
-        self.hopper.set_right_target_rps(self.right_target_rps)
-        self.hopper.set_enabled(self.enabled)
-
-        # We only want to reapply the gains if they changed. The TalonFX motor
-        # doesn't like being reconfigured constantly.
-        if self._left_gains_changed():
-            self._apply_left_gains()
-        if self._right_gains_changed():
-            self._apply_right_gains()
-
-    def _left_gains_changed(self) -> bool:
-        """Detect if any of the gains for the left motor changed.
-
-        Returns:
-            True if any of the gains changed, False if they didn't.
-        """
-        return (
-            self.left_k_s != self._current_left_gains.k_s
-            or self.left_k_v != self._current_left_gains.k_v
-            or self.left_k_a != self._current_left_gains.k_a
-            or self.left_k_p != self._current_left_gains.k_p
-            or self.left_k_i != self._current_left_gains.k_i
-            or self.left_k_d != self._current_left_gains.k_d
-        )
-
-    def _right_gains_changed(self) -> bool:
-        """Detect if any of the gains for the right motor changed.
-
-        Returns:
-            True if any of the gains changed, False otherwise.
-        """
-        return (
-            self.right_k_s != self._current_right_gains.k_s
-            or self.right_k_v != self._current_right_gains.k_v
-            or self.right_k_a != self._current_right_gains.k_a
-            or self.right_k_p != self._current_right_gains.k_p
-            or self.right_k_i != self._current_right_gains.k_i
-            or self.right_k_d != self._current_right_gains.k_d
-        )
-
-    def _apply_left_gains(self) -> None:
-        """Apply the current gains to the left motor."""
-        result = self.hopper_left_motor.configurator.apply(
-            self._current_left_gains.with_k_s(self.left_k_s)
-            .with_k_v(self.left_k_v)
-            .with_k_a(self.left_k_a)
-            .with_k_p(self.left_k_p)
-            .with_k_i(self.left_k_i)
-            .with_k_d(self.left_k_d)
-        )
-        if not result.is_ok():
-            self.logger.error(
-                (
-                    f"Failed to apply new gains to hopper left motor: "
-                    f"{result.name}: {result.description}"
-                )
-            )
-
-    def _apply_right_gains(self) -> None:
-        """Apply the current gains to the right motor."""
-        result = self.hopper_right_motor.configurator.apply(
-            self._current_right_gains.with_k_s(self.right_k_s)
-            .with_k_v(self.right_k_v)
-            .with_k_a(self.right_k_a)
-            .with_k_p(self.right_k_p)
-            .with_k_i(self.right_k_i)
-            .with_k_d(self.right_k_d)
-        )
-        if not result.is_ok():
-            self.logger.error(
-                (
-                    f"Failed to apply new gains to hopper right motor: "
-                    f"{result.name}: {result.description}"
-                )
-            )
+        self._enabled_log.update(self._enabled)
+        self._left_target_velocity_log.update(self._left_target_rps)
+        self._right_target_velocity_log.update(self._right_target_rps)
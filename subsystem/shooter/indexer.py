@@ -1,9 +1,7 @@
-import magicbot
 import phoenix6
-import wpilib
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices
 from subsystem import shooter
 
 
@@ -17,6 +15,9 @@ class Indexer:
     indexer_back_motor: phoenix6.hardware.TalonFX
     indexer_front_motor: phoenix6.hardware.TalonFX
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
 
     def setup(self) -> None:
         """Set up initial state for the indexer.
@@ -28,7 +29,9 @@ class Indexer:
             self.robot_constants.shooter.indexer
         )
         # Configuration settings for back motor.
-        self.indexer_back_motor.configurator.apply(
+        self.device_configurator.submit(
+            "indexer back motor",
+            self.indexer_back_motor,
             phoenix6.configs.TalonFXConfiguration()
             .with_motor_output(
                 phoenix6.configs.MotorOutputConfigs().with_inverted(
@@ -50,10 +53,12 @@ class Indexer:
                     indexer_constants.supply_current_limit
                 )
                 .with_supply_current_limit_enable(True)
-            )
+            ),
         )
         # Configuration settings for front motor.
-        self.indexer_front_motor.configurator.apply(
+        self.device_configurator.submit(
+            "indexer front motor",
+            self.indexer_front_motor,
             phoenix6.configs.TalonFXConfiguration()
             .with_motor_output(
                 phoenix6.configs.MotorOutputConfigs().with_inverted(
@@ -75,7 +80,7 @@ class Indexer:
                     indexer_constants.supply_current_limit
                 )
                 .with_supply_current_limit_enable(True)
-            )
+            ),
         )
 
         # The target speed (in rotations per second) to request the indexer
@@ -88,8 +93,29 @@ class Indexer:
             self._target_rps
         ).with_slot(0)
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
+        self._enabled_log = self.data_logger.register_boolean(
+            "/components/indexer/enabled"
+        )
+        self._target_velocity_log = self.data_logger.register_double(
+            "/components/indexer/target_velocity_rotations_per_second"
+        )
+        self._back_motor_telemetry = self.data_logger.register_motor(
+            "/components/indexer/back_motor",
+            self.indexer_back_motor,
+            velocity=True,
+        )
+        self._front_motor_telemetry = self.data_logger.register_motor(
+            "/components/indexer/front_motor",
+            self.indexer_front_motor,
+            velocity=True,
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(self._back_motor_telemetry)
+        self.can_bus_planner.request_motor_logging(self._front_motor_telemetry)
+
+        self.telemetry_scheduler.register_motor(self._back_motor_telemetry)
+        self.telemetry_scheduler.register_motor(self._front_motor_telemetry)
 
     def execute(self) -> None:
         """Command the motors to the current speed if enabled.
@@ -149,178 +175,5 @@ class Indexer:
         self._enabled = value
 
     def _log_data(self):
-        self.data_logger.log_boolean(
-            "/components/indexer/enabled", self._enabled, on_change=True
-        )
-        self.data_logger.log_double(
-            "/components/indexer/target_velocity_rotations_per_second",
-            self._target_rps,
-            on_change=True,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/indexer/back_motor",
-            self.indexer_back_motor,
-            velocity=True,
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/indexer/front_motor",
-            self.indexer_front_motor,
-            velocity=True,
-        )
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/indexer/back_motor",
-                self.indexer_back_motor,
-            )
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/indexer/front_motor",
-                self.indexer_front_motor,
-            )
-
-
-class IndexerTuner:
-    """Component for tuning indexer gains.
-
-    It sets up tunable gains over network tables so they can be easily modified
-    on AdvantageScope. It also provides a settable indexer target speed.
-    """
-
-    robot_constants: constants.RobotConstants
-    indexer_back_motor: phoenix6.hardware.TalonFX
-    indexer_front_motor: phoenix6.hardware.TalonFX
-    indexer: Indexer
-
-    # Gains for velocity control of the back indexer motor.
-    back_k_s = magicbot.tunable(0.0)
-    back_k_v = magicbot.tunable(0.0)
-    back_k_a = magicbot.tunable(0.0)
-    back_k_p = magicbot.tunable(0.0)
-    back_k_i = magicbot.tunable(0.0)
-    back_k_d = magicbot.tunable(0.0)
-
-    # Gains for velocity control of the front indexer motor.
-    front_k_s = magicbot.tunable(0.0)
-    front_k_v = magicbot.tunable(0.0)
-    front_k_a = magicbot.tunable(0.0)
-    front_k_p = magicbot.tunable(0.0)
-    front_k_i = magicbot.tunable(0.0)
-    front_k_d = magicbot.tunable(0.0)
-
-    # The target rotational speed of the indexer.
-    target_rps = magicbot.tunable(0.0)
-    # Whether or not the indexer motors should run.
-    enabled = magicbot.tunable(False)
-
-    def setup(self) -> None:
-        indexer_constants: shooter.IndexerConstants = (
-            self.robot_constants.shooter.indexer
-        )
-
-        self.back_k_s = indexer_constants.back_k_s
-        self.back_k_v = indexer_constants.back_k_v
-        self.back_k_a = indexer_constants.back_k_a
-        self.back_k_p = indexer_constants.back_k_p
-        self.back_k_i = indexer_constants.back_k_i
-        self.back_k_d = indexer_constants.back_k_d
-
-        self.front_k_s = indexer_constants.front_k_s
-        self.front_k_v = indexer_constants.front_k_v
-        self.front_k_a = indexer_constants.front_k_a
-        self.front_k_p = indexer_constants.front_k_p
-        self.front_k_i = indexer_constants.front_k_i
-        self.front_k_d = indexer_constants.front_k_d
-
-        self._current_back_gains = (
-            phoenix6.configs.config_groups.Slot0Configs()
-            .with_k_s(self.back_k_s)
-            .with_k_v(self.back_k_v)
-            .with_k_a(self.back_k_a)
-            .with_k_p(self.back_k_p)
-            .with_k_i(self.back_k_i)
-            .with_k_d(self.back_k_d)
-        )
-        self._current_front_gains = (
-            phoenix6.configs.config_groups.Slot0Configs()
-            .with_k_s(self.front_k_s)
-            .with_k_v(self.front_k_v)
-            .with_k_a(self.front_k_a)
-            .with_k_p(self.front_k_p)
-            .with_k_i(self.front_k_i)
-            .with_k_d(self.front_k_d)
-        )
-
-    def execute(self) -> None:
-        self.indexer.set_target_rps(self.target_rps)
-        self.indexer.set_enabled(self.enabled)
-
-        # We only want to reapply the gains if they changed. The TalonFX motor
-        # doesn't like being reconfigured constantly.
-        if self._back_gains_changed():
-            self._apply_back_gains()
-        if self._front_gains_changed():
-            self._apply_front_gains()
-
-    def _back_gains_changed(self) -> bool:
-        """Detect if any of the gains for the back motor changed.
-
-        Returns:
-            True if any of the gains changed, False if the gains didn't change
-                or if the current gains couldn't be read from the motor.
-        """
-        return (
-            self.back_k_s != self._current_back_gains.k_s
-            or self.back_k_v != self._current_back_gains.k_v
-            or self.back_k_a != self._current_back_gains.k_a
-            or self.back_k_p != self._current_back_gains.k_p
-            or self.back_k_i != self._current_back_gains.k_i
-            or self.back_k_d != self._current_back_gains.k_d
-        )
-
-    def _front_gains_changed(self) -> bool:
-        """Detect if any of the gains for the front motor changed.
-
-        Returns:
-            True if any of the gains changed, False otherwise.
-        """
-        return (
-            self.front_k_s != self._current_front_gains.k_s
-            or self.front_k_v != self._current_front_gains.k_v
-            or self.front_k_a != self._current_front_gains.k_a
-            or self.front_k_p != self._current_front_gains.k_p
-            or self.front_k_i != self._current_front_gains.k_i
-            or self.front_k_d != self._current_front_gains.k_d
-        )
-
-    def _apply_back_gains(self) -> None:
-        """Apply the current gains to the back motor."""
-        result = self.indexer_back_motor.configurator.apply(
-            self._current_back_gains.with_k_s(self.back_k_s)
-            .with_k_v(self.back_k_v)
-            .with_k_a(self.back_k_a)
-            .with_k_p(self.back_k_p)
-            .with_k_i(self.back_k_i)
-            .with_k_d(self.back_k_d)
-        )
-        if not result.is_ok():
-            self.logger.error(
-                f"Failed to apply new gains to indexer back motor: {result.name}: {result.description}"
-            )
-
-    def _apply_front_gains(self) -> None:
-        """Apply the current gains to the front motor."""
-        result = self.indexer_front_motor.configurator.apply(
-            self._current_front_gains.with_k_s(self.front_k_s)
-            .with_k_v(self.front_k_v)
-            .with_k_a(self.front_k_a)
-            .with_k_p(self.front_k_p)
-            .with_k_i(self.front_k_i)
-            .with_k_d(self.front_k_d)
-        )
-        if not result.is_ok():
-            self.logger.error(
-                f"Failed to apply new gains to indexer front motor: {result.name}: {result.description}"
-            )
+        self._enabled_log.update(self._enabled)
+        self._target_velocity_log.update(self._target_rps)
@@ -41,6 +41,13 @@ class Shooter(magicbot.StateMachine):
         self._driver_wants_feed = False
         self._auto = True
 
+        self._auto_log = self.data_logger.register_boolean(
+            "/components/shooter/auto"
+        )
+        self._driver_wants_feed_log = self.data_logger.register_boolean(
+            "/components/shooter/driver_wants_feed"
+        )
+
     @magicbot.state(first=True)
     def idling(self):
         """Waiting for the driver to command fuel feed."""
@@ -153,11 +160,5 @@ class Shooter(magicbot.StateMachine):
         return robot_speed_mps > speed_threshold_mps
 
     def _log_data(self) -> None:
-        self.data_logger.log_boolean(
-            "/components/shooter/auto", self._auto, on_change=True
-        )
-        self.data_logger.log_boolean(
-            "/components/shooter/driver_wants_feed",
-            self._driver_wants_feed,
-            on_change=True,
-        )
+        self._auto_log.update(self._auto)
+        self._driver_wants_feed_log.update(self._driver_wants_feed)
@@ -0,0 +1,232 @@
+"""A precomputed grid of stationary shot solutions over the field.
+
+Each grid point holds the turret's field bearing and distance to a target, and
+the hood angle and flywheel speed for that distance, so the target tracker can
+find its stationary solution with a few array reads and a bilinear
+interpolation.
+
+The grid depends on the target positions and the shot table. Rebuild it after
+changing either with:
+
+    python -m subsystem.shooter.shot_grid
+"""
+
+import array
+import math
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Callable, Sequence, Tuple
+
+import wpilib
+
+FILE_NAME = "shot_grid.bin"
+
+FIELD_LENGTH_METERS = 16.541
+FIELD_WIDTH_METERS = 8.069
+CELL_SIZE_METERS = 0.25
+
+# Values stored for each grid point: field bearing to the target in radians,
+# distance to the target in meters, hood angle in degrees and flywheel speed in
+# rotations per second.
+VALUES_PER_POINT = 4
+
+_MAGIC = b"SHOTGRD1"
+# Magic, cell size, number of columns, number of rows and number of targets.
+_HEADER = struct.Struct("<8sf3I")
+
+
+@dataclass(frozen=True)
+class StationaryShot:
+    """How to shoot at a target from a stationary turret."""
+
+    # Field-relative bearing from the turret to the target.
+    bearing_radians: float
+    distance_meters: float
+    hood_angle_degrees: float
+    flywheel_speed_rps: float
+
+
+def default_path() -> str:
+    """Returns the path of the grid file in the deploy directory."""
+    return os.path.join(wpilib.getDeployDirectory(), FILE_NAME)
+
+
+class ShotGrid:
+    """Stationary shot solutions for a set of targets, on a grid over the field.
+
+    Grid points are `cell_size_meters` apart, starting at the field origin and
+    covering the whole field. Lookups outside the field are clamped to its
+    edge.
+    """
+
+    def __init__(
+        self,
+        cell_size_meters: float,
+        columns: int,
+        rows: int,
+        target_count: int,
+        values: array.array,
+    ) -> None:
+        if columns < 2 or rows < 2:
+            raise ValueError("Shot grid must have at least 2 columns and rows")
+        if len(values) != target_count * rows * columns * VALUES_PER_POINT:
+            raise ValueError(
+                f"Shot grid has {len(values)} values, expected"
+                f" {target_count * rows * columns * VALUES_PER_POINT}"
+            )
+        self.cell_size_meters = cell_size_meters
+        self.columns = columns
+        self.rows = rows
+        self.target_count = target_count
+        self._values = values
+        self._max_x = (columns - 1) * cell_size_meters
+        self._max_y = (rows - 1) * cell_size_meters
+
+    @classmethod
+    def build(
+        cls,
+        targets: Sequence[Tuple[float, float]],
+        shot_table: Callable[[float], Tuple[float, float]],
+        cell_size_meters: float = CELL_SIZE_METERS,
+    ) -> "ShotGrid":
+        """Computes the grid.
+
+        Args:
+            targets: The (x, y) field position of each target, in meters.
+            shot_table: Returns (hood angle, flywheel speed) for a distance.
+            cell_size_meters: Distance between neighboring grid points.
+        """
+        columns = math.ceil(FIELD_LENGTH_METERS / cell_size_meters) + 1
+        rows = math.ceil(FIELD_WIDTH_METERS / cell_size_meters) + 1
+        values = array.array("f")
+        for target_x, target_y in targets:
+            for row in range(rows):
+                dy = target_y - row * cell_size_meters
+                for column in range(columns):
+                    dx = target_x - column * cell_size_meters
+                    distance = math.hypot(dx, dy)
+                    hood_angle, flywheel_speed = shot_table(distance)
+                    values.extend(
+                        (
+                            math.atan2(dy, dx),
+                            distance,
+                            hood_angle,
+                            flywheel_speed,
+                        )
+                    )
+        return cls(cell_size_meters, columns, rows, len(targets), values)
+
+    @classmethod
+    def load(cls, path: str) -> "ShotGrid":
+        """Reads a grid from a file written by `save`.
+
+        Raises:
+            OSError: If the file can't be read.
+            ValueError: If the file isn't a valid grid.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is too short to be a shot grid")
+        magic, cell_size, columns, rows, target_count = _HEADER.unpack_from(
+            data
+        )
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a shot grid")
+        values = array.array("f")
+        values.frombytes(data[_HEADER.size :])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return cls(cell_size, columns, rows, target_count, values)
+
+    def save(self, path: str) -> None:
+        """Writes the grid to a file, as little-endian 32-bit floats."""
+        values = self._values
+        if sys.byteorder != "little":
+            values = array.array("f", values)
+            values.byteswap()
+        with open(path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    self.cell_size_meters,
+                    self.columns,
+                    self.rows,
+                    self.target_count,
+                )
+            )
+            f.write(values.tobytes())
+
+    def lookup(
+        self, target_index: int, x_meters: float, y_meters: float
+    ) -> StationaryShot:
+        """Interpolates the stationary shot at a field position.
+
+        Args:
+            target_index: Index of the target, in the order passed to `build`.
+            x_meters: X of the turret's field position.
+            y_meters: Y of the turret's field position.
+        """
+        fx = min(max(x_meters, 0.0), self._max_x) / self.cell_size_meters
+        fy = min(max(y_meters, 0.0), self._max_y) / self.cell_size_meters
+        column = min(int(fx), self.columns - 2)
+        row = min(int(fy), self.rows - 2)
+        tx = fx - column
+        ty = fy - row
+
+        v = self._values
+        i00 = (
+            (target_index * self.rows + row) * self.columns + column
+        ) * VALUES_PER_POINT
+        i10 = i00 + VALUES_PER_POINT
+        i01 = i00 + self.columns * VALUES_PER_POINT
+        i11 = i01 + VALUES_PER_POINT
+        w00 = (1.0 - tx) * (1.0 - ty)
+        w10 = tx * (1.0 - ty)
+        w01 = (1.0 - tx) * ty
+        w11 = tx * ty
+
+        # Bearings wrap around, so interpolate their differences from the
+        # first corner.
+        b00 = v[i00]
+        bearing = b00 + (
+            w10 * math.remainder(v[i10] - b00, math.tau)
+            + w01 * math.remainder(v[i01] - b00, math.tau)
+            + w11 * math.remainder(v[i11] - b00, math.tau)
+        )
+        return StationaryShot(
+            math.remainder(bearing, math.tau),
+            *(
+                w00 * v[i00 + k]
+                + w10 * v[i10 + k]
+                + w01 * v[i01 + k]
+                + w11 * v[i11 + k]
+                for k in range(1, VALUES_PER_POINT)
+            ),
+        )
+
+
+def build_default() -> ShotGrid:
+    """Builds the grid for the target tracker's targets and shot table."""
+    # Imported here, since the target tracker loads grids from this module.
+    from subsystem.shooter import target_tracker
+
+    return ShotGrid.build(
+        target_tracker.TargetTracker.TARGET_POSITIONS,
+        target_tracker.ShotTable.get,
+    )
+
+
+if __name__ == "__main__":
+    # Write into the deploy directory of the source tree, next to robot.py.
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        "deploy",
+        FILE_NAME,
+    )
+    build_default().save(path)
+    print(f"Wrote {os.path.normpath(path)}")
@@ -1,6 +1,7 @@
 import bisect
 import math
-from typing import Tuple
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
 
 import magicbot
 import phoenix6
@@ -8,8 +9,13 @@ import wpilib
 from wpimath import geometry, kinematics, units
 
 import constants
-from common import alliance, datalog
+from common import alliance, datalog, signals
 from subsystem import drivetrain, shooter
+from subsystem.shooter import shot_grid
+
+if TYPE_CHECKING:
+    import numpy
+    import numpy.typing
 
 INCHES_TO_METERS = 0.0254
 TURRET_TO_ROBOT_X = 4.25 * INCHES_TO_METERS
@@ -20,6 +26,52 @@ BLUE_HUB_TO_FIELD_X = 182.11 * INCHES_TO_METERS
 BLUE_HUB_TO_FIELD_Y = 158.845 * INCHES_TO_METERS
 
 
+def _pchip_slopes(
+    xs: Sequence[float], ys: Sequence[float]
+) -> Tuple[float, ...]:
+    """Returns the slopes of a monotone cubic (PCHIP) curve at each point.
+
+    These are the Fritsch-Carlson slopes SciPy's PchipInterpolator uses. The
+    curve through the points with these slopes has a continuous first
+    derivative, and doesn't overshoot between points.
+    """
+    h = [x2 - x1 for x1, x2 in zip(xs, xs[1:])]
+    delta = [(y2 - y1) / hk for y1, y2, hk in zip(ys, ys[1:], h)]
+    if len(h) == 1:
+        return (delta[0], delta[0])
+
+    slopes = [0.0] * len(xs)
+    for k in range(1, len(xs) - 1):
+        if delta[k - 1] * delta[k] > 0.0:
+            w1 = 2.0 * h[k] + h[k - 1]
+            w2 = h[k] + 2.0 * h[k - 1]
+            slopes[k] = (w1 + w2) / (w1 / delta[k - 1] + w2 / delta[k])
+
+    def end_slope(h0: float, h1: float, d0: float, d1: float) -> float:
+        slope = ((2.0 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+        if slope * d0 <= 0.0:
+            return 0.0
+        if d0 * d1 < 0.0 and abs(slope) > abs(3.0 * d0):
+            return 3.0 * d0
+        return slope
+
+    slopes[0] = end_slope(h[0], h[1], delta[0], delta[1])
+    slopes[-1] = end_slope(h[-1], h[-2], delta[-1], delta[-2])
+    return tuple(slopes)
+
+
+def _pchip_table_slopes(
+    table: Sequence[Sequence[float]],
+) -> Tuple[Tuple[float, ...], ...]:
+    """Returns the PCHIP slopes of each column after the first, for each row."""
+    distances = [row[0] for row in table]
+    columns = [
+        _pchip_slopes(distances, [row[i] for row in table])
+        for i in range(1, len(table[0]))
+    ]
+    return tuple(zip(*columns))
+
+
 class ShotTable:
     """A lookup table for hood angles and flywheel speeds based on robot pose."""
 
@@ -27,17 +79,32 @@ class ShotTable:
     #  * turret-to-target distance in meters
     #  * hood angle in degrees
     #  * flywheel speed in rotations per second
-    _TABLE: Tuple[Tuple[float, float, float], ...] = (
-        (2.25, 2.0, 27.5),
-        (2.75, 3.5, 29.0),
-        (3.25, 5.0, 30.5),
-        (3.75, 6.5, 32.5),
-        (4.25, 7.0, 34.0),
-        (4.75, 7.5, 36.0),
-        (5.25, 8.0, 38.0),  # Not calibrated
+    #  * time of flight of the fuel in seconds
+    # TODO: Measure the times of flight. These are estimates around the 1.25s
+    # average we used before.
+    _TABLE: Tuple[Tuple[float, float, float, float], ...] = (
+        (2.25, 2.0, 27.5, 1.05),
+        (2.75, 3.5, 29.0, 1.12),
+        (3.25, 5.0, 30.5, 1.19),
+        (3.75, 6.5, 32.5, 1.25),
+        (4.25, 7.0, 34.0, 1.31),
+        (4.75, 7.5, 36.0, 1.37),
+        (5.25, 8.0, 38.0, 1.43),  # Not calibrated
     )
     # A tuple of just the distances from _TABLE.
     _DISTANCES: Tuple[float, ...] = tuple(row[0] for row in _TABLE)
+    # Slopes of the hood angle, flywheel speed and time of flight at each
+    # distance in _TABLE, for monotone cubic interpolation.
+    _SLOPES: Tuple[Tuple[float, float, float], ...] = _pchip_table_slopes(
+        _TABLE
+    )
+
+    # Whether to interpolate with monotone cubic (PCHIP) curves instead of
+    # straight lines. The cubic curves don't change slope at the table
+    # distances, so the flywheel target changes smoothly as we drive. They
+    # never overshoot the table values between distances. The shot
+    # grid must be rebuilt after changing this.
+    MONOTONE_CUBIC: bool = False
 
     @classmethod
     def get(cls, distance_meters: float) -> Tuple[float, float]:
@@ -54,6 +121,10 @@ class ShotTable:
             A tuple containing the target hood angle in degrees and flywheel
             speed in rotations per second.
         """
+        if cls.MONOTONE_CUBIC:
+            hood_angle, flywheel_speed, _ = cls._cubic_lookup(distance_meters)
+            return hood_angle, flywheel_speed
+
         if distance_meters <= cls._TABLE[0][0]:
             return cls._TABLE[0][1], cls._TABLE[0][2]
         if distance_meters >= cls._TABLE[-1][0]:
@@ -61,14 +132,260 @@ class ShotTable:
 
         idx = bisect.bisect_left(cls._DISTANCES, distance_meters) - 1
 
-        d1, h1, f1 = cls._TABLE[idx]
-        d2, h2, f2 = cls._TABLE[idx + 1]
+        d1, h1, f1, _ = cls._TABLE[idx]
+        d2, h2, f2, _ = cls._TABLE[idx + 1]
+
+        fraction = (distance_meters - d1) / (d2 - d1)
+        return h1 + fraction * (h2 - h1), f1 + fraction * (f2 - f1)
+
+    @classmethod
+    def lookup(cls, distance_meters: float) -> Tuple[float, float, float]:
+        """Get (hood angle, flywheel speed, time of flight) for a distance.
+
+        This interpolates between values for known distances.
+
+        Args:
+            distance_meters:
+                The Euclidian distance in the XY plane in meters from the center
+                of the turret to the target.
+
+        Returns:
+            A tuple containing the target hood angle in degrees, flywheel
+            speed in rotations per second, and time of flight in seconds.
+        """
+        if cls.MONOTONE_CUBIC:
+            return cls._cubic_lookup(distance_meters)
+
+        if distance_meters <= cls._TABLE[0][0]:
+            return cls._TABLE[0][1], cls._TABLE[0][2], cls._TABLE[0][3]
+        if distance_meters >= cls._TABLE[-1][0]:
+            return cls._TABLE[-1][1], cls._TABLE[-1][2], cls._TABLE[-1][3]
+
+        idx = bisect.bisect_left(cls._DISTANCES, distance_meters) - 1
+
+        d1, h1, f1, t1 = cls._TABLE[idx]
+        d2, h2, f2, t2 = cls._TABLE[idx + 1]
 
         fraction = (distance_meters - d1) / (d2 - d1)
         hood_angle = h1 + fraction * (h2 - h1)
         flywheel_speed = f1 + fraction * (f2 - f1)
+        time_of_flight = t1 + fraction * (t2 - t1)
+
+        return hood_angle, flywheel_speed, time_of_flight
+
+    @classmethod
+    def get_time_of_flight(cls, distance_meters: float) -> float:
+        """Get the time of flight in seconds for a given distance in meters."""
+        if cls.MONOTONE_CUBIC:
+            return cls._cubic_lookup(distance_meters)[2]
+
+        if distance_meters <= cls._TABLE[0][0]:
+            return cls._TABLE[0][3]
+        if distance_meters >= cls._TABLE[-1][0]:
+            return cls._TABLE[-1][3]
+
+        idx = bisect.bisect_left(cls._DISTANCES, distance_meters) - 1
+
+        d1, _, _, t1 = cls._TABLE[idx]
+        d2, _, _, t2 = cls._TABLE[idx + 1]
+
+        return t1 + (distance_meters - d1) / (d2 - d1) * (t2 - t1)
+
+    @classmethod
+    def _cubic_lookup(
+        cls, distance_meters: float
+    ) -> Tuple[float, float, float]:
+        """Like lookup, but interpolates with monotone cubic curves."""
+        if distance_meters <= cls._TABLE[0][0]:
+            return cls._TABLE[0][1], cls._TABLE[0][2], cls._TABLE[0][3]
+        if distance_meters >= cls._TABLE[-1][0]:
+            return cls._TABLE[-1][1], cls._TABLE[-1][2], cls._TABLE[-1][3]
+
+        idx = bisect.bisect_left(cls._DISTANCES, distance_meters) - 1
+
+        d1, *y1 = cls._TABLE[idx]
+        d2, *y2 = cls._TABLE[idx + 1]
+        m1 = cls._SLOPES[idx]
+        m2 = cls._SLOPES[idx + 1]
+
+        # Cubic Hermite basis functions.
+        h = d2 - d1
+        t = (distance_meters - d1) / h
+        t2 = t * t
+        t3 = t2 * t
+        h00 = 2.0 * t3 - 3.0 * t2 + 1.0
+        h10 = (t3 - 2.0 * t2 + t) * h
+        h01 = 1.0 - h00
+        h11 = (t3 - t2) * h
+        hood_angle, flywheel_speed, time_of_flight = (
+            h00 * y1[i] + h10 * m1[i] + h01 * y2[i] + h11 * m2[i]
+            for i in range(3)
+        )
+        return hood_angle, flywheel_speed, time_of_flight
+
+    @classmethod
+    def lookup_array(
+        cls, distances_meters: "numpy.typing.ArrayLike"
+    ) -> Tuple["numpy.ndarray", "numpy.ndarray", "numpy.ndarray"]:
+        """Like lookup, but for an array of distances.
+
+        This is for simulation and log analysis, where evaluating many
+        distances one at a time is slow. It needs NumPy, which isn't installed
+        on the robot.
+
+        Args:
+            distances_meters:
+                Turret-to-target distances in meters, of any shape.
+
+        Returns:
+            Arrays of hood angles in degrees, flywheel speeds in rotations per
+            second, and times of flight in seconds, each the same shape as
+            `distances_meters`.
+        """
+        import numpy
+
+        table = numpy.asarray(cls._TABLE)
+        distances = table[:, 0]
+        values = table[:, 1:]
+
+        x = numpy.clip(
+            numpy.asarray(distances_meters, dtype=float),
+            distances[0],
+            distances[-1],
+        )
+        idx = numpy.clip(
+            numpy.searchsorted(distances, x, side="right") - 1,
+            0,
+            len(distances) - 2,
+        )
+        h = (distances[idx + 1] - distances[idx])[..., numpy.newaxis]
+        t = (x[..., numpy.newaxis] - distances[idx][..., numpy.newaxis]) / h
+        y1 = values[idx]
+        y2 = values[idx + 1]
+
+        if cls.MONOTONE_CUBIC:
+            slopes = numpy.asarray(cls._SLOPES)
+            t2 = t * t
+            t3 = t2 * t
+            h00 = 2.0 * t3 - 3.0 * t2 + 1.0
+            result = (
+                h00 * y1
+                + (t3 - 2.0 * t2 + t) * h * slopes[idx]
+                + (1.0 - h00) * y2
+                + (t3 - t2) * h * slopes[idx + 1]
+            )
+        else:
+            result = y1 + t * (y2 - y1)
 
-        return hood_angle, flywheel_speed
+        return result[..., 0], result[..., 1], result[..., 2]
+
+    @classmethod
+    def get_array(
+        cls, distances_meters: "numpy.typing.ArrayLike"
+    ) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+        """Like get, but for an array of distances. See lookup_array."""
+        hood_angles, flywheel_speeds, _ = cls.lookup_array(distances_meters)
+        return hood_angles, flywheel_speeds
+
+
+@dataclass(frozen=True)
+class MovingShot:
+    """Where to aim, and how to shoot, to hit a target while moving."""
+
+    # Vector from the turret to the virtual target, in field coordinates.
+    virtual_target_x_meters: float
+    virtual_target_y_meters: float
+    distance_meters: float
+    # Turret angle relative to the robot's heading, before any limits.
+    turret_angle_degrees: float
+    hood_angle_degrees: float
+    flywheel_speed_rps: float
+    time_of_flight_seconds: float
+    # Number of iterations the solver took, and whether the time of flight
+    # converged within them.
+    iterations: int
+    converged: bool
+
+
+# Most iterations solve_moving_shot runs for, and how little the time of flight
+# must change between iterations for the solution to have converged.
+MOVING_SHOT_MAX_ITERATIONS = 8
+MOVING_SHOT_TOLERANCE_SECONDS = 0.001
+
+
+def solve_moving_shot(
+    turret_to_target_x_meters: float,
+    turret_to_target_y_meters: float,
+    turret_vx_meters_per_second: float,
+    turret_vy_meters_per_second: float,
+    turret_heading_radians: float,
+    max_iterations: int = MOVING_SHOT_MAX_ITERATIONS,
+    tolerance_seconds: float = MOVING_SHOT_TOLERANCE_SECONDS,
+) -> MovingShot:
+    """Find where to aim a shot from a moving turret so it hits the target.
+
+    Fuel inherits the turret's velocity, so we aim at a virtual target, offset
+    from the real target by how far the turret moves during the time of
+    flight. The time of flight itself depends on the distance to the virtual
+    target, so we solve for it by fixed-point iteration: look up the time of
+    flight for the current virtual target distance, move the virtual target,
+    and repeat until the time of flight stops changing.
+
+    This only uses floats, so it takes a few microseconds.
+
+    Args:
+        turret_to_target_x_meters: X of the vector from the turret to the
+            target, in field coordinates.
+        turret_to_target_y_meters: Y of the vector from the turret to the
+            target, in field coordinates.
+        turret_vx_meters_per_second: X velocity of the turret, in field
+            coordinates.
+        turret_vy_meters_per_second: Y velocity of the turret, in field
+            coordinates.
+        turret_heading_radians: Heading of the turret frame, which is the
+            robot's heading.
+        max_iterations: Most iterations to run.
+        tolerance_seconds: The solution has converged once the time of flight
+            changes by less than this between iterations.
+    """
+    time_of_flight = ShotTable.get_time_of_flight(
+        math.hypot(turret_to_target_x_meters, turret_to_target_y_meters)
+    )
+    iterations = 0
+    converged = False
+    while iterations < max_iterations and not converged:
+        iterations += 1
+        next_time_of_flight = ShotTable.get_time_of_flight(
+            math.hypot(
+                turret_to_target_x_meters
+                - turret_vx_meters_per_second * time_of_flight,
+                turret_to_target_y_meters
+                - turret_vy_meters_per_second * time_of_flight,
+            )
+        )
+        converged = (
+            abs(next_time_of_flight - time_of_flight) < tolerance_seconds
+        )
+        time_of_flight = next_time_of_flight
+
+    x = turret_to_target_x_meters - turret_vx_meters_per_second * time_of_flight
+    y = turret_to_target_y_meters - turret_vy_meters_per_second * time_of_flight
+    distance = math.hypot(x, y)
+    hood_angle, flywheel_speed, _ = ShotTable.lookup(distance)
+    turret_angle = math.degrees(
+        math.remainder(math.atan2(y, x) - turret_heading_radians, math.tau)
+    )
+    return MovingShot(
+        x,
+        y,
+        distance,
+        turret_angle,
+        hood_angle,
+        flywheel_speed,
+        time_of_flight,
+        iterations,
+        converged,
+    )
 
 
 class TargetTracker:
@@ -90,6 +407,7 @@ class TargetTracker:
     hood: shooter.Hood
     turret: shooter.Turret
     data_logger: datalog.DataLogger
+    signal_hub: signals.SignalHub
 
     BLUE_ZONE_END_X_METERS: float = 5.189
     RED_ZONE_END_X_METERS: float = 11.352
@@ -106,6 +424,24 @@ class TargetTracker:
     BLUE_OUTPOST_PASS_X_METERS: float = 2.54
     BLUE_OUTPOST_PASS_Y_METERS: float = 1.27
 
+    # Indices of the targets in TARGET_POSITIONS and the shot grid.
+    BLUE_HUB = 0
+    BLUE_DEPOT_PASS = 1
+    BLUE_OUTPOST_PASS = 2
+    RED_HUB = 3
+    RED_DEPOT_PASS = 4
+    RED_OUTPOST_PASS = 5
+    # Field positions of the targets. The shot grid must be rebuilt after
+    # changing these.
+    TARGET_POSITIONS: Tuple[Tuple[float, float], ...] = (
+        (BLUE_HUB_TO_FIELD_X, BLUE_HUB_TO_FIELD_Y),
+        (BLUE_DEPOT_PASS_X_METERS, BLUE_DEPOT_PASS_Y_METERS),
+        (BLUE_OUTPOST_PASS_X_METERS, BLUE_OUTPOST_PASS_Y_METERS),
+        (RED_HUB_TO_FIELD_X, RED_HUB_TO_FIELD_Y),
+        (RED_DEPOT_PASS_X_METERS, RED_DEPOT_PASS_Y_METERS),
+        (RED_OUTPOST_PASS_X_METERS, RED_OUTPOST_PASS_Y_METERS),
+    )
+
     def setup(self) -> None:
         # Transform from robot frame to turret frame.
         self._robot_to_turret_transform: geometry.Transform2d = (
@@ -114,8 +450,17 @@ class TargetTracker:
                 geometry.Rotation2d(),
             )
         )
-        # Vector from field origin to target.
+        # Index of the current target in TARGET_POSITIONS, and the vector from
+        # field origin to it. These are selected once per control loop.
+        self._target_index: int = self.BLUE_HUB
         self._target_position: geometry.Translation2d = geometry.Translation2d()
+        # Precomputed stationary shot solutions. If the grid can't be loaded,
+        # we compute the stationary solution directly.
+        self._shot_grid: Optional[shot_grid.ShotGrid] = None
+        try:
+            self._shot_grid = shot_grid.ShotGrid.load(shot_grid.default_path())
+        except (OSError, ValueError) as e:
+            wpilib.reportError(f"Failed to load shot grid: {e}", False)
         # Pose of the turret relative to the field. This will be computed each
         # control loop based on the current robot pose estimate.
         self._turret_field_pose: geometry.Pose2d = geometry.Pose2d()
@@ -137,11 +482,17 @@ class TargetTracker:
         self.future_turret_to_target: geometry.Translation2d = (
             geometry.Translation2d(0, 0)
         )
+        # The latest moving shot solution. This is computed each control loop.
+        self._moving_shot: Optional[MovingShot] = None
 
-        # Raw yaw rate of the robot (and the turret).
+        # Raw yaw rate of the robot (and the turret). This is refreshed each
+        # loop by the signal hub.
+        pigeon2 = self.drivetrain.swerve_drive.pigeon2
         self._yaw_rate_signal: phoenix6.status_signal.StatusSignal[
             phoenix6.units.degrees_per_second
-        ] = self.drivetrain.swerve_drive.pigeon2.get_angular_velocity_z_world()
+        ] = self.signal_hub.register(
+            pigeon2, pigeon2.get_angular_velocity_z_world(), synchronous=True
+        )
 
         # Whether to re-calculate the turret and hood positions each loop.
         self._track_position = True
@@ -150,24 +501,59 @@ class TargetTracker:
         # Whether to command mechanisms to the current targets.
         self._enabled = True
 
-    def execute(self) -> None:
-        self._yaw_rate_signal.refresh()
+        self._enabled_log = self.data_logger.register_boolean(
+            "/components/target_tracker/enabled"
+        )
+        self._track_position_log = self.data_logger.register_boolean(
+            "/components/target_tracker/track_position"
+        )
+        self._track_speed_log = self.data_logger.register_boolean(
+            "/components/target_tracker/track_speed"
+        )
+        self._current_distance_log = self.data_logger.register_double(
+            "/components/target_tracker/current_turret_distance_from_target_meters"
+        )
+        self._future_distance_log = self.data_logger.register_double(
+            "/components/target_tracker/future_turret_distance_from_target_meters"
+        )
+        self._future_angle_log = self.data_logger.register_double(
+            "/components/target_tracker/future_turret_to_target_angle"
+        )
+        self._target_turret_position_log = self.data_logger.register_double(
+            "/components/target_tracker/target_turret_position_degrees"
+        )
+        self._target_hood_position_log = self.data_logger.register_double(
+            "/components/target_tracker/target_hood_position_degrees"
+        )
+        self._target_flywheel_velocity_log = self.data_logger.register_double(
+            "/components/target_tracker/target_flywheel_velocity_rotations_per_second"
+        )
+        self._time_of_flight_log = self.data_logger.register_double(
+            "/components/target_tracker/moving_shot/time_of_flight_seconds"
+        )
+        self._solver_iterations_log = self.data_logger.register_double(
+            "/components/target_tracker/moving_shot/iterations"
+        )
+        self._solver_converged_log = self.data_logger.register_boolean(
+            "/components/target_tracker/moving_shot/converged"
+        )
 
+    def execute(self) -> None:
         # Pose of the robot relative to field origin.
         robot_pose: geometry.Pose2d = self.drivetrain.get_robot_pose()
         self._turret_field_pose: geometry.Pose2d = robot_pose.transformBy(
             self._robot_to_turret_transform
         )
+        self._select_target(robot_pose)
 
         self.turret_moving_target_angle = (
             self._compute_moving_target_turret_angle_degrees()
         )
 
-        # Set the flywheel and hood targets based on future turret-to-target
-        # distance.
-        target_hood_angle_degrees, target_flywheel_speed_rps = ShotTable.get(
-            self.future_turret_distance_from_target_meters()
-        )
+        # Set the flywheel and hood targets from the moving shot solution,
+        # which is based on the future turret-to-target distance.
+        target_hood_angle_degrees = self._moving_shot.hood_angle_degrees
+        target_flywheel_speed_rps = self._moving_shot.flywheel_speed_rps
 
         self.turret_mvt_feed_forward = (
             self.turret_moving_target_angle
@@ -231,22 +617,28 @@ class TargetTracker:
         """Computes turret angle to hit the target while moving.
 
         Takes into account both linear and angular velocities of the robot, and
-        compensates for them.
+        compensates for them. This also solves for the hood angle and flywheel
+        speed of the shot, and stores the solution in `self._moving_shot`.
         """
-        # Vector from field origin to the target.
-        self._target_position = self._get_target_position(
-            self.drivetrain.get_robot_pose()
-        )
-
         # Vector from center of turret to the target.
-        self.future_turret_to_target = self._target_position - (
-            self._turret_field_pose.translation() + self._get_movement_vector()
+        turret_to_target = (
+            self._target_position - self._turret_field_pose.translation()
         )
+        turret_vx, turret_vy = self._get_turret_velocity()
         # Heading of the turret_field_pose is same as the robot's heading.
-        target_angle_degrees = (
-            self.future_turret_to_target.angle()
-            - self._turret_field_pose.rotation()
-        ).degrees()
+        self._moving_shot = solve_moving_shot(
+            turret_to_target.X(),
+            turret_to_target.Y(),
+            turret_vx,
+            turret_vy,
+            self._turret_field_pose.rotation().radians(),
+        )
+        # Vector from center of turret to the virtual target.
+        self.future_turret_to_target = geometry.Translation2d(
+            self._moving_shot.virtual_target_x_meters,
+            self._moving_shot.virtual_target_y_meters,
+        )
+        target_angle_degrees = self._moving_shot.turret_angle_degrees
 
         # Predict how much the robot will yaw in the next control loop interval
         # based on our current yaw rate.
@@ -260,38 +652,58 @@ class TargetTracker:
             ),
         )
 
-    def _get_target_position(
-        self, robot_pose: geometry.Pose2d
-    ) -> geometry.Translation2d:
-        """Returns the position of our target based on alliance and robot pose."""
+    def _get_target_index(self, robot_pose: geometry.Pose2d) -> int:
+        """Returns the index of our target based on alliance and robot pose."""
         if self.alliance_fetcher.is_red_alliance():
             if robot_pose.X() > self.RED_ZONE_END_X_METERS:
-                return geometry.Translation2d(
-                    RED_HUB_TO_FIELD_X, RED_HUB_TO_FIELD_Y
-                )
+                return self.RED_HUB
             elif robot_pose.Y() > self.CENTER_Y_METERS:
-                return geometry.Translation2d(
-                    self.RED_OUTPOST_PASS_X_METERS,
-                    self.RED_OUTPOST_PASS_Y_METERS,
-                )
+                return self.RED_OUTPOST_PASS
             else:
-                return geometry.Translation2d(
-                    self.RED_DEPOT_PASS_X_METERS, self.RED_DEPOT_PASS_Y_METERS
-                )
+                return self.RED_DEPOT_PASS
         else:
             if robot_pose.X() < self.BLUE_ZONE_END_X_METERS:
-                return geometry.Translation2d(
-                    BLUE_HUB_TO_FIELD_X, BLUE_HUB_TO_FIELD_Y
-                )
+                return self.BLUE_HUB
             elif robot_pose.Y() > self.CENTER_Y_METERS:
-                return geometry.Translation2d(
-                    self.BLUE_DEPOT_PASS_X_METERS, self.BLUE_DEPOT_PASS_Y_METERS
-                )
+                return self.BLUE_DEPOT_PASS
             else:
-                return geometry.Translation2d(
-                    self.BLUE_OUTPOST_PASS_X_METERS,
-                    self.BLUE_OUTPOST_PASS_Y_METERS,
-                )
+                return self.BLUE_OUTPOST_PASS
+
+    def _get_target_position(
+        self, robot_pose: geometry.Pose2d
+    ) -> geometry.Translation2d:
+        """Returns the position of our target based on alliance and robot pose."""
+        return geometry.Translation2d(
+            *self.TARGET_POSITIONS[self._get_target_index(robot_pose)]
+        )
+
+    def _select_target(self, robot_pose: geometry.Pose2d) -> None:
+        """Selects the target for this control loop."""
+        self._target_index = self._get_target_index(robot_pose)
+        self._target_position = geometry.Translation2d(
+            *self.TARGET_POSITIONS[self._target_index]
+        )
+
+    def _get_stationary_shot(self) -> shot_grid.StationaryShot:
+        """Returns the stationary shot at the turret's current position.
+
+        This is interpolated from the shot grid, or computed directly if the
+        grid isn't loaded.
+        """
+        turret_position = self._turret_field_pose.translation()
+        if self._shot_grid is not None:
+            return self._shot_grid.lookup(
+                self._target_index, turret_position.X(), turret_position.Y()
+            )
+        turret_to_target = self._target_position - turret_position
+        distance = turret_to_target.norm()
+        hood_angle, flywheel_speed = ShotTable.get(distance)
+        return shot_grid.StationaryShot(
+            math.atan2(turret_to_target.Y(), turret_to_target.X()),
+            distance,
+            hood_angle,
+            flywheel_speed,
+        )
 
     def _compute_stationary_target_turret_angle_degrees(
         self,
@@ -301,20 +713,21 @@ class TargetTracker:
         Compensates for robot's angular vecloity with a lookahead, but assumes
         robot's linear velocity is zero.
         """
-        # Vector from field origin to center of the target.
-        self._target_position = self._get_target_position(
-            self.drivetrain.get_robot_pose()
-        )
+        stationary_shot = self._get_stationary_shot()
 
         # Vector from center of turret to the target.
-        self.current_turret_to_target = (
-            self._target_position - self._turret_field_pose.translation()
+        self.current_turret_to_target = geometry.Translation2d(
+            stationary_shot.distance_meters,
+            geometry.Rotation2d(stationary_shot.bearing_radians),
         )
         # Heading of the turret_field_pose is same as the robot's heading.
-        target_angle_degrees = (
-            self.current_turret_to_target.angle()
-            - self._turret_field_pose.rotation()
-        ).degrees()
+        target_angle_degrees = math.degrees(
+            math.remainder(
+                stationary_shot.bearing_radians
+                - self._turret_field_pose.rotation().radians(),
+                math.tau,
+            )
+        )
 
         # Predict how much the robot will yaw in the next control loop interval
         # based on our current yaw rate.
@@ -328,18 +741,17 @@ class TargetTracker:
             ),
         )
 
-    def _get_movement_vector(self) -> geometry.Translation2d:
-        """Computes distance vector of robot's movement.
+    def _get_turret_velocity(self) -> Tuple[float, float]:
+        """Computes the turret's velocity in field coordinates.
 
-        Uses a fixed time period (average time-of-flight of fuel) and the the
-        robot's current velocity to determine the vector that represents the
-        magnitude and direction of the distance traveled by the robot.
+        This is the robot's velocity, plus the velocity the turret gets from
+        the robot's rotation. The fuel inherits this velocity when it's shot.
 
-        This is meant to represent the distance the fuel will travel along the
-        direction of the robot's velocity over its time-of-flight.
+        Returns:
+            The X and Y velocity in meters per second.
         """
         robot_pose = self.drivetrain.get_robot_pose()
-        robot_centric_speeds = self.drivetrain.swerve_drive.get_state().speeds
+        robot_centric_speeds = self.drivetrain.robot_speeds()
         field_centric_speeds = kinematics.ChassisSpeeds.fromRobotRelativeSpeeds(
             robot_centric_speeds.vx,
             robot_centric_speeds.vy,
@@ -359,9 +771,7 @@ class TargetTracker:
             - TURRET_TO_ROBOT_Y * math.sin(robot_angle)
         )
 
-        return (
-            geometry.Translation2d(turret_vx, turret_vy)
-        ) * self.robot_constants.shooter.turret.time_of_flight
+        return turret_vx, turret_vy
 
     def current_turret_distance_from_target_meters(
         self,
@@ -380,40 +790,25 @@ class TargetTracker:
         return self.future_turret_to_target.angle().degrees()
 
     def _log_data(self) -> None:
-        self.data_logger.log_boolean(
-            "/components/target_tracker/enabled", self._enabled, on_change=True
-        )
-        self.data_logger.log_boolean(
-            "/components/target_tracker/track_position",
-            self._track_position,
-            on_change=True,
-        )
-        self.data_logger.log_boolean(
-            "/components/target_tracker/track_speed",
-            self._track_speed,
-            on_change=True,
+        self._enabled_log.update(self._enabled)
+        self._track_position_log.update(self._track_position)
+        self._track_speed_log.update(self._track_speed)
+        self._current_distance_log.update(
+            self.current_turret_distance_from_target_meters()
         )
-        self.data_logger.log_double(
-            "/components/target_tracker/current_turret_distance_from_target_meters",
-            self.current_turret_distance_from_target_meters(),
-        )
-        self.data_logger.log_double(
-            "/components/target_tracker/future_turret_distance_from_target_meters",
-            self.future_turret_distance_from_target_meters(),
-        )
-        self.data_logger.log_double(
-            "/components/target_tracker/future_turret_to_target_angle",
-            self.future_turret_angle_to_target(),
+        self._future_distance_log.update(
+            self.future_turret_distance_from_target_meters()
         )
-        self.data_logger.log_double(
-            "/components/target_tracker/target_turret_position_degrees",
-            self._target_turret_angle_degrees,
+        self._future_angle_log.update(self.future_turret_angle_to_target())
+        self._target_turret_position_log.update(
+            self._target_turret_angle_degrees
         )
-        self.data_logger.log_double(
-            "/components/target_tracker/target_hood_position_degrees",
-            self._target_hood_angle_degrees,
+        self._target_hood_position_log.update(self._target_hood_angle_degrees)
+        self._target_flywheel_velocity_log.update(
+            self._target_flywheel_speed_rps
         )
-        self.data_logger.log_double(
-            "/components/target_tracker/target_flywheel_velocity_rotations_per_second",
-            self._target_flywheel_speed_rps,
+        self._time_of_flight_log.update(
+            self._moving_shot.time_of_flight_seconds
         )
+        self._solver_iterations_log.update(self._moving_shot.iterations)
+        self._solver_converged_log.update(self._moving_shot.converged)
@@ -0,0 +1,746 @@
+"""Components for tuning the shooter mechanisms.
+
+Only tunerbot.py uses these, so the shooter package doesn't import them.
+"""
+
+import magicbot
+import phoenix6
+
+import constants
+from subsystem import shooter
+
+
+class FlywheelTuner:
+    """Component for tuning the flywheel gains.
+
+    It sets up tunable gains over network tables so they can be easily modified
+    on AdvantageScope. It also provides a settable flywheel target velocity.
+    """
+
+    robot_constants: constants.RobotConstants
+    flywheel_motor: phoenix6.hardware.TalonFX
+    flywheel_encoder: phoenix6.hardware.CANcoder
+    flywheel: shooter.Flywheel
+
+    # Gains for velocity control of the flywheel.
+    k_s = magicbot.tunable(0.0)
+    k_v = magicbot.tunable(0.0)
+    k_a = magicbot.tunable(0.0)
+    k_p = magicbot.tunable(0.0)
+    k_i = magicbot.tunable(0.0)
+    k_d = magicbot.tunable(0.0)
+
+    # The target rotational velocity of the flywheel.
+    target_rps = magicbot.tunable(0.0)
+
+    def setup(self) -> None:
+        """Set up initial state for the flywheel tuner.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        flywheel_constants: shooter.FlywheelConstants = (
+            self.robot_constants.shooter.flywheel
+        )
+
+        self.k_s = flywheel_constants.k_s
+        self.k_v = flywheel_constants.k_v
+        self.k_a = flywheel_constants.k_a
+        self.k_p = flywheel_constants.k_p
+        self.k_i = flywheel_constants.k_i
+        self.k_d = flywheel_constants.k_d
+
+        self.last_k_s = self.k_s
+        self.last_k_v = self.k_v
+        self.last_k_a = self.k_a
+        self.last_k_p = self.k_p
+        self.last_k_i = self.k_i
+        self.last_k_d = self.k_d
+
+        self.target_rps = flywheel_constants.default_speed_rps
+
+    def execute(self) -> None:
+        """Update the flywheel speed and gains (if they changed).
+
+        This method is called at the end of the control loop.
+        """
+        self.flywheel.set_target_rps(self.target_rps)
+
+        # We only want to reapply the gains if they changed. The TalonFX motor
+        # doesn't like being reconfigured constantly.
+        if not self.gains_changed():
+            return
+
+        self.apply_gains()
+
+        self.last_k_s = self.k_s
+        self.last_k_v = self.k_v
+        self.last_k_a = self.k_a
+        self.last_k_p = self.k_p
+        self.last_k_i = self.k_i
+        self.last_k_d = self.k_d
+
+    def gains_changed(self) -> bool:
+        """Detect if any of the gains changed.
+
+        Returns:
+            True if any of the gains changed, False otherwise.
+        """
+        return (
+            self.k_s != self.last_k_s
+            or self.k_v != self.last_k_v
+            or self.k_a != self.last_k_a
+            or self.k_p != self.last_k_p
+            or self.k_i != self.last_k_i
+            or self.k_d != self.last_k_d
+        )
+
+    def apply_gains(self) -> None:
+        """Apply the current gains to the motor."""
+        result = self.flywheel_motor.configurator.apply(
+            phoenix6.configs.config_groups.Slot0Configs()
+            .with_k_s(self.k_s)
+            .with_k_v(self.k_v)
+            .with_k_a(self.k_a)
+            .with_k_p(self.k_p)
+            .with_k_i(self.k_i)
+            .with_k_d(self.k_d)
+        )
+        if not result.is_ok():
+            self.logger.error("Failed to apply new gains to flywheel motor")
+
+
+class HoodTuner:
+    """Component for tuning the hood gains.
+
+    It sets up tunable gains over network tables so they can be easily modified
+    on AdvantageScope. It also provides a settable hood target angle position.
+    """
+
+    robot_constants: constants.RobotConstants
+    hood_motor: phoenix6.hardware.TalonFX
+    hood_encoder: phoenix6.hardware.CANcoder
+    hood: shooter.Hood
+
+    # Gains for position control of the hood.
+    k_s = magicbot.tunable(0.0)
+    k_v = magicbot.tunable(0.0)
+    k_a = magicbot.tunable(0.0)
+    k_g = magicbot.tunable(0.0)
+    k_p = magicbot.tunable(0.0)
+    k_i = magicbot.tunable(0.0)
+    k_d = magicbot.tunable(0.0)
+    # Motion Magic parameters for smooth trajectories.
+    mm_cruise_velocity = magicbot.tunable(0.0)
+    mm_acceleration = magicbot.tunable(0.0)
+    mm_jerk = magicbot.tunable(0.0)
+
+    # The target angle of the hood, in degrees.
+    target_angle_deg = magicbot.tunable(20.0)
+
+    def setup(self) -> None:
+        """Set up initial state for the hood tuner.
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        hood_constants: shooter.HoodConstants = (
+            self.robot_constants.shooter.hood
+        )
+
+        self.k_s = hood_constants.k_s
+        self.k_v = hood_constants.k_v
+        self.k_a = hood_constants.k_a
+        self.k_g = hood_constants.k_g
+        self.k_p = hood_constants.k_p
+        self.k_i = hood_constants.k_i
+        self.k_d = hood_constants.k_d
+        self.mm_cruise_velocity = hood_constants.motion_magic_cruise_velocity
+        self.mm_acceleration = hood_constants.motion_magic_acceleration
+        self.mm_jerk = hood_constants.motion_magic_jerk
+
+        self.last_k_s = self.k_s
+        self.last_k_v = self.k_v
+        self.last_k_a = self.k_a
+        self.last_k_g = self.k_g
+        self.last_k_p = self.k_p
+        self.last_k_i = self.k_i
+        self.last_k_d = self.k_d
+        self.last_mm_cruise_velocity = self.mm_cruise_velocity
+        self.last_mm_acceleration = self.mm_acceleration
+        self.last_mm_jerk = self.mm_jerk
+
+        self.target_angle_deg = self.hood.measured_angle_degrees()
+
+    def execute(self) -> None:
+        """Update the hood speed and gains (if they changed).
+
+        This method is called at the end of the control loop.
+        """
+        self.hood.set_position(self.target_angle_deg)
+
+        # We only want to reapply the gains if they changed. The TalonFX motor
+        # doesn't like being reconfigured constantly.
+        if not self._gains_changed():
+            return
+
+        self._apply_gains()
+
+        self.last_k_s = self.k_s
+        self.last_k_v = self.k_v
+        self.last_k_a = self.k_a
+        self.last_k_p = self.k_p
+        self.last_k_i = self.k_i
+        self.last_k_d = self.k_d
+        self.last_k_g = self.k_g
+        self.last_mm_cruise_velocity = self.mm_cruise_velocity
+        self.last_mm_acceleration = self.mm_acceleration
+        self.last_mm_jerk = self.mm_jerk
+
+    def _gains_changed(self) -> bool:
+        """Detect if any of the gains changed.
+
+        Returns:
+            True if any of the gains changed, False otherwise.
+        """
+        return (
+            self.k_s != self.last_k_s
+            or self.k_v != self.last_k_v
+            or self.k_a != self.last_k_a
+            or self.k_p != self.last_k_p
+            or self.k_i != self.last_k_i
+            or self.k_d != self.last_k_d
+            or self.k_g != self.last_k_g
+            or self.mm_cruise_velocity != self.last_mm_cruise_velocity
+            or self.mm_acceleration != self.last_mm_acceleration
+            or self.mm_jerk != self.last_mm_jerk
+        )
+
+    def _apply_gains(self) -> None:
+        """Apply the current gains to the motor."""
+        result = self.hood_motor.configurator.apply(
+            self.hood.hood_motor_configs.with_slot0(
+                phoenix6.configs.Slot0Configs()
+                .with_k_s(self.k_s)
+                .with_k_v(self.k_v)
+                .with_k_a(self.k_a)
+                .with_k_p(self.k_p)
+                .with_k_i(self.k_i)
+                .with_k_d(self.k_d)
+                .with_k_g(self.k_g)
+            ).with_motion_magic(
+                phoenix6.configs.MotionMagicConfigs()
+                .with_motion_magic_cruise_velocity(self.mm_cruise_velocity)
+                .with_motion_magic_acceleration(self.mm_acceleration)
+                .with_motion_magic_jerk(self.mm_jerk)
+            )
+        )
+        if not result.is_ok():
+            self.logger.error("Failed to apply new gains to hood motor")
+
+    @magicbot.feedback
+    def get_absolute_position(self) -> float:
+        return self.hood_encoder.get_absolute_position().value
+
+
+class HopperTuner:
+    """Component for tuning hopper gains.
+
+    It sets up tunable gains over network tables so they can be easily modified
+    on AdvantageScope. It also provides a settable hopper target speed.
+    """
+
+    robot_constants: constants.RobotConstants
+    hopper_left_motor: phoenix6.hardware.TalonFX
+    hopper_right_motor: phoenix6.hardware.TalonFX
+    hopper: shooter.Hopper
+
+    # Gains for velocity control of the left hopper motor.
+    left_k_s = magicbot.tunable(0.0)
+    left_k_v = magicbot.tunable(0.0)
+    left_k_a = magicbot.tunable(0.0)
+    left_k_p = magicbot.tunable(0.0)
+    left_k_i = magicbot.tunable(0.0)
+    left_k_d = magicbot.tunable(0.0)
+
+    # Gains for velocity control of the right hopper motor.
+    right_k_s = magicbot.tunable(0.0)
+    right_k_v = magicbot.tunable(0.0)
+    right_k_a = magicbot.tunable(0.0)
+    right_k_p = magicbot.tunable(0.0)
+    right_k_i = magicbot.tunable(0.0)
+    right_k_d = magicbot.tunable(0.0)
+
+    # The target rotational speeds for the hopper motors.
+    left_target_rps = magicbot.tunable(0.0)
+    right_target_rps = magicbot.tunable(0.0)
+    # Whether or not the hopper motors should run.
+    enabled = magicbot.tunable(False)
+
+    def setup(self) -> None:
+        hopper_constants: shooter.HopperConstants = (
+            self.robot_constants.shooter.hopper
+        )
+
+        self.left_k_s = hopper_constants.left_k_s
+        self.left_k_v = hopper_constants.left_k_v
+        self.left_k_a = hopper_constants.left_k_a
+        self.left_k_p = hopper_constants.left_k_p
+        self.left_k_i = hopper_constants.left_k_i
+        self.left_k_d = hopper_constants.left_k_d
+
+        self.right_k_s = hopper_constants.right_k_s
+        self.right_k_v = hopper_constants.right_k_v
+        self.right_k_a = hopper_constants.right_k_a
+        self.right_k_p = hopper_constants.right_k_p
+        self.right_k_i = hopper_constants.right_k_i
+        self.right_k_d = hopper_constants.right_k_d
+
+        self._current_left_gains = (
+            phoenix6.configs.config_groups.Slot0Configs()
+            .with_k_s(self.left_k_s)
+            .with_k_v(self.left_k_v)
+            .with_k_a(self.left_k_a)
+            .with_k_p(self.left_k_p)
+            .with_k_i(self.left_k_i)
+            .with_k_d(self.left_k_d)
+        )
+        self._current_right_gains = (
+            phoenix6.configs.config_groups.Slot0Configs()
+            .with_k_s(self.right_k_s)
+            .with_k_v(self.right_k_v)
+            .with_k_a(self.right_k_a)
+            .with_k_p(self.right_k_p)
+            .with_k_i(self.right_k_i)
+            .with_k_d(self.right_k_d)
+        )
+
+    def execute(self) -> None:
+        self.hopper.set_left_target_rps(self.left_target_rps)
+        self.hopper.set_right_target_rps(self.right_target_rps)
+        self.hopper.set_enabled(self.enabled)
+
+        # We only want to reapply the gains if they changed. The TalonFX motor
+        # doesn't like being reconfigured constantly.
+        if self._left_gains_changed():
+            self._apply_left_gains()
+        if self._right_gains_changed():
+            self._apply_right_gains()
+
+    def _left_gains_changed(self) -> bool:
+        """Detect if any of the gains for the left motor changed.
+
+        Returns:
+            True if any of the gains changed, False if they didn't.
+        """
+        return (
+            self.left_k_s != self._current_left_gains.k_s
+            or self.left_k_v != self._current_left_gains.k_v
+            or self.left_k_a != self._current_left_gains.k_a
+            or self.left_k_p != self._current_left_gains.k_p
+            or self.left_k_i != self._current_left_gains.k_i
+            or self.left_k_d != self._current_left_gains.k_d
+        )
+
+    def _right_gains_changed(self) -> bool:
+        """Detect if any of the gains for the right motor changed.
+
+        Returns:
+            True if any of the gains changed, False otherwise.
+        """
+        return (
+            self.right_k_s != self._current_right_gains.k_s
+            or self.right_k_v != self._current_right_gains.k_v
+            or self.right_k_a != self._current_right_gains.k_a
+            or self.right_k_p != self._current_right_gains.k_p
+            or self.right_k_i != self._current_right_gains.k_i
+            or self.right_k_d != self._current_right_gains.k_d
+        )
+
+    def _apply_left_gains(self) -> None:
+        """Apply the current gains to the left motor."""
+        result = self.hopper_left_motor.configurator.apply(
+            self._current_left_gains.with_k_s(self.left_k_s)
+            .with_k_v(self.left_k_v)
+            .with_k_a(self.left_k_a)
+            .with_k_p(self.left_k_p)
+            .with_k_i(self.left_k_i)
+            .with_k_d(self.left_k_d)
+        )
+        if not result.is_ok():
+            self.logger.error(
+                (
+                    f"Failed to apply new gains to hopper left motor: "
+                    f"{result.name}: {result.description}"
+                )
+            )
+
+    def _apply_right_gains(self) -> None:
+        """Apply the current gains to the right motor."""
+        result = self.hopper_right_motor.configurator.apply(
+            self._current_right_gains.with_k_s(self.right_k_s)
+            .with_k_v(self.right_k_v)
+            .with_k_a(self.right_k_a)
+            .with_k_p(self.right_k_p)
+            .with_k_i(self.right_k_i)
+            .with_k_d(self.right_k_d)
+        )
+        if not result.is_ok():
+            self.logger.error(
+                (
+                    f"Failed to apply new gains to hopper right motor: "
+                    f"{result.name}: {result.description}"
+                )
+            )
+
+
+class IndexerTuner:
+    """Component for tuning indexer gains.
+
+    It sets up tunable gains over network tables so they can be easily modified
+    on AdvantageScope. It also provides a settable indexer target speed.
+    """
+
+    robot_constants: constants.RobotConstants
+    indexer_back_motor: phoenix6.hardware.TalonFX
+    indexer_front_motor: phoenix6.hardware.TalonFX
+    indexer: shooter.Indexer
+
+    # Gains for velocity control of the back indexer motor.
+    back_k_s = magicbot.tunable(0.0)
+    back_k_v = magicbot.tunable(0.0)
+    back_k_a = magicbot.tunable(0.0)
+    back_k_p = magicbot.tunable(0.0)
+    back_k_i = magicbot.tunable(0.0)
+    back_k_d = magicbot.tunable(0.0)
+
+    # Gains for velocity control of the front indexer motor.
+    front_k_s = magicbot.tunable(0.0)
+    front_k_v = magicbot.tunable(0.0)
+    front_k_a = magicbot.tunable(0.0)
+    front_k_p = magicbot.tunable(0.0)
+    front_k_i = magicbot.tunable(0.0)
+    front_k_d = magicbot.tunable(0.0)
+
+    # The target rotational speed of the indexer.
+    target_rps = magicbot.tunable(0.0)
+    # Whether or not the indexer motors should run.
+    enabled = magicbot.tunable(False)
+
+    def setup(self) -> None:
+        indexer_constants: shooter.IndexerConstants = (
+            self.robot_constants.shooter.indexer
+        )
+
+        self.back_k_s = indexer_constants.back_k_s
+        self.back_k_v = indexer_constants.back_k_v
+        self.back_k_a = indexer_constants.back_k_a
+        self.back_k_p = indexer_constants.back_k_p
+        self.back_k_i = indexer_constants.back_k_i
+        self.back_k_d = indexer_constants.back_k_d
+
+        self.front_k_s = indexer_constants.front_k_s
+        self.front_k_v = indexer_constants.front_k_v
+        self.front_k_a = indexer_constants.front_k_a
+        self.front_k_p = indexer_constants.front_k_p
+        self.front_k_i = indexer_constants.front_k_i
+        self.front_k_d = indexer_constants.front_k_d
+
+        self._current_back_gains = (
+            phoenix6.configs.config_groups.Slot0Configs()
+            .with_k_s(self.back_k_s)
+            .with_k_v(self.back_k_v)
+            .with_k_a(self.back_k_a)
+            .with_k_p(self.back_k_p)
+            .with_k_i(self.back_k_i)
+            .with_k_d(self.back_k_d)
+        )
+        self._current_front_gains = (
+            phoenix6.configs.config_groups.Slot0Configs()
+            .with_k_s(self.front_k_s)
+            .with_k_v(self.front_k_v)
+            .with_k_a(self.front_k_a)
+            .with_k_p(self.front_k_p)
+            .with_k_i(self.front_k_i)
+            .with_k_d(self.front_k_d)
+        )
+
+    def execute(self) -> None:
+        self.indexer.set_target_rps(self.target_rps)
+        self.indexer.set_enabled(self.enabled)
+
+        # We only want to reapply the gains if they changed. The TalonFX motor
+        # doesn't like being reconfigured constantly.
+        if self._back_gains_changed():
+            self._apply_back_gains()
+        if self._front_gains_changed():
+            self._apply_front_gains()
+
+    def _back_gains_changed(self) -> bool:
+        """Detect if any of the gains for the back motor changed.
+
+        Returns:
+            True if any of the gains changed, False if the gains didn't change
+                or if the current gains couldn't be read from the motor.
+        """
+        return (
+            self.back_k_s != self._current_back_gains.k_s
+            or self.back_k_v != self._current_back_gains.k_v
+            or self.back_k_a != self._current_back_gains.k_a
+            or self.back_k_p != self._current_back_gains.k_p
+            or self.back_k_i != self._current_back_gains.k_i
+            or self.back_k_d != self._current_back_gains.k_d
+        )
+
+    def _front_gains_changed(self) -> bool:
+        """Detect if any of the gains for the front motor changed.
+
+        Returns:
+            True if any of the gains changed, False otherwise.
+        """
+        return (
+            self.front_k_s != self._current_front_gains.k_s
+            or self.front_k_v != self._current_front_gains.k_v
+            or self.front_k_a != self._current_front_gains.k_a
+            or self.front_k_p != self._current_front_gains.k_p
+            or self.front_k_i != self._current_front_gains.k_i
+            or self.front_k_d != self._current_front_gains.k_d
+        )
+
+    def _apply_back_gains(self) -> None:
+        """Apply the current gains to the back motor."""
+        result = self.indexer_back_motor.configurator.apply(
+            self._current_back_gains.with_k_s(self.back_k_s)
+            .with_k_v(self.back_k_v)
+            .with_k_a(self.back_k_a)
+            .with_k_p(self.back_k_p)
+            .with_k_i(self.back_k_i)
+            .with_k_d(self.back_k_d)
+        )
+        if not result.is_ok():
+            self.logger.error(
+                f"Failed to apply new gains to indexer back motor: {result.name}: {result.description}"
+            )
+
+    def _apply_front_gains(self) -> None:
+        """Apply the current gains to the front motor."""
+        result = self.indexer_front_motor.configurator.apply(
+            self._current_front_gains.with_k_s(self.front_k_s)
+            .with_k_v(self.front_k_v)
+            .with_k_a(self.front_k_a)
+            .with_k_p(self.front_k_p)
+            .with_k_i(self.front_k_i)
+            .with_k_d(self.front_k_d)
+        )
+        if not result.is_ok():
+            self.logger.error(
+                f"Failed to apply new gains to indexer front motor: {result.name}: {result.description}"
+            )
+
+
+class TurretTuner:
+    """Component for tuning the turret gains.
+
+    It sets up tunable gains over network tables so they can be easily modified
+    on AdvantageScope. It also provides a settable turret target position.
+    """
+
+    robot_constants: constants.RobotConstants
+    turret_motor: phoenix6.hardware.TalonFX
+    turret_encoder: phoenix6.hardware.CANcoder
+    turret: shooter.Turret
+    target_tracker: shooter.TargetTracker
+
+    # Gains for position control of the turret.
+    position_k_s = magicbot.tunable(0.0)
+    position_k_v = magicbot.tunable(0.0)
+    position_k_a = magicbot.tunable(0.0)
+    position_k_p = magicbot.tunable(0.0)
+    position_k_i = magicbot.tunable(0.0)
+    position_k_d = magicbot.tunable(0.0)
+
+    # Gains for velocity control of the turret.
+    velocity_k_s = magicbot.tunable(0.0)
+    velocity_k_v = magicbot.tunable(0.0)
+    velocity_k_a = magicbot.tunable(0.0)
+    velocity_k_p = magicbot.tunable(0.0)
+    velocity_k_i = magicbot.tunable(0.0)
+    velocity_k_d = magicbot.tunable(0.0)
+
+    # Limits for motion magic.
+    mm_cruise_velocity = magicbot.tunable(0.0)
+    mm_acceleration = magicbot.tunable(0.0)
+    mm_jerk = magicbot.tunable(0.0)
+
+    # Feedforward for motion magic.
+    mm_feed_forward = magicbot.tunable(0.0)
+
+    mvt_feed_forward = magicbot.tunable(0.0)
+
+    # The target position of the turret.
+    target_position = magicbot.tunable(0.0)
+    target_velocity = magicbot.tunable(0.0)
+    use_velocity = magicbot.tunable(False)
+
+    # Auto-track hub
+    auto_track = magicbot.tunable(False)
+
+    def setup(self) -> None:
+        """Set up initial state for the turret tuner.
+
+        This method is called after createObjects has been called in the main
+        robot class, and after all components have been created.
+        """
+        turret_constants: shooter.TurretConstants = (
+            self.robot_constants.shooter.turret
+        )
+
+        self.position_k_s = turret_constants.position_k_s
+        self.position_k_v = turret_constants.position_k_v
+        self.position_k_a = turret_constants.position_k_a
+        self.position_k_p = turret_constants.position_k_p
+        self.position_k_i = turret_constants.position_k_i
+        self.position_k_d = turret_constants.position_k_d
+
+        self.velocity_k_s = turret_constants.velocity_k_s
+        self.velocity_k_v = turret_constants.velocity_k_v
+        self.velocity_k_a = turret_constants.velocity_k_a
+        self.velocity_k_p = turret_constants.velocity_k_p
+        self.velocity_k_i = turret_constants.velocity_k_i
+        self.velocity_k_d = turret_constants.velocity_k_d
+
+        self.mm_cruise_velocity = turret_constants.motion_magic_cruise_velocity
+        self.mm_acceleration = turret_constants.motion_magic_acceleration
+        self.mm_jerk = turret_constants.motion_magic_jerk
+
+        self.mm_feed_forward = turret_constants.motion_magic_feed_forward
+
+        self.mvt_feed_forward = turret_constants.feed_forward_mvt_multiplier
+
+        self.last_position_k_s = self.position_k_s
+        self.last_position_k_v = self.position_k_v
+        self.last_position_k_a = self.position_k_a
+        self.last_position_k_p = self.position_k_p
+        self.last_position_k_i = self.position_k_i
+        self.last_position_k_d = self.position_k_d
+
+        self.last_velocity_k_s = self.velocity_k_s
+        self.last_velocity_k_v = self.velocity_k_v
+        self.last_velocity_k_a = self.velocity_k_a
+        self.last_velocity_k_p = self.velocity_k_p
+        self.last_velocity_k_i = self.velocity_k_i
+        self.last_velocity_k_d = self.velocity_k_d
+
+        self.last_mm_cruise_velocity = self.mm_cruise_velocity
+        self.last_mm_acceleration = self.mm_acceleration
+        self.last_mm_jerk = self.mm_jerk
+
+        self.last_mvt_feed_forward = self.mvt_feed_forward
+
+        self.last_use_velocity = self.use_velocity
+
+        self.logger.info("TurretTuner initialized")
+
+    def execute(self) -> None:
+        """Update the turret position and gains (if they changed).
+
+        This method is called at the end of the control loop.
+        """
+        self.turret.set_position(self.target_position)
+        self.turret.set_velocity(self.target_velocity)
+        self.turret.set_control_type(self.use_velocity)
+        self.turret.set_motion_magic_feed_forward(self.mm_feed_forward)
+        self.target_tracker.track_position(self.auto_track)
+        self.target_tracker.track_speed(self.auto_track)
+        self.target_tracker.set_turret_feed_forward_multiplier(
+            self.mvt_feed_forward
+        )
+
+        # We only want to reapply the gains if they changed. The TalonFX motor
+        # doesn't like being reconfigured constantly.
+        if not self._gains_changed():
+            return
+
+        self._apply_gains()
+
+        self.last_use_velocity = self.use_velocity
+
+        self.last_position_k_s = self.position_k_s
+        self.last_position_k_v = self.position_k_v
+        self.last_position_k_a = self.position_k_a
+        self.last_position_k_p = self.position_k_p
+        self.last_position_k_i = self.position_k_i
+        self.last_position_k_d = self.position_k_d
+
+        self.last_velocity_k_s = self.velocity_k_s
+        self.last_velocity_k_v = self.velocity_k_v
+        self.last_velocity_k_a = self.velocity_k_a
+        self.last_velocity_k_p = self.velocity_k_p
+        self.last_velocity_k_i = self.velocity_k_i
+        self.last_velocity_k_d = self.velocity_k_d
+
+        self.last_mm_cruise_velocity = self.mm_cruise_velocity
+        self.last_mm_acceleration = self.mm_acceleration
+        self.last_mm_jerk = self.mm_jerk
+
+    def _gains_changed(self) -> bool:
+        """Detect if any of the gains changed.
+
+        Returns:
+            True if any of the gains changed, False otherwise.
+        """
+        return (
+            self.position_k_s != self.last_position_k_s
+            or self.position_k_v != self.last_position_k_v
+            or self.position_k_a != self.last_position_k_a
+            or self.position_k_p != self.last_position_k_p
+            or self.position_k_i != self.last_position_k_i
+            or self.position_k_d != self.last_position_k_d
+            or self.velocity_k_s != self.last_velocity_k_s
+            or self.velocity_k_v != self.last_velocity_k_v
+            or self.velocity_k_a != self.last_velocity_k_a
+            or self.velocity_k_p != self.last_velocity_k_p
+            or self.velocity_k_i != self.last_velocity_k_i
+            or self.velocity_k_d != self.last_velocity_k_d
+            or self.mm_cruise_velocity != self.last_mm_cruise_velocity
+            or self.mm_acceleration != self.last_mm_acceleration
+            or self.mm_jerk != self.last_mm_jerk
+        )
+
+    def _apply_gains(self) -> None:
+        """Apply the current gains to the motor."""
+        self.logger.info("Applying turret gains...")
+        slot1_configs = (
+            phoenix6.configs.Slot1Configs()
+            .with_k_s(self.velocity_k_s)
+            .with_k_v(self.velocity_k_v)
+            .with_k_a(self.velocity_k_a)
+            .with_k_p(self.velocity_k_p)
+            .with_k_i(self.velocity_k_i)
+            .with_k_d(self.velocity_k_d)
+        )
+        slot0_configs = (
+            phoenix6.configs.Slot0Configs()
+            .with_k_s(self.position_k_s)
+            .with_k_v(self.position_k_v)
+            .with_k_a(self.position_k_a)
+            .with_k_p(self.position_k_p)
+            .with_k_i(self.position_k_i)
+            .with_k_d(self.position_k_d)
+        )
+        motion_magic_configs = (
+            phoenix6.configs.MotionMagicConfigs()
+            .with_motion_magic_cruise_velocity(self.mm_cruise_velocity)
+            .with_motion_magic_acceleration(self.mm_acceleration)
+            .with_motion_magic_jerk(self.mm_jerk)
+        )
+        result = self.turret_motor.configurator.apply(
+            self.turret.turret_motor_configs.with_slot0(slot0_configs)
+            .with_slot1(slot1_configs)
+            .with_motion_magic(motion_magic_configs)
+        )
+        if not result.is_ok():
+            self.logger.error("Failed to apply new gains to turret motor")
+
+    @magicbot.feedback
+    def get_measured_dps(self) -> float:
+        return self.turret_motor.get_velocity().value * 360
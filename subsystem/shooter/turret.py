@@ -1,9 +1,7 @@
-import magicbot
 import phoenix6
-import wpilib
 
 import constants
-from common import datalog
+from common import canbus, datalog, devices, signals
 from subsystem import drivetrain, shooter
 
 
@@ -16,6 +14,10 @@ class Turret:
     turret_encoder: phoenix6.hardware.CANcoder
     drivetrain: drivetrain.Drivetrain
     data_logger: datalog.DataLogger
+    can_bus_planner: canbus.CanBusPlanner
+    device_configurator: devices.DeviceConfigurator
+    telemetry_scheduler: datalog.TelemetryScheduler
+    signal_hub: signals.SignalHub
 
     def setup(self) -> None:
         """Set up initial state for the turret.
@@ -91,11 +93,14 @@ class Turret:
                 .with_supply_current_limit_enable(True)
             )
         )
-        result = self.turret_motor.configurator.apply(self.turret_motor_configs)
-        if not result.is_ok():
-            self.logger.error("Failed to apply configs to turret motor")
-
-        result = self.turret_encoder.configurator.apply(
+        # Applied with the configs of the other devices, once every component
+        # is set up.
+        self.device_configurator.submit(
+            "turret motor", self.turret_motor, self.turret_motor_configs
+        )
+        self.device_configurator.submit(
+            "turret encoder",
+            self.turret_encoder,
             phoenix6.configs.CANcoderConfiguration().with_magnet_sensor(
                 phoenix6.configs.MagnetSensorConfigs()
                 .with_sensor_direction(turret_constants.encoder_direction)
@@ -103,10 +108,11 @@ class Turret:
                     turret_constants.absolute_sensor_discontinuity_point
                 )
                 .with_magnet_offset(turret_constants.magnet_offset)
-            )
+            ),
         )
-        if not result.is_ok():
-            self.logger.error("Failed to apply configs to turret encoder")
+        # Zeroing uses the encoder's magnet offset, so it waits for the
+        # configs.
+        self.device_configurator.after_applied(self._zero)
 
         # Initial Motion Magic request (position expressed in rotations)
         self._request = phoenix6.controls.MotionMagicVoltage(
@@ -121,14 +127,50 @@ class Turret:
         # due to robot's linear velocity.
         self.feed_forward_movement = 0.0
         # Raw yaw rate of the robot (and the turret) from the external IMU.
+        # This is refreshed each loop by the signal hub.
+        pigeon2 = self.drivetrain.swerve_drive.pigeon2
         self._yaw_rate_signal: phoenix6.status_signal.StatusSignal[
             phoenix6.units.degrees_per_second
-        ] = self.drivetrain.swerve_drive.pigeon2.get_angular_velocity_z_world()
-        # Raw position from the external encoder.
+        ] = self.signal_hub.register(
+            pigeon2, pigeon2.get_angular_velocity_z_world(), synchronous=True
+        )
+        # Raw position from the external encoder. This is refreshed each loop
+        # by the signal hub.
         self._encoder_position_signal: phoenix6.status_signal.StatusSignal[
             phoenix6.units.rotation
-        ] = self.turret_encoder.get_position()
+        ] = self.signal_hub.register(
+            self.turret_encoder,
+            self.turret_encoder.get_position(),
+            synchronous=True,
+        )
 
+        self._target_position_log = self.data_logger.register_double(
+            "/components/turret/target_position_degrees"
+        )
+        self._measured_position_log = self.data_logger.register_double(
+            "/components/turret/measured_position_degrees"
+        )
+        self._sensor_latency_log = self.data_logger.register_double(
+            "/components/turret/sensor_latency_ms"
+        )
+        self._motor_telemetry = self.data_logger.register_motor(
+            "/components/turret/motor", self.turret_motor, position=True
+        )
+
+        # Tell the CAN bus planner which signals we use.
+        self.can_bus_planner.request_motor_logging(self._motor_telemetry)
+        self.can_bus_planner.request_remote_sensor(self.turret_encoder)
+
+        self.telemetry_scheduler.register_motor(self._motor_telemetry)
+
+    def _zero(self) -> None:
+        """Set the turret position from the absolute encoder.
+
+        This is called once the turret's devices have been configured.
+        """
+        turret_constants: shooter.TurretConstants = (
+            self.robot_constants.shooter.turret
+        )
         # Say our sensor to mechanism ratio is 10. Then, within any 36 degree
         # window of turret position, if we assume an arbitrary zero in that
         # window, we can use the absolute position of the encoder to set the
@@ -172,15 +214,11 @@ class Turret:
         if not result.is_ok():
             self.logger.error("Failed to set position on turret motor")
 
-        self._log_timer = wpilib.Timer()
-        self._log_timer.start()
-
     def execute(self) -> None:
         """Command the motors to the current speed.
 
         This method is called at the end of the control loop.
         """
-        self._encoder_position_signal.refresh()
         if self._is_velocity_controlled:
             self.turret_motor.set_control(
                 phoenix6.controls.VelocityVoltage(
@@ -192,7 +230,6 @@ class Turret:
             # Calculate a feedforward to provide as an assist to the position
             # controller in counteracting the robot's yaw rate, so it tracks the
             # target with considerably less lag.
-            self._yaw_rate_signal.refresh()
             turret_constants = self.robot_constants.shooter.turret
             # This feedforward voltage is added after all the scaled
             # calculations onboard the motor controller, so we need to account
@@ -212,6 +249,11 @@ class Turret:
                 )
             )
 
+        # Time from the encoder sample to commanding the motor. This shows the
+        # effect of running the signal hub in synchronous mode.
+        self._sensor_latency_log.append(
+            self._encoder_position_signal.timestamp.get_latency() * 1000.0
+        )
         self._log_data()
 
     def on_enable(self) -> None:
@@ -280,233 +322,5 @@ class Turret:
         )
 
     def _log_data(self) -> None:
-        self.data_logger.log_double(
-            "/components/turret/target_position_degrees",
-            self._turret_position_degrees,
-            on_change=True,
-        )
-        self.data_logger.log_double(
-            "/components/turret/measured_position_degrees",
-            self.measured_angle_degrees(),
-        )
-        datalog.log_primary_motor_data(
-            self.data_logger,
-            "/components/turret/motor",
-            self.turret_motor,
-            position=True,
-        )
-        if self._log_timer.advanceIfElapsed(1.0):
-            datalog.log_secondary_motor_data(
-                self.data_logger,
-                "/components/turret/motor",
-                self.turret_motor,
-            )
-
-
-class TurretTuner:
-    """Component for tuning the turret gains.
-
-    It sets up tunable gains over network tables so they can be easily modified
-    on AdvantageScope. It also provides a settable turret target position.
-    """
-
-    robot_constants: constants.RobotConstants
-    turret_motor: phoenix6.hardware.TalonFX
-    turret_encoder: phoenix6.hardware.CANcoder
-    turret: Turret
-    target_tracker: shooter.TargetTracker
-
-    # Gains for position control of the turret.
-    position_k_s = magicbot.tunable(0.0)
-    position_k_v = magicbot.tunable(0.0)
-    position_k_a = magicbot.tunable(0.0)
-    position_k_p = magicbot.tunable(0.0)
-    position_k_i = magicbot.tunable(0.0)
-    position_k_d = magicbot.tunable(0.0)
-
-    # Gains for velocity control of the turret.
-    velocity_k_s = magicbot.tunable(0.0)
-    velocity_k_v = magicbot.tunable(0.0)
-    velocity_k_a = magicbot.tunable(0.0)
-    velocity_k_p = magicbot.tunable(0.0)
-    velocity_k_i = magicbot.tunable(0.0)
-    velocity_k_d = magicbot.tunable(0.0)
-
-    # Limits for motion magic.
-    mm_cruise_velocity = magicbot.tunable(0.0)
-    mm_acceleration = magicbot.tunable(0.0)
-    mm_jerk = magicbot.tunable(0.0)
-
-    # Feedforward for motion magic.
-    mm_feed_forward = magicbot.tunable(0.0)
-
-    mvt_feed_forward = magicbot.tunable(0.0)
-
-    # The target position of the turret.
-    target_position = magicbot.tunable(0.0)
-    target_velocity = magicbot.tunable(0.0)
-    use_velocity = magicbot.tunable(False)
-
-    # Auto-track hub
-    auto_track = magicbot.tunable(False)
-
-    def setup(self) -> None:
-        """Set up initial state for the turret tuner.
-
-        This method is called after createObjects has been called in the main
-        robot class, and after all components have been created.
-        """
-        turret_constants: shooter.TurretConstants = (
-            self.robot_constants.shooter.turret
-        )
-
-        self.position_k_s = turret_constants.position_k_s
-        self.position_k_v = turret_constants.position_k_v
-        self.position_k_a = turret_constants.position_k_a
-        self.position_k_p = turret_constants.position_k_p
-        self.position_k_i = turret_constants.position_k_i
-        self.position_k_d = turret_constants.position_k_d
-
-        self.velocity_k_s = turret_constants.velocity_k_s
-        self.velocity_k_v = turret_constants.velocity_k_v
-        self.velocity_k_a = turret_constants.velocity_k_a
-        self.velocity_k_p = turret_constants.velocity_k_p
-        self.velocity_k_i = turret_constants.velocity_k_i
-        self.velocity_k_d = turret_constants.velocity_k_d
-
-        self.mm_cruise_velocity = turret_constants.motion_magic_cruise_velocity
-        self.mm_acceleration = turret_constants.motion_magic_acceleration
-        self.mm_jerk = turret_constants.motion_magic_jerk
-
-        self.mm_feed_forward = turret_constants.motion_magic_feed_forward
-
-        self.mvt_feed_forward = turret_constants.feed_forward_mvt_multiplier
-
-        self.last_position_k_s = self.position_k_s
-        self.last_position_k_v = self.position_k_v
-        self.last_position_k_a = self.position_k_a
-        self.last_position_k_p = self.position_k_p
-        self.last_position_k_i = self.position_k_i
-        self.last_position_k_d = self.position_k_d
-
-        self.last_velocity_k_s = self.velocity_k_s
-        self.last_velocity_k_v = self.velocity_k_v
-        self.last_velocity_k_a = self.velocity_k_a
-        self.last_velocity_k_p = self.velocity_k_p
-        self.last_velocity_k_i = self.velocity_k_i
-        self.last_velocity_k_d = self.velocity_k_d
-
-        self.last_mm_cruise_velocity = self.mm_cruise_velocity
-        self.last_mm_acceleration = self.mm_acceleration
-        self.last_mm_jerk = self.mm_jerk
-
-        self.last_mvt_feed_forward = self.mvt_feed_forward
-
-        self.last_use_velocity = self.use_velocity
-
-        self.logger.info("TurretTuner initialized")
-
-    def execute(self) -> None:
-        """Update the turret position and gains (if they changed).
-
-        This method is called at the end of the control loop.
-        """
-        self.turret.set_position(self.target_position)
-        self.turret.set_velocity(self.target_velocity)
-        self.turret.set_control_type(self.use_velocity)
-        self.turret.set_motion_magic_feed_forward(self.mm_feed_forward)
-        self.target_tracker.track_position(self.auto_track)
-        self.target_tracker.track_speed(self.auto_track)
-        self.target_tracker.set_turret_feed_forward_multiplier(
-            self.mvt_feed_forward
-        )
-
-        # We only want to reapply the gains if they changed. The TalonFX motor
-        # doesn't like being reconfigured constantly.
-        if not self._gains_changed():
-            return
-
-        self._apply_gains()
-
-        self.last_use_velocity = self.use_velocity
-
-        self.last_position_k_s = self.position_k_s
-        self.last_position_k_v = self.position_k_v
-        self.last_position_k_a = self.position_k_a
-        self.last_position_k_p = self.position_k_p
-        self.last_position_k_i = self.position_k_i
-        self.last_position_k_d = self.position_k_d
-
-        self.last_velocity_k_s = self.velocity_k_s
-        self.last_velocity_k_v = self.velocity_k_v
-        self.last_velocity_k_a = self.velocity_k_a
-        self.last_velocity_k_p = self.velocity_k_p
-        self.last_velocity_k_i = self.velocity_k_i
-        self.last_velocity_k_d = self.velocity_k_d
-
-        self.last_mm_cruise_velocity = self.mm_cruise_velocity
-        self.last_mm_acceleration = self.mm_acceleration
-        self.last_mm_jerk = self.mm_jerk
-
-    def _gains_changed(self) -> bool:
-        """Detect if any of the gains changed.
-
-        Returns:
-            True if any of the gains changed, False otherwise.
-        """
-        return (
-            self.position_k_s != self.last_position_k_s
-            or self.position_k_v != self.last_position_k_v
-            or self.position_k_a != self.last_position_k_a
-            or self.position_k_p != self.last_position_k_p
-            or self.position_k_i != self.last_position_k_i
-            or self.position_k_d != self.last_position_k_d
-            or self.velocity_k_s != self.last_velocity_k_s
-            or self.velocity_k_v != self.last_velocity_k_v
-            or self.velocity_k_a != self.last_velocity_k_a
-            or self.velocity_k_p != self.last_velocity_k_p
-            or self.velocity_k_i != self.last_velocity_k_i
-            or self.velocity_k_d != self.last_velocity_k_d
-            or self.mm_cruise_velocity != self.last_mm_cruise_velocity
-            or self.mm_acceleration != self.last_mm_acceleration
-            or self.mm_jerk != self.last_mm_jerk
-        )
-
-    def _apply_gains(self) -> None:
-        """Apply the current gains to the motor."""
-        self.logger.info("Applying turret gains...")
-        slot1_configs = (
-            phoenix6.configs.Slot1Configs()
-            .with_k_s(self.velocity_k_s)
-            .with_k_v(self.velocity_k_v)
-            .with_k_a(self.velocity_k_a)
-            .with_k_p(self.velocity_k_p)
-            .with_k_i(self.velocity_k_i)
-            .with_k_d(self.velocity_k_d)
-        )
-        slot0_configs = (
-            phoenix6.configs.Slot0Configs()
-            .with_k_s(self.position_k_s)
-            .with_k_v(self.position_k_v)
-            .with_k_a(self.position_k_a)
-            .with_k_p(self.position_k_p)
-            .with_k_i(self.position_k_i)
-            .with_k_d(self.position_k_d)
-        )
-        motion_magic_configs = (
-            phoenix6.configs.MotionMagicConfigs()
-            .with_motion_magic_cruise_velocity(self.mm_cruise_velocity)
-            .with_motion_magic_acceleration(self.mm_acceleration)
-            .with_motion_magic_jerk(self.mm_jerk)
-        )
-        result = self.turret_motor.configurator.apply(
-            self.turret.turret_motor_configs.with_slot0(slot0_configs)
-            .with_slot1(slot1_configs)
-            .with_motion_magic(motion_magic_configs)
-        )
-        if not result.is_ok():
-            self.logger.error("Failed to apply new gains to turret motor")
-
-    @magicbot.feedback
-    def get_measured_dps(self) -> float:
-        return self.turret_motor.get_velocity().value * 360
+        self._target_position_log.update(self._turret_position_degrees)
+        self._measured_position_log.update(self.measured_angle_degrees())
@@ -12,7 +12,7 @@ class TestChassis(magicbot.MagicRobot):
 
     def createObjects(self) -> None:
         self.robot_constants: constants.RobotConstants = (
-            constants.get_robot_constants()
+            constants.get_robot_constants(constants.default_serial_cache_path())
         )
         self.logger.info(
             f"Using constants for serial #{self.robot_constants.serial}"
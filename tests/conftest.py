@@ -0,0 +1,107 @@
+import logging
+
+import pytest
+
+from common import devices
+
+try:
+    from phoenix6.wpiutils.auto_feed_enable import AutoFeedEnable
+except ImportError:
+    AutoFeedEnable = None
+
+# Feeders left over from earlier robots in this process. They are never
+# destroyed, since their notifier handles may belong to another robot by now.
+_stale_feeders = []
+
+
+@pytest.fixture
+def data_logger(mocker):
+    """Mock DataLogger that hands out a separate mock handle for each topic.
+
+    Handles are kept in `data_logger.handles`, keyed by topic name, and every
+    value logged through them is recorded in `data_logger.logged` as a
+    (topic name, value) pair, in order.
+    """
+    logger = mocker.Mock()
+    logger.handles = {}
+    logger.logged = []
+
+    def register(topic_name, *args):
+        handle = logger.handles.get(topic_name)
+        if handle is None:
+            handle = mocker.Mock()
+
+            def record(value):
+                logger.logged.append((topic_name, value))
+
+            handle.append.side_effect = record
+            handle.update.side_effect = record
+            logger.handles[topic_name] = handle
+        return handle
+
+    for method in (
+        "register_double",
+        "register_boolean",
+        "register_string",
+        "register_string_array",
+        "register_struct",
+        "register_struct_array",
+    ):
+        getattr(logger, method).side_effect = register
+    return logger
+
+
+@pytest.fixture
+def device_configurator(data_logger):
+    """DeviceConfigurator with setup() called.
+
+    Components submit their configs to it in their `setup()`. Call `apply()`
+    to apply them.
+    """
+    configurator = devices.DeviceConfigurator()
+    configurator.logger = logging.getLogger("device_configurator")
+    configurator.data_logger = data_logger
+    configurator.setup()
+    return configurator
+
+
+@pytest.fixture(autouse=True)
+def fresh_phoenix_feed_enable(request):
+    """Give each robot test its own phoenix6 enable feeder.
+
+    phoenix6 feeds the enable to simulated devices from a notifier owned by a
+    process-wide singleton. pyfrc resets the HAL's handles after each robot
+    test, so when tests aren't isolated in their own process, a later robot's
+    devices would be fed by a notifier whose handle may now be one of the new
+    robot's notifiers. That stalls the robot's loop, or step_timing().
+
+    This drops any feeder left from before the robot was created, and stops
+    the robot's own feeder before pyfrc resets the handles.
+    """
+    if AutoFeedEnable is None or "robot" not in request.fixturenames:
+        yield
+        return
+    # The robot only creates its devices in robotInit, so this runs first.
+    request.getfixturevalue("robot")
+    _drop_feeder(stale=True)
+    yield
+    _drop_feeder(stale=False)
+
+
+def _drop_feeder(stale: bool) -> None:
+    """Forget the phoenix6 enable feeder, so the next device makes a new one.
+
+    Args:
+        stale: True if the feeder's notifier handle may no longer be its own.
+            The feeder is then kept alive forever, since destroying it would
+            stop the notifier that now has its handle. Otherwise, its notifier
+            is destroyed, which waits for its thread to finish.
+    """
+    feeder = AutoFeedEnable._AutoFeedEnable__instance
+    if feeder is None:
+        return
+    AutoFeedEnable._AutoFeedEnable__instance = None
+    if stale:
+        _stale_feeders.append(feeder)
+    else:
+        del feeder._AutoFeedEnable__enable_notifier
@@ -0,0 +1,55 @@
+import pytest
+
+import auto_report
+import match_sim
+import robot
+
+
+def test_finds_every_routine():
+    modes = auto_report.find_modes()
+
+    assert "Center Shoot Preload" in modes
+    assert len(modes) == len(set(modes))
+    assert modes == sorted(modes)
+
+
+def test_simulates_routine():
+    result = auto_report.AutoSimulator(
+        robot.MyRobot, "Center Shoot Preload", "red"
+    ).run()
+
+    print("\n" + auto_report.format_table([result]))
+    assert result.ok, result.match.error
+    # The routine drives for a couple of seconds, then shoots for 8.
+    assert result.shooting_fuel_seconds == pytest.approx(8.0, abs=0.1)
+    assert result.total_seconds == pytest.approx(10.2, abs=0.5)
+    assert result.slack_seconds > 0.0
+    assert result.x_error.samples > 0
+    assert result.x_error.rms < 0.3
+    assert result.y_error.rms < 0.3
+    assert result.heading_error.max < 15.0
+    # This routine doesn't shoot on the move.
+    assert result.zone_shooting_seconds is None
+    assert result.peak_loop_cpu_seconds > 0.0
+
+
+def test_table_shows_crashed_routines():
+    finished = auto_report.AutoResult(
+        "Finished",
+        "blue",
+        match=match_sim.MatchResult("MyRobot", 21.0, 1.0, 1.0, 1050),
+        total_seconds=12.5,
+    )
+    crashed = auto_report.AutoResult(
+        "Crashed",
+        "red",
+        match=match_sim.MatchResult(
+            "MyRobot", 1.0, 1.0, 1.0, 50, error="Traceback"
+        ),
+    )
+
+    lines = auto_report.format_table([finished, crashed]).splitlines()
+
+    assert lines[0].startswith("Routine")
+    assert lines[2].split()[:4] == ["Finished", "blue", "12.50", "7.50"]
+    assert lines[3].split() == ["Crashed", "red", "CRASHED"]
@@ -0,0 +1,511 @@
+"""Micro-benchmarks of the code that runs every control loop.
+
+Each benchmark times one operation, like a component's `execute()`, with fake
+hardware, and measures how much memory it allocates. Run with `-s` to see the
+results:
+
+    python -m pytest tests/test_benchmarks.py -s
+
+Results are compared to the baseline in `benchmark_baseline.json`, and a
+benchmark fails if it got more than `BENCHMARK_THRESHOLD` (a fraction, 0.5 by
+default) slower or bigger. Timings are compared relative to a reference
+workload timed alongside them, so the baseline carries over between
+machines. Baselines are only compared on the Python version they were
+recorded on.
+
+After an intentional change, record a new baseline with:
+
+    BENCHMARK_UPDATE_BASELINE=1 python -m pytest tests/test_benchmarks.py
+"""
+
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, Tuple
+
+import pytest
+import wpiutil
+from magicbot import magic_tunable
+from wpimath import geometry, kinematics
+
+from common import datalog, joystick
+from subsystem import drivetrain, shooter
+from subsystem.drivetrain import limelight, vision
+from subsystem.shooter import shot_grid, target_tracker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "tests", "benchmark_baseline.json")
+UPDATE_BASELINE_ENVIRONMENT_VARIABLE = "BENCHMARK_UPDATE_BASELINE"
+THRESHOLD_ENVIRONMENT_VARIABLE = "BENCHMARK_THRESHOLD"
+DEFAULT_THRESHOLD = 0.5
+# Allocations smaller than this never count as a regression, since a single
+# extra float or small tuple is within the noise.
+ALLOCATION_SLACK_BYTES = 128
+
+# Each timing is the best of REPEATS runs of about REPEAT_SECONDS each, after
+# running the operation for WARM_UP_SECONDS. Some operations are a lot slower
+# for a little while after they're set up.
+REPEATS = 15
+REPEAT_SECONDS = 0.01
+WARM_UP_SECONDS = 0.5
+# Number of times to measure a benchmark again before failing it.
+CONFIRMATION_RUNS = 2
+# Number of operations to measure allocations over. We take the median, since
+# other threads, like the data log writer, allocate now and then.
+ALLOCATION_SAMPLES = 101
+
+# Number of Limelights on the robot.
+NUM_LIMELIGHTS = 4
+
+# A function that takes a DataLogger, and returns the operation to measure.
+Benchmark = Callable[[datalog.DataLogger], Callable[[], Any]]
+
+
+class FakeSignal:
+    """Stand-in for a phoenix6 StatusSignal."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeMotor:
+    """Stand-in for a TalonFX, with the signals log_primary_motor_data reads."""
+
+    GETTERS = (
+        "get_supply_current",
+        "get_stator_current",
+        "get_position",
+        "get_rotor_position",
+        "get_velocity",
+        "get_rotor_velocity",
+    )
+
+    def __init__(self):
+        signal = FakeSignal(1.0)
+        for getter in self.GETTERS:
+            setattr(self, getter, lambda refresh=True: signal)
+
+
+class FakeController:
+    """Stand-in for an XboxController, with a stick pushed diagonally."""
+
+    def getLeftBumper(self) -> bool:
+        return False
+
+    def getRightTriggerAxis(self) -> float:
+        return 0.0
+
+    def getLeftX(self) -> float:
+        return 0.5
+
+    def getLeftY(self) -> float:
+        return -0.7
+
+    def getRightX(self) -> float:
+        return 0.3
+
+
+class FakeSubscriber:
+    """Stand-in for a DoubleArraySubscriber that gets one frame per loop."""
+
+    def __init__(self, frame: list[float], time_us: int):
+        self._queue = [types.SimpleNamespace(value=frame, time=time_us)]
+
+    def readQueue(self):
+        return self._queue
+
+
+def _ignore(*args, **kwargs) -> None:
+    pass
+
+
+def _pose_estimate_array(x: float, fiducials: int) -> list[float]:
+    """A MegaTag2 botpose array that sees the given number of tags."""
+    # x, y, z, roll, pitch, yaw, latency, tag count, span, distance, area
+    array = [x, 4.0, 0.0, 0.0, 0.0, 30.0, 20.0, fiducials, 0.5, 2.0, 1.0]
+    for tag_id in range(fiducials):
+        # id, txnc, tync, ta, distance to camera, distance to robot, ambiguity
+        array += [tag_id + 1, 5.0, -3.0, 0.2, 2.1, 2.3, 0.1]
+    return array
+
+
+def _target_tracker_execute(data_logger: datalog.DataLogger):
+    tracker = target_tracker.TargetTracker()
+    tracker.robot_constants = types.SimpleNamespace(
+        shooter=types.SimpleNamespace(
+            turret=types.SimpleNamespace(
+                min_angle=-180.0,
+                max_angle=180.0,
+                feed_forward_mvt_multiplier=1.0,
+            )
+        )
+    )
+    tracker.alliance_fetcher = types.SimpleNamespace(
+        is_red_alliance=lambda: False
+    )
+    # Driving and turning near the hub.
+    robot_pose = geometry.Pose2d(3.0, 2.5, geometry.Rotation2d.fromDegrees(30))
+    robot_speeds = kinematics.ChassisSpeeds(1.5, -0.5, 0.3)
+    yaw_rate_signal = FakeSignal(17.0)
+    tracker.drivetrain = types.SimpleNamespace(
+        get_robot_pose=lambda: robot_pose,
+        robot_speeds=lambda: robot_speeds,
+        swerve_drive=types.SimpleNamespace(
+            pigeon2=types.SimpleNamespace(
+                get_angular_velocity_z_world=lambda: yaw_rate_signal
+            )
+        ),
+    )
+    mechanism = types.SimpleNamespace(
+        set_feed_forward_control=_ignore,
+        set_position=_ignore,
+        set_target_rps=_ignore,
+    )
+    tracker.flywheel = mechanism
+    tracker.hood = mechanism
+    tracker.turret = mechanism
+    tracker.data_logger = data_logger
+    tracker.signal_hub = types.SimpleNamespace(
+        register=lambda device, signal, **kwargs: signal
+    )
+    tracker.setup()
+    # The deploy directory is next to the main script, which isn't robot.py
+    # when running plain pytest.
+    tracker._shot_grid = shot_grid.ShotGrid.load(
+        os.path.join(ROOT, "deploy", shot_grid.FILE_NAME)
+    )
+    tracker.track_speed(True)
+    return tracker.execute
+
+
+def _shot_table_get(data_logger: datalog.DataLogger):
+    return lambda: target_tracker.ShotTable.get(3.7)
+
+
+def _vision_update_robot_pose(data_logger: datalog.DataLogger):
+    names = [f"limelight-benchmark{index}" for index in range(NUM_LIMELIGHTS)]
+    component = vision.Vision()
+    component.robot_constants = types.SimpleNamespace(
+        drivetrain=types.SimpleNamespace(
+            vision=drivetrain.constants.VisionConstants(limelights=names)
+        )
+    )
+    component.drivetrain = types.SimpleNamespace(
+        get_robot_pose=lambda: geometry.Pose2d(),
+        swerve_drive=types.SimpleNamespace(add_vision_measurement=_ignore),
+    )
+    component.data_logger = data_logger
+    component.telemetry_scheduler = datalog.TelemetryScheduler()
+    component.setup()
+    # Every Limelight sees two tags each loop. The frames are a few
+    # milliseconds apart, so they're merged into one measurement.
+    component._pose_subscribers = [
+        FakeSubscriber(
+            _pose_estimate_array(3.0 + index * 0.01, fiducials=2),
+            1_000_000 + index * 2_000,
+        )
+        for index in range(NUM_LIMELIGHTS)
+    ]
+    return component._update_robot_pose
+
+
+def _limelight_botpose_estimate(fiducials: int) -> Benchmark:
+    def make(data_logger: datalog.DataLogger):
+        name = f"limelight-benchmark-fiducials{fiducials}"
+        limelight.LimelightHelpers.get_limelight_double_array_entry(
+            name, "botpose_orb_wpiblue"
+        ).set(_pose_estimate_array(3.0, fiducials), 1_000_000)
+        return lambda: limelight.LimelightHelpers._get_botpose_estimate(
+            name, "botpose_orb_wpiblue", True
+        )
+
+    return make
+
+
+def _datalog_log_double(data_logger: datalog.DataLogger):
+    return lambda: data_logger.log_double(
+        "/benchmark/log_double", 1.0, on_change=True
+    )
+
+
+def _datalog_log_boolean(data_logger: datalog.DataLogger):
+    return lambda: data_logger.log_boolean("/benchmark/log_boolean", True)
+
+
+def _datalog_log_primary_motor_data(data_logger: datalog.DataLogger):
+    motor = FakeMotor()
+    return lambda: datalog.log_primary_motor_data(
+        data_logger,
+        "/benchmark/motor",
+        motor,
+        position=True,
+        velocity=True,
+    )
+
+
+def _driver_controller_get_drive_command(data_logger: datalog.DataLogger):
+    driver = joystick.DriverController(
+        FakeController(),
+        types.SimpleNamespace(
+            max_linear_speed_meters_per_second=4.5,
+            max_angular_speed_radians_per_second=2 * math.pi,
+        ),
+    )
+    return driver.get_drive_command
+
+
+def _shooter_state_cycle(data_logger: datalog.DataLogger):
+    """Goes from idling to shooting and back, with the shooter ready."""
+    state_machine = shooter.Shooter()
+    state_machine.robot_constants = types.SimpleNamespace(
+        shooter=types.SimpleNamespace(
+            flywheel=types.SimpleNamespace(default_speed_rps=20.0)
+        )
+    )
+    state_machine.turret = types.SimpleNamespace(
+        measured_angle_degrees=lambda: 0.0
+    )
+    state_machine.hood = types.SimpleNamespace(
+        measured_angle_degrees=lambda: 0.0
+    )
+    state_machine.flywheel = types.SimpleNamespace(
+        measured_speed_rps=lambda: 20.0
+    )
+    state_machine.hopper = types.SimpleNamespace(set_enabled=_ignore)
+    state_machine.indexer = types.SimpleNamespace(set_enabled=_ignore)
+    state_machine.drivetrain = types.SimpleNamespace(
+        robot_speeds=kinematics.ChassisSpeeds
+    )
+    state_machine.target_tracker = types.SimpleNamespace(
+        track_position=_ignore,
+        track_speed=_ignore,
+        set_target_flywheel_speed_rps=_ignore,
+        target_turret_angle_degrees=lambda: 0.0,
+        target_hood_angle_degrees=lambda: 0.0,
+        target_flywheel_speed_rps=lambda: 20.0,
+    )
+    state_machine.data_logger = data_logger
+    magic_tunable.setup_tunables(state_machine, "shooter")
+    state_machine.setup()
+
+    def cycle():
+        # Idling, then targeting, then shooting right away.
+        state_machine.set_driver_wants_feed(True)
+        state_machine.engage()
+        state_machine.execute()
+        state_machine.engage()
+        state_machine.execute()
+        # Back to idling.
+        state_machine.set_driver_wants_feed(False)
+        state_machine.engage()
+        state_machine.execute()
+
+    return cycle
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "TargetTracker.execute": _target_tracker_execute,
+    "ShotTable.get": _shot_table_get,
+    "Vision._update_robot_pose": _vision_update_robot_pose,
+    "LimelightHelpers._get_botpose_estimate[1 fiducial]": (
+        _limelight_botpose_estimate(1)
+    ),
+    "LimelightHelpers._get_botpose_estimate[4 fiducials]": (
+        _limelight_botpose_estimate(4)
+    ),
+    "LimelightHelpers._get_botpose_estimate[8 fiducials]": (
+        _limelight_botpose_estimate(8)
+    ),
+    "DataLogger.log_double": _datalog_log_double,
+    "DataLogger.log_boolean": _datalog_log_boolean,
+    "log_primary_motor_data": _datalog_log_primary_motor_data,
+    "DriverController.get_drive_command": _driver_controller_get_drive_command,
+    "Shooter idling-shooting-idling": _shooter_state_cycle,
+}
+
+_REFERENCE_VALUES = [index * 0.5 for index in range(100)]
+
+
+def _reference_op() -> float:
+    """Fixed pure-Python workload that timings are compared relative to."""
+    total = 0.0
+    for value in _REFERENCE_VALUES:
+        total += math.sqrt(value) * 0.5
+    return total
+
+
+def _time_calls(op: Callable[[], Any], calls: int) -> float:
+    """Times calling op, with the garbage collector off, in seconds."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(calls):
+            op()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _warm_up(op: Callable[[], Any]) -> None:
+    """Calls op for WARM_UP_SECONDS."""
+    end = time.perf_counter() + WARM_UP_SECONDS
+    while time.perf_counter() < end:
+        op()
+
+
+def _calls_per_repeat(op: Callable[[], Any]) -> int:
+    """Number of calls to op that take about REPEAT_SECONDS."""
+    calls = 1
+    elapsed = _time_calls(op, calls)
+    while elapsed < REPEAT_SECONDS / 10:
+        calls *= 10
+        elapsed = _time_calls(op, calls)
+    return max(1, round(calls * REPEAT_SECONDS / elapsed))
+
+
+def _ns_per_op(op: Callable[[], Any]) -> Tuple[float, float]:
+    """Best time per call of op and of the reference workload, in nanoseconds.
+
+    The two are timed in alternating runs, so they're both slowed down alike
+    when something else is running.
+    """
+    _warm_up(op)
+    calls = _calls_per_repeat(op)
+    reference_calls = _calls_per_repeat(_reference_op)
+    best = reference_best = float("inf")
+    for _ in range(REPEATS):
+        best = min(best, _time_calls(op, calls) / calls)
+        reference_best = min(
+            reference_best,
+            _time_calls(_reference_op, reference_calls) / reference_calls,
+        )
+    return best * 1e9, reference_best * 1e9
+
+
+def _peak_bytes_per_op(op: Callable[[], Any]) -> float:
+    """Median of the most memory a call allocated at once, in bytes.
+
+    CPython doesn't count allocations, so this uses tracemalloc's peak. It is
+    zero for code that doesn't allocate, and grows with the number and size of
+    objects a call creates, like a count of allocations would.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        samples = []
+        for _ in range(ALLOCATION_SAMPLES):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+            samples.append(peak - current)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return statistics.median(samples)
+
+
+def _python_version() -> str:
+    return ".".join(platform.python_version_tuple()[:2])
+
+
+@pytest.fixture(scope="module")
+def data_logger(tmp_path_factory):
+    # The synchronous DataLogger writes to this like it writes to
+    # DataLogManager's log on the robot.
+    data_log = wpiutil.DataLogBackgroundWriter(
+        str(tmp_path_factory.mktemp("benchmarks")), "benchmarks.wpilog"
+    )
+    yield datalog.DataLogger(data_log)
+    data_log.stop()
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    """The recorded baseline, or None if there isn't one, and a dict to add
+    results to.
+
+    Records a new baseline from the results, if BENCHMARK_UPDATE_BASELINE is
+    set.
+    """
+    try:
+        with open(BASELINE_PATH) as f:
+            recorded = json.load(f)
+    except FileNotFoundError:
+        recorded = None
+
+    results: Dict[str, Dict[str, float]] = {}
+    yield recorded, results
+
+    if not os.environ.get(UPDATE_BASELINE_ENVIRONMENT_VARIABLE) or not results:
+        return
+    # Keep the benchmarks that weren't run, if they were recorded on the same
+    # Python version.
+    benchmarks = {}
+    if recorded is not None and recorded["python"] == _python_version():
+        benchmarks = recorded["benchmarks"]
+    benchmarks.update(results)
+    with open(BASELINE_PATH, "w") as f:
+        json.dump(
+            {
+                "python": _python_version(),
+                "benchmarks": dict(sorted(benchmarks.items())),
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+
+
+@pytest.mark.parametrize("name", BENCHMARKS)
+def test_benchmark(name, data_logger, baseline):
+    recorded, results = baseline
+    op = BENCHMARKS[name](data_logger)
+
+    ns_per_op, reference_ns_per_op = _ns_per_op(op)
+    peak_bytes_per_op = _peak_bytes_per_op(op)
+    results[name] = {
+        "ns_per_op": round(ns_per_op, 1),
+        "reference_ns_per_op": round(reference_ns_per_op, 1),
+        "peak_bytes_per_op": peak_bytes_per_op,
+    }
+    print(f"\n{name}: {ns_per_op:,.0f}ns/op, {peak_bytes_per_op:,.0f}B/op")
+
+    if os.environ.get(UPDATE_BASELINE_ENVIRONMENT_VARIABLE):
+        return
+    if recorded is None or name not in recorded["benchmarks"]:
+        pytest.skip(f"No baseline for {name}")
+    if recorded["python"] != _python_version():
+        pytest.skip(f"Baseline was recorded on Python {recorded['python']}")
+
+    threshold = float(
+        os.environ.get(THRESHOLD_ENVIRONMENT_VARIABLE, DEFAULT_THRESHOLD)
+    )
+    expected = recorded["benchmarks"][name]
+    # Time relative to the reference workload, which doesn't depend on how
+    # fast this machine is.
+    expected_ratio = expected["ns_per_op"] / expected["reference_ns_per_op"]
+    ratio = ns_per_op / reference_ns_per_op
+    for _ in range(CONFIRMATION_RUNS):
+        if ratio <= expected_ratio * (1 + threshold):
+            break
+        # Measure again, in case something else was running.
+        ns_per_op, reference_ns_per_op = _ns_per_op(op)
+        ratio = min(ratio, ns_per_op / reference_ns_per_op)
+    print(
+        f"  {ratio / expected_ratio - 1:+.0%} time, baseline "
+        f"{expected['peak_bytes_per_op']:,.0f}B/op"
+    )
+    assert ratio <= expected_ratio * (1 + threshold)
+    assert peak_bytes_per_op <= (
+        expected["peak_bytes_per_op"] * (1 + threshold) + ALLOCATION_SLACK_BYTES
+    )
@@ -0,0 +1,111 @@
+import pytest
+
+from common import boot
+
+
+class FakeClock:
+    """Stand-in for time.perf_counter."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def timeline(clock):
+    """A timeline of a process that started 2 seconds ago."""
+    return boot.BootTimeline(clock, seconds_since_process_start=2.0)
+
+
+class TestBootTimeline:
+    def test_records_python_startup(self, timeline):
+        assert timeline.phases() == [
+            boot.BootPhase("python startup", 0.0, 2.0, 0)
+        ]
+
+    def test_records_nested_phases_in_order(self, timeline, clock):
+        with timeline.phase("robotInit()"):
+            clock.now += 1.0
+            with timeline.phase("turret.setup()"):
+                clock.now += 0.5
+        with timeline.phase("can_bus_planner.apply()"):
+            clock.now += 0.25
+
+        assert timeline.phases()[1:] == [
+            boot.BootPhase("robotInit()", 2.0, 1.5, 0),
+            boot.BootPhase("turret.setup()", 3.0, 0.5, 1),
+            boot.BootPhase("can_bus_planner.apply()", 3.5, 0.25, 0),
+        ]
+
+    def test_timed_function(self, timeline, clock):
+        def setup(value):
+            clock.now += 0.5
+            return value
+
+        assert timeline.timed("hood.setup()", setup)(3) == 3
+        assert timeline.phases()[-1] == boot.BootPhase(
+            "hood.setup()", 2.0, 0.5, 0
+        )
+
+    def test_records_phases_that_raise(self, timeline, clock):
+        with pytest.raises(ValueError):
+            with timeline.phase("constants.get_robot_constants()"):
+                clock.now += 1.0
+                raise ValueError()
+
+        assert timeline.phases()[-1].duration_seconds == 1.0
+
+    def test_report_logs_and_clears(self, timeline, clock, data_logger):
+        with timeline.phase("turret.setup()"):
+            clock.now += 0.5
+
+        reported = timeline.report(data_logger)
+
+        assert [phase.name for phase in reported] == [
+            "python startup",
+            "turret.setup()",
+        ]
+        assert timeline.phases() == []
+        data_logger.log_double.assert_any_call("/boot/total_ms", 2500.0)
+        data_logger.log_double.assert_any_call(
+            "/boot/phases/turret_setup_ms", 500.0
+        )
+        timeline_text = data_logger.log_string.call_args.args[1]
+        assert "turret.setup()" in timeline_text
+
+    def test_process_start_is_known_on_linux(self):
+        elapsed = boot._seconds_since_process_start()
+
+        assert elapsed is None or elapsed > 0.0
+
+
+# Simulated robot initialization should take less than this. It takes under a
+# second today, so this catches regressions like parsing files or waiting on
+# devices at boot.
+SIMULATED_INIT_BUDGET_SECONDS = 3.0
+
+
+def test_simulated_startup_is_fast(mocker, control):
+    report = mocker.spy(boot.TIMELINE, "report")
+
+    with control.run_robot():
+        control.step_timing(seconds=1.0, autonomous=False, enabled=False)
+
+    report.assert_called_once()
+    phases = {phase.name: phase for phase in report.spy_return}
+    # Every component's setup was timed.
+    assert "turret.setup()" in phases
+    assert "drivetrain.setup()" in phases
+    init_seconds = (
+        phases["MagicRobot.robotInit()"].duration_seconds
+        + phases["can_bus_planner.apply()"].duration_seconds
+    )
+    print(f"\nSimulated robot initialization: {init_seconds:.3f}s")
+    assert init_seconds < SIMULATED_INIT_BUDGET_SECONDS
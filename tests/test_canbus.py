@@ -0,0 +1,195 @@
+import logging
+import types
+
+import pytest
+
+from common import canbus, datalog
+
+
+def _make_device(mocker, bus_name: str = "Shooter", fd: bool = True):
+    """Mock phoenix6 device on the given CAN bus."""
+    device = mocker.Mock()
+    device.network = mocker.Mock()
+    device.network.name = bus_name
+    device.network.is_network_fd.return_value = fd
+    return device
+
+
+@pytest.fixture
+def planner(data_logger):
+    """CanBusPlanner with setup() called."""
+    p = canbus.CanBusPlanner()
+    p.logger = logging.getLogger("can_bus_planner")
+    p.data_logger = data_logger
+    p.telemetry_scheduler = datalog.TelemetryScheduler()
+    p.setup()
+    return p
+
+
+@pytest.fixture
+def set_update_frequency_for_all(mocker):
+    return mocker.patch.object(
+        canbus.phoenix6.BaseStatusSignal,
+        "set_update_frequency_for_all",
+        return_value=canbus.phoenix6.StatusCode.OK,
+    )
+
+
+def _applied_frequencies(set_update_frequency_for_all):
+    """Map of id(signal) to the frequency it was set to."""
+    frequencies = {}
+    for call in set_update_frequency_for_all.call_args_list:
+        frequency_hz, signals = call.args
+        for signal in signals:
+            frequencies[id(signal)] = frequency_hz
+    return frequencies
+
+
+class TestPlan:
+    def test_fastest_request_wins(
+        self, mocker, planner, set_update_frequency_for_all
+    ):
+        """A signal requested at several rates is set to the fastest one."""
+        device = _make_device(mocker)
+        signal = mocker.Mock()
+        planner.request(device, [signal], canbus.TELEMETRY_FREQUENCY_HZ)
+        planner.request(device, [signal], canbus.CONTROL_FREQUENCY_HZ)
+        planner.request(device, [signal], canbus.LOOP_FREQUENCY_HZ)
+
+        planner.apply()
+
+        assert _applied_frequencies(set_update_frequency_for_all) == {
+            id(signal): canbus.CONTROL_FREQUENCY_HZ
+        }
+
+    def test_one_call_per_frequency(
+        self, mocker, planner, set_update_frequency_for_all
+    ):
+        """Signals with the same rate are set together."""
+        first = _make_device(mocker, "Shooter")
+        second = _make_device(mocker, "rio", fd=False)
+        planner.request(first, [mocker.Mock()], canbus.LOOP_FREQUENCY_HZ)
+        planner.request(second, [mocker.Mock()], canbus.LOOP_FREQUENCY_HZ)
+        planner.request(first, [mocker.Mock()], canbus.CONTROL_FREQUENCY_HZ)
+
+        planner.apply()
+
+        assert set_update_frequency_for_all.call_count == 2
+
+    def test_optimizes_each_device_once(
+        self, mocker, planner, set_update_frequency_for_all
+    ):
+        """Each planned device has its other signals slowed down once."""
+        device = _make_device(mocker)
+        device.optimize_bus_utilization.return_value = (
+            canbus.phoenix6.StatusCode.OK
+        )
+        planner.request(device, [mocker.Mock()], canbus.LOOP_FREQUENCY_HZ)
+        planner.request(device, [mocker.Mock()], canbus.CONTROL_FREQUENCY_HZ)
+
+        planner.apply()
+
+        device.optimize_bus_utilization.assert_called_once()
+
+    def test_no_optimize_when_tuning(
+        self, mocker, planner, set_update_frequency_for_all
+    ):
+        """Unrequested signals are left alone when optimize is False."""
+        device = _make_device(mocker)
+        planner.request(device, [mocker.Mock()], canbus.LOOP_FREQUENCY_HZ)
+
+        planner.apply(optimize=False)
+
+        device.optimize_bus_utilization.assert_not_called()
+        set_update_frequency_for_all.assert_called_once()
+
+    def test_motor_logging_rates(
+        self, mocker, planner, set_update_frequency_for_all
+    ):
+        """Logged motor signals are planned at loop and telemetry rates."""
+        motor = _make_device(mocker)
+        planner.request_motor_logging(
+            datalog.MotorTelemetry(
+                planner.data_logger, "/motor", motor, velocity=True
+            )
+        )
+
+        planner.apply(optimize=False)
+
+        frequencies = _applied_frequencies(set_update_frequency_for_all)
+        assert (
+            frequencies[id(motor.get_velocity.return_value)]
+            == canbus.LOOP_FREQUENCY_HZ
+        )
+        assert (
+            frequencies[id(motor.get_device_temp.return_value)]
+            == canbus.TELEMETRY_FREQUENCY_HZ
+        )
+        assert id(motor.get_position.return_value) not in frequencies
+
+
+class TestUtilization:
+    def test_predicted_utilization(self, mocker, planner):
+        """Prediction adds up the frame time of every planned signal."""
+        shooter = _make_device(mocker, "Shooter", fd=True)
+        rio = _make_device(mocker, "rio", fd=False)
+        planner.request(
+            shooter, [mocker.Mock(), mocker.Mock()], canbus.CONTROL_FREQUENCY_HZ
+        )
+        planner.request(rio, [mocker.Mock()], canbus.LOOP_FREQUENCY_HZ)
+
+        utilization = planner.predicted_utilization()
+
+        assert utilization["Shooter"] == pytest.approx(
+            2 * canbus.CONTROL_FREQUENCY_HZ * canbus.FD_FRAME_SECONDS
+        )
+        assert utilization["rio"] == pytest.approx(
+            canbus.LOOP_FREQUENCY_HZ * canbus.CLASSIC_FRAME_SECONDS
+        )
+
+    def test_logs_one_bus_per_second(self, mocker, planner):
+        """Measured utilization is logged for one bus at a time."""
+        planner.request(
+            _make_device(mocker, "Shooter"),
+            [mocker.Mock()],
+            canbus.LOOP_FREQUENCY_HZ,
+        )
+        planner.request(
+            _make_device(mocker, "swerve"),
+            [mocker.Mock()],
+            canbus.LOOP_FREQUENCY_HZ,
+        )
+        mocker.patch.object(
+            canbus.wpilib.RobotBase, "isReal", return_value=True
+        )
+        can_bus = mocker.patch.object(canbus.phoenix6, "CANBus")
+        can_bus.return_value.get_status.return_value = types.SimpleNamespace(
+            status=canbus.phoenix6.StatusCode.OK, bus_utilization=0.25
+        )
+
+        # Two seconds of loops.
+        for _ in range(100):
+            planner.telemetry_scheduler.run()
+
+        assert [call.args[0] for call in can_bus.call_args_list] == [
+            "Shooter",
+            "swerve",
+        ]
+        assert planner.data_logger.logged == [
+            ("/can/Shooter/measured_utilization_percent", 25.0),
+            ("/can/swerve/measured_utilization_percent", 25.0),
+        ]
+
+    def test_does_not_read_buses_in_simulation(self, mocker, planner):
+        planner.request(
+            _make_device(mocker, "Shooter"),
+            [mocker.Mock()],
+            canbus.LOOP_FREQUENCY_HZ,
+        )
+        can_bus = mocker.patch.object(canbus.phoenix6, "CANBus")
+
+        for _ in range(100):
+            planner.telemetry_scheduler.run()
+
+        can_bus.assert_not_called()
+        assert planner.data_logger.logged == []
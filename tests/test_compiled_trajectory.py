@@ -0,0 +1,159 @@
+import glob
+import os
+import time
+
+import choreo
+import choreo.util
+import pytest
+import wpilib
+
+from autonomous import compiled_trajectory
+
+NAME = "neutral_zone_depot_shoot_starting_depot_side"
+
+
+def _load_json(name: str) -> choreo.SwerveTrajectory:
+    return choreo.load_swerve_trajectory(name)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return _load_json(NAME)
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return compiled_trajectory.CompiledTrajectory.load(
+        os.path.join(
+            wpilib.getDeployDirectory(),
+            "choreo",
+            NAME + compiled_trajectory.EXTENSION,
+        )
+    )
+
+
+def _timestamps(trajectory: choreo.SwerveTrajectory):
+    """Timestamps before, during and after the trajectory, including samples."""
+    total = trajectory.get_total_time()
+    return (
+        [-1.0, 0.0]
+        + [sample.timestamp for sample in trajectory.samples[:5]]
+        + [i * 0.02 for i in range(int(total / 0.02) + 1)]
+        + [total, total + 1.0]
+    )
+
+
+def _assert_same_sample(actual, expected):
+    assert actual.timestamp == pytest.approx(expected.timestamp, abs=1e-12)
+    for field in compiled_trajectory._COLUMNS[1:]:
+        assert getattr(actual, field) == pytest.approx(
+            getattr(expected, field), abs=1e-9
+        ), field
+    assert actual.fx == pytest.approx(expected.fx, abs=1e-9)
+    assert actual.fy == pytest.approx(expected.fy, abs=1e-9)
+
+
+@pytest.mark.parametrize(
+    "path",
+    sorted(
+        glob.glob(os.path.join(wpilib.getDeployDirectory(), "choreo", "*.traj"))
+    ),
+    ids=os.path.basename,
+)
+def test_compiled_trajectories_are_up_to_date(path):
+    """Every .traj file has a matching .bin file.
+
+    If this fails, convert the trajectories with
+    `python -m autonomous.compiled_trajectory`.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(
+        os.path.splitext(path)[0] + compiled_trajectory.EXTENSION, "rb"
+    ) as f:
+        compiled_bytes = f.read()
+
+    assert compiled_bytes == compiled_trajectory.compile_trajectory(
+        _load_json(name)
+    )
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a compiled trajectory")
+
+    with pytest.raises(ValueError):
+        compiled_trajectory.CompiledTrajectory.load(str(path))
+
+
+def test_total_time_and_initial_pose(reference, compiled):
+    assert compiled.get_total_time() == reference.get_total_time()
+    for flip in (False, True):
+        assert compiled.get_initial_pose(flip) == reference.get_initial_pose(
+            flip
+        )
+
+
+def test_empty_trajectory():
+    compiled = compiled_trajectory.CompiledTrajectory.from_trajectory(
+        choreo.SwerveTrajectory("empty", [], [0], [])
+    )
+
+    assert compiled.get_total_time() == 0.0
+    assert compiled.get_initial_pose() is None
+    assert compiled.sampler().sample_at(1.0) is None
+
+
+class TestSampler:
+    @pytest.mark.parametrize("flip", [False, True], ids=["blue", "red"])
+    def test_matches_choreo_in_order(self, reference, compiled, flip):
+        sampler = compiled.sampler()
+        for timestamp in _timestamps(reference):
+            _assert_same_sample(
+                sampler.sample_at(timestamp, flip),
+                reference.sample_at(timestamp, flip),
+            )
+
+    def test_matches_choreo_out_of_order(self, reference, compiled):
+        sampler = compiled.sampler()
+        timestamps = _timestamps(reference)
+        for timestamp in timestamps[::7] + timestamps[::-5]:
+            _assert_same_sample(
+                sampler.sample_at(timestamp), reference.sample_at(timestamp)
+            )
+
+    def test_matches_choreo_mirrored(self, mocker, reference, compiled):
+        """Flipping also works for years when the field is mirrored."""
+        mocker.patch.object(
+            compiled_trajectory.choreo.util,
+            "get_flipper_for_year",
+            return_value=choreo.util.MirroredFlipper(),
+        )
+        sampler = compiled.sampler()
+        for timestamp in _timestamps(reference)[::10]:
+            _assert_same_sample(
+                sampler.sample_at(timestamp, True),
+                reference.sample_at(timestamp).flipped(2024),
+            )
+
+    def test_reuses_sample(self, compiled):
+        sampler = compiled.sampler()
+
+        assert sampler.sample_at(1.0) is sampler.sample_at(2.0)
+
+    def test_is_faster_than_choreo(self, reference, compiled):
+        """Run with `-s` to see the timings."""
+        timestamps = _timestamps(reference)
+
+        def best_us(sample_at) -> float:
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                for timestamp in timestamps:
+                    sample_at(timestamp, True)
+                best = min(best, time.perf_counter() - start)
+            return best / len(timestamps) * 1e6
+
+        choreo_us = best_us(reference.sample_at)
+        compiled_us = best_us(compiled.sampler().sample_at)
+        print(f"\nsample_at: {compiled_us:.1f}us, choreo {choreo_us:.1f}us")
+        assert compiled_us < choreo_us
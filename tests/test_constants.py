@@ -1,4 +1,7 @@
 import dataclasses
+import os
+import subprocess
+
 import pytest
 
 import constants
@@ -66,3 +69,57 @@ def test_constants_are_immutable(mocker):
 
     with pytest.raises(dataclasses.FrozenInstanceError):
         robot_constants.shooter.hopper.left_k_p = 42
+
+
+@pytest.fixture
+def serial_cache(mocker, tmp_path):
+    """Path to cache the serial number at, on a roboRIO with a known MAC."""
+    mac_address = tmp_path / "address"
+    mac_address.write_text("00:80:2f:aa:bb:cc\n")
+    mocker.patch.object(constants, "_MAC_ADDRESS_PATH", str(mac_address))
+    return str(tmp_path / "robot_serial.json")
+
+
+@pytest.fixture
+def fw_printenv(mocker):
+    mock_run = mocker.patch("subprocess.run")
+    mock_run.return_value = mocker.Mock(stdout="023AC96C\n", returncode=0)
+    return mock_run
+
+
+def test_serial_is_cached(serial_cache, fw_printenv):
+    """The serial number is only read with fw_printenv once."""
+    assert constants.get_robot_serial(serial_cache) == "023AC96C"
+    assert constants.get_robot_serial(serial_cache) == "023AC96C"
+
+    fw_printenv.assert_called_once()
+
+
+def test_cached_serial_of_another_roborio(serial_cache, fw_printenv):
+    """A serial number cached on another roboRIO is read again."""
+    constants.get_robot_serial(serial_cache)
+    with open(constants._MAC_ADDRESS_PATH, "w") as f:
+        f.write("00:80:2f:dd:ee:ff\n")
+
+    constants.get_robot_serial(serial_cache)
+
+    assert fw_printenv.call_count == 2
+
+
+def test_corrupt_serial_cache(serial_cache, fw_printenv):
+    with open(serial_cache, "w") as f:
+        f.write("{")
+
+    assert constants.get_robot_serial(serial_cache) == "023AC96C"
+    fw_printenv.assert_called_once()
+
+
+def test_failed_serial_read_is_not_cached(mocker, serial_cache, fw_printenv):
+    fw_printenv.side_effect = subprocess.TimeoutExpired("fw_printenv", 1)
+    mocker.patch("wpilib.reportError")
+    mocker.patch("wpilib.reportWarning")
+
+    serial = constants.get_robot_serial(serial_cache)
+
+    assert serial == constants.DEFAULT_ROBOT_SERIAL
+    assert not os.path.exists(serial_cache)
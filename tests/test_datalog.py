@@ -0,0 +1,319 @@
+import time
+
+import pytest
+import wpiutil
+
+from common import datalog
+
+# Number of TalonFX motors on the robot.
+NUM_MOTORS = 15
+
+
+class FakeSignal:
+    """Stand-in for a phoenix6 StatusSignal."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeMotor:
+    """Stand-in for a TalonFX, with the signals the datalog helpers read."""
+
+    def __init__(self):
+        self._signals = {}
+
+    def __getattr__(self, name: str):
+        if not name.startswith("get_"):
+            raise AttributeError(name)
+        signal = self._signals.setdefault(
+            name, FakeSignal(False if "fault" in name else 0.0)
+        )
+        return lambda refresh=True: signal
+
+    def set_values(self, value: float) -> None:
+        for name, signal in self._signals.items():
+            if "fault" not in name:
+                signal.value = value
+
+
+@pytest.fixture
+def entries(mocker):
+    """Replace the wpiutil log entry types with mocks.
+
+    Returns the list of (topic name, value) pairs logged, in order. Values
+    passed to `update` are only recorded if they changed.
+    """
+    logged = []
+
+    def make_entry_type(name):
+        def entry_type(data_log, topic_name, *args):
+            entry = mocker.Mock(name=topic_name)
+            last = []
+
+            def append(value):
+                logged.append((topic_name, value))
+
+            def update(value):
+                if last != [value]:
+                    last[:] = [value]
+                    logged.append((topic_name, value))
+
+            entry.append.side_effect = append
+            entry.update.side_effect = update
+            return entry
+
+        return mocker.patch.object(datalog.log, name, side_effect=entry_type)
+
+    for name in ("DoubleLogEntry", "BooleanLogEntry", "StringLogEntry"):
+        make_entry_type(name)
+    return logged
+
+
+@pytest.fixture
+def logger(mocker):
+    return datalog.DataLogger(mocker.Mock())
+
+
+@pytest.fixture
+def refresh_all(mocker):
+    return mocker.patch.object(datalog.phoenix6.BaseStatusSignal, "refresh_all")
+
+
+class TestLogHandle:
+    def test_append_and_update(self, logger, entries):
+        """append always logs, update only logs changes."""
+        appended = logger.register_double("/appended")
+        updated = logger.register_double("/updated")
+        for value in (1.0, 1.0, 2.0):
+            appended.append(value)
+            updated.update(value)
+
+        assert [value for topic, value in entries if topic == "/appended"] == [
+            1.0,
+            1.0,
+            2.0,
+        ]
+        assert [value for topic, value in entries if topic == "/updated"] == [
+            1.0,
+            2.0,
+        ]
+
+    def test_registering_does_not_start_log(self, mocker):
+        """The log isn't touched until something is logged."""
+        get_log = mocker.patch.object(datalog.wpilib.DataLogManager, "getLog")
+        logger = datalog.DataLogger()
+        logger.register_double("/value")
+        get_log.assert_not_called()
+
+    def test_shares_entry_with_log_methods(self, logger, entries):
+        """Handles and log_* methods write to the same entry."""
+        handle = logger.register_string("/name")
+        handle.update("turret")
+        logger.log_string("/name", "turret", on_change=True)
+        logger.log_string("/name", "hood", on_change=True)
+
+        assert entries == [("/name", "turret"), ("/name", "hood")]
+        datalog.log.StringLogEntry.assert_called_once()
+
+
+class TestMotorTelemetry:
+    def test_matches_log_helpers(self, mocker, entries, refresh_all):
+        """MotorTelemetry logs the same topics as the log_* helpers."""
+        motor = FakeMotor()
+        motor.set_values(3.0)
+
+        helper_logger = datalog.DataLogger(mocker.Mock())
+        datalog.log_primary_motor_data(
+            helper_logger, "/motor", motor, position=True, velocity=True
+        )
+        datalog.log_secondary_motor_data(helper_logger, "/motor", motor)
+        logged_by_helpers = list(entries)
+        entries.clear()
+
+        telemetry = datalog.DataLogger(mocker.Mock()).register_motor(
+            "/motor", motor, position=True, velocity=True
+        )
+        telemetry.log_primary()
+        telemetry.log_secondary()
+
+        assert len(logged_by_helpers) == 12
+        assert entries == logged_by_helpers
+
+    def test_refreshes_signals_together(self, logger, entries, refresh_all):
+        """Each log call refreshes all of its signals at once."""
+        telemetry = logger.register_motor("/motor", FakeMotor(), velocity=True)
+
+        telemetry.log_primary()
+        telemetry.log_secondary()
+
+        assert refresh_all.call_count == 2
+        refresh_all.assert_any_call(telemetry.primary_signals)
+        refresh_all.assert_any_call(telemetry.secondary_signals)
+        assert len(telemetry.primary_signals) == 4
+        assert len(telemetry.secondary_signals) == 6
+
+
+class TestTelemetryScheduler:
+    @staticmethod
+    def _counter(runs, name):
+        return lambda: runs.append(name)
+
+    def test_runs_tasks_at_their_rates(self):
+        scheduler = datalog.TelemetryScheduler()
+        runs = []
+        for rate_hz in (
+            datalog.FAST_RATE_HZ,
+            datalog.MEDIUM_RATE_HZ,
+            datalog.SLOW_RATE_HZ,
+        ):
+            scheduler.register(self._counter(runs, rate_hz), rate_hz)
+
+        for _ in range(100):
+            scheduler.run()
+
+        assert runs.count(datalog.FAST_RATE_HZ) == 100
+        assert runs.count(datalog.MEDIUM_RATE_HZ) == 20
+        assert runs.count(datalog.SLOW_RATE_HZ) == 2
+
+    def test_staggers_slow_tasks(self):
+        """Tasks with the same rate run in different loops."""
+        scheduler = datalog.TelemetryScheduler()
+        runs = []
+        scheduler.register(lambda: None, datalog.FAST_RATE_HZ, cost=8)
+        for index in range(10):
+            scheduler.register(self._counter(runs, index), datalog.SLOW_RATE_HZ)
+
+        runs_per_loop = []
+        for _ in range(50):
+            runs.clear()
+            scheduler.run()
+            runs_per_loop.append(len(runs))
+
+        assert max(runs_per_loop) == 1
+        assert sum(runs_per_loop) == 10
+
+    def test_balances_cost(self):
+        """Costly tasks are kept apart from other tasks."""
+        scheduler = datalog.TelemetryScheduler()
+        runs = []
+        scheduler.register(
+            self._counter(runs, "big"), datalog.MEDIUM_RATE_HZ, cost=4
+        )
+        for index in range(4):
+            scheduler.register(
+                self._counter(runs, index), datalog.MEDIUM_RATE_HZ
+            )
+
+        loops = []
+        for _ in range(5):
+            runs.clear()
+            scheduler.run()
+            loops.append(list(runs))
+
+        assert ["big"] in loops
+
+    def test_match_mode_lowers_rates(self):
+        scheduler = datalog.TelemetryScheduler()
+        runs = []
+        for rate_hz in (
+            datalog.FAST_RATE_HZ,
+            datalog.MEDIUM_RATE_HZ,
+            datalog.SLOW_RATE_HZ,
+        ):
+            scheduler.register(self._counter(runs, rate_hz), rate_hz)
+
+        scheduler.set_match_mode(True)
+        for _ in range(100):
+            scheduler.run()
+
+        assert scheduler.is_match_mode()
+        assert runs.count(datalog.FAST_RATE_HZ) == 20
+        assert runs.count(datalog.MEDIUM_RATE_HZ) == 4
+        assert runs.count(datalog.SLOW_RATE_HZ) == 2
+
+    def test_register_motor(self, logger, entries, refresh_all):
+        """Motor telemetry logs primary data every loop, the rest each second."""
+        scheduler = datalog.TelemetryScheduler()
+        telemetry = logger.register_motor("/motor", FakeMotor(), velocity=True)
+        scheduler.register_motor(telemetry)
+
+        for _ in range(50):
+            scheduler.run()
+
+        calls = [call.args[0] for call in refresh_all.call_args_list]
+        assert calls.count(telemetry.primary_signals) == 50
+        assert calls.count(telemetry.secondary_signals) == 1
+
+
+class TestBenchmark:
+    """Compares the per-loop cost of the log_* methods and log handles.
+
+    Each loop logs primary data and two component values for every motor, like
+    the components do. Run with `-s` to see the timings.
+    """
+
+    LOOPS = 250
+    REPEATS = 5
+
+    @staticmethod
+    def _best_loop_us(run_loop) -> float:
+        best = float("inf")
+        for _ in range(TestBenchmark.REPEATS):
+            start = time.perf_counter()
+            for i in range(TestBenchmark.LOOPS):
+                run_loop(i)
+            best = min(best, time.perf_counter() - start)
+        return best / TestBenchmark.LOOPS * 1e6
+
+    def test_handles_are_faster(self, mocker, tmp_path):
+        # The fake signals don't need refreshing, and a mock would add more
+        # overhead than the logging we're measuring.
+        mocker.patch.object(
+            datalog.phoenix6.BaseStatusSignal,
+            "refresh_all",
+            lambda signals: None,
+        )
+        # This is the writer DataLogManager uses on the robot.
+        data_log = wpiutil.DataLogBackgroundWriter(
+            str(tmp_path), "benchmark.wpilog"
+        )
+        logger = datalog.DataLogger(data_log)
+        motors = [FakeMotor() for _ in range(NUM_MOTORS)]
+
+        def log_methods_loop(i: int) -> None:
+            for index, motor in enumerate(motors):
+                motor.set_values(i)
+                prefix = f"/components/motor_{index}"
+                logger.log_double(f"{prefix}/target", i, on_change=True)
+                logger.log_double(f"{prefix}/measured", i, on_change=True)
+                datalog.log_primary_motor_data(
+                    logger, f"{prefix}/motor", motor, velocity=True
+                )
+
+        handles = [
+            (
+                motor,
+                logger.register_double(f"/handles/motor_{index}/target"),
+                logger.register_double(f"/handles/motor_{index}/measured"),
+                logger.register_motor(
+                    f"/handles/motor_{index}/motor", motor, velocity=True
+                ),
+            )
+            for index, motor in enumerate(motors)
+        ]
+
+        def handles_loop(i: int) -> None:
+            for motor, target, measured, telemetry in handles:
+                motor.set_values(i)
+                target.update(i)
+                measured.update(i)
+                telemetry.log_primary()
+
+        log_methods_us = self._best_loop_us(log_methods_loop)
+        handles_us = self._best_loop_us(handles_loop)
+        print(
+            f"\nLogging {NUM_MOTORS} motors: log_* methods "
+            f"{log_methods_us:.1f}us/loop, handles {handles_us:.1f}us/loop"
+        )
+        data_log.stop()
+        assert handles_us < log_methods_us
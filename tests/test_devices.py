@@ -0,0 +1,248 @@
+import threading
+
+import phoenix6
+import pytest
+
+from common import devices
+
+OK = phoenix6.StatusCode.OK
+FAILED = phoenix6.StatusCode.CONFIG_FAILED
+
+
+def _make_device(mocker, device_id: int, statuses=()):
+    """Mock phoenix6 device that fails to apply configs with each of the given
+    statuses, then succeeds."""
+    device = mocker.Mock()
+    device.device_id = device_id
+    device.network.name = "Shooter"
+    remaining = list(statuses)
+    device.configurator.apply.side_effect = lambda config, timeout: (
+        remaining.pop(0) if remaining else OK
+    )
+    return device
+
+
+class TestDeviceConfigurator:
+    def test_applies_each_config(self, mocker, device_configurator):
+        motor = _make_device(mocker, 1)
+        encoder = _make_device(mocker, 2)
+        device_configurator.submit("motor", motor, "motor config")
+        device_configurator.submit("encoder", encoder, "encoder config")
+
+        results = device_configurator.apply()
+
+        motor.configurator.apply.assert_called_once_with(
+            "motor config", devices.DeviceConfigurator.TIMEOUT_SECONDS
+        )
+        encoder.configurator.apply.assert_called_once_with(
+            "encoder config", devices.DeviceConfigurator.TIMEOUT_SECONDS
+        )
+        assert [(result.name, result.ok) for result in results] == [
+            ("motor", True),
+            ("encoder", True),
+        ]
+
+    def test_applies_configs_of_a_device_in_order(
+        self, mocker, device_configurator
+    ):
+        motor = _make_device(mocker, 1)
+        device_configurator.submit("first", motor, 1)
+        device_configurator.submit("second", motor, 2)
+
+        device_configurator.apply()
+
+        assert [
+            call.args[0] for call in motor.configurator.apply.call_args_list
+        ] == [1, 2]
+
+    def test_configures_devices_concurrently(self, mocker, device_configurator):
+        """Each device waits for the other, so this only finishes if both are
+        configured at once."""
+        barrier = threading.Barrier(2, timeout=5.0)
+
+        def apply(config, timeout):
+            barrier.wait()
+            return OK
+
+        for i in range(2):
+            motor = _make_device(mocker, i)
+            motor.configurator.apply.side_effect = apply
+            device_configurator.submit("motor", motor, None)
+
+        results = device_configurator.apply()
+
+        assert all(result.ok for result in results)
+
+    def test_retries_failed_config(self, mocker, device_configurator):
+        motor = _make_device(mocker, 1, statuses=[FAILED])
+        device_configurator.submit("motor", motor, None)
+
+        (result,) = device_configurator.apply()
+
+        assert result.ok
+        assert result.attempts == 2
+
+    def test_reports_config_that_keeps_failing(
+        self, mocker, device_configurator, data_logger
+    ):
+        motor = _make_device(
+            mocker,
+            41,
+            statuses=[FAILED] * devices.DeviceConfigurator.MAX_ATTEMPTS,
+        )
+        device_configurator.submit("hood motor", motor, None)
+
+        (result,) = device_configurator.apply()
+
+        assert not result.ok
+        assert result.status == FAILED
+        assert (
+            motor.configurator.apply.call_count
+            == devices.DeviceConfigurator.MAX_ATTEMPTS
+        )
+        data_logger.log_string_array.assert_called_once_with(
+            "/devices/config/failures",
+            [f"hood motor (Mock 41 on 'Shooter'): {FAILED.name}"],
+        )
+
+    def test_runs_callbacks_after_applying(self, mocker, device_configurator):
+        motor = _make_device(mocker, 1)
+        calls = []
+        motor.configurator.apply.side_effect = lambda config, timeout: (
+            calls.append("apply") or OK
+        )
+        device_configurator.submit("motor", motor, None)
+        device_configurator.after_applied(lambda: calls.append("first"))
+        device_configurator.after_applied(lambda: calls.append("second"))
+
+        device_configurator.apply()
+
+        assert calls == ["apply", "first", "second"]
+
+    @pytest.mark.parametrize("times", [1, 2])
+    def test_applies_each_config_once(self, mocker, device_configurator, times):
+        motor = _make_device(mocker, 1)
+        callback = mocker.Mock()
+        device_configurator.submit("motor", motor, None)
+        device_configurator.after_applied(callback)
+
+        for _ in range(times):
+            device_configurator.apply()
+
+        motor.configurator.apply.assert_called_once()
+        callback.assert_called_once()
+
+
+def _config(k_p: float) -> phoenix6.configs.TalonFXConfiguration:
+    return phoenix6.configs.TalonFXConfiguration().with_slot0(
+        phoenix6.configs.Slot0Configs().with_k_p(k_p)
+    )
+
+
+def _make_configured_device(mocker, k_p: float):
+    """Mock TalonFX that reads back a configuration with the given gain."""
+    device = _make_device(mocker, 41)
+
+    def refresh(config, timeout):
+        config.slot0.k_p = k_p
+        return OK
+
+    device.configurator.refresh.side_effect = refresh
+    return device
+
+
+@pytest.fixture
+def store(tmp_path):
+    return devices.ConfigStore(str(tmp_path / "fingerprints.json"))
+
+
+class TestConfigStore:
+    def test_starts_empty(self, store):
+        assert store.get("hood motor") is None
+
+    def test_saves_fingerprints(self, tmp_path, store):
+        store.set("hood motor", "abc")
+        store.set("turret motor", "def")
+        store.set("turret motor", None)
+        store.save()
+
+        loaded = devices.ConfigStore(str(tmp_path / "fingerprints.json"))
+        assert loaded.get("hood motor") == "abc"
+        assert loaded.get("turret motor") is None
+
+    def test_ignores_corrupt_file(self, tmp_path):
+        path = tmp_path / "fingerprints.json"
+        path.write_text("{not json")
+
+        assert devices.ConfigStore(str(path)).get("hood motor") is None
+
+    def test_fingerprint_covers_every_value(self):
+        assert devices.fingerprint(_config(1.0)) == devices.fingerprint(
+            _config(1.0)
+        )
+        assert devices.fingerprint(_config(1.0)) != devices.fingerprint(
+            _config(2.0)
+        )
+
+
+class TestSkipUnchangedConfigs:
+    def _apply(self, device_configurator, store, device, config):
+        device_configurator.submit("hood motor", device, config)
+        (result,) = device_configurator.apply(store)
+        return result
+
+    def test_applies_new_config(self, mocker, device_configurator, store):
+        device = _make_configured_device(mocker, 1.0)
+
+        result = self._apply(device_configurator, store, device, _config(1.0))
+
+        assert not result.skipped
+        device.configurator.apply.assert_called_once()
+        assert store.get(result.key) == devices.fingerprint(_config(1.0))
+
+    def test_skips_unchanged_config(self, mocker, device_configurator, store):
+        device = _make_configured_device(mocker, 1.0)
+        self._apply(device_configurator, store, device, _config(1.0))
+        device.configurator.apply.reset_mock()
+
+        result = self._apply(device_configurator, store, device, _config(1.0))
+
+        assert result.skipped
+        assert result.ok
+        device.configurator.apply.assert_not_called()
+
+    def test_applies_changed_config(self, mocker, device_configurator, store):
+        device = _make_configured_device(mocker, 1.0)
+        self._apply(device_configurator, store, device, _config(1.0))
+        device.configurator.apply.reset_mock()
+
+        result = self._apply(device_configurator, store, device, _config(2.0))
+
+        assert not result.skipped
+        device.configurator.apply.assert_called_once()
+
+    def test_applies_config_changed_on_device(
+        self, mocker, device_configurator, store
+    ):
+        """Someone changed the gain with Phoenix Tuner since the last boot."""
+        self._apply(
+            device_configurator,
+            store,
+            _make_configured_device(mocker, 1.0),
+            _config(1.0),
+        )
+        device = _make_configured_device(mocker, 3.0)
+
+        result = self._apply(device_configurator, store, device, _config(1.0))
+
+        assert not result.skipped
+        device.configurator.apply.assert_called_once()
+
+    def test_forgets_failed_config(self, mocker, device_configurator, store):
+        device = _make_configured_device(mocker, 1.0)
+        result = self._apply(device_configurator, store, device, _config(1.0))
+        device.configurator.apply.side_effect = lambda config, timeout: FAILED
+
+        self._apply(device_configurator, store, device, _config(2.0))
+
+        assert store.get(result.key) is None
@@ -0,0 +1,44 @@
+import pytest
+
+from subsystem.drivetrain import drivetrain
+
+
+@pytest.fixture
+def drive(mocker):
+    """Drivetrain with a mock swerve drive, without calling setup()."""
+    d = drivetrain.Drivetrain()
+    d.swerve_drive = mocker.Mock()
+    d.swerve_drive.get_state_copy.side_effect = lambda: mocker.Mock()
+    d.clear_state()
+    return d
+
+
+class TestStateSnapshot:
+    def test_one_copy_per_loop(self, drive):
+        """Every read in a loop sees the same state."""
+        pose = drive.get_robot_pose()
+        speeds = drive.robot_speeds()
+        drive.estimated_yaw_degrees()
+
+        assert drive.get_robot_pose() is pose
+        assert drive.robot_speeds() is speeds
+        drive.swerve_drive.get_state_copy.assert_called_once()
+
+    def test_clear_state_takes_new_snapshot(self, drive):
+        first = drive.state()
+        drive.clear_state()
+
+        assert drive.state() is not first
+        assert drive.swerve_drive.get_state_copy.call_count == 2
+
+    def test_fresh_state_keeps_snapshot(self, drive):
+        snapshot = drive.state()
+
+        assert drive.fresh_state() is not snapshot
+        assert drive.state() is snapshot
+
+    def test_set_pose_clears_snapshot(self, mocker, drive):
+        snapshot = drive.state()
+        drive.set_pose(mocker.Mock())
+
+        assert drive.state() is not snapshot
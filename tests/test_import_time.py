@@ -0,0 +1,93 @@
+import os
+import re
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Most time importing each module may take, in milliseconds, including the
+# modules it imports. These are a few times what they take on a laptop, with
+# no cached bytecode, so they only catch big regressions, like importing a
+# large library or doing real work at import time.
+IMPORT_BUDGET_MS: Dict[str, float] = {
+    "robot": 1500.0,
+    "constants": 50.0,
+    "autonomous.trajectories": 300.0,
+    "common.datalog": 50.0,
+    "subsystem.drivetrain": 250.0,
+    "subsystem.intake": 100.0,
+    "subsystem.shooter": 250.0,
+}
+
+# Modules only tunerbot.py needs, which the competition robot shouldn't import.
+TUNING_MODULES = (
+    "commands2.sysid",
+    "subsystem.drivetrain.tuners",
+    "subsystem.intake.tuners",
+    "subsystem.shooter.tuners",
+)
+
+_IMPORT_TIME_LINE = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$", re.MULTILINE
+)
+
+
+def _import_times_ms(module: str) -> Dict[str, float]:
+    """Imports a module in a new interpreter, and returns how long importing
+    each module took, in milliseconds, including the modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    return {
+        name: int(cumulative_us) / 1e3
+        for _, cumulative_us, _, name in _IMPORT_TIME_LINE.findall(
+            result.stderr
+        )
+    }
+
+
+@pytest.fixture(scope="module")
+def robot_import_times() -> Dict[str, float]:
+    return _import_times_ms("robot")
+
+
+def test_import_time_budget(robot_import_times):
+    own_modules = sorted(
+        (
+            (name, ms)
+            for name, ms in robot_import_times.items()
+            if name.split(".")[0]
+            in ("robot", "constants", "autonomous", "common", "subsystem")
+        ),
+        key=lambda item: -item[1],
+    )
+    print("\nImport time of robot.py, including imported modules:")
+    for name, ms in own_modules:
+        print(f"  {ms:8.1f}ms {name}")
+
+    over_budget = {
+        name: robot_import_times[name]
+        for name, budget_ms in IMPORT_BUDGET_MS.items()
+        if robot_import_times.get(name, 0.0) > budget_ms
+    }
+    assert not over_budget
+
+
+def test_robot_does_not_import_tuning_modules(robot_import_times):
+    assert [
+        module for module in TUNING_MODULES if module in robot_import_times
+    ] == []
+
+
+def test_tunerbot_imports_tuners():
+    import_times = _import_times_ms("tunerbot")
+
+    assert all(module in import_times for module in TUNING_MODULES)
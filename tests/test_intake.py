@@ -61,14 +61,20 @@ def mock_bottom_motor():
 
 
 @pytest.fixture
-def intake(mock_constants, mock_top_motor, mock_bottom_motor):
+def intake(
+    mock_constants, mock_top_motor, mock_bottom_motor, device_configurator
+):
     """Fresh Intake instance with mocks injected and setup() already called."""
     component = Intake()
     component.robot_constants = mock_constants
     component.intake_roller_top_motor = mock_top_motor
     component.intake_roller_bottom_motor = mock_bottom_motor
     component.data_logger = mock.MagicMock()
+    component.can_bus_planner = mock.MagicMock()
+    component.telemetry_scheduler = mock.MagicMock()
+    component.device_configurator = device_configurator
     component.setup()
+    device_configurator.apply()
     return component
 
 
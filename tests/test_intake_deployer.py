@@ -57,7 +57,11 @@ def mock_intake():
 
 @pytest.fixture
 def deployer(
-    mock_constants, mock_deploy_motor, mock_deploy_encoder, mock_intake
+    mock_constants,
+    mock_deploy_motor,
+    mock_deploy_encoder,
+    mock_intake,
+    device_configurator,
 ):
     """Fresh IntakeDeployer with mocks injected and setup() called."""
     d = intake.IntakeDeployer()
@@ -66,9 +70,15 @@ def deployer(
     d.intake_deploy_encoder = mock_deploy_encoder
     d.intake = mock_intake
     d.data_logger = mock.MagicMock()
+    d.signal_hub = mock.MagicMock()
+    d.can_bus_planner = mock.MagicMock()
+    d.telemetry_scheduler = mock.MagicMock()
+    d.device_configurator = device_configurator
+    d.signal_hub.register.side_effect = lambda device, signal, **kwargs: signal
     d.logger = logging.getLogger("IntakeDeployer")
     magic_tunable.setup_tunables(d, "intake_deployer")
     d.setup()
+    device_configurator.apply()
     return d
 
 
@@ -0,0 +1,42 @@
+import pytest
+
+import match_sim
+import robot
+from subsystem.intake import intake
+
+# A short match, with a couple of seconds of each mode.
+SHORT_MATCH = (
+    match_sim.MatchPhase("pre-match", 0.5, autonomous=True, enabled=False),
+    match_sim.MatchPhase("autonomous", 2.0, True, True, 20.0),
+    match_sim.MatchPhase("teleop", 3.0, False, True, 140.0),
+)
+
+
+def test_controller_input_rejects_unknown_buttons():
+    with pytest.raises(ValueError):
+        match_sim.ControllerInput(0.0, buttons=frozenset({"Z"}))
+
+
+def test_simulates_match_faster_than_real_time(mocker):
+    toggle_active = mocker.spy(intake.Intake, "toggle_active")
+    simulator = match_sim.MatchSimulator(
+        robot.MyRobot,
+        phases=SHORT_MATCH,
+        driver_script=[
+            # Press the intake button in teleop.
+            match_sim.ControllerInput(3.0, buttons=frozenset({"RightBumper"})),
+            match_sim.ControllerInput(3.5, left_y=-1.0),
+        ],
+    )
+
+    result = simulator.run()
+
+    print(
+        f"\nSimulated {result.simulated_seconds:.1f}s in "
+        f"{result.wall_seconds:.2f}s ({result.speedup:.1f}x real time)"
+    )
+    assert result.ok, result.error
+    assert result.loops == 275
+    assert result.simulated_seconds == pytest.approx(5.5)
+    assert result.speedup > 1.0
+    toggle_active.assert_called_once()
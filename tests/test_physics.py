@@ -0,0 +1,102 @@
+import contextlib
+from typing import Callable, Iterator
+
+import pytest
+from wpilib.simulation import XboxControllerSim
+
+
+@pytest.fixture(autouse=True)
+def real_time(monkeypatch):
+    """Simulate in real time, so the simulated devices' control loops keep up
+    with the mechanisms."""
+    monkeypatch.setenv("PHYSICS_REAL_TIME", "1")
+
+
+@contextlib.contextmanager
+def _run_robot(control) -> Iterator[None]:
+    """Run the robot, starting with a few disabled loops.
+
+    Enabling the robot during its first disabled loop can hang the simulated
+    HAL's step_timing().
+    """
+    with control.run_robot():
+        control.step_timing(seconds=0.1, autonomous=False, enabled=False)
+        yield
+
+
+def _step_teleop(control, seconds: float) -> float:
+    return control.step_timing(seconds=seconds, autonomous=False, enabled=True)
+
+
+def _step_teleop_until(
+    control, condition: Callable[[], bool], seconds: float, message: str
+) -> None:
+    """Step teleop until a condition holds.
+
+    The robot's teleop loop can start a little after simulated time does, so
+    tests wait for what they check rather than for a fixed time.
+    """
+    elapsed = 0.0
+    while not condition():
+        assert elapsed < seconds, message
+        elapsed += _step_teleop(control, 0.1)
+
+
+def test_flywheel_spins_up(control, robot):
+    def at_speed() -> bool:
+        return robot.flywheel.measured_speed_rps() == pytest.approx(
+            robot.robot_constants.shooter.flywheel.default_speed_rps, abs=1.0
+        )
+
+    with _run_robot(control):
+        _step_teleop_until(
+            control, at_speed, 4.0, "The flywheel didn't spin up"
+        )
+        # It stays at speed.
+        _step_teleop(control, 1.0)
+
+        assert at_speed()
+
+
+def test_turret_tracks_target(control, robot):
+    def on_target() -> bool:
+        return robot.turret.measured_angle_degrees() == pytest.approx(
+            robot.target_tracker.target_turret_angle_degrees(), abs=1.0
+        )
+
+    with _run_robot(control):
+        _step_teleop_until(
+            control, on_target, 3.0, "The turret didn't reach its target"
+        )
+        # It stays on target.
+        _step_teleop(control, 1.0)
+
+        assert on_target()
+
+
+def test_intake_deploys(control, robot):
+    with _run_robot(control):
+        _step_teleop_until(
+            control,
+            robot.intake_deployer.has_deployed,
+            4.0,
+            "The intake didn't deploy",
+        )
+
+
+def test_shooter_gets_ready_to_shoot(control, robot):
+    controller = XboxControllerSim(0)
+    with _run_robot(control):
+        _step_teleop(control, 0.2)
+        # Shoot from behind the tower.
+        controller.setAButton(True)
+        _step_teleop_until(
+            control,
+            lambda: robot.shooter_state_machine.current_state == "shooting",
+            5.0,
+            "The shooter didn't get ready",
+        )
+
+        assert robot.hood.measured_angle_degrees() == pytest.approx(
+            robot.target_tracker.target_hood_angle_degrees(), abs=3.0
+        )
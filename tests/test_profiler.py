@@ -0,0 +1,173 @@
+import pytest
+
+from common import datalog, profiler
+
+
+class FakeClock:
+    """Stand-in for the FPGA clock, in microseconds."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance_ms(self, ms: float) -> None:
+        self.now += int(ms * 1000)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def loop_profiler(clock, data_logger):
+    """LoopProfiler with a 20ms budget, a fake clock and a mocked logger."""
+    p = profiler.LoopProfiler(0.02, data_logger, window_size=10)
+    p._get_time = clock
+    return p
+
+
+def _run_loop(loop_profiler, clock, epochs) -> None:
+    """Simulate one MagicRobot loop with the given (name, ms) epochs."""
+    loop_profiler.reset()
+    for name, duration_ms in epochs:
+        clock.advance_ms(duration_ms)
+        loop_profiler.addEpoch(name)
+    loop_profiler.printIfExpired()
+
+
+class TestEpochStats:
+    def test_empty_window_is_zero(self):
+        """No samples gives zero for all statistics."""
+        stats = profiler._EpochStats("turret", 10, datalog.DataLogger())
+        assert stats.percentiles_ms() == (0.0, 0.0, 0.0, 0.0)
+
+    def test_percentiles(self):
+        """Percentiles use the nearest rank over the recorded samples."""
+        stats = profiler._EpochStats("turret", 100, datalog.DataLogger())
+        for duration_us in range(1000, 101000, 1000):
+            stats.record(duration_us)
+        p50, p95, p99, maximum = stats.percentiles_ms()
+        assert p50 == pytest.approx(51.0)
+        assert p95 == pytest.approx(96.0)
+        assert p99 == pytest.approx(100.0)
+        assert maximum == pytest.approx(100.0)
+
+    def test_window_rolls_over(self):
+        """Old samples drop out once the window is full."""
+        stats = profiler._EpochStats("turret", 3, datalog.DataLogger())
+        for duration_us in (9000, 1000, 1000, 1000):
+            stats.record(duration_us)
+        assert stats.percentiles_ms()[3] == pytest.approx(1.0)
+
+    def test_topic_names_are_sanitized(self):
+        """Epoch names are turned into clean topic names."""
+        data_logger = datalog.DataLogger()
+        assert (
+            profiler._EpochStats("robotPeriodic()", 1, data_logger)
+            .p95_log.topic_name
+            == "/profiler/robotPeriodic/p95_ms"
+        )
+        assert (
+            profiler._EpochStats("@magicbot.feedback", 1, data_logger)
+            .max_log.topic_name
+            == "/profiler/magicbot_feedback/max_ms"
+        )
+        assert (
+            profiler._EpochStats("auto on_iteration", 1, data_logger)
+            .p50_log.topic_name
+            == "/profiler/auto_on_iteration/p50_ms"
+        )
+
+
+class TestLoopProfiler:
+    def test_records_each_epoch(self, loop_profiler, clock):
+        """Every epoch gets its own duration statistics."""
+        _run_loop(
+            loop_profiler,
+            clock,
+            [("teleopPeriodic()", 1.0), ("vision", 4.0), ("turret", 2.0)],
+        )
+        assert loop_profiler.percentiles_ms("vision")[3] == pytest.approx(4.0)
+        assert loop_profiler.percentiles_ms("turret")[3] == pytest.approx(2.0)
+        assert loop_profiler.percentiles_ms(
+            "teleopPeriodic()"
+        )[3] == pytest.approx(1.0)
+        assert loop_profiler.percentiles_ms(
+            profiler.LOOP_EPOCH_NAME
+        )[3] == pytest.approx(7.0)
+
+    def test_unknown_epoch_is_zero(self, loop_profiler):
+        """Epochs we've never seen report zeros."""
+        assert loop_profiler.percentiles_ms("flywheel") == (0.0, 0.0, 0.0, 0.0)
+
+    def test_no_overrun_within_budget(self, loop_profiler, clock):
+        """Loops within budget are not counted as overruns."""
+        _run_loop(loop_profiler, clock, [("vision", 5.0), ("turret", 5.0)])
+        assert loop_profiler.overrun_count() == 0
+        assert loop_profiler.last_overrun_culprit() is None
+
+    def test_overrun_blames_slowest_epoch(
+        self, loop_profiler, clock, data_logger
+    ):
+        """On overrun, the slowest epoch of that loop is blamed."""
+        _run_loop(
+            loop_profiler,
+            clock,
+            [("teleopPeriodic()", 2.0), ("vision", 15.0), ("turret", 6.0)],
+        )
+        assert loop_profiler.overrun_count() == 1
+        assert loop_profiler.last_overrun_culprit() == "vision"
+        data_logger.handles[
+            "/profiler/overrun_culprit"
+        ].append.assert_called_with("vision")
+
+    def test_logs_loop_time_every_loop(
+        self, loop_profiler, clock, data_logger
+    ):
+        """The total loop time is appended to the log every loop."""
+        _run_loop(loop_profiler, clock, [("vision", 3.0)])
+        data_logger.handles["/profiler/loop_ms"].append.assert_any_call(3.0)
+
+    def test_logs_one_epoch_per_publish_period(
+        self, loop_profiler, clock, data_logger
+    ):
+        """Statistics are logged for one epoch at a time, in round robin order."""
+        epochs = [("vision", 1.0), ("turret", 1.0)]
+        for _ in range(3 * profiler.LoopProfiler.PUBLISH_PERIOD_LOOPS):
+            _run_loop(loop_profiler, clock, epochs)
+        logged_topics = [
+            topic_name
+            for topic_name, _ in data_logger.logged
+            if topic_name.endswith("/p95_ms")
+        ]
+        assert logged_topics == [
+            "/profiler/vision/p95_ms",
+            "/profiler/turret/p95_ms",
+            "/profiler/loop/p95_ms",
+        ]
+
+    def test_remaining_time_leaves_room_for_rest_of_loop(
+        self, loop_profiler, clock
+    ):
+        """The time left excludes the longest time the rest of the loop took
+        after the tracked epoch."""
+        loop_profiler.track_time_after("signal_hub")
+        _run_loop(
+            loop_profiler,
+            clock,
+            [("signal_hub", 2.0), ("vision", 6.0), ("turret", 2.0)],
+        )
+        _run_loop(loop_profiler, clock, [("signal_hub", 2.0), ("vision", 3.0)])
+
+        loop_profiler.reset()
+        clock.advance_ms(1.0)
+
+        # 20ms budget, 1ms into the loop, and the rest took up to 8ms.
+        assert loop_profiler.remaining_seconds() == pytest.approx(0.011)
+
+    def test_is_a_simple_watchdog(self, loop_profiler):
+        """The autonomous mode selector relies on this being a SimpleWatchdog."""
+        assert isinstance(loop_profiler, profiler.SimpleWatchdog)
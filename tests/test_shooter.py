@@ -113,6 +113,7 @@ def shooter_sm(
     sm.indexer = mock_indexer
     sm.drivetrain = mock_drivetrain
     sm.target_tracker = mock_hub_tracker
+    sm.data_logger = mock.MagicMock()
     # Provide a logger mock to avoid AttributeError
     sm.logger = mock.MagicMock()
     # Initialize magicbot tunables for state machine
@@ -0,0 +1,84 @@
+import math
+
+import pytest
+
+from subsystem.shooter import shot_grid, target_tracker
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return shot_grid.build_default()
+
+
+def test_deployed_grid_is_up_to_date(grid):
+    """The grid in deploy/ matches the current targets and shot table.
+
+    If this fails, rebuild it with `python -m subsystem.shooter.shot_grid`.
+    """
+    deployed = shot_grid.ShotGrid.load(shot_grid.default_path())
+
+    assert deployed.cell_size_meters == grid.cell_size_meters
+    assert (deployed.columns, deployed.rows) == (grid.columns, grid.rows)
+    assert deployed.target_count == len(
+        target_tracker.TargetTracker.TARGET_POSITIONS
+    )
+    assert deployed._values == grid._values
+
+
+def test_save_and_load_round_trip(grid, tmp_path):
+    path = str(tmp_path / "grid.bin")
+    grid.save(path)
+
+    loaded = shot_grid.ShotGrid.load(path)
+
+    assert loaded.lookup(0, 3.3, 2.1) == grid.lookup(0, 3.3, 2.1)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "grid.bin"
+    path.write_bytes(b"not a shot grid, but long enough")
+
+    with pytest.raises(ValueError):
+        shot_grid.ShotGrid.load(str(path))
+
+
+@pytest.mark.parametrize("target_index", range(6))
+@pytest.mark.parametrize(
+    "x, y",
+    [(1.1, 0.4), (3.37, 6.9), (8.27, 4.03), (12.9, 2.61), (15.8, 7.7)],
+)
+def test_lookup_matches_exact_solution(grid, target_index, x, y):
+    target_x, target_y = target_tracker.TargetTracker.TARGET_POSITIONS[
+        target_index
+    ]
+    distance = math.hypot(target_x - x, target_y - y)
+    if distance < 1.5:
+        pytest.skip("Too close to the target to shoot")
+    hood_angle, flywheel_speed = target_tracker.ShotTable.get(distance)
+
+    shot = grid.lookup(target_index, x, y)
+
+    bearing_error = math.remainder(
+        shot.bearing_radians - math.atan2(target_y - y, target_x - x),
+        math.tau,
+    )
+    assert math.degrees(bearing_error) == pytest.approx(0.0, abs=0.25)
+    assert shot.distance_meters == pytest.approx(distance, abs=0.01)
+    assert shot.hood_angle_degrees == pytest.approx(hood_angle, abs=0.1)
+    assert shot.flywheel_speed_rps == pytest.approx(flywheel_speed, abs=0.1)
+
+
+def test_lookup_interpolates_across_bearing_wraparound():
+    """Bearings of -pi and pi are interpolated as the same direction."""
+    grid = shot_grid.ShotGrid.build(
+        [(0.0, 2.5)], target_tracker.ShotTable.get, cell_size_meters=1.0
+    )
+
+    # Halfway between grid points just above and just below the target.
+    shot = grid.lookup(0, 5.0, 2.5)
+
+    assert abs(shot.bearing_radians) == pytest.approx(math.pi)
+
+
+def test_lookup_clamps_to_field(grid):
+    assert grid.lookup(0, -3.0, -1.0) == grid.lookup(0, 0.0, 0.0)
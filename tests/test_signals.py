@@ -0,0 +1,217 @@
+import logging
+import types
+from unittest import mock
+
+import pytest
+
+from common import signals
+
+
+def _make_device(mocker, bus_name: str):
+    """Mock phoenix6 device on the given CAN bus."""
+    device = mocker.Mock()
+    device.network = types.SimpleNamespace(name=bus_name)
+    return device
+
+
+def _make_signal(mocker, name: str = "Position"):
+    """Mock StatusSignal with the given name."""
+    signal = mocker.Mock()
+    signal.name = name
+    return signal
+
+
+@pytest.fixture
+def hub(data_logger):
+    """SignalHub with setup() called."""
+    h = signals.SignalHub()
+    h.logger = logging.getLogger("signal_hub")
+    h.data_logger = data_logger
+    h.can_bus_planner = mock.Mock()
+    h.setup()
+    return h
+
+
+@pytest.fixture
+def refresh_all(mocker):
+    return mocker.patch.object(signals.phoenix6.BaseStatusSignal, "refresh_all")
+
+
+@pytest.fixture
+def wait_for_all(mocker):
+    return mocker.patch.object(
+        signals.phoenix6.BaseStatusSignal,
+        "wait_for_all",
+        return_value=signals.phoenix6.StatusCode.OK,
+    )
+
+
+class TestRegister:
+    def test_returns_signal(self, mocker, hub):
+        """register() hands back the signal it was given."""
+        signal = _make_signal(mocker)
+        assert hub.register(_make_device(mocker, "rio"), signal) is signal
+
+    def test_refreshes_on_register(self, mocker, hub):
+        """Signals are refreshed once when registered."""
+        signal = _make_signal(mocker)
+        hub.register(_make_device(mocker, "rio"), signal)
+        signal.refresh.assert_called_once()
+
+    def test_duplicate_registration_is_ignored(self, mocker, hub, refresh_all):
+        """A signal shared by two components is only refreshed once per loop."""
+        device = _make_device(mocker, "Drivetrain")
+        signal = _make_signal(mocker)
+        hub.register(device, signal)
+        hub.register(device, signal)
+        hub.refresh()
+        refresh_all.assert_called_once_with([signal])
+
+
+class TestRefresh:
+    def test_one_refresh_per_bus(self, mocker, hub, refresh_all):
+        """Signals are refreshed in one call per CAN bus."""
+        rio = _make_device(mocker, "rio")
+        canivore = _make_device(mocker, "Shooter")
+        rio_signals = [_make_signal(mocker), _make_signal(mocker)]
+        canivore_signals = [
+            _make_signal(mocker),
+            _make_signal(mocker),
+            _make_signal(mocker),
+        ]
+        for signal in rio_signals:
+            hub.register(rio, signal)
+        for signal in canivore_signals:
+            hub.register(canivore, signal)
+
+        hub.execute()
+
+        assert refresh_all.call_count == 2
+        refresh_all.assert_any_call(rio_signals)
+        refresh_all.assert_any_call(canivore_signals)
+
+    def test_no_signals(self, hub, refresh_all):
+        """Refreshing with nothing registered doesn't touch the CAN bus."""
+        hub.refresh()
+        refresh_all.assert_not_called()
+
+    def test_records_refresh_time(self, mocker, hub, refresh_all):
+        """The time of the latest refresh is recorded."""
+        mocker.patch.object(
+            signals.wpilib.Timer, "getFPGATimestamp", return_value=12.5
+        )
+        hub.refresh()
+        assert hub.refresh_timestamp() == 12.5
+
+
+class TestSynchronous:
+    def test_not_waiting_by_default(
+        self, mocker, hub, refresh_all, wait_for_all
+    ):
+        """Synchronous signals are just refreshed unless the mode is on."""
+        signal = _make_signal(mocker)
+        hub.register(_make_device(mocker, "Shooter"), signal, synchronous=True)
+        hub.refresh()
+        wait_for_all.assert_not_called()
+        refresh_all.assert_called_once_with([signal])
+
+    def test_waits_then_refreshes_the_rest(
+        self, mocker, hub, refresh_all, wait_for_all
+    ):
+        """In synchronous mode, we wait on the synchronous signals only."""
+        shooter = _make_device(mocker, "Shooter")
+        turret_position = _make_signal(mocker)
+        motor_current = _make_signal(mocker)
+        hub.register(shooter, turret_position, synchronous=True)
+        hub.register(shooter, motor_current)
+        hub.set_synchronous(True)
+
+        hub.refresh()
+
+        wait_for_all.assert_called_once_with(
+            hub.SYNCHRONOUS_TIMEOUT_SECONDS,
+            [turret_position],
+            report_error=False,
+        )
+        refresh_all.assert_called_once_with([motor_current])
+
+    def test_waits_on_bus_with_most_signals(
+        self, mocker, hub, refresh_all, wait_for_all
+    ):
+        """Signals on other buses are refreshed without waiting."""
+        shooter = _make_device(mocker, "Shooter")
+        swerve = _make_device(mocker, "swerve")
+        yaw_rate = _make_signal(mocker)
+        shooter_signals = [_make_signal(mocker), _make_signal(mocker)]
+        hub.register(swerve, yaw_rate, synchronous=True)
+        for signal in shooter_signals:
+            hub.register(shooter, signal, synchronous=True)
+        hub.set_synchronous(True)
+
+        hub.refresh()
+
+        assert wait_for_all.call_args.args[1] == shooter_signals
+        refresh_all.assert_called_once_with([yaw_rate])
+
+    def test_wait_leaves_time_for_rest_of_loop(
+        self, mocker, hub, refresh_all, wait_for_all
+    ):
+        """The wait is cut short by the time the rest of the loop needs."""
+        signal = _make_signal(mocker)
+        hub.register(_make_device(mocker, "Shooter"), signal, synchronous=True)
+        loop_profiler = mocker.Mock()
+        loop_profiler.remaining_seconds.return_value = 0.007
+        hub.set_synchronous(True, loop_profiler)
+
+        hub.refresh()
+
+        wait_for_all.assert_called_once_with(
+            pytest.approx(0.007 - hub.SYNCHRONOUS_MARGIN_SECONDS),
+            [signal],
+            report_error=False,
+        )
+
+    def test_no_wait_when_loop_is_behind(
+        self, mocker, hub, refresh_all, wait_for_all
+    ):
+        """Without time left to wait, synchronous signals are refreshed."""
+        signal = _make_signal(mocker)
+        hub.register(_make_device(mocker, "Shooter"), signal, synchronous=True)
+        loop_profiler = mocker.Mock()
+        loop_profiler.remaining_seconds.return_value = 0.001
+        hub.set_synchronous(True, loop_profiler)
+
+        hub.refresh()
+
+        wait_for_all.assert_not_called()
+        refresh_all.assert_called_once_with([signal])
+
+    def test_counts_timeouts(self, mocker, hub, refresh_all, wait_for_all):
+        """Waits that time out are counted and logged."""
+        wait_for_all.return_value = signals.phoenix6.StatusCode.RX_TIMEOUT
+        hub.register(
+            _make_device(mocker, "Shooter"),
+            _make_signal(mocker),
+            synchronous=True,
+        )
+        hub.set_synchronous(True)
+
+        hub.refresh()
+
+        hub.data_logger.handles[
+            "/signal_hub/wait_timeouts"
+        ].update.assert_called_once_with(1)
+
+    def test_disable_stops_waiting(
+        self, mocker, hub, refresh_all, wait_for_all
+    ):
+        """Turning synchronous mode off goes back to plain refreshes."""
+        signal = _make_signal(mocker)
+        hub.register(_make_device(mocker, "Shooter"), signal, synchronous=True)
+        hub.set_synchronous(True)
+        hub.set_synchronous(False)
+
+        hub.refresh()
+
+        wait_for_all.assert_not_called()
+        refresh_all.assert_called_once_with([signal])
@@ -1,5 +1,10 @@
+import bisect
+import math
+import time
 import types
+from typing import Tuple
 
+import numpy
 import pytest
 from wpimath import geometry
 
@@ -73,6 +78,224 @@ class TestShotTable:
         )
 
 
+class TestShotTableArrays:
+    DISTANCES = (0.0, 2.25, 2.4, 2.75, 3.1, 3.75, 4.0, 4.9, 5.25, 7.0)
+
+    @pytest.fixture(params=[False, True], ids=["linear", "cubic"])
+    def monotone_cubic(self, request, mocker):
+        mocker.patch.object(
+            target_tracker.ShotTable, "MONOTONE_CUBIC", request.param
+        )
+        return request.param
+
+    def test_matches_scalar_lookup(self, monotone_cubic):
+        hood, flywheel, tof = target_tracker.ShotTable.lookup_array(
+            numpy.array(self.DISTANCES)
+        )
+
+        for i, distance in enumerate(self.DISTANCES):
+            assert (hood[i], flywheel[i], tof[i]) == pytest.approx(
+                target_tracker.ShotTable.lookup(distance), abs=1e-9
+            )
+
+    def test_keeps_shape(self, monotone_cubic):
+        distances = numpy.linspace(2.0, 6.0, 12).reshape(3, 4)
+
+        hood, flywheel = target_tracker.ShotTable.get_array(distances)
+
+        assert hood.shape == flywheel.shape == (3, 4)
+        assert hood[1, 2] == pytest.approx(
+            target_tracker.ShotTable.get(distances[1, 2])[0]
+        )
+
+
+class TestShotTableMonotoneCubic:
+    @pytest.fixture(autouse=True)
+    def monotone_cubic(self, mocker):
+        mocker.patch.object(target_tracker.ShotTable, "MONOTONE_CUBIC", True)
+
+    def test_passes_through_table_points(self):
+        for distance, hood, flywheel, tof in target_tracker.ShotTable._TABLE:
+            assert target_tracker.ShotTable.lookup(distance) == pytest.approx(
+                (hood, flywheel, tof)
+            )
+
+    def test_is_monotone(self):
+        """Like the table, the curves never decrease with distance."""
+        hood, flywheel, tof = target_tracker.ShotTable.lookup_array(
+            numpy.linspace(2.25, 5.25, 1001)
+        )
+
+        for values in (hood, flywheel, tof):
+            assert numpy.all(numpy.diff(values) >= 0.0)
+
+    def test_slope_is_continuous_at_table_points(self):
+        """Unlike linear interpolation, the flywheel slope doesn't jump."""
+        step = 1e-6
+        for distance in target_tracker.ShotTable._DISTANCES[1:-1]:
+            _, below = target_tracker.ShotTable.get(distance - step)
+            _, at = target_tracker.ShotTable.get(distance)
+            _, above = target_tracker.ShotTable.get(distance + step)
+            assert (above - at) / step == pytest.approx(
+                (at - below) / step, rel=1e-3
+            )
+
+
+def _previous_shot_table_lookup(
+    distance_meters: float,
+) -> Tuple[float, float, float]:
+    """ShotTable.lookup before it had a cubic mode, for comparison."""
+    table = target_tracker.ShotTable._TABLE
+    if distance_meters <= table[0][0]:
+        return table[0][1], table[0][2], table[0][3]
+    if distance_meters >= table[-1][0]:
+        return table[-1][1], table[-1][2], table[-1][3]
+
+    idx = (
+        bisect.bisect_left(target_tracker.ShotTable._DISTANCES, distance_meters)
+        - 1
+    )
+
+    d1, h1, f1, t1 = table[idx]
+    d2, h2, f2, t2 = table[idx + 1]
+
+    fraction = (distance_meters - d1) / (d2 - d1)
+    hood_angle = h1 + fraction * (h2 - h1)
+    flywheel_speed = f1 + fraction * (f2 - f1)
+    time_of_flight = t1 + fraction * (t2 - t1)
+
+    return hood_angle, flywheel_speed, time_of_flight
+
+
+def _previous_shot_table_get(distance_meters: float) -> Tuple[float, float]:
+    """ShotTable.get before it had a cubic mode, for comparison."""
+    hood_angle, flywheel_speed, _ = _previous_shot_table_lookup(distance_meters)
+    return hood_angle, flywheel_speed
+
+
+class TestShotTableBenchmark:
+    """Times the scalar and array lookups. Run with `-s` to see the timings."""
+
+    DISTANCES = [2.0 + i * 0.0037 for i in range(1000)]
+    REPEATS = 5
+
+    @classmethod
+    def _best_ns_per_distance(cls, run) -> float:
+        """Best time of run(), which looks up all the distances, over
+        REPEATS runs, per distance."""
+        best = float("inf")
+        for _ in range(cls.REPEATS):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return best / len(cls.DISTANCES) * 1e9
+
+    @classmethod
+    def _best_call_ns(cls, get) -> float:
+        def run():
+            for distance in cls.DISTANCES:
+                get(distance)
+
+        return cls._best_ns_per_distance(run)
+
+    def test_scalar_get_is_not_slower(self):
+        # Alternate between the two, so load from other processes slows both
+        # down alike.
+        previous = current = float("inf")
+        for _ in range(self.REPEATS):
+            previous = min(
+                previous, self._best_call_ns(_previous_shot_table_get)
+            )
+            current = min(
+                current, self._best_call_ns(target_tracker.ShotTable.get)
+            )
+        print(f"\nShotTable.get: {current:.0f}ns, previously {previous:.0f}ns")
+        # Allow some noise, since the timings are short.
+        assert current < previous * 1.1
+
+    def test_array_is_faster_than_scalar(self):
+        distances = numpy.array(self.DISTANCES)
+        scalar = self._best_call_ns(target_tracker.ShotTable.get)
+        array = self._best_ns_per_distance(
+            lambda: target_tracker.ShotTable.get_array(distances)
+        )
+        print(f"\nShotTable.get_array: {array:.0f}ns per distance")
+        assert array < scalar
+
+
+class TestMovingShotSolver:
+    def test_stationary_shot_matches_table(self):
+        shot = target_tracker.solve_moving_shot(3.0, 4.0, 0.0, 0.0, 0.0)
+
+        assert shot.converged
+        assert shot.iterations == 1
+        assert shot.distance_meters == pytest.approx(5.0)
+        assert (
+            shot.hood_angle_degrees,
+            shot.flywheel_speed_rps,
+        ) == target_tracker.ShotTable.get(5.0)
+        assert shot.turret_angle_degrees == pytest.approx(
+            math.degrees(math.atan2(4.0, 3.0))
+        )
+
+    def test_turret_angle_is_relative_to_heading(self):
+        shot = target_tracker.solve_moving_shot(
+            -3.0, 0.0, 0.0, 0.0, math.radians(170.0)
+        )
+
+        assert shot.turret_angle_degrees == pytest.approx(10.0)
+
+    def test_moving_shot_is_self_consistent(self):
+        """The virtual target is offset by the time of flight to itself."""
+        shot = target_tracker.solve_moving_shot(3.0, 1.0, 1.5, -2.0, 0.0)
+
+        assert shot.converged
+        assert shot.iterations <= target_tracker.MOVING_SHOT_MAX_ITERATIONS
+        time_of_flight = target_tracker.ShotTable.get_time_of_flight(
+            shot.distance_meters
+        )
+        assert shot.time_of_flight_seconds == pytest.approx(
+            time_of_flight, abs=target_tracker.MOVING_SHOT_TOLERANCE_SECONDS
+        )
+        assert shot.virtual_target_x_meters == pytest.approx(
+            3.0 - 1.5 * shot.time_of_flight_seconds
+        )
+        assert shot.virtual_target_y_meters == pytest.approx(
+            1.0 + 2.0 * shot.time_of_flight_seconds
+        )
+
+    def test_moving_away_shoots_farther(self):
+        stationary = target_tracker.solve_moving_shot(3.0, 0.0, 0.0, 0.0, 0.0)
+        moving_away = target_tracker.solve_moving_shot(3.0, 0.0, -1.0, 0.0, 0.0)
+
+        assert moving_away.distance_meters > stationary.distance_meters
+        assert moving_away.flywheel_speed_rps > stationary.flywheel_speed_rps
+        assert (
+            moving_away.time_of_flight_seconds
+            > stationary.time_of_flight_seconds
+        )
+
+    def test_reports_when_not_converged(self):
+        shot = target_tracker.solve_moving_shot(
+            3.0, 0.0, -2.0, 0.0, 0.0, max_iterations=1
+        )
+
+        assert shot.iterations == 1
+        assert not shot.converged
+
+    def test_takes_microseconds(self):
+        """The solver is cheap enough to run every loop."""
+        solves = 2000
+        start = time.perf_counter()
+        for i in range(solves):
+            target_tracker.solve_moving_shot(
+                3.0, 1.0, 1.5 + i * 1e-4, -2.0, 0.5
+            )
+        microseconds = (time.perf_counter() - start) / solves * 1e6
+        print(f"\nsolve_moving_shot: {microseconds:.1f}us")
+        assert microseconds < 100.0
+
+
 def _make_tracker(
     mocker,
     robot_pose: geometry.Pose2d,
@@ -88,7 +311,6 @@ def _make_tracker(
                 min_angle=min_angle,
                 max_angle=max_angle,
                 feed_forward_mvt_multiplier=1.0,
-                time_of_flight=0.0,
             )
         )
     )
@@ -101,16 +323,17 @@ def _make_tracker(
         yaw_rate_signal
     )
     tracker.drivetrain.get_robot_pose.return_value = robot_pose
-    tracker.drivetrain.swerve_drive.get_state.return_value = (
-        types.SimpleNamespace(
-            pose=robot_pose,
-            speeds=types.SimpleNamespace(vx=0.0, vy=0.0, omega=0.0),
-        )
+    tracker.drivetrain.robot_speeds.return_value = types.SimpleNamespace(
+        vx=0.0, vy=0.0, omega=0.0
     )
     tracker.flywheel = mocker.Mock()
     tracker.hood = mocker.Mock()
     tracker.turret = mocker.Mock()
     tracker.data_logger = mocker.Mock()
+    tracker.signal_hub = mocker.Mock()
+    tracker.signal_hub.register.side_effect = (
+        lambda device, signal, **kwargs: signal
+    )
     tracker.setup()
     return tracker
 
@@ -158,6 +381,11 @@ def test_setup_initializes_known_transforms(mocker) -> None:
         tracker._yaw_rate_signal
         is tracker.drivetrain.swerve_drive.pigeon2.get_angular_velocity_z_world.return_value
     )
+    tracker.signal_hub.register.assert_called_once_with(
+        tracker.drivetrain.swerve_drive.pigeon2,
+        tracker._yaw_rate_signal,
+        synchronous=True,
+    )
 
 
 @pytest.mark.parametrize(
@@ -268,7 +496,7 @@ def test_execute_updates_turret_pose_and_commands_angle(
         expected_turret_pose.rotation() - tracker._turret_field_pose.rotation()
     ).degrees()
 
-    tracker._yaw_rate_signal.refresh.assert_called_once()
+    tracker._yaw_rate_signal.refresh.assert_not_called()
     tracker.turret.set_position.assert_called_once()
     (commanded_angle,) = tracker.turret.set_position.call_args.args
 
@@ -295,7 +523,7 @@ def test_execute_zero_yaw_rate_does_not_offset_target_angle(mocker) -> None:
 
     tracker.execute()
 
-    tracker._yaw_rate_signal.refresh.assert_called_once()
+    tracker._yaw_rate_signal.refresh.assert_not_called()
     tracker.turret.set_position.assert_called_once()
     (commanded_angle,) = tracker.turret.set_position.call_args.args
     assert commanded_angle == pytest.approx(17.5)
@@ -337,7 +565,7 @@ def test_execute_clamps_target_angle_to_limits(
 
     tracker.execute()
 
-    tracker._yaw_rate_signal.refresh.assert_called_once()
+    tracker._yaw_rate_signal.refresh.assert_not_called()
     tracker.turret.set_position.assert_called_once()
     (commanded_angle,) = tracker.turret.set_position.call_args.args
     assert commanded_angle == pytest.approx(expected_command)
@@ -379,14 +607,14 @@ def test_execute_compensation_applied_before_clamping(
 
     tracker.execute()
 
-    tracker._yaw_rate_signal.refresh.assert_called_once()
+    tracker._yaw_rate_signal.refresh.assert_not_called()
     tracker.turret.set_position.assert_called_once()
     (commanded_angle,) = tracker.turret.set_position.call_args.args
     assert commanded_angle == pytest.approx(expected_command)
 
 
 def test_execute_updates_compensation_across_control_loops(mocker) -> None:
-    """Each execute loop should refresh yaw-rate and recompute compensation."""
+    """Each execute loop should recompute compensation from the hub's yaw-rate."""
     blue_hub = geometry.Translation2d(
         target_tracker.BLUE_HUB_TO_FIELD_X, target_tracker.BLUE_HUB_TO_FIELD_Y
     )
@@ -405,7 +633,7 @@ def test_execute_updates_compensation_across_control_loops(mocker) -> None:
     tracker._yaw_rate_signal.value = -50.0
     tracker.execute()
 
-    assert tracker._yaw_rate_signal.refresh.call_count == 2
+    tracker._yaw_rate_signal.refresh.assert_not_called()
     assert tracker.turret.set_position.call_count == 2
     first_commanded_angle = tracker.turret.set_position.call_args_list[0].args[
         0
@@ -444,10 +672,39 @@ def test_compute_stationary_target_turret_angle_degrees_is_relative_to_heading(
         blue_hub - geometry.Translation2d(1.0, 0.0),
         geometry.Rotation2d.fromDegrees(90.0),
     )
+    tracker._select_target(tracker._turret_field_pose)
 
+    # The shot grid is interpolated, so this is only close to exact.
     assert (
         tracker._compute_stationary_target_turret_angle_degrees()
-        == pytest.approx(-90.0)
+        == pytest.approx(-90.0, abs=0.1)
+    )
+
+
+def test_stationary_angle_without_shot_grid_matches_grid(mocker) -> None:
+    """Without a shot grid, the stationary solution is computed directly."""
+    report_error = mocker.patch.object(target_tracker.wpilib, "reportError")
+    mocker.patch.object(
+        target_tracker.shot_grid, "default_path", return_value="/nonexistent"
+    )
+    without_grid = _make_tracker(mocker, geometry.Pose2d())
+    mocker.stopall()
+    with_grid = _make_tracker(mocker, geometry.Pose2d())
+
+    assert without_grid._shot_grid is None
+    report_error.assert_called_once()
+    assert with_grid._shot_grid is not None
+    for tracker in (without_grid, with_grid):
+        tracker._turret_field_pose = geometry.Pose2d(
+            geometry.Translation2d(2.1, 6.3),
+            geometry.Rotation2d.fromDegrees(30.0),
+        )
+        tracker._select_target(tracker._turret_field_pose)
+    assert with_grid._compute_stationary_target_turret_angle_degrees() == (
+        pytest.approx(
+            without_grid._compute_stationary_target_turret_angle_degrees(),
+            abs=0.25,
+        )
     )
 
 
@@ -0,0 +1,131 @@
+import os
+import shutil
+
+import pytest
+import wpilib
+
+from autonomous import (
+    auto_base,
+    center_shoot_preload,
+    compiled_trajectory,
+    trajectories,
+)
+
+NAME = "center_shoot_preload"
+
+
+@pytest.fixture
+def choreo_dir(tmp_path):
+    """A copy of one deployed trajectory, in its own directory."""
+    for extension in (".traj", compiled_trajectory.EXTENSION):
+        shutil.copy(
+            os.path.join(
+                wpilib.getDeployDirectory(), "choreo", NAME + extension
+            ),
+            tmp_path,
+        )
+    return tmp_path
+
+
+@pytest.fixture
+def cache(choreo_dir):
+    return trajectories.TrajectoryCache(str(choreo_dir))
+
+
+@pytest.fixture
+def parses(mocker):
+    """Counts .traj file parses."""
+    return mocker.spy(trajectories.choreo, "load_swerve_trajectory_string")
+
+
+@pytest.fixture
+def loads(mocker):
+    """Counts compiled trajectory loads."""
+    return mocker.spy(compiled_trajectory.CompiledTrajectory, "load")
+
+
+class TestTrajectoryCache:
+    def test_loads_nothing_up_front(self, cache, parses, loads):
+        assert parses.call_count == 0
+        assert loads.call_count == 0
+
+    def test_keeps_loaded_trajectory(self, cache, parses, loads):
+        trajectory = cache.get(NAME)
+
+        assert trajectory is not None
+        assert trajectory.sample_count > 0
+        assert cache.get(NAME) is trajectory
+        assert loads.call_count == 1
+        assert parses.call_count == 0
+
+    def test_parses_uncompiled_trajectory(self, cache, choreo_dir, parses):
+        os.remove(choreo_dir / (NAME + compiled_trajectory.EXTENSION))
+
+        trajectory = cache.get(NAME)
+
+        assert trajectory is not None
+        assert trajectory.sample_count > 0
+        assert parses.call_count == 1
+
+    def test_loads_in_background(self, cache):
+        cache.load_async(NAME)
+        trajectory = cache.get(NAME)
+
+        assert cache.is_loaded(NAME)
+        assert trajectory is not None
+
+    def test_reloads_changed_file(self, cache, choreo_dir, loads):
+        first = cache.get(NAME)
+        path = choreo_dir / (NAME + compiled_trajectory.EXTENSION)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert cache.get(NAME) is not first
+        assert loads.call_count == 2
+
+    def test_reports_missing_trajectory_once(self, mocker, cache):
+        report_error = mocker.patch.object(trajectories.wpilib, "reportError")
+
+        assert cache.get("missing") is None
+        assert cache.get("missing") is None
+        report_error.assert_called_once()
+
+
+class TestAutoBase:
+    @pytest.fixture
+    def auto(self, mocker, cache):
+        mode = center_shoot_preload.CenterShootPreload()
+        mode.alliance_fetcher = mocker.Mock()
+        mode.alliance_fetcher.is_red_alliance.return_value = False
+        mode.intake = mocker.Mock()
+        mode.trajectory_cache = cache
+        mode.setup()
+        return mode
+
+    def test_setup_loads_nothing(self, auto, parses, loads):
+        assert parses.call_count == 0
+        assert loads.call_count == 0
+
+    def test_initial_pose_once_loaded(self, auto, cache):
+        auto.get_initial_pose()
+        cache.get(NAME)
+
+        pose = auto.get_initial_pose()
+
+        expected = cache.get(NAME).get_initial_pose(False)
+        assert pose == expected
+
+    def test_initial_pose_while_loading(self, mocker, auto, cache):
+        mocker.patch.object(cache, "is_loaded", return_value=False)
+
+        assert auto.get_initial_pose() is None
+
+    def test_on_enable_waits_for_trajectory(self, mocker, auto, cache):
+        mocker.patch.object(
+            auto_base.magicbot.AutonomousStateMachine, "on_enable"
+        )
+
+        auto.on_enable()
+
+        assert auto._trajectory is cache.get(NAME)
+        assert auto._sampler is not None
@@ -0,0 +1,245 @@
+import itertools
+import math
+import types
+
+import pytest
+
+from wpimath import geometry
+
+from common import datalog
+from subsystem import drivetrain
+from subsystem.drivetrain import limelight, vision
+
+# Gives each test its own Limelight names, since LimelightHelpers caches its
+# NetworkTables entries by name.
+_limelight_ids = itertools.count()
+
+
+@pytest.fixture
+def limelights():
+    index = next(_limelight_ids)
+    return [f"limelight-test{index}a", f"limelight-test{index}b"]
+
+
+@pytest.fixture
+def component(mocker, limelights, data_logger):
+    """Vision component for two Limelights, with setup() called."""
+    v = vision.Vision()
+    v.robot_constants = mocker.MagicMock()
+    v.robot_constants.drivetrain.vision = drivetrain.constants.VisionConstants(
+        limelights=limelights
+    )
+    v.drivetrain = mocker.Mock()
+    v.drivetrain.estimated_yaw_degrees.return_value = 0.0
+    v.data_logger = data_logger
+    v.telemetry_scheduler = datalog.TelemetryScheduler()
+    v.setup()
+    return v
+
+
+def _publish_frame(limelight_name: str, time_us: int, x: float = 3.0) -> None:
+    """Publish a MegaTag2 frame that sees one tag, at the given NT time."""
+    entry = limelight.LimelightHelpers.get_limelight_double_array_entry(
+        limelight_name, "botpose_orb_wpiblue"
+    )
+    # x, y, z, roll, pitch, yaw, latency, tag count, span, distance, area
+    entry.set([x, 4.0, 0.0, 0.0, 0.0, 0.0, 20.0, 1, 0.0, 2.0, 1.0], time_us)
+
+
+class TestFrameQueue:
+    def test_fuses_each_frame_once(self, component, limelights):
+        _publish_frame(limelights[0], 1_000_000)
+
+        component.execute()
+        component.execute()
+
+        add = component.drivetrain.swerve_drive.add_vision_measurement
+        add.assert_called_once()
+        assert add.call_args.args[0].X() == pytest.approx(3.0)
+
+    def test_fuses_every_frame_in_order(self, component, limelights):
+        """Frames published between loops are all fused, oldest first."""
+        for index, x in enumerate((3.0, 3.5, 4.0)):
+            _publish_frame(limelights[0], 1_000_000 + index * 10_000, x=x)
+
+        component.execute()
+
+        add = component.drivetrain.swerve_drive.add_vision_measurement
+        assert [call.args[0].X() for call in add.call_args_list] == [
+            pytest.approx(3.0),
+            pytest.approx(3.5),
+            pytest.approx(4.0),
+        ]
+        timestamps = [call.args[1] for call in add.call_args_list]
+        assert timestamps == sorted(timestamps)
+        assert len(set(timestamps)) == 3
+
+    def test_caps_frames_per_loop(self, component, limelights):
+        """Only the newest frames are fused when too many arrive at once."""
+        frames = vision.Vision.MAX_FRAMES_PER_LOOP + 2
+        for index in range(frames):
+            _publish_frame(
+                limelights[0], 1_000_000 + index * 10_000, x=1.0 + index
+            )
+
+        component.execute()
+
+        add = component.drivetrain.swerve_drive.add_vision_measurement
+        assert [call.args[0].X() for call in add.call_args_list] == [
+            pytest.approx(1.0 + index) for index in range(2, frames)
+        ]
+
+    def test_logs_frame_rates(self, component, limelights, data_logger):
+        frames = vision.Vision.MAX_FRAMES_PER_LOOP + 1
+        for index in range(frames):
+            _publish_frame(
+                limelights[0], 1_000_000 + index * 10_000, x=1.0 + index
+            )
+        component.execute()
+        component.execute()
+        component._frame_rate_timer = types.SimpleNamespace(
+            get=lambda: 2.0, reset=lambda: None
+        )
+
+        component._log_frame_rates()
+
+        logged = dict(data_logger.logged)
+        prefix = f"/components/vision/{limelights[0]}"
+        assert logged[f"{prefix}/frames_per_second"] == pytest.approx(
+            (frames - 1) / 2.0
+        )
+        assert logged[f"{prefix}/dropped_frames_per_second"] == pytest.approx(
+            0.5
+        )
+        # The second Limelight never sent a frame.
+        assert (
+            logged[f"/components/vision/{limelights[1]}/frames_per_second"]
+            == 0.0
+        )
+
+
+def _estimate(tag_count=1, avg_tag_dist=2.0, tag_span=0.0, ambiguities=()):
+    return limelight.PoseEstimate(
+        tag_count=tag_count,
+        avg_tag_dist=avg_tag_dist,
+        tag_span=tag_span,
+        raw_fiducials=[
+            limelight.RawFiducial(ambiguity=ambiguity)
+            for ambiguity in ambiguities
+        ],
+        is_megatag_2=True,
+    )
+
+
+class TestMeasurementStdDevs:
+    CONSTANTS = drivetrain.constants.VisionConstants(limelights=[])
+
+    def _xy_std_dev(self, pose_estimate) -> float:
+        xy_std_dev, _ = vision.measurement_std_devs(
+            pose_estimate, self.CONSTANTS, 0.5, 1.0
+        )
+        return xy_std_dev
+
+    def test_single_tag_at_reference_distance(self):
+        """The configured standard deviations are for this case."""
+        assert vision.measurement_std_devs(
+            _estimate(avg_tag_dist=2.0), self.CONSTANTS, 0.5, 1.0
+        ) == pytest.approx((0.5, 1.0))
+
+    def test_closer_tags_are_trusted_more(self):
+        assert self._xy_std_dev(_estimate(avg_tag_dist=1.0)) < self._xy_std_dev(
+            _estimate(avg_tag_dist=3.0)
+        )
+
+    def test_more_tags_are_trusted_more(self):
+        assert self._xy_std_dev(
+            _estimate(tag_count=4, tag_span=1.0)
+        ) < self._xy_std_dev(_estimate(tag_count=2, tag_span=1.0))
+
+    def test_wider_span_is_trusted_more(self):
+        assert self._xy_std_dev(
+            _estimate(tag_count=2, tag_span=2.0)
+        ) < self._xy_std_dev(_estimate(tag_count=2, tag_span=0.5))
+
+    def test_ambiguous_tags_are_trusted_less(self):
+        assert self._xy_std_dev(
+            _estimate(ambiguities=(0.1, 0.6))
+        ) > self._xy_std_dev(_estimate(ambiguities=(0.1, 0.1)))
+
+    def test_infinite_theta_stays_infinite(self):
+        _, theta_std_dev = vision.measurement_std_devs(
+            _estimate(tag_count=4), self.CONSTANTS, 0.5, math.inf
+        )
+        assert theta_std_dev == math.inf
+
+
+class TestMergeMeasurements:
+    def test_weights_by_inverse_variance(self):
+        merged = vision.merge_measurements(
+            [
+                vision.VisionMeasurement(
+                    geometry.Pose2d(1.0, 1.0, 0.0), 1.0, 0.1, math.inf
+                ),
+                vision.VisionMeasurement(
+                    geometry.Pose2d(2.0, 1.0, 0.0), 1.002, 0.2, math.inf
+                ),
+            ]
+        )
+
+        # Weights of 100 and 25.
+        assert merged.pose.X() == pytest.approx(1.2)
+        assert merged.timestamp_seconds == pytest.approx(1.0004)
+        assert merged.xy_std_dev == pytest.approx(1.0 / math.sqrt(125.0))
+        assert merged.theta_std_dev == math.inf
+
+    def test_averages_headings_across_wraparound(self):
+        merged = vision.merge_measurements(
+            [
+                vision.VisionMeasurement(
+                    geometry.Pose2d(1.0, 1.0, math.radians(179.0)),
+                    1.0,
+                    0.1,
+                    0.1,
+                ),
+                vision.VisionMeasurement(
+                    geometry.Pose2d(1.0, 1.0, math.radians(-179.0)),
+                    1.0,
+                    0.1,
+                    0.1,
+                ),
+            ]
+        )
+
+        assert abs(merged.pose.rotation().degrees()) == pytest.approx(180.0)
+        assert merged.theta_std_dev == pytest.approx(0.1 / math.sqrt(2.0))
+
+
+class TestFusion:
+    def test_merges_time_aligned_frames(self, component, limelights):
+        """Frames from both Limelights at the same time become one measurement."""
+        _publish_frame(limelights[0], 1_000_000, x=3.0)
+        _publish_frame(limelights[1], 1_001_000, x=3.2)
+        _publish_frame(limelights[1], 1_040_000, x=3.4)
+
+        component.execute()
+
+        add = component.drivetrain.swerve_drive.add_vision_measurement
+        assert [call.args[0].X() for call in add.call_args_list] == [
+            pytest.approx(3.1),
+            pytest.approx(3.4),
+        ]
+        merged_std_devs = add.call_args_list[0].args[2]
+        single_std_devs = add.call_args_list[1].args[2]
+        assert merged_std_devs[0] < single_std_devs[0]
+
+    def test_merging_can_be_disabled(self, mocker, component, limelights):
+        mocker.patch.object(
+            vision.Vision, "MERGE_TIME_ALIGNED_ESTIMATES", False
+        )
+        _publish_frame(limelights[0], 1_000_000, x=3.0)
+        _publish_frame(limelights[1], 1_001_000, x=3.2)
+
+        component.execute()
+
+        add = component.drivetrain.swerve_drive.add_vision_measurement
+        assert add.call_count == 2
@@ -3,7 +3,9 @@ import phoenix6
 import wpilib
 
 import robot
-from subsystem import drivetrain, intake, shooter
+from subsystem.drivetrain import tuners as drivetrain_tuners
+from subsystem.intake import tuners as intake_tuners
+from subsystem.shooter import tuners as shooter_tuners
 
 
 class TunerBot(robot.MyRobot):
@@ -18,14 +20,14 @@ class TunerBot(robot.MyRobot):
     ```
     """
 
-    flywheel_tuner: shooter.FlywheelTuner
-    hood_tuner: shooter.HoodTuner
-    hopper_tuner: shooter.HopperTuner
-    indexer_tuner: shooter.IndexerTuner
-    turret_tuner: shooter.TurretTuner
-    vision_tuner: drivetrain.vision.VisionTuner
-    intake_tuner: intake.IntakeTuner
-    drivetrain_tuner: drivetrain.DrivetrainTuner
+    flywheel_tuner: shooter_tuners.FlywheelTuner
+    hood_tuner: shooter_tuners.HoodTuner
+    hopper_tuner: shooter_tuners.HopperTuner
+    indexer_tuner: shooter_tuners.IndexerTuner
+    turret_tuner: shooter_tuners.TurretTuner
+    vision_tuner: drivetrain_tuners.VisionTuner
+    intake_tuner: intake_tuners.IntakeTuner
+    drivetrain_tuner: drivetrain_tuners.DrivetrainTuner
 
     def createObjects(self) -> None:
         super().createObjects()